@@ -0,0 +1,31 @@
+"""add_project_chats_keyset_index
+
+Revision ID: 3c9a1f7d2b64
+Revises: e841ac6f60f9
+Create Date: 2026-10-18 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f7d2b64'
+down_revision: Union[str, Sequence[str], None] = 'e841ac6f60f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite index for keyset-paginated chat history."""
+    op.create_index(
+        'ix_project_chats_project_id_timestamp_id',
+        'project_chats',
+        ['project_id', 'timestamp', 'id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_chats_project_id_timestamp_id', table_name='project_chats')
@@ -0,0 +1,99 @@
+"""add_terraform_diff_storage_tables
+
+Revision ID: 7d4e2b9c1a35
+Revises: 3c9a1f7d2b64
+Create Date: 2026-10-18 21:40:12.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4e2b9c1a35'
+down_revision: Union[str, Sequence[str], None] = '3c9a1f7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create compressed diff storage with trigram and keyset indexes."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_table(
+        'terraform_diff_dictionaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('dictionary', sa.LargeBinary(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        'terraform_diffs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.String(), nullable=True),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('source_file', sa.Text(), nullable=True),
+        sa.Column('target_file', sa.Text(), nullable=True),
+        sa.Column('source_hash', sa.String(64), nullable=False, server_default=''),
+        sa.Column('target_hash', sa.String(64), nullable=False, server_default=''),
+        # Plain-text content, only set on rows written before compression
+        sa.Column('diff_content', sa.Text(), nullable=True),
+        sa.Column('diff_format', sa.String(20), nullable=False, server_default='unified'),
+        sa.Column('additions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('deletions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('changes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('risk_score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('impact_level', sa.String(20), nullable=False, server_default='low'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='active'),
+        sa.Column('metadata', sa.Text(), nullable=True),
+        sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('content_blob', sa.LargeBinary(), nullable=True),
+        sa.Column('content_codec', sa.String(16), nullable=True),
+        sa.Column(
+            'dictionary_id', sa.Integer(),
+            sa.ForeignKey('terraform_diff_dictionaries.id'), nullable=True
+        ),
+        sa.Column('base_diff_id', sa.Integer(), nullable=True),
+        sa.Column('chain_depth', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('content_size', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('stored_size', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Keyset pagination, newest first
+    op.create_index('ix_terraform_diffs_created_at_id', 'terraform_diffs', ['created_at', 'id'])
+    op.create_index(
+        'ix_terraform_diffs_user_id_created_at_id', 'terraform_diffs', ['user_id', 'created_at', 'id']
+    )
+    # Delta base lookup and per-job history
+    op.create_index(
+        'ix_terraform_diffs_job_id_target_file_id', 'terraform_diffs', ['job_id', 'target_file', 'id']
+    )
+    op.create_index('ix_terraform_diffs_base_diff_id', 'terraform_diffs', ['base_diff_id'])
+    # Substring path search (LIKE '%...%')
+    op.create_index(
+        'ix_terraform_diffs_source_file_trgm', 'terraform_diffs', ['source_file'],
+        postgresql_using='gin', postgresql_ops={'source_file': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_terraform_diffs_target_file_trgm', 'terraform_diffs', ['target_file'],
+        postgresql_using='gin', postgresql_ops={'target_file': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_terraform_diffs_target_file_trgm', table_name='terraform_diffs')
+    op.drop_index('ix_terraform_diffs_source_file_trgm', table_name='terraform_diffs')
+    op.drop_index('ix_terraform_diffs_base_diff_id', table_name='terraform_diffs')
+    op.drop_index('ix_terraform_diffs_job_id_target_file_id', table_name='terraform_diffs')
+    op.drop_index('ix_terraform_diffs_user_id_created_at_id', table_name='terraform_diffs')
+    op.drop_index('ix_terraform_diffs_created_at_id', table_name='terraform_diffs')
+    op.drop_table('terraform_diffs')
+    op.drop_table('terraform_diff_dictionaries')
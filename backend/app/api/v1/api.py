@@ -90,4 +90,22 @@ def create_app() -> FastAPI:
     async def root():
         return {"message": "Welcome to Infrajet Backend API"}
 
+    @app.get("/metrics/db-pool")
+    async def db_pool_metrics():
+        from app.db.session import get_pool_status
+
+        return get_pool_status()
+
+    @app.get("/metrics/logging")
+    async def logging_metrics():
+        from logconfig.logger import get_sink_metrics
+
+        return get_sink_metrics()
+
+    @app.get("/metrics/conversation-context")
+    async def conversation_context_metrics():
+        from app.services.chat.conversation_context_manager import context_store
+
+        return context_store.get_stats()
+
     return app
@@ -3,6 +3,7 @@ from logconfig.logger import get_logger, get_context_filter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.firebase_token_cache import token_cache
 from app.db.session import get_db
 from app.dependencies.auth import get_current_user_id
 from app.models.user import User
@@ -109,6 +110,12 @@ async def logout(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid refresh token",
             )
+
+        # Stop serving the caller's ID token from the verification cache
+        authorization = request.headers.get("authorization", "")
+        if authorization.startswith("Bearer "):
+            token_cache.invalidate_token(authorization[len("Bearer "):])
+
         logger.info("User logged out successfully")
         return {"detail": "Successfully logged out"}
     except Exception as e:
@@ -137,6 +144,8 @@ async def logout_all(
     
     try:
         await AuthService.logout_all_sessions(db, current_user_id)
+        # Refuse ID tokens issued before now for this user in this process
+        token_cache.invalidate_user(current_user_id)
         logger.info(f"Successfully logged out user {current_user_id} from all devices")
         return {"detail": "Successfully logged out from all devices"}
     except Exception as e:
@@ -7,14 +7,16 @@ chat history with proper authentication and access control.
 """
 
 import asyncio
+import json
 import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_async_db
+from app.db.session import get_async_db, async_session_factory
 from app.dependencies.auth import get_current_user_id
 from app.services.chat_service import (
     ChatService,
@@ -130,6 +132,7 @@ class ChatHistoryResponse(BaseModel):
     total_count: int = Field(..., description="Total number of messages (if available)")
     returned_count: int = Field(..., description="Number of messages returned")
     has_more: bool = Field(..., description="Whether there are more messages available")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
     message_text: str = Field(..., description="Success message")
 
 
@@ -408,7 +411,7 @@ async def _trigger_code_generation(
         if provider:
             # Get the previous user message to combine with provider info
             try:
-                chat_history = await chat_service.get_chat_history(project_id, user_id, limit=5)
+                chat_history = await chat_service.get_recent_chat_history(project_id, user_id, limit=5)
                 previous_user_message = None
                 for msg in reversed(chat_history):
                     if msg.message_type == MessageType.USER and msg.message_content != user_query:
@@ -460,7 +463,6 @@ async def _trigger_code_generation(
         if result:
             try:
                 from app.models.project import CodeGeneration, GenerationStatus
-                from sqlalchemy import select
 
                 generation_record = CodeGeneration(
                     id=generation_id,
@@ -524,7 +526,6 @@ async def _trigger_code_generation(
                 # Create ProjectFile records in database for file share visibility
                 try:
                     from app.models.project import ProjectFile
-                    from sqlalchemy import select
 
                     for filename in files_saved:
                         # Get file path relative to generation
@@ -832,7 +833,8 @@ async def save_message(
     
     - Validates user has access to the project
     - Returns messages in chronological order (oldest first)
-    - Supports pagination with limit and offset parameters
+    - Supports cursor pagination: pass the returned next_cursor to get the next page
+    - Offset pagination is still accepted but slows down on deep pages
     - Includes message metadata and user information
     """,
     responses={
@@ -847,6 +849,7 @@ async def get_chat_history(
     project_id: str = Path(..., description="Project ID (UUID)"),
     limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of messages to return"),
     offset: int = Query(0, ge=0, description="Number of messages to skip (for pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor returned with the previous page"),
     user_id: str = Depends(get_current_user_id),
     chat_service: ChatService = Depends(get_chat_service)
 ) -> ChatHistoryResponse:
@@ -857,6 +860,7 @@ async def get_chat_history(
         project_id: Project ID to get chat history for
         limit: Maximum number of messages to return
         offset: Number of messages to skip for pagination
+        cursor: Keyset cursor from the previous page (takes precedence over offset)
         user_id: Supabase user ID from JWT token
         chat_service: Chat service instance
         
@@ -867,13 +871,24 @@ async def get_chat_history(
         HTTPException: If operation fails
     """
     try:
-        # Get chat history using chat service
-        messages = await chat_service.get_chat_history(
-            project_id=project_id,
-            user_id=user_id,
-            limit=limit,
-            offset=offset
-        )
+        # Get chat history using chat service; paged requests fetch one
+        # extra row to determine has_more in the same query
+        next_cursor = None
+        has_more = False
+        if limit is not None or cursor is not None:
+            messages, next_cursor, has_more = await chat_service.get_chat_history_page(
+                project_id=project_id,
+                user_id=user_id,
+                limit=limit or 1000,
+                cursor=cursor,
+                offset=offset
+            )
+        else:
+            messages = await chat_service.get_chat_history(
+                project_id=project_id,
+                user_id=user_id,
+                offset=offset
+            )
         
         # Convert to response models
         message_responses = []
@@ -889,22 +904,6 @@ async def get_chat_history(
             )
             message_responses.append(message_response)
         
-        # Determine if there are more messages
-        has_more = False
-        if limit is not None and len(messages) == limit:
-            # Check if there are more messages by trying to get one more
-            try:
-                next_messages = await chat_service.get_chat_history(
-                    project_id=project_id,
-                    user_id=user_id,
-                    limit=1,
-                    offset=offset + len(messages)
-                )
-                has_more = len(next_messages) > 0
-            except Exception:
-                # If we can't check, assume no more messages
-                has_more = False
-        
         logger.info(f"Retrieved {len(messages)} chat messages for project {project_id}")
         
         return ChatHistoryResponse(
@@ -913,6 +912,7 @@ async def get_chat_history(
             total_count=len(messages),  # Note: This is returned count, not total in DB
             returned_count=len(messages),
             has_more=has_more,
+            next_cursor=next_cursor,
             message_text=f"Retrieved {len(messages)} chat messages successfully"
         )
         
@@ -958,6 +958,107 @@ async def get_chat_history(
         )
 
 
+@router.get(
+    "/{project_id}/chat/messages/export",
+    summary="Export chat history",
+    description="""
+    Stream a project's complete chat history as newline-delimited JSON.
+    
+    - Validates user has access to the project
+    - One message per line, in chronological order (oldest first)
+    - Messages are read in batches, so exports of long histories use bounded memory
+    """,
+    responses={
+        200: {"description": "Chat history stream", "content": {"application/x-ndjson": {}}},
+        401: {"description": "Authentication required"},
+        403: {"description": "Access denied - user lacks project access", "model": ErrorResponse},
+        500: {"description": "Internal server error", "model": ErrorResponse}
+    }
+)
+async def export_chat_history(
+    project_id: str = Path(..., description="Project ID (UUID)"),
+    batch_size: int = Query(500, ge=1, le=5000, description="Messages read per database query"),
+    user_id: str = Depends(get_current_user_id),
+    chat_service: ChatService = Depends(get_chat_service)
+) -> StreamingResponse:
+    """
+    Export chat history for a project as NDJSON.
+    
+    Args:
+        project_id: Project ID to export chat history for
+        batch_size: Number of messages read per query
+        user_id: Supabase user ID from JWT token
+        chat_service: Chat service instance
+        
+    Returns:
+        StreamingResponse with one JSON object per line
+        
+    Raises:
+        HTTPException: If access validation fails
+    """
+    try:
+        await chat_service.ensure_history_access(project_id, user_id)
+    except ChatValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                error="ChatValidationError",
+                message=str(e),
+                details={"project_id": project_id, "field": getattr(e, 'field', None)}
+            ).model_dump()
+        )
+    except ChatAccessDeniedError as e:
+        logger.warning(f"Chat export denied for project {project_id}, user {user_id}: {e}")
+        raise HTTPException(
+            status_code=403,
+            detail=ErrorResponse(
+                error="ChatAccessDenied",
+                message=str(e),
+                details={"project_id": project_id, "user_id": user_id}
+            ).model_dump()
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error preparing chat export for project {project_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="InternalServerError",
+                message="An unexpected error occurred while exporting chat history",
+                details={"project_id": project_id}
+            ).model_dump()
+        )
+
+    async def generate():
+        # The stream outlives the request-scoped session, so read with its own
+        exported = 0
+        async with async_session_factory() as export_session:
+            async for message in chat_service.iter_chat_history(
+                project_id,
+                user_id,
+                batch_size=batch_size,
+                session=export_session,
+                check_access=False
+            ):
+                exported += 1
+                yield json.dumps({
+                    "id": message.id,
+                    "project_id": message.project_id,
+                    "user_id": message.user_id,
+                    "message_content": message.message_content,
+                    "message_type": message.message_type.value,
+                    "timestamp": message.timestamp.isoformat(),
+                    "thread_id": message.thread_id,
+                    "generation_id": message.generation_id
+                }) + "\n"
+        logger.info(f"Exported {exported} chat messages for project {project_id}")
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="chat-{project_id}.ndjson"'}
+    )
+
+
 @router.get(
     "/{project_id}/generations",
     summary="List project generations",
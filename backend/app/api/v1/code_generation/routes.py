@@ -62,27 +62,22 @@ diff_generator = TerraformDiffGenerator()
 validator = TerraformValidator()
 best_practices_enforcer = TerraformBestPracticesEnforcer()
 
-# Global orchestrator instances cache
-_orchestrators: Dict[str, CodeGenerationOrchestrator] = {}
-_project_orchestrators: Dict[str, ProjectIntegratedOrchestrator] = {}
-
 router = APIRouter()
 
 
 def get_orchestrator(db: AsyncSession) -> CodeGenerationOrchestrator:
-    """Get or create orchestrator instance for the database session."""
-    session_id = str(id(db))
-    if session_id not in _orchestrators:
-        _orchestrators[session_id] = CodeGenerationOrchestrator(db)
-    return _orchestrators[session_id]
+    """
+    Create an orchestrator bound to the request's database session.
+
+    Expensive components and job state live in the process-wide component
+    registry, so this only builds thin session-bound wrappers.
+    """
+    return CodeGenerationOrchestrator(db)
 
 
 def get_project_orchestrator(db: AsyncSession) -> ProjectIntegratedOrchestrator:
-    """Get or create project-integrated orchestrator instance for the database session."""
-    session_id = str(id(db))
-    if session_id not in _project_orchestrators:
-        _project_orchestrators[session_id] = get_project_integrated_orchestrator(db)
-    return _project_orchestrators[session_id]
+    """Create a project-integrated orchestrator bound to the request's database session."""
+    return get_project_integrated_orchestrator(db)
 
 
 # @router.on_event("startup")
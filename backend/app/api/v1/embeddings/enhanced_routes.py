@@ -224,7 +224,7 @@ async def hybrid_search(
         orchestrator = EmbeddingOrchestrator(db)
 
         # Generate query embedding
-        query_embedding = orchestrator.embedding_provider.embed_query(query)
+        query_embedding = await orchestrator.embedding_provider.aembed_query(query)
 
         results = []
 
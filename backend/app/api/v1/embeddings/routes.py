@@ -323,7 +323,7 @@ async def enhanced_search(
         orchestrator = EmbeddingOrchestrator(db)
 
         # Generate query embedding
-        query_embedding = orchestrator.embedding_provider.embed_query(query)
+        query_embedding = await orchestrator.embedding_provider.aembed_query(query)
 
         results = []
 
@@ -407,6 +407,8 @@ async def get_system_health(
         }
 
         health_status["services"] = services_status
+        health_status["summarization"] = orchestrator.summarization_service.get_stats()
+        health_status["embedding_batching"] = orchestrator.embedding_provider.get_batching_stats()
 
         # Determine overall status
         all_services_healthy = all(services_status.values())
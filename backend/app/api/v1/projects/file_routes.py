@@ -13,7 +13,8 @@ import time
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response
 from fastapi.responses import PlainTextResponse, StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.dependencies.auth import get_current_user_id
@@ -58,7 +59,7 @@ async def get_project_file_tree(
     project_id: str = Path(..., description="Project UUID"),
     group_by_generation: bool = Query(True, description="Group files by generation"),
     include_metadata: bool = Query(True, description="Include file metadata"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> ProjectFileTreeResponse:
     """
@@ -99,10 +100,11 @@ async def get_project_file_tree(
         stats = await project_service.get_project_stats(project_id, user_id)
 
         # Count file types
-        files = db.query(ProjectFile).filter(ProjectFile.project_id == project_id).all()
+        result = await db.execute(
+            select(ProjectFile.file_type).where(ProjectFile.project_id == project_id)
+        )
         file_types = {}
-        for file in files:
-            file_type = file.file_type
+        for file_type in result.scalars():
             file_types[file_type] = file_types.get(file_type, 0) + 1
 
         return ProjectFileTreeResponse(
@@ -145,7 +147,7 @@ async def get_enhanced_file_content(
     project_id: str = Path(..., description="Project UUID"),
     file_path: str = Path(..., description="File path within project"),
     highlight_syntax: bool = Query(True, description="Apply syntax highlighting"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> EnhancedFileContentResponse:
     """
@@ -176,13 +178,12 @@ async def get_enhanced_file_content(
             )
 
         # Get file metadata
-        file_record = (
-            db.query(ProjectFile)
-            .filter(
+        result = await db.execute(
+            select(ProjectFile).where(
                 ProjectFile.project_id == project_id, ProjectFile.file_path == file_path
             )
-            .first()
         )
+        file_record = result.scalars().first()
 
         if not file_record:
             raise HTTPException(
@@ -255,7 +256,7 @@ async def search_project_files(
         None, description="Comma-separated file types to search (e.g., 'tf,json,yaml')"
     ),
     max_results: int = Query(50, ge=1, le=100, description="Maximum number of results"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> FileSearchResponse:
     """
@@ -365,7 +366,7 @@ async def list_project_files(
         None, description="Filter by file type (tf, tfvars, json, etc.)"
     ),
     path_filter: Optional[str] = Query(None, description="Filter by file path pattern"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> List[ProjectFileResponse]:
     """
@@ -395,17 +396,18 @@ async def list_project_files(
             )
 
         # Build file query
-        query = db.query(ProjectFile).filter(ProjectFile.project_id == project_id)
+        query = select(ProjectFile).where(ProjectFile.project_id == project_id)
 
         # Apply filters
         if file_type:
-            query = query.filter(ProjectFile.file_type == file_type)
+            query = query.where(ProjectFile.file_type == file_type)
 
         if path_filter:
-            query = query.filter(ProjectFile.file_path.ilike(f"%{path_filter}%"))
+            query = query.where(ProjectFile.file_path.ilike(f"%{path_filter}%"))
 
         # Get files ordered by path
-        files = query.order_by(ProjectFile.file_path).all()
+        result = await db.execute(query.order_by(ProjectFile.file_path))
+        files = result.scalars().all()
 
         # Convert to response models
         file_responses = [
@@ -456,7 +458,7 @@ async def get_file_content(
     include_analysis: bool = Query(
         True, description="Include AI-generated code analysis"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> FileContentResponse:
     """
@@ -486,13 +488,12 @@ async def get_file_content(
             )
 
         # Get file metadata
-        file_record = (
-            db.query(ProjectFile)
-            .filter(
+        result = await db.execute(
+            select(ProjectFile).where(
                 ProjectFile.project_id == project_id, ProjectFile.file_path == file_path
             )
-            .first()
         )
+        file_record = result.scalars().first()
 
         if not file_record:
             raise HTTPException(
@@ -574,7 +575,7 @@ async def download_file(
     project_id: str = Path(..., description="Project UUID"),
     file_path: str = Path(..., description="File path within project"),
     as_attachment: bool = Query(False, description="Force download as attachment"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> Response:
     """
@@ -605,13 +606,12 @@ async def download_file(
             )
 
         # Verify file exists
-        file_record = (
-            db.query(ProjectFile)
-            .filter(
+        result = await db.execute(
+            select(ProjectFile).where(
                 ProjectFile.project_id == project_id, ProjectFile.file_path == file_path
             )
-            .first()
         )
+        file_record = result.scalars().first()
 
         if not file_record:
             raise HTTPException(
@@ -681,7 +681,7 @@ async def get_file_analysis(
     project_id: str = Path(..., description="Project UUID"),
     file_path: str = Path(..., description="File path within project"),
     regenerate: bool = Query(False, description="Force regeneration of analysis"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ) -> Dict[str, Any]:
     """
@@ -711,13 +711,12 @@ async def get_file_analysis(
             )
 
         # Get file metadata
-        file_record = (
-            db.query(ProjectFile)
-            .filter(
+        result = await db.execute(
+            select(ProjectFile).where(
                 ProjectFile.project_id == project_id, ProjectFile.file_path == file_path
             )
-            .first()
         )
+        file_record = result.scalars().first()
 
         if not file_record:
             raise HTTPException(
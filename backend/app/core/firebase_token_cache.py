@@ -0,0 +1,257 @@
+"""
+Verified Firebase ID token cache.
+
+Firebase ID tokens stay valid for up to an hour, but ``auth.verify_id_token``
+re-checks the RS256 signature (and may refresh Google's signing certificates)
+on every call and blocks the event loop while doing so. This module keeps the
+decoded claims of successfully verified tokens, keyed by a SHA-256 digest of
+the raw token, until shortly before the token's ``exp``.
+
+Cold verifications run in a worker thread and concurrent verifications of the
+same token are collapsed into a single call. Revocation hooks drop cached
+entries for a user so that revoked sessions are not served from the cache.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+import httpx
+from firebase_admin import auth
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Public certificates used to sign Firebase ID tokens.
+FIREBASE_ID_TOKEN_CERT_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+
+
+@dataclass
+class _CachedToken:
+    """Decoded claims of a verified token and when they stop being served."""
+
+    claims: Dict[str, Any]
+    uid: str
+    expires_at: float
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified Firebase ID token claims.
+
+    Entries expire at the token's ``exp`` minus a clock-skew margin, capped by
+    ``max_ttl_seconds`` so that revocations made outside this process are
+    picked up within a bounded window.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_ttl_seconds: int = 300,
+        clock_skew_seconds: int = 30,
+        enabled: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, _CachedToken]" = OrderedDict()
+        self._digests_by_uid: Dict[str, Set[str]] = {}
+        self._revoked_after: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "cold_verify_seconds": 0.0,
+        }
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return decoded claims for a Firebase ID token.
+
+        Raises the same ``firebase_admin.auth`` exceptions as
+        ``auth.verify_id_token`` so existing error handling keeps working.
+        Failed verifications are never cached.
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(auth.verify_id_token, token)
+
+        digest = self._digest(token)
+        cached = self._get(digest)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(digest)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            inflight = asyncio.ensure_future(self._verify_cold(digest, token))
+            self._inflight[digest] = inflight
+
+        # Shielded so that a cancelled caller (e.g. a client disconnect) does
+        # not cancel the verification other requests are waiting on.
+        return await asyncio.shield(inflight)
+
+    async def _verify_cold(self, digest: str, token: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            claims = await asyncio.to_thread(auth.verify_id_token, token)
+            self._put(digest, claims)
+            return claims
+        finally:
+            self._stats["cold_verify_seconds"] += time.perf_counter() - started
+            self._inflight.pop(digest, None)
+
+    def _get(self, digest: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+
+        if entry.expires_at <= time.time() or self._is_revoked(entry):
+            self._drop(digest)
+            return None
+
+        self._entries.move_to_end(digest)
+        return entry.claims
+
+    def _put(self, digest: str, claims: Dict[str, Any]) -> None:
+        uid = claims.get("uid") or claims.get("sub")
+        exp = claims.get("exp")
+        if not uid or not exp:
+            return
+
+        now = time.time()
+        expires_at = min(
+            float(exp) - self.clock_skew_seconds, now + self.max_ttl_seconds
+        )
+        if expires_at <= now:
+            return
+
+        entry = _CachedToken(claims=claims, uid=uid, expires_at=expires_at)
+        if self._is_revoked(entry):
+            return
+
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        self._digests_by_uid.setdefault(uid, set()).add(digest)
+
+        while len(self._entries) > self.max_entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._digests_by_uid.get(entry.uid)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_uid[entry.uid]
+
+    def _is_revoked(self, entry: _CachedToken) -> bool:
+        revoked_after = self._revoked_after.get(entry.uid)
+        if revoked_after is None:
+            return False
+        auth_time = entry.claims.get("auth_time") or entry.claims.get("iat") or 0
+        return float(auth_time) < revoked_after
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop a single token from the cache (e.g. on logout)."""
+        digest = self._digest(token)
+        if digest in self._entries:
+            self._drop(digest)
+            self._stats["invalidations"] += 1
+
+    def invalidate_user(self, uid: str, revoked_at: Optional[float] = None) -> int:
+        """
+        Drop every cached token for a user.
+
+        Call this after ``auth.revoke_refresh_tokens`` or when a user is
+        disabled. Tokens issued before ``revoked_at`` (defaults to now) are
+        also refused if they are verified again in this process.
+
+        Returns:
+            Number of cache entries removed
+        """
+        self._revoked_after[uid] = revoked_at if revoked_at is not None else time.time()
+        digests = list(self._digests_by_uid.get(uid, ()))
+        for digest in digests:
+            self._drop(digest)
+        self._stats["invalidations"] += len(digests)
+        return len(digests)
+
+    def clear(self) -> None:
+        """Remove all cached tokens."""
+        self._entries.clear()
+        self._digests_by_uid.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics, including average cold verification cost."""
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        misses = self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+            "avg_cold_verify_ms": (
+                self._stats["cold_verify_seconds"] * 1000 / misses if misses else 0.0
+            ),
+        }
+
+
+async def check_signing_certificate_endpoint() -> bool:
+    """
+    Check at startup that Google's signing certificate endpoint is reachable.
+
+    Nothing is cached: ``auth.verify_id_token`` keeps its own certificate
+    cache and fills it on the first verification. This only surfaces an
+    unreachable endpoint at startup instead of on the first login. Failures
+    are logged and ignored.
+
+    Returns:
+        True if the certificates could be fetched
+    """
+    try:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(FIREBASE_ID_TOKEN_CERT_URL)
+            response.raise_for_status()
+        logger.info(f"Firebase signing certificate endpoint reachable ({len(response.json())} certificates)")
+        return True
+    except Exception as e:
+        logger.warning(f"Firebase signing certificate endpoint unreachable: {str(e)}")
+        return False
+
+
+token_cache = VerifiedTokenCache(
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    max_ttl_seconds=settings.AUTH_TOKEN_CACHE_MAX_TTL_SECONDS,
+    clock_skew_seconds=settings.AUTH_TOKEN_CACHE_CLOCK_SKEW_SECONDS,
+    enabled=settings.AUTH_TOKEN_CACHE_ENABLED,
+)
+
+
+async def verify_firebase_id_token(token: str) -> Dict[str, Any]:
+    """Verify a Firebase ID token through the process-wide cache."""
+    return await token_cache.verify(token)
@@ -7,8 +7,11 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import logging
 import aiohttp
+import httpx
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.github_http_cache import GitHubConditionalCacheTransport
+
 logger = logging.getLogger(__name__)
 
 
@@ -161,6 +164,7 @@ class GitHubService:
         """Initialize the GitHub service with configuration."""
         self.config = config
         self._session = None
+        self._http_client = None
 
     @property
     async def session(self) -> aiohttp.ClientSession:
@@ -169,10 +173,22 @@ class GitHubService:
             self._session = aiohttp.ClientSession()
         return self._session
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Get or create the httpx client used for cacheable REST reads."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                transport=GitHubConditionalCacheTransport(),
+            )
+        return self._http_client
+
     async def close(self):
-        """Close the aiohttp session."""
+        """Close the aiohttp session and httpx client."""
         if self._session and not self._session.closed:
             await self._session.close()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
 
     async def get_authorization_url(self, state: Optional[str] = None) -> str:
         """
@@ -313,7 +329,6 @@ class GitHubService:
             List of GitHubRepository objects
         """
         try:
-            session = await self.session
             headers = {
                 "Authorization": f"Bearer {access_token}",
                 "Accept": "application/vnd.github.v3+json",
@@ -327,18 +342,18 @@ class GitHubService:
                 "direction": "desc",
             }
 
-            async with session.get(
+            # Served from the ETag cache when GitHub answers 304
+            response = await self.http_client.get(
                 f"{self.config.api_base_url}/user/repos",
                 headers=headers,
                 params=params,
-            ) as response:
-                if response.status == 401:
-                    raise GitHubAuthError("GitHub access token is invalid or expired")
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise GitHubAPIError(f"Failed to get repositories: {error_text}")
+            )
+            if response.status_code == 401:
+                raise GitHubAuthError("GitHub access token is invalid or expired")
+            elif response.status_code != 200:
+                raise GitHubAPIError(f"Failed to get repositories: {response.text}")
 
-                repos_data = await response.json()
+            repos_data = response.json()
 
             repositories = [GitHubRepository(**repo) for repo in repos_data]
             logger.info(f"Retrieved {len(repositories)} repositories from GitHub")
@@ -365,26 +380,25 @@ class GitHubService:
             GitHubRepository object
         """
         try:
-            session = await self.session
             headers = {
                 "Authorization": f"Bearer {access_token}",
                 "Accept": "application/vnd.github.v3+json",
                 "User-Agent": "Infrajet-Backend/1.0",
             }
 
-            async with session.get(
+            # Served from the ETag cache when GitHub answers 304
+            response = await self.http_client.get(
                 f"{self.config.api_base_url}/repos/{owner}/{repo}",
                 headers=headers,
-            ) as response:
-                if response.status == 401:
-                    raise GitHubAuthError("GitHub access token is invalid or expired")
-                elif response.status == 404:
-                    raise RepositoryNotFoundError(f"Repository {owner}/{repo} not found")
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise GitHubAPIError(f"Failed to get repository: {error_text}")
-
-                repo_data = await response.json()
+            )
+            if response.status_code == 401:
+                raise GitHubAuthError("GitHub access token is invalid or expired")
+            elif response.status_code == 404:
+                raise RepositoryNotFoundError(f"Repository {owner}/{repo} not found")
+            elif response.status_code != 200:
+                raise GitHubAPIError(f"Failed to get repository: {response.text}")
+
+            repo_data = response.json()
 
             logger.info(f"Retrieved repository: {owner}/{repo}")
             return GitHubRepository(**repo_data)
@@ -0,0 +1,439 @@
+"""
+Conditional-request cache for GitHub REST reads.
+
+GitHub does not count a ``304 Not Modified`` answer to a conditional request
+against the primary rate limit. This module provides an httpx transport that
+remembers the ``ETag``/``Last-Modified`` validators and body of successful
+GET responses per (credential, URL), revalidates them with
+``If-None-Match``/``If-Modified-Since`` and serves the stored body when GitHub
+answers 304.
+
+Only the repository and installation listings that are re-read on every
+dashboard or link action are cached (``CACHEABLE_PATHS``); other reads, such
+as the refs and trees fetched while pushing, pass straight through.
+
+Requests made with an installation token carry the installation ID in the
+``github_installation_id`` request extension and are keyed on it, so entries
+survive the hourly token rotation. Other requests are keyed by a SHA-256
+digest of the ``Authorization`` header, so raw tokens are never held as keys
+or written to Redis. The in-process tier is an LRU bounded by entry count and
+body bytes; an optional Redis tier lets workers share validators. Redis
+failures are logged and ignored.
+
+The transport also records the ``X-RateLimit-*`` headers of every response so
+that rate-limit headroom per credential can be reported.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Response headers kept with a cached body and replayed on a 304
+_STORED_HEADERS = (
+    "content-type",
+    "content-encoding",
+    "etag",
+    "last-modified",
+    "link",
+    "cache-control",
+    "vary",
+    "x-github-media-type",
+)
+
+# Paths (relative to the API root, optionally behind GitHub Enterprise's
+# /api/v3 prefix) whose GET responses are cached
+CACHEABLE_PATHS = re.compile(
+    r"^(?:/api/v3)?/(?:user/repos|user/installations|repos/[^/]+/[^/]+)/?$"
+)
+
+# Request extension naming the installation an installation token belongs to
+INSTALLATION_EXTENSION = "github_installation_id"
+
+# Warn once the remaining quota of a credential drops below this fraction
+_LOW_HEADROOM_FRACTION = 0.1
+
+
+@dataclass
+class _CachedResponse:
+    """Validators, headers and raw (still encoded) body of a 200 response."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    headers: List[Tuple[str, str]]
+    content: bytes
+    stored_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "headers": self.headers,
+            "content": base64.b64encode(self.content).decode("ascii"),
+            "stored_at": self.stored_at,
+        })
+
+    @classmethod
+    def from_json(cls, value: str) -> "_CachedResponse":
+        data = json.loads(value)
+        return cls(
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+            headers=[tuple(header) for header in data.get("headers", [])],
+            content=base64.b64decode(data["content"]),
+            stored_at=float(data.get("stored_at", time.time())),
+        )
+
+
+@dataclass
+class _RateLimit:
+    """Most recent rate-limit headers seen for one credential."""
+
+    limit: int
+    remaining: int
+    reset_at: int
+    resource: str
+    observed_at: float = field(default_factory=time.time)
+
+
+class GitHubConditionalCache:
+    """
+    Bounded store of GitHub GET responses and their validators.
+
+    The local tier evicts least recently used entries once ``max_entries`` or
+    ``max_bytes`` of bodies is exceeded. With ``redis_url`` set, entries are
+    also written to Redis with a ``ttl_seconds`` expiry and read back on a
+    local miss.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 86400,
+        key_prefix: str = "github:http_cache",
+        max_tracked_credentials: int = 1000,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.max_tracked_credentials = max_tracked_credentials
+
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._rate_limits: "OrderedDict[str, _RateLimit]" = OrderedDict()
+        self._redis = None
+
+        self._stats = {
+            "requests": 0,
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "redis_hits": 0,
+            "stores": 0,
+            "evictions": 0,
+            "uncacheable": 0,
+        }
+
+    @staticmethod
+    def credential_id(request: httpx.Request) -> str:
+        """
+        Identify the credential a request is sent with.
+
+        Installation tokens are identified by their installation, other
+        credentials by a digest of the ``Authorization`` header.
+        """
+        installation_id = request.extensions.get(INSTALLATION_EXTENSION)
+        if installation_id is not None:
+            return f"installation:{installation_id}"
+        authorization = request.headers.get("authorization", "")
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable(request: httpx.Request) -> bool:
+        """Check whether a request targets one of the cached endpoints."""
+        return request.method == "GET" and bool(CACHEABLE_PATHS.match(request.url.path))
+
+    def cache_key(self, request: httpx.Request) -> str:
+        """Cache key for a GET request: credential, Accept header and URL."""
+        accept = request.headers.get("accept", "")
+        return f"{self.credential_id(request)}:{accept}:{request.url}"
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[_CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        entry = await self._get_shared(key)
+        if entry is not None:
+            self._stats["redis_hits"] += 1
+            self._put_local(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: _CachedResponse) -> None:
+        self._stats["stores"] += 1
+        self._put_local(key, entry)
+        await self._put_shared(key, entry)
+
+    def _put_local(self, key: str, entry: _CachedResponse) -> None:
+        if len(entry.content) > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous.content)
+        self._entries[key] = entry
+        self._bytes += len(entry.content)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.content)
+            self._stats["evictions"] += 1
+
+    async def invalidate(self, request: httpx.Request) -> None:
+        """Drop the cached response for a GET request, if any."""
+        key = self.cache_key(request)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.delete(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate shared GitHub response: {e}")
+
+    def record_lookup(self, revalidating: bool) -> None:
+        """Count a cacheable request, and whether a stored entry is revalidated."""
+        self._stats["requests"] += 1
+        if revalidating:
+            self._stats["conditional_requests"] += 1
+
+    def record_hit(self) -> None:
+        """Count a 304 answered from a stored entry."""
+        self._stats["not_modified"] += 1
+
+    def record_miss(self, storable: bool) -> None:
+        """Count a full response; ``storable`` is False if it cannot be cached."""
+        if not storable:
+            self._stats["uncacheable"] += 1
+
+    # ------------------------------------------------------------------
+    # Rate limits
+    # ------------------------------------------------------------------
+
+    def record_rate_limit(self, request: httpx.Request, response: httpx.Response) -> None:
+        """Remember the rate-limit headers of a response for its credential."""
+        headers = response.headers
+        if "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            rate_limit = _RateLimit(
+                limit=int(headers.get("x-ratelimit-limit", 0)),
+                remaining=int(headers["x-ratelimit-remaining"]),
+                reset_at=int(headers.get("x-ratelimit-reset", 0)),
+                resource=headers.get("x-ratelimit-resource", "core"),
+            )
+        except ValueError:
+            return
+
+        credential = self.credential_id(request)
+        self._rate_limits[credential] = rate_limit
+        self._rate_limits.move_to_end(credential)
+        while len(self._rate_limits) > self.max_tracked_credentials:
+            self._rate_limits.popitem(last=False)
+
+        if rate_limit.limit and rate_limit.remaining < rate_limit.limit * _LOW_HEADROOM_FRACTION:
+            logger.warning(
+                f"GitHub {rate_limit.resource} rate limit low for credential {credential[:12]}: "
+                f"{rate_limit.remaining}/{rate_limit.limit} remaining until {rate_limit.reset_at}"
+            )
+
+    def get_rate_limit_headroom(self) -> Dict[str, Any]:
+        """Summarize the last observed rate-limit state of every credential."""
+        now = time.time()
+        active = [rl for rl in self._rate_limits.values() if rl.reset_at > now]
+        lowest = min(active, key=lambda rl: rl.remaining / rl.limit if rl.limit else 1.0, default=None)
+        return {
+            "tracked_credentials": len(self._rate_limits),
+            "active_windows": len(active),
+            "min_remaining": lowest.remaining if lowest else None,
+            "min_remaining_limit": lowest.limit if lowest else None,
+            "min_remaining_reset_at": lowest.reset_at if lowest else None,
+            "credentials_below_10pct": sum(
+                1 for rl in active if rl.limit and rl.remaining < rl.limit * _LOW_HEADROOM_FRACTION
+            ),
+        }
+
+    # ------------------------------------------------------------------
+    # Shared (Redis) tier
+    # ------------------------------------------------------------------
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    async def _get_shared(self, key: str) -> Optional[_CachedResponse]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            value = await client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Shared GitHub response cache unavailable: {e}")
+            return None
+        return _CachedResponse.from_json(value) if value else None
+
+    async def _put_shared(self, key: str, entry: _CachedResponse) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(self._redis_key(key), entry.to_json(), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to share GitHub response: {e}")
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache and rate-limit statistics."""
+        conditional = self._stats["conditional_requests"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "cached_bytes": self._bytes,
+            "revalidation_hit_rate": (
+                self._stats["not_modified"] / conditional if conditional else 0.0
+            ),
+            "shared_tier": bool(self.redis_url),
+            "rate_limit": self.get_rate_limit_headroom(),
+        }
+
+
+class GitHubConditionalCacheTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport adding conditional-request caching to GET requests.
+
+    Other methods and GETs outside ``CACHEABLE_PATHS`` pass straight through
+    to the wrapped transport. Requests that already carry their own
+    validators are not touched.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[GitHubConditionalCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.cache = cache or get_github_http_cache()
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cache = self.cache
+        if not cache.is_cacheable(request) or "if-none-match" in request.headers:
+            response = await self.transport.handle_async_request(request)
+            cache.record_rate_limit(request, response)
+            return response
+
+        key = cache.cache_key(request)
+        entry = await cache.get(key)
+        cache.record_lookup(revalidating=entry is not None)
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self.transport.handle_async_request(request)
+        cache.record_rate_limit(request, response)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            cache.record_hit()
+            headers = httpx.Headers(entry.headers)
+            for name, value in response.headers.items():
+                if name.startswith("x-ratelimit-") or name in ("date", "x-github-request-id"):
+                    headers[name] = value
+            return httpx.Response(
+                200,
+                headers=headers,
+                content=entry.content,
+                request=request,
+                extensions={**response.extensions, "from_cache": True},
+            )
+
+        storable = response.status_code == 200 and (
+            "etag" in response.headers or "last-modified" in response.headers
+        )
+        cache.record_miss(storable)
+        if not storable:
+            return response
+
+        # Read the raw (still encoded) body so it can be stored and replayed
+        content = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        await cache.put(key, _CachedResponse(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            headers=[
+                (name, value) for name, value in response.headers.items()
+                if name in _STORED_HEADERS
+            ],
+            content=content,
+        ))
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+github_http_cache = GitHubConditionalCache(
+    max_entries=settings.GITHUB_HTTP_CACHE_MAX_ENTRIES,
+    max_bytes=settings.GITHUB_HTTP_CACHE_MAX_BYTES,
+    redis_url=settings.GITHUB_HTTP_CACHE_REDIS_URL,
+    ttl_seconds=settings.GITHUB_HTTP_CACHE_TTL_SECONDS,
+)
+
+
+def get_github_http_cache() -> GitHubConditionalCache:
+    """Get the process-wide GitHub conditional-request cache."""
+    return github_http_cache
@@ -15,14 +15,38 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://postgres:infrajetdevdb202@/infrajetdb?host=/cloudsql/pgsql-infrajet-dev"
 
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PING_STRATEGY: str = "pre_ping"  # pre_ping, idle or none
+    DB_POOL_PING_IDLE_SECONDS: float = 60.0
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
     # Redis (Valkey)
     REDIS_HOST: str = "infrajet-valkey-memstore"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
 
+    # Distributed locks ("memory" for a single process, "redis" across workers)
+    LOCK_BACKEND: str = "memory"
+    LOCK_REDIS_URL: Optional[str] = None
+
     # Firebase
     FIREBASE_PROJECT_ID: str = "infrajet-nexgen-fb-55585-e9543"
 
+    # Verified ID token cache
+    AUTH_TOKEN_CACHE_ENABLED: bool = True
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_MAX_TTL_SECONDS: int = 300
+    AUTH_TOKEN_CACHE_CLOCK_SKEW_SECONDS: int = 30
+
+    # Conversation context store (write-behind cache over conversation_contexts)
+    CONTEXT_STORE_MAX_CACHED: int = 2000
+    CONTEXT_STORE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    CONTEXT_PROMPT_TOKEN_BUDGET: int = 1500
+
     # JWT
     SECRET_KEY: str = "default-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -53,6 +77,15 @@ class Settings(BaseSettings):
     MAX_CHUNK_TOKENS: int = 400
     OVERLAP_TOKENS: int = 60
     EMBEDDING_DIMENSION: int = 1536
+    # Write embeddings with binary COPY in batches of this many rows
+    EMBEDDING_BULK_INGEST_ENABLED: bool = True
+    EMBEDDING_BULK_FLUSH_ROWS: int = 5000
+
+    # Batch chunk summarization
+    SUMMARIZATION_MAX_CONCURRENCY: int = 4
+    SUMMARIZATION_MAX_CHUNKS_PER_PACK: int = 8
+    SUMMARIZATION_PACK_TOKEN_LIMIT: int = 2000
+    SUMMARIZATION_CACHE_SIZE: int = 5000
 
     # Feature Flags
     ENTRA_AUTH_ENABLED: bool = False
@@ -67,6 +100,16 @@ class Settings(BaseSettings):
     GITHUB_PRIVATE_KEY: Optional[str] = None
     GITHUB_WEBHOOK_SECRET: Optional[str] = None
 
+    # GitHub App credential cache (Redis URL enables sharing tokens across workers)
+    GITHUB_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
+    GITHUB_TOKEN_CACHE_REDIS_URL: Optional[str] = None
+
+    # GitHub conditional-request (ETag) cache for REST reads
+    GITHUB_HTTP_CACHE_MAX_ENTRIES: int = 1000
+    GITHUB_HTTP_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    GITHUB_HTTP_CACHE_REDIS_URL: Optional[str] = None
+    GITHUB_HTTP_CACHE_TTL_SECONDS: int = 86400
+
     @field_validator("GITHUB_APP_ID", mode="before")
     @classmethod
     def validate_github_app_id(cls, v: Optional[Union[str, int]]) -> Optional[str]:
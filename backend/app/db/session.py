@@ -1,16 +1,146 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.settings import get_settings
 
 # Get settings
 settings = get_settings()
 
+
+class PoolMetrics:
+    """
+    Checkout wait-time counters for the async connection pool.
+
+    Wait time covers the time spent in the pool handing out a connection,
+    including opening a new one when the pool is allowed to overflow.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.pings = 0
+        self.invalidated_on_ping = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait_seconds += seconds
+        if seconds > self.max_wait_seconds:
+            self.max_wait_seconds = seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": (
+                self.total_wait_seconds * 1000 / self.checkouts if self.checkouts else 0.0
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "pings": self.pings,
+            "invalidated_on_ping": self.invalidated_on_ping,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+
+def _engine_options() -> Dict[str, Any]:
+    """
+    Build engine keyword arguments from settings.
+
+    DB_POOL_PING_STRATEGY controls how stale connections are detected:
+    - "pre_ping": ping on every checkout (one extra round trip per request)
+    - "idle": ping only connections idle longer than DB_POOL_PING_IDLE_SECONDS
+    - "none": rely on DB_POOL_RECYCLE and disconnect handling only
+    """
+    options: Dict[str, Any] = {
+        "echo": False,  # Set to True to see SQL queries
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PING_STRATEGY == "pre_ping",
+    }
+
+    if "+asyncpg" in settings.DATABASE_URL:
+        options["connect_args"] = {
+            # SQLAlchemy-side cache of prepared statements per connection
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # asyncpg's own statement cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+
+    return options
+
+
 # Create async engine from the DATABASE_URL
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False,  # Set to True to see SQL queries
-)
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options())
+
+
+if settings.DB_POOL_PING_STRATEGY == "idle":
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _record_checkin_time(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None:
+            return
+        if time.monotonic() - checked_in_at < settings.DB_POOL_PING_IDLE_SECONDS:
+            return
+
+        pool_metrics.pings += 1
+        try:
+            dbapi_connection.ping()
+        except Exception as e:
+            pool_metrics.invalidated_on_ping += 1
+            # The pool discards this connection and retries with a fresh one
+            raise DisconnectionError(str(e))
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """
+    Get a snapshot of the connection pool.
+
+    Returns:
+        Pool configuration, current usage and checkout wait-time metrics
+    """
+    pool = engine.sync_engine.pool
+    status: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "ping_strategy": settings.DB_POOL_PING_STRATEGY,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update({
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+
+    status.update(pool_metrics.to_dict())
+    return status
+
 
 # Create async session factory
 async_session_factory = sessionmaker(
@@ -2,8 +2,10 @@ from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, Security, Header
 from fastapi.security import OAuth2PasswordBearer
 from firebase_admin import auth
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
+from app.core.firebase_token_cache import verify_firebase_id_token
 from app.db.session import get_db
 from app.models.user import User
 
@@ -30,6 +32,18 @@ class FirebaseJWTValidator:
         except Exception as e:
             raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
+    @staticmethod
+    async def verify_token_async(token: str) -> Dict[str, Any]:
+        """Verify Firebase ID token off the event loop, using the verified-token cache"""
+        try:
+            return await verify_firebase_id_token(token)
+        except auth.ExpiredIdTokenError:
+            raise HTTPException(status_code=401, detail="Token has expired")
+        except auth.InvalidIdTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        except Exception as e:
+            raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
+
 
 # Alias for backward compatibility
 SupabaseJWTValidator = FirebaseJWTValidator
@@ -40,15 +54,8 @@ async def get_current_user_id(token: str = Security(oauth2_scheme)) -> str:
     if not token:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    try:
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token["uid"]
-    except auth.ExpiredIdTokenError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except auth.InvalidIdTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
+    decoded_token = await FirebaseJWTValidator.verify_token_async(token)
+    return decoded_token["uid"]
 
 
 async def get_current_user_id_optional(
@@ -67,16 +74,17 @@ async def get_current_user_id_optional(
         return None
 
     try:
-        decoded_token = auth.verify_id_token(token_to_use)
+        decoded_token = await verify_firebase_id_token(token_to_use)
         return decoded_token["uid"]
     except Exception:
         # Return None for optional auth instead of raising exception
         return None
 
 
-async def get_current_user(db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)) -> User:
+async def get_current_user(db: AsyncSession = Depends(get_db), user_id: str = Depends(get_current_user_id)) -> User:
     """Get current user from database (required)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
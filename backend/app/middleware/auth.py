@@ -1,7 +1,8 @@
 from fastapi import Request, HTTPException, status
-from firebase_admin import auth
 import firebase_admin
 
+from app.core.firebase_token_cache import verify_firebase_id_token
+
 # Initialize Firebase Admin if not already done
 if not firebase_admin._apps:
     firebase_admin.initialize_app()
@@ -16,7 +17,7 @@ async def verify_firebase_token(request: Request):
 
     token = auth_header.split(" ")[1]
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_firebase_id_token(token)
         # Add user to request state
         request.state.user = decoded_token
         return decoded_token # Contains 'uid', 'email', etc.
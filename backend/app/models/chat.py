@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 from typing import Dict, Any, List
-from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, func, Integer, Boolean
+from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, func, Integer, Boolean, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -37,6 +37,11 @@ class ProjectChat(Base):
     project = relationship("Project", back_populates="chats")
     thread = relationship("ConversationThread", back_populates="messages")
 
+    # Keyset pagination of a project's history by (timestamp, id)
+    __table_args__ = (
+        Index("ix_project_chats_project_id_timestamp_id", "project_id", "timestamp", "id"),
+    )
+
     def __init__(self, **kwargs):
         """Initialize ProjectChat with auto-generated UUID."""
         if 'id' not in kwargs:
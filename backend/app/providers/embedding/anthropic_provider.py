@@ -1,10 +1,14 @@
 """
 Anthropic Claude embedding provider implementation.
 """
+import hashlib
 import json
 from typing import List, Sequence, Dict, Any
+
+import numpy as np
 from anthropic import Anthropic
 from app.providers.embedding.base import EmbeddingProvider
+from app.utils.vectors import extend_by_averaging, hash_bytes_vector, normalize_rows
 from logconfig.logger import get_logger
 
 logger = get_logger()
@@ -26,7 +30,7 @@ class AnthropicEmbeddingProvider(EmbeddingProvider):
         self.client = Anthropic(api_key=api_key) if api_key else None
         self._dimension = 1536  # Standard embedding dimension
         
-    def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+    def embed_texts(self, texts: Sequence[str]) -> List[np.ndarray]:
         """
         Generate embeddings for multiple texts using Claude's text analysis.
         
@@ -47,11 +51,11 @@ class AnthropicEmbeddingProvider(EmbeddingProvider):
             except Exception as e:
                 logger.error(f"Failed to generate embedding for text: {e}")
                 # Return zero vector as fallback
-                embeddings.append([0.0] * self._dimension)
+                embeddings.append(np.zeros(self._dimension, dtype=np.float32))
         
         return embeddings
     
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """
         Generate embedding for a single query.
         
@@ -66,7 +70,7 @@ class AnthropicEmbeddingProvider(EmbeddingProvider):
         
         return self._generate_embedding(query)
     
-    def _generate_embedding(self, text: str) -> List[float]:
+    def _generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text using Claude's semantic analysis.
         
@@ -168,11 +172,8 @@ Return only valid JSON."""
             "scalability_design": 0.5
         }
     
-    def _analysis_to_vector(self, analysis: Dict[str, float], text: str) -> List[float]:
-        """Convert semantic analysis to embedding vector."""
-        import hashlib
-        import math
-        
+    def _analysis_to_vector(self, analysis: Dict[str, float], text: str) -> np.ndarray:
+        """Convert semantic analysis to a float32 embedding vector."""
         # Start with semantic dimensions
         vector = list(analysis.values())
         
@@ -198,54 +199,26 @@ Return only valid JSON."""
         vector.append(min(security_score, 1.0))
         
         # Add hash-based features for uniqueness
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        for i in range(0, len(text_hash), 2):
-            hex_val = int(text_hash[i:i+2], 16)
-            vector.append(hex_val / 255.0)
-        
-        # Pad or truncate to target dimension
-        while len(vector) < self._dimension:
-            # Add derived features based on existing ones
-            if len(vector) >= 2:
-                vector.append((vector[-1] + vector[-2]) / 2)
-            else:
-                vector.append(0.5)
+        text_hash = hashlib.md5(text.encode()).digest()
+        seed = np.concatenate([
+            np.asarray(vector, dtype=np.float32),
+            hash_bytes_vector(text_hash, len(text_hash))
+        ])
         
-        vector = vector[:self._dimension]
+        # Pad with derived features (mean of the previous two) or truncate
+        embedding = extend_by_averaging(seed, self._dimension)
         
-        # Normalize vector
-        magnitude = math.sqrt(sum(x * x for x in vector))
-        if magnitude > 0:
-            vector = [x / magnitude for x in vector]
-        
-        return vector
+        normalize_rows(embedding.reshape(1, -1))
+        return embedding
     
-    def _fallback_embedding(self, text: str) -> List[float]:
-        """Generate a fallback embedding based on text hash."""
-        import hashlib
-        import math
-        
-        # Create a deterministic embedding based on text content
-        text_hash = hashlib.sha256(text.encode()).hexdigest()
-        
-        # Convert hash to vector
-        vector = []
-        for i in range(0, len(text_hash), 2):
-            if len(vector) >= self._dimension:
-                break
-            hex_val = int(text_hash[i:i+2], 16)
-            vector.append((hex_val - 127.5) / 127.5)  # Normalize to [-1, 1]
-        
-        # Pad if necessary
-        while len(vector) < self._dimension:
-            vector.append(0.0)
-        
-        # Normalize vector
-        magnitude = math.sqrt(sum(x * x for x in vector))
-        if magnitude > 0:
-            vector = [x / magnitude for x in vector]
-        
-        return vector
+    def _fallback_embedding(self, text: str) -> np.ndarray:
+        """Generate a fallback float32 embedding based on text hash."""
+        # Create a deterministic embedding based on text content, bytes in [-1, 1]
+        text_hash = hashlib.sha256(text.encode()).digest()
+        embedding = hash_bytes_vector(text_hash, self._dimension, centered=True)
+        
+        normalize_rows(embedding.reshape(1, -1))
+        return embedding
     
     def get_dimension(self) -> int:
         """Get embedding dimension."""
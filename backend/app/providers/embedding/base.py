@@ -1,12 +1,35 @@
 """
 Abstract base class for embedding providers.
 """
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Sequence, Dict, Any
 
+import numpy as np
+
+from app.providers.embedding.batching import EmbeddingBatcher
+from app.utils.vectors import as_float32_matrix
+
 
 class EmbeddingProvider(ABC):
-    """Abstract base class for embedding providers."""
+    """
+    Abstract base class for embedding providers.
+
+    Providers implement the synchronous ``embed_texts``; async callers use
+    ``aembed_texts``, which micro-batches concurrent requests and runs at most
+    ``max_concurrency`` provider batches at a time. By default a batch runs
+    the synchronous ``embed_texts`` in a worker thread; providers with a
+    native async client override ``_aembed_batch``.
+
+    Vectors may be returned as lists of floats or as float32 NumPy arrays;
+    ``embed_texts_matrix`` gives callers a single (n, dimension) float32
+    matrix either way.
+    """
+
+    # Micro-batching limits for aembed_texts
+    max_batch_size: int = 32
+    batch_window_ms: float = 5.0
+    max_concurrency: int = 4
     
     @abstractmethod
     def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
@@ -54,6 +77,71 @@ class EmbeddingProvider(ABC):
         """
         pass
     
+    def embed_texts_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Generate embeddings as a C-contiguous (n, dimension) float32 matrix.
+
+        Providers that build vectors in NumPy override this to fill the
+        matrix directly instead of stacking per-text vectors.
+        """
+        return as_float32_matrix(self.embed_texts(texts))
+
+    async def aembed_texts_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """Async, micro-batched counterpart of ``embed_texts_matrix``."""
+        return as_float32_matrix(await self.aembed_texts(texts))
+
+    async def aembed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Generate embeddings without blocking the event loop.
+
+        Requests from concurrent callers arriving within ``batch_window_ms``
+        are coalesced into one provider batch.
+
+        Args:
+            texts: Sequence of text strings to embed
+
+        Returns:
+            List of embedding vectors (one per input text)
+        """
+        return await self._get_batcher().embed(texts)
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Generate embedding for a single query without blocking the event loop.
+
+        Args:
+            query: Query text to embed
+
+        Returns:
+            Embedding vector for the query
+        """
+        embeddings = await self.aembed_texts([query])
+        return embeddings[0]
+
+    async def _aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one coalesced batch; the sync adapter runs in a worker thread."""
+        return await asyncio.to_thread(self.embed_texts, texts)
+
+    def _get_batcher(self) -> EmbeddingBatcher:
+        # Batchers hold loop-bound primitives, so keep one per event loop
+        loop = asyncio.get_running_loop()
+        batcher = self.__dict__.get("_batcher")
+        if batcher is None or self.__dict__.get("_batcher_loop") is not loop:
+            batcher = EmbeddingBatcher(
+                self._aembed_batch,
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.batch_window_ms,
+                max_concurrency=self.max_concurrency,
+            )
+            self.__dict__["_batcher"] = batcher
+            self.__dict__["_batcher_loop"] = loop
+        return batcher
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Get micro-batching statistics for aembed_texts."""
+        batcher = self.__dict__.get("_batcher")
+        return batcher.get_stats() if batcher else {}
+
     def get_provider_info(self) -> Dict[str, Any]:
         """
         Get information about this provider.
@@ -0,0 +1,180 @@
+"""
+Micro-batching of embedding requests.
+
+Concurrent callers (query embedding for retrieval, file indexing, search
+endpoints) each ask for a handful of vectors. The batcher collects requests
+that arrive within a short window into one provider batch, runs at most a
+fixed number of provider batches at a time, and hands every caller back its
+own slice of the result.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Sequence
+
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class _PendingRequest:
+    """Texts submitted by one caller and the future resolving its vectors."""
+
+    texts: List[str]
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into provider batches.
+
+    A batch is dispatched when ``max_batch_size`` texts are waiting or
+    ``max_wait_ms`` after the first of them arrived, whichever comes first.
+    Requests larger than ``max_batch_size`` are split across batches.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_concurrency: int = 4,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: List[_PendingRequest] = []
+        self._pending_texts = 0
+        self._flush_handle = None
+        self._tasks = set()
+        # End-to-end latencies of recent requests, for percentile reporting
+        self._latencies = deque(maxlen=1000)
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "max_batch_texts": 0,
+            "total_wait_seconds": 0.0,
+            "total_batch_seconds": 0.0,
+        }
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed texts as part of the next batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per input text, in order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        if len(texts) > self.max_batch_size:
+            parts = await asyncio.gather(*(
+                self.embed(texts[i:i + self.max_batch_size])
+                for i in range(0, len(texts), self.max_batch_size)
+            ))
+            return [vector for part in parts for vector in part]
+
+        loop = asyncio.get_running_loop()
+        request = _PendingRequest(texts=texts, future=loop.create_future())
+        self._pending.append(request)
+        self._pending_texts += len(texts)
+        self._stats["requests"] += 1
+
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        try:
+            return await request.future
+        finally:
+            self._latencies.append(time.perf_counter() - request.submitted_at)
+
+    def _flush(self) -> None:
+        """Dispatch waiting requests as batches of up to max_batch_size texts."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch: List[_PendingRequest] = []
+            size = 0
+            while self._pending and size + len(self._pending[0].texts) <= self.max_batch_size:
+                request = self._pending.pop(0)
+                batch.append(request)
+                size += len(request.texts)
+            self._pending_texts -= size
+
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[_PendingRequest]) -> None:
+        texts = [text for request in batch for text in request.texts]
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            for request in batch:
+                self._stats["total_wait_seconds"] += started - request.submitted_at
+            try:
+                vectors = await self.embed_batch(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(
+                        f"Provider returned {len(vectors)} embeddings for {len(texts)} texts"
+                    )
+            except Exception as e:
+                self._stats["failed_batches"] += 1
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                return
+            finally:
+                self._stats["total_batch_seconds"] += time.perf_counter() - started
+
+        self._stats["batches"] += 1
+        self._stats["texts"] += len(texts)
+        self._stats["max_batch_texts"] = max(self._stats["max_batch_texts"], len(texts))
+
+        offset = 0
+        for request in batch:
+            count = len(request.texts)
+            if not request.future.done():
+                request.future.set_result(vectors[offset:offset + count])
+            offset += count
+
+    def get_stats(self) -> dict:
+        """Get batching statistics."""
+        batches = self._stats["batches"]
+        requests = self._stats["requests"]
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+        return {
+            **self._stats,
+            "pending_texts": self._pending_texts,
+            "avg_batch_texts": self._stats["texts"] / batches if batches else 0.0,
+            "avg_queue_wait_ms": (
+                self._stats["total_wait_seconds"] * 1000 / requests if requests else 0.0
+            ),
+            "avg_batch_ms": (
+                self._stats["total_batch_seconds"] * 1000 / batches if batches else 0.0
+            ),
+            "p50_request_ms": percentile(0.5),
+            "p99_request_ms": percentile(0.99),
+        }
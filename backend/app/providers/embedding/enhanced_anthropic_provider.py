@@ -4,10 +4,13 @@ Enhanced Anthropic Embedding Provider with actual embedding generation.
 
 import hashlib
 import json
-import math
+from functools import lru_cache
 from typing import List, Sequence, Dict, Any
+
+import numpy as np
 from anthropic import Anthropic
 from app.providers.embedding.base import EmbeddingProvider
+from app.utils.vectors import extend_by_averaging, hash_bytes_vector, normalize_rows
 from logconfig.logger import get_logger
 
 logger = get_logger()
@@ -16,6 +19,10 @@ logger = get_logger()
 class EnhancedAnthropicEmbeddingProvider(EmbeddingProvider):
     """Enhanced Anthropic embedding provider with actual semantic embeddings."""
 
+    # Each text is one Claude call, so keep batches small and few in flight
+    max_batch_size = 16
+    max_concurrency = 4
+
     def __init__(self, api_key: str, model: str = "claude-3-haiku-20240307"):
         """
         Initialize enhanced Anthropic embedding provider.
@@ -31,7 +38,7 @@ class EnhancedAnthropicEmbeddingProvider(EmbeddingProvider):
         self.max_tokens = 1000
         self.temperature = 0.1
 
-    def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+    def embed_texts(self, texts: Sequence[str]) -> List[np.ndarray]:
         """
         Generate embeddings for multiple texts.
 
@@ -39,24 +46,40 @@ class EnhancedAnthropicEmbeddingProvider(EmbeddingProvider):
             texts: Sequence of text strings to embed
 
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors (rows of one contiguous matrix)
+        """
+        return list(self.embed_texts_matrix(texts))
+
+    def embed_texts_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as one (n, dimension) matrix.
+
+        Rows are filled in place and L2-normalized in a single batch.
+
+        Args:
+            texts: Sequence of text strings to embed
+
+        Returns:
+            C-contiguous float32 matrix with one row per text
         """
-        if not self.is_available():
+        matrix = np.empty((len(texts), self._dimension), dtype=np.float32)
+
+        available = self.is_available()
+        if not available:
             logger.warning("Anthropic provider not available, using fallback embeddings")
-            return [self._fallback_embedding(text) for text in texts]
 
-        embeddings = []
-        for text in texts:
-            try:
-                embedding = self._generate_semantic_embedding(text)
-                embeddings.append(embedding)
-            except Exception as e:
-                logger.error(f"Failed to generate embedding: {e}")
-                embeddings.append(self._fallback_embedding(text))
+        for row, text in enumerate(texts):
+            if available:
+                try:
+                    matrix[row] = self._generate_semantic_embedding(text, normalize=False)
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to generate embedding: {e}")
+            matrix[row] = self._fallback_embedding(text, normalize=False)
 
-        return embeddings
+        return normalize_rows(matrix)
 
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """
         Generate embedding for a single query.
 
@@ -64,19 +87,11 @@ class EnhancedAnthropicEmbeddingProvider(EmbeddingProvider):
             query: Query text to embed
 
         Returns:
-            Embedding vector for the query
+            Float32 embedding vector for the query
         """
-        if not self.is_available():
-            logger.warning("Anthropic provider not available, using fallback embedding")
-            return self._fallback_embedding(query)
+        return self.embed_texts_matrix([query])[0]
 
-        try:
-            return self._generate_semantic_embedding(query)
-        except Exception as e:
-            logger.error(f"Failed to generate query embedding: {e}")
-            return self._fallback_embedding(query)
-
-    def _generate_semantic_embedding(self, text: str) -> List[float]:
+    def _generate_semantic_embedding(self, text: str, normalize: bool = True) -> np.ndarray:
         """
         Generate semantic embedding using Claude's analysis capabilities.
 
@@ -88,13 +103,13 @@ class EnhancedAnthropicEmbeddingProvider(EmbeddingProvider):
             semantic_features = self._extract_semantic_features(text)
 
             # Convert semantic features to embedding vector
-            embedding = self._semantic_features_to_vector(semantic_features, text)
+            embedding = self._semantic_features_to_vector(semantic_features, text, normalize)
 
             return embedding
 
         except Exception as e:
             logger.error(f"Error generating semantic embedding: {e}")
-            return self._fallback_embedding(text)
+            return self._fallback_embedding(text, normalize)
 
     def _extract_semantic_features(self, text: str) -> Dict[str, float]:
         """Extract semantic features from text using Claude."""
@@ -172,8 +187,10 @@ Return only valid JSON with the dimension scores."""
             "scalability_design": 0.5
         }
 
-    def _semantic_features_to_vector(self, features: Dict[str, float], text: str) -> List[float]:
-        """Convert semantic features to embedding vector."""
+    def _semantic_features_to_vector(
+        self, features: Dict[str, float], text: str, normalize: bool = True
+    ) -> np.ndarray:
+        """Convert semantic features to a float32 embedding vector."""
         # Start with semantic dimensions
         vector = list(features.values())
 
@@ -202,55 +219,28 @@ Return only valid JSON with the dimension scores."""
         vector.append(min(security_score, 1.0))
 
         # Add hash-based features for uniqueness and consistency
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        for i in range(0, len(text_hash), 2):
-            hex_val = int(text_hash[i:i+2], 16)
-            vector.append(hex_val / 255.0)
-
-        # Pad or truncate to target dimension
-        while len(vector) < self._dimension:
-            # Add derived features based on existing ones
-            if len(vector) >= 2:
-                # Create smooth transitions
-                vector.append((vector[-1] + vector[-2]) / 2)
-            else:
-                vector.append(0.5)
-
-        vector = vector[:self._dimension]
-
-        # Normalize vector
-        magnitude = math.sqrt(sum(x * x for x in vector))
-        if magnitude > 0:
-            vector = [x / magnitude for x in vector]
-
-        return vector
-
-    def _fallback_embedding(self, text: str) -> List[float]:
-        """Generate a fallback embedding based on text hash."""
-        import hashlib
-        import math
-
-        # Create a deterministic embedding based on text content
-        text_hash = hashlib.sha256(text.encode()).hexdigest()
-
-        # Convert hash to vector
-        vector = []
-        for i in range(0, len(text_hash), 2):
-            if len(vector) >= self._dimension:
-                break
-            hex_val = int(text_hash[i:i+2], 16)
-            vector.append((hex_val - 127.5) / 127.5)  # Normalize to [-1, 1]
-
-        # Pad if necessary
-        while len(vector) < self._dimension:
-            vector.append(0.0)
-
-        # Normalize vector
-        magnitude = math.sqrt(sum(x * x for x in vector))
-        if magnitude > 0:
-            vector = [x / magnitude for x in vector]
-
-        return vector
+        text_hash = hashlib.md5(text.encode()).digest()
+        seed = np.concatenate([
+            np.asarray(vector, dtype=np.float32),
+            hash_bytes_vector(text_hash, len(text_hash))
+        ])
+
+        # Pad with derived features (mean of the previous two) or truncate
+        embedding = extend_by_averaging(seed, self._dimension)
+
+        if normalize:
+            normalize_rows(embedding.reshape(1, -1))
+        return embedding
+
+    def _fallback_embedding(self, text: str, normalize: bool = True) -> np.ndarray:
+        """Generate a fallback float32 embedding based on text hash."""
+        # Create a deterministic embedding based on text content, bytes in [-1, 1]
+        text_hash = hashlib.sha256(text.encode()).digest()
+        embedding = hash_bytes_vector(text_hash, self._dimension, centered=True)
+
+        if normalize:
+            normalize_rows(embedding.reshape(1, -1))
+        return embedding
 
     def get_dimension(self) -> int:
         """Get embedding dimension."""
@@ -268,4 +258,17 @@ Return only valid JSON with the dimension scores."""
             "dimension": self._dimension,
             "available": self.is_available(),
             "embedding_type": "semantic_analysis"
-        }
\ No newline at end of file
+        }
+
+
+@lru_cache(maxsize=8)
+def get_enhanced_embedding_provider(
+    api_key: str, model: str = "claude-3-haiku-20240307"
+) -> EnhancedAnthropicEmbeddingProvider:
+    """
+    Get a shared provider per API key and model.
+
+    Sharing the instance lets aembed_texts coalesce requests from every
+    caller into the same batches and concurrency limit.
+    """
+    return EnhancedAnthropicEmbeddingProvider(api_key=api_key, model=model)
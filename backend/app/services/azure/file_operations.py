@@ -11,7 +11,7 @@ import logging
 import mimetypes
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List, BinaryIO, Union
+from typing import Optional, Dict, Any, List, BinaryIO, Union, AsyncIterator
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -25,6 +25,12 @@ from azure.core.exceptions import (
 
 from app.services.azure.connection import AzureConnectionManager, get_connection_manager
 from app.core.azure_config import AzureFileShareConfig, get_azure_config
+from app.exceptions.azure_exceptions import AzureFileShareError
+
+
+# Azure file metadata key holding the SHA-256 of the content, written at upload
+# time so that sync jobs can compare files without downloading them.
+CONTENT_SHA256_METADATA_KEY = "content_sha256"
 
 
 class FileOperationType(Enum):
@@ -52,10 +58,11 @@ class FileMetadata:
     @classmethod
     def from_azure_properties(cls, file_path: str, properties: Dict[str, Any]) -> "FileMetadata":
         """Create FileMetadata from Azure file properties."""
+        stored_hash = (properties.get("metadata") or {}).get(CONTENT_SHA256_METADATA_KEY)
         return cls(
             file_path=file_path,
             size_bytes=properties.get("size", 0),
-            content_hash=properties.get("content_settings", {}).get("content_md5", ""),
+            content_hash=stored_hash or properties.get("content_settings", {}).get("content_md5", ""),
             content_type=properties.get("content_settings", {}).get("content_type", ""),
             created_at=properties.get("creation_time", datetime.utcnow()),
             modified_at=properties.get("last_modified", datetime.utcnow()),
@@ -209,6 +216,24 @@ class FileProcessor:
         
         return hashlib.md5(content).hexdigest()
     
+    @staticmethod
+    def calculate_sha256(content: Union[str, bytes]) -> str:
+        """
+        Calculate SHA-256 hash of file content.
+        
+        This matches the hash stored in ProjectFile.content_hash.
+        
+        Args:
+            content: File content as string or bytes.
+            
+        Returns:
+            SHA-256 hash as hex string.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        
+        return hashlib.sha256(content).hexdigest()
+    
     @staticmethod
     def prepare_content_for_upload(content: Union[str, bytes]) -> bytes:
         """
@@ -346,11 +371,16 @@ class FileUploadService:
                 content_type=final_content_type
             )
             
+            # Store the SHA-256 alongside the file so metadata sync can skip
+            # downloading it to recompute the hash
+            file_metadata_values = dict(metadata or {})
+            file_metadata_values[CONTENT_SHA256_METADATA_KEY] = FileProcessor.calculate_sha256(content_bytes)
+            
             await file_client.upload_file(
                 data=content_bytes,
                 length=len(content_bytes),
                 content_settings=content_settings,
-                metadata=metadata or {}
+                metadata=file_metadata_values
             )
             
             # Get file properties for metadata
@@ -505,6 +535,29 @@ class FileDownloadService:
             )
 
 
+    async def iter_file_chunks(self, file_path: str) -> AsyncIterator[bytes]:
+        """
+        Stream a file from Azure File Share in chunks.
+        
+        Chunk size follows the client's ``max_chunk_get_size`` setting, so
+        callers can hash large files without holding them in memory.
+        
+        Args:
+            file_path: Path of the file to download.
+            
+        Yields:
+            Raw content chunks in order.
+        """
+        if not self.connection_manager:
+            self.connection_manager = await get_connection_manager()
+        
+        file_client = await self.connection_manager.get_file_client(file_path)
+        download_stream = await file_client.download_file()
+        
+        async for chunk in download_stream.chunks():
+            yield chunk
+
+
 class FileMetadataService:
     """Service for file metadata operations."""
     
@@ -576,6 +629,69 @@ class FileMetadataService:
                 duration_seconds=duration
             )
     
+    async def list_files(
+        self,
+        folder_path: str,
+        max_concurrency: int = 16
+    ) -> List[FileMetadata]:
+        """
+        List every file under a folder with its properties and metadata.
+        
+        Directory listings do not carry user metadata, so the properties of
+        each file are fetched with bounded concurrency. No content is read.
+        
+        Args:
+            folder_path: Folder to list recursively.
+            max_concurrency: Maximum concurrent property requests.
+            
+        Returns:
+            FileMetadata for each file; empty if the folder does not exist.
+            
+        Raises:
+            AzureFileShareError: If the listing fails.
+        """
+        try:
+            if not self.connection_manager:
+                self.connection_manager = await get_connection_manager()
+            
+            file_paths: List[str] = []
+            async with self.connection_manager.get_share_client() as share_client:
+                pending = [folder_path.strip("/")]
+                while pending:
+                    current = pending.pop()
+                    directory_client = share_client.get_directory_client(current)
+                    async for item in directory_client.list_directories_and_files():
+                        item_path = f"{current}/{item['name']}" if current else item['name']
+                        if item['is_directory']:
+                            pending.append(item_path)
+                        else:
+                            file_paths.append(item_path)
+            
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def fetch(file_path: str) -> Optional[FileMetadata]:
+                async with semaphore:
+                    file_client = await self.connection_manager.get_file_client(file_path)
+                    try:
+                        properties = await file_client.get_file_properties()
+                    except ResourceNotFoundError:
+                        # Deleted between listing and the properties request
+                        return None
+                    return FileMetadata.from_azure_properties(file_path, properties)
+            
+            results = await asyncio.gather(*[fetch(path) for path in file_paths])
+            return [metadata for metadata in results if metadata is not None]
+            
+        except ResourceNotFoundError:
+            return []
+            
+        except AzureError as e:
+            self.logger.error(f"Failed to list files under {folder_path}: {e}")
+            raise AzureFileShareError(
+                f"Failed to list files under {folder_path}",
+                original_exception=e
+            )
+    
     async def file_exists(self, file_path: str) -> FileOperationResult:
         """
         Check if a file exists.
@@ -700,6 +816,10 @@ class FileOperationsService:
         """Download a file from Azure File Share."""
         return await self.download_service.download_file(file_path, as_text)
     
+    def iter_file_chunks(self, file_path: str) -> AsyncIterator[bytes]:
+        """Stream a file from Azure File Share in chunks."""
+        return self.download_service.iter_file_chunks(file_path)
+    
     async def download_multiple_files(
         self,
         file_paths: List[str],
@@ -731,6 +851,42 @@ class FileOperationsService:
         """Check if a file exists."""
         return await self.metadata_service.file_exists(file_path)
     
+    async def list_project_files(
+        self,
+        project_id: str,
+        folder_path: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List the files of a project for metadata sync.
+        
+        Args:
+            project_id: Project whose files to list.
+            folder_path: Azure folder holding the project; defaults to the
+                configured project path.
+            
+        Returns:
+            One dictionary per file with ``file_path`` (relative to the
+            project folder), ``azure_path``, ``size_bytes``, ``etag``,
+            ``last_modified``, ``metadata`` and ``content_hash``, the SHA-256
+            stored at upload time or None for files uploaded without it.
+        """
+        root = (folder_path or self.validator.config.get_project_path(project_id)).strip("/")
+        files = await self.metadata_service.list_files(root)
+        
+        listing = []
+        for file_metadata in files:
+            metadata = file_metadata.properties.get("metadata") or {}
+            listing.append({
+                'file_path': file_metadata.file_path[len(root):].lstrip("/"),
+                'azure_path': file_metadata.file_path,
+                'size_bytes': file_metadata.size_bytes,
+                'etag': file_metadata.etag,
+                'last_modified': file_metadata.modified_at,
+                'metadata': dict(metadata),
+                'content_hash': metadata.get(CONTENT_SHA256_METADATA_KEY),
+            })
+        return listing
+    
     # Delete operations
     async def delete_file(self, file_path: str) -> FileOperationResult:
         """
@@ -98,10 +98,11 @@ class AutonomousChatService:
             AutonomousChatServiceError: If analysis fails
         """
         try:
-            # Get conversation context if available
+            # Get conversation context, packed into the prompt token budget
             context_summary = ""
             if thread_id:
-                context_summary = await self.context_manager.summarize_context(thread_id)
+                assembled = await self.context_manager.assemble_prompt_context(thread_id)
+                context_summary = assembled.text
 
             # Prepare analysis prompt for LLM
             analysis_prompt = self._build_analysis_prompt(prompt, context_summary, context_history)
@@ -4,19 +4,37 @@ Conversation Context Manager for Autonomous Chat System.
 This service manages conversation state, context snapshots, summarization,
 and tracks intent, code references, and generation lineage for autonomous
 chat conversations.
+
+Contexts are persisted to ``conversation_contexts`` through a process-wide
+write-behind cache: reads are served from memory after the first load and
+writes are flushed to the database in the background. Flushes compare and
+set on the record's ``updated_at``, so a write made by another worker is
+never overwritten with a stale copy; the pending changes are replayed onto
+it instead.
 """
 
-import json
+import asyncio
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, tuple_
 
+from app.core.settings import get_settings
+from app.db.session import async_session_factory
+from app.models.chat import ConversationContext as ConversationContextRecord, ProjectChat
+from app.services.chat.prompt_assembler import AssembledContext, ContextPromptAssembler
 from logconfig.logger import get_logger
 
 logger = get_logger()
+settings = get_settings()
+
+# Number of recent messages passed verbatim to the prompt assembler
+RECENT_MESSAGE_WINDOW = 10
+# Length of a single message once folded into the rolling summary
+SUMMARY_LINE_LENGTH = 160
 
 
 @dataclass
@@ -29,6 +47,9 @@ class ConversationContext:
     summary: Optional[str] = None
     last_updated: datetime = None
     context_metadata: Dict[str, Any] = None
+    context_id: Optional[str] = None
+    # updated_at of the stored record this context is based on; None if unsaved
+    version: Optional[datetime] = None
 
     def __post_init__(self):
         if self.code_references is None:
@@ -46,6 +67,367 @@ class ConversationContextManagerError(Exception):
     pass
 
 
+class ConversationContextStore:
+    """
+    Write-behind cache of conversation contexts.
+
+    Contexts are cached by thread ID (LRU, bounded). Writes update the cache
+    immediately and mark the thread dirty; a background task persists dirty
+    contexts every ``flush_interval`` seconds, one short transaction per
+    context, using its own sessions. Dirty contexts are never evicted before
+    they are flushed.
+
+    Other workers may write the same context, so each write only succeeds if
+    the record still has the ``updated_at`` this worker last saw. On a
+    conflict, changes made through ``update()`` since the last flush are
+    replayed onto the stored version; a full snapshot from ``put()``
+    replaces it.
+    """
+
+    def __init__(
+        self,
+        max_cached: int = 2000,
+        flush_interval: float = 5.0,
+        max_flush_attempts: int = 5,
+    ):
+        self.max_cached = max_cached
+        self.flush_interval = flush_interval
+        self.max_flush_attempts = max_flush_attempts
+
+        self._cache: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self._dirty: Dict[str, int] = {}  # thread_id -> failed flush attempts
+        # thread_id -> changes not yet flushed, in order; None after put()
+        self._pending: Dict[str, Optional[List[Callable[[ConversationContext], None]]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "flushed": 0,
+            "flush_failures": 0,
+            "write_conflicts": 0,
+            "assembled_turns": 0,
+            "assembled_tokens": 0,
+            "full_context_tokens": 0,
+        }
+
+    async def get(self, thread_id: str) -> Optional[ConversationContext]:
+        """Get a thread's context from the cache, loading it on a miss."""
+        context = self._cache.get(thread_id)
+        if context is not None:
+            self._stats["hits"] += 1
+            self._cache.move_to_end(thread_id)
+            return context
+
+        self._stats["misses"] += 1
+        async with async_session_factory() as session:
+            result = await session.execute(
+                select(ConversationContextRecord)
+                .where(ConversationContextRecord.thread_id == thread_id)
+                .order_by(ConversationContextRecord.last_updated.desc())
+                .limit(1)
+            )
+            record = result.scalar_one_or_none()
+
+        if record is None:
+            return None
+
+        # A concurrent writer may have cached a newer version meanwhile
+        if thread_id in self._cache:
+            return self._cache[thread_id]
+
+        context = self._from_record(record)
+        self._remember(context)
+        return context
+
+    def put(self, context: ConversationContext) -> str:
+        """
+        Cache a context and schedule it for persistence.
+
+        The context is written as a whole, replacing any version another
+        worker stored meanwhile.
+
+        Returns:
+            The context ID
+        """
+        if context.context_id is None:
+            context.context_id = str(uuid.uuid4())
+
+        self._remember(context)
+        self._pending[context.thread_id] = None
+        self._mark_dirty(context.thread_id)
+        return context.context_id
+
+    async def update(
+        self,
+        thread_id: str,
+        mutate: Callable[[ConversationContext], None]
+    ) -> ConversationContext:
+        """
+        Apply a change to a thread's context and schedule it for persistence.
+
+        The change is kept until it is flushed, so it can be replayed onto a
+        version another worker stored meanwhile.
+
+        Args:
+            thread_id: Conversation thread ID
+            mutate: Function applying the change to a context in place
+
+        Returns:
+            The updated context
+        """
+        context = await self.get(thread_id)
+        if context is None:
+            context = self._cache.get(thread_id)
+        if context is None:
+            context = ConversationContext(thread_id=thread_id, context_id=str(uuid.uuid4()))
+            self._remember(context)
+
+        mutate(context)
+        pending = self._pending.setdefault(thread_id, [])
+        if pending is not None:
+            pending.append(mutate)
+        self._mark_dirty(thread_id)
+        return context
+
+    def _mark_dirty(self, thread_id: str) -> None:
+        self._dirty.setdefault(thread_id, 0)
+        self._stats["writes"] += 1
+        self._ensure_flush_task()
+
+    @staticmethod
+    def _from_record(record: ConversationContextRecord) -> ConversationContext:
+        return ConversationContext(
+            thread_id=record.thread_id,
+            intent=record.intent,
+            code_references=list(record.code_references or []),
+            generation_lineage=list(record.generation_lineage or []),
+            summary=record.summary,
+            last_updated=record.last_updated,
+            context_metadata=dict(record.context_metadata or {}),
+            context_id=record.id,
+            version=record.updated_at,
+        )
+
+    @staticmethod
+    def _fields(context: ConversationContext) -> Dict[str, Any]:
+        """Stored columns of a context, copied so later changes don't leak in."""
+        return {
+            "intent": context.intent,
+            "code_references": list(context.code_references),
+            "generation_lineage": list(context.generation_lineage),
+            "summary": context.summary,
+            "last_updated": context.last_updated,
+            "context_metadata": dict(context.context_metadata),
+        }
+
+    def _remember(self, context: ConversationContext) -> None:
+        self._cache[context.thread_id] = context
+        self._cache.move_to_end(context.thread_id)
+
+        if len(self._cache) <= self.max_cached:
+            return
+        for thread_id in list(self._cache):
+            if len(self._cache) <= self.max_cached:
+                break
+            if thread_id not in self._dirty:
+                del self._cache[thread_id]
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            # No running loop; contexts are flushed on the next explicit flush()
+            pass
+
+    async def _flush_loop(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Persist all dirty contexts.
+
+        Returns:
+            Number of contexts written
+        """
+        async with self._flush_lock:
+            flushed = 0
+            for thread_id in list(self._dirty):
+                context = self._cache.get(thread_id)
+                if context is None:
+                    self._dirty.pop(thread_id, None)
+                    continue
+
+                # Clear the mark first so writes made during the flush re-mark it
+                attempts = self._dirty.pop(thread_id)
+                pending = self._pending.pop(thread_id, [])
+                try:
+                    await self._write(context, pending)
+                    flushed += 1
+                except Exception as e:
+                    self._restore_pending(thread_id, pending)
+                    self._stats["flush_failures"] += 1
+                    if attempts + 1 < self.max_flush_attempts:
+                        self._dirty.setdefault(thread_id, attempts + 1)
+                        logger.warning(f"Failed to persist context for thread {thread_id}, will retry: {e}")
+                    else:
+                        logger.error(f"Dropping context write for thread {thread_id} after {attempts + 1} attempts: {e}")
+
+            self._stats["flushed"] += flushed
+            return flushed
+
+    def _restore_pending(
+        self,
+        thread_id: str,
+        pending: Optional[List[Callable[[ConversationContext], None]]]
+    ) -> None:
+        """Put back changes of a failed write ahead of those made during it."""
+        if thread_id not in self._pending:
+            self._pending[thread_id] = pending
+            return
+        later = self._pending[thread_id]
+        self._pending[thread_id] = None if pending is None or later is None else pending + later
+
+    async def _write(
+        self,
+        context: ConversationContext,
+        pending: Optional[List[Callable[[ConversationContext], None]]]
+    ) -> None:
+        """
+        Persist a context if its record still has the version it is based on.
+
+        Args:
+            context: Cached context to persist
+            pending: Changes since the last flush, or None for a full snapshot
+
+        Raises:
+            ConversationContextManagerError: If the record keeps changing
+        """
+        # Capture the state before any await so it matches ``pending`` exactly
+        fields = self._fields(context)
+        expected = context.version
+        rebased: Optional[ConversationContext] = None
+
+        for _ in range(self.max_flush_attempts):
+            now = datetime.utcnow()
+            current = await self._compare_and_set(context, fields, expected, now)
+            if current is None:
+                break
+
+            # Another worker stored this context since it was read
+            self._stats["write_conflicts"] += 1
+            logger.debug(f"Context for thread {context.thread_id} changed elsewhere, rebasing")
+            expected = current.updated_at
+            if pending is not None:
+                rebased = self._from_record(current)
+                for mutate in pending:
+                    mutate(rebased)
+                fields = self._fields(rebased)
+        else:
+            raise ConversationContextManagerError(
+                f"Context for thread {context.thread_id} kept changing during flush"
+            )
+
+        if rebased is not None:
+            # Keep changes made while the write was in flight on top of it
+            later = self._pending.get(context.thread_id, [])
+            if later is not None:
+                for mutate in later:
+                    mutate(rebased)
+                for name, value in self._fields(rebased).items():
+                    setattr(context, name, value)
+        context.version = now
+
+    async def _compare_and_set(
+        self,
+        context: ConversationContext,
+        fields: Dict[str, Any],
+        expected: Optional[datetime],
+        now: datetime
+    ) -> Optional[ConversationContextRecord]:
+        """
+        Write a context's fields if its record is still at version ``expected``.
+
+        A missing record is created.
+
+        Returns:
+            None if the fields were written, otherwise the conflicting record
+        """
+        async with async_session_factory() as session:
+            async with session.begin():
+                if expected is not None:
+                    result = await session.execute(
+                        update(ConversationContextRecord)
+                        .where(
+                            ConversationContextRecord.id == context.context_id,
+                            ConversationContextRecord.updated_at == expected,
+                        )
+                        .values(updated_at=now, **fields)
+                    )
+                    if result.rowcount == 1:
+                        return None
+
+                current = await session.get(ConversationContextRecord, context.context_id)
+                if current is not None:
+                    return current
+
+                session.add(ConversationContextRecord(
+                    id=context.context_id,
+                    thread_id=context.thread_id,
+                    updated_at=now,
+                    **fields,
+                ))
+                return None
+
+    async def close(self) -> None:
+        """Stop the background flush and persist remaining writes."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def is_dirty(self, thread_id: str) -> bool:
+        """Whether a thread's context has writes not yet persisted."""
+        return thread_id in self._dirty
+
+    def record_assembly(self, assembled: AssembledContext) -> None:
+        """Record token usage of an assembled prompt context."""
+        self._stats["assembled_turns"] += 1
+        self._stats["assembled_tokens"] += assembled.token_estimate
+        self._stats["full_context_tokens"] += assembled.full_token_estimate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics and average input-token savings per turn."""
+        turns = self._stats["assembled_turns"]
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "cached": len(self._cache),
+            "dirty": len(self._dirty),
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "avg_tokens_saved_per_turn": (
+                (self._stats["full_context_tokens"] - self._stats["assembled_tokens"]) / turns
+                if turns
+                else 0.0
+            ),
+        }
+
+
+context_store = ConversationContextStore(
+    max_cached=settings.CONTEXT_STORE_MAX_CACHED,
+    flush_interval=settings.CONTEXT_STORE_FLUSH_INTERVAL_SECONDS,
+)
+
+
 class ConversationContextManager:
     """
     Manages conversation context for autonomous chat system.
@@ -62,6 +444,8 @@ class ConversationContextManager:
             db_session: Database session for operations
         """
         self.db = db_session
+        self.store = context_store
+        self.assembler = ContextPromptAssembler(token_budget=settings.CONTEXT_PROMPT_TOKEN_BUDGET)
 
     async def save_context(self, context: ConversationContext) -> str:
         """
@@ -77,26 +461,8 @@ class ConversationContextManager:
             ConversationContextManagerError: If save operation fails
         """
         try:
-            # For now, we'll store in memory/disk since DB schema isn't ready yet
-            # This will be updated in Phase 2 when we add the database tables
-            context_id = str(uuid.uuid4())
-
-            # Serialize context for storage
-            context_data = {
-                'id': context_id,
-                'thread_id': context.thread_id,
-                'intent': context.intent,
-                'code_references': context.code_references,
-                'generation_lineage': context.generation_lineage,
-                'summary': context.summary,
-                'last_updated': context.last_updated.isoformat(),
-                'metadata': context.context_metadata
-            }
-
-            # TODO: Replace with actual database insertion when schema is ready
-            # For now, we'll log the context data
-            logger.info(f"Saving context for thread {context.thread_id}: {json.dumps(context_data, indent=2)}")
-
+            context_id = self.store.put(context)
+            logger.debug(f"Saved context {context_id} for thread {context.thread_id}")
             return context_id
 
         except Exception as e:
@@ -117,10 +483,7 @@ class ConversationContextManager:
             ConversationContextManagerError: If load operation fails
         """
         try:
-            # TODO: Replace with actual database query when schema is ready
-            # For now, return None as we don't have persistence yet
-            logger.info(f"Loading context for thread {thread_id} (not implemented yet)")
-            return None
+            return await self.store.get(thread_id)
 
         except Exception as e:
             logger.error(f"Failed to load context for thread {thread_id}: {e}")
@@ -144,39 +507,47 @@ class ConversationContextManager:
         Raises:
             ConversationContextManagerError: If update operation fails
         """
-        try:
-            # Load existing context
-            context = await self.load_context(thread_id)
-
-            if context is None:
-                # Create new context if none exists
-                context = ConversationContext(thread_id=thread_id)
-
-            # Apply updates
+        def apply(context: ConversationContext) -> None:
+            # Callables derive the new value from the context, so the update
+            # can be replayed onto a version written by another worker
             for key, value in updates.items():
+                if callable(value):
+                    value = value(context)
                 if hasattr(context, key):
                     setattr(context, key, value)
-
-            # Update timestamp
+                else:
+                    context.context_metadata[key] = value
             context.last_updated = datetime.utcnow()
 
-            # Save updated context
-            await self.save_context(context)
+        try:
+            # Creates the context if none exists
+            context = await self.store.update(thread_id, apply)
 
-            logger.info(f"Updated context for thread {thread_id}")
+            logger.debug(f"Updated context for thread {thread_id}")
             return context
 
         except Exception as e:
             logger.error(f"Failed to update context for thread {thread_id}: {e}")
             raise ConversationContextManagerError(f"Failed to update context: {e}")
 
-    async def summarize_context(self, thread_id: str, max_length: int = 500) -> str:
+    async def summarize_context(
+        self,
+        thread_id: str,
+        max_length: int = 500,
+        recent_message_window: int = RECENT_MESSAGE_WINDOW
+    ) -> str:
         """
         Generate or retrieve a summary of the conversation context.
 
+        The summary is rolling and covers only messages older than the
+        recent window, which prompts carry verbatim: messages that left the
+        window since the last call are folded in, and the oldest lines are
+        dropped once it exceeds ``max_length``.
+
         Args:
             thread_id: Conversation thread ID
             max_length: Maximum length of summary in characters
+            recent_message_window: Number of recent messages left out of the summary
 
         Returns:
             str: Context summary
@@ -186,30 +557,151 @@ class ConversationContextManager:
         """
         try:
             context = await self.load_context(thread_id)
+            if context is None:
+                context = ConversationContext(thread_id=thread_id)
+
+            recent = await self._recent_messages(thread_id, recent_message_window)
+            if recent:
+                await self._fold_messages_into_summary(
+                    context,
+                    max_length=max_length,
+                    before=(recent[0].timestamp, recent[0].id)
+                )
 
-            if context and context.summary:
-                # Return existing summary if available
+            if context.summary:
                 return context.summary
 
-            # TODO: Implement LLM-based summarization when context is available
-            # For now, return a placeholder summary
-            summary = f"Conversation context for thread {thread_id}: Intent - {context.intent if context else 'Unknown'}"
+            return f"Conversation context for thread {thread_id}: Intent - {context.intent or 'Unknown'}"
 
-            # Truncate if too long
-            if len(summary) > max_length:
-                summary = summary[:max_length - 3] + "..."
+        except Exception as e:
+            logger.error(f"Failed to summarize context for thread {thread_id}: {e}")
+            raise ConversationContextManagerError(f"Failed to summarize context: {e}")
 
-            # Update context with summary
-            if context:
-                context.summary = summary
-                await self.save_context(context)
+    async def _recent_messages(self, thread_id: str, window: int) -> List[ProjectChat]:
+        """Get the last ``window`` messages of a thread, oldest first."""
+        result = await self.db.execute(
+            select(ProjectChat)
+            .where(ProjectChat.thread_id == thread_id)
+            .order_by(ProjectChat.timestamp.desc(), ProjectChat.id.desc())
+            .limit(window)
+        )
+        return list(reversed(result.scalars().all()))
+
+    async def _fold_messages_into_summary(
+        self,
+        context: ConversationContext,
+        max_length: int = 500,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> int:
+        """
+        Fold messages newer than the summary watermark into the summary.
+
+        Args:
+            context: Context to update
+            max_length: Maximum summary length in characters
+            before: Only fold messages positioned before this (timestamp, id)
 
-            logger.info(f"Generated summary for thread {thread_id}")
-            return summary
+        Returns:
+            Number of messages folded
+        """
+        query = select(ProjectChat).where(ProjectChat.thread_id == context.thread_id)
+
+        watermark = context.context_metadata.get("summary_watermark")
+        if watermark:
+            query = query.where(
+                tuple_(ProjectChat.timestamp, ProjectChat.id)
+                > tuple_(datetime.fromisoformat(watermark[0]), watermark[1])
+            )
+        if before is not None:
+            query = query.where(tuple_(ProjectChat.timestamp, ProjectChat.id) < tuple_(*before))
+
+        query = query.order_by(ProjectChat.timestamp.asc(), ProjectChat.id.asc()).limit(200)
+        result = await self.db.execute(query)
+        messages = list(result.scalars().all())
+        if not messages:
+            return 0
+
+        lines = context.summary.splitlines() if context.summary else []
+        for message in messages:
+            content = " ".join(message.message_content.split())
+            if len(content) > SUMMARY_LINE_LENGTH:
+                content = content[:SUMMARY_LINE_LENGTH - 3] + "..."
+            lines.append(f"{message.message_type.value}: {content}")
+
+        while lines and len("\n".join(lines)) > max_length:
+            lines.pop(0)
+
+        summary = "\n".join(lines)
+        new_watermark = [messages[-1].timestamp.isoformat(), messages[-1].id]
+
+        def apply(target: ConversationContext) -> None:
+            # Never roll back a summary another worker already folded further
+            current = target.context_metadata.get("summary_watermark")
+            if current and tuple(current) >= tuple(new_watermark):
+                return
+            target.summary = summary
+            target.context_metadata["summary_watermark"] = new_watermark
+            target.last_updated = datetime.utcnow()
+
+        stored = await self.store.update(context.thread_id, apply)
+        if stored is not context:
+            apply(context)
+        return len(messages)
+
+    async def assemble_prompt_context(
+        self,
+        thread_id: str,
+        token_budget: Optional[int] = None,
+        recent_message_window: int = RECENT_MESSAGE_WINDOW
+    ) -> AssembledContext:
+        """
+        Build prompt context for a chat turn within a token budget.
+
+        The most recent messages are passed verbatim; older ones are folded
+        into the rolling summary, so each turn only reads the window it needs.
+
+        Args:
+            thread_id: Conversation thread ID
+            token_budget: Token budget override
+            recent_message_window: Number of recent messages kept verbatim
+
+        Returns:
+            AssembledContext with the packed text and token accounting
+
+        Raises:
+            ConversationContextManagerError: If assembly fails
+        """
+        try:
+            context = await self.load_context(thread_id)
+            if context is None:
+                context = ConversationContext(thread_id=thread_id)
+
+            recent = await self._recent_messages(thread_id, recent_message_window)
+
+            if recent:
+                await self._fold_messages_into_summary(
+                    context, before=(recent[0].timestamp, recent[0].id)
+                )
+
+            assembled = self.assembler.assemble(
+                context,
+                [
+                    {"role": message.message_type.value, "content": message.message_content}
+                    for message in recent
+                ],
+                token_budget=token_budget,
+            )
+            self.store.record_assembly(assembled)
+
+            logger.debug(
+                f"Assembled context for thread {thread_id}: {assembled.token_estimate} tokens "
+                f"(saved {assembled.saved_tokens} of {assembled.full_token_estimate})"
+            )
+            return assembled
 
         except Exception as e:
-            logger.error(f"Failed to summarize context for thread {thread_id}: {e}")
-            raise ConversationContextManagerError(f"Failed to summarize context: {e}")
+            logger.error(f"Failed to assemble prompt context for thread {thread_id}: {e}")
+            raise ConversationContextManagerError(f"Failed to assemble prompt context: {e}")
 
     async def add_code_reference(
         self,
@@ -330,7 +822,8 @@ class ConversationContextManager:
                 'code_references_count': len(context.code_references),
                 'generation_lineage_count': len(context.generation_lineage),
                 'has_summary': bool(context.summary),
-                'last_updated': context.last_updated.isoformat() if context.last_updated else None
+                'last_updated': context.last_updated.isoformat() if context.last_updated else None,
+                'pending_write': self.store.is_dirty(thread_id)
             }
 
         except Exception as e:
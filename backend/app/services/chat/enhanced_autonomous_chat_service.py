@@ -26,6 +26,7 @@ from app.services.chat.autonomous_chat_service import (
 from app.services.websocket_manager import websocket_manager
 from app.services.code_generation.llm_providers.provider_factory import ProviderFactory
 from app.services.code_generation.config.settings import get_code_generation_settings
+from app.services.code_generation.events import GenerationEventType, generation_event_bus
 from app.models.chat import MessageType, ConversationThread, ProjectChat
 from logconfig.logger import get_logger
 
@@ -677,52 +678,50 @@ class EnhancedAutonomousChatService(AutonomousChatService):
             job_id = generation_result["job_id"]
             generation_id = generation_result["generation_id"]
             
-            # Poll for completion (in real implementation, this would be event-driven)
+            # Wait for generation events instead of polling job status
             max_wait_time = 300  # 5 minutes
-            poll_interval = 5    # 5 seconds
-            elapsed_time = 0
-            
-            while elapsed_time < max_wait_time:
-                try:
-                    # Check generation status
-                    status = await self._check_generation_status(job_id)
-                    
-                    if status["status"] == "completed":
-                        # Generation completed, save to Azure
-                        await self._save_generated_files_to_azure(
-                            conversation_key, 
-                            status["generated_files"],
-                            azure_service
-                        )
-                        break
-                    elif status["status"] == "failed":
-                        # Generation failed
-                        await self._handle_generation_failure(
-                            conversation_key, 
-                            status.get("error", "Generation failed")
-                        )
-                        break
-                    else:
-                        # Still generating, send progress update
-                        await websocket_manager.send_to_user(conversation["user_id"], {
-                            "type": "generation_progress",
-                            "thread_id": conversation["thread_id"],
-                            "job_id": job_id,
-                            "status": status["status"],
-                            "progress_percentage": status.get("progress", 0),
-                            "current_step": status.get("current_step", "Generating code..."),
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                
-                except Exception as e:
-                    logger.error(f"Error checking generation status: {e}")
-                
-                await asyncio.sleep(poll_interval)
-                elapsed_time += poll_interval
-            
-            if elapsed_time >= max_wait_time:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_wait_time
+
+            try:
+                async with generation_event_bus.subscribe(job_id) as subscription:
+                    while True:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            raise asyncio.TimeoutError()
+
+                        event = await subscription.next_event(timeout=remaining)
+
+                        if event.event_type == GenerationEventType.COMPLETED:
+                            # Generation completed, save to Azure
+                            await self._save_generated_files_to_azure(
+                                conversation_key,
+                                event.data.get("generated_files", {}),
+                                azure_service
+                            )
+                            break
+                        elif event.is_terminal:
+                            # Generation failed
+                            await self._handle_generation_failure(
+                                conversation_key,
+                                event.data.get("error_message") or "Generation failed"
+                            )
+                            break
+                        else:
+                            # Still generating, send progress update
+                            await websocket_manager.send_to_user(conversation["user_id"], {
+                                "type": "generation_progress",
+                                "thread_id": conversation["thread_id"],
+                                "job_id": job_id,
+                                "status": event.status,
+                                "progress_percentage": event.progress_percentage,
+                                "current_step": event.current_step or "Generating code...",
+                                "timestamp": datetime.utcnow().isoformat()
+                            })
+
+            except asyncio.TimeoutError:
                 await self._handle_generation_timeout(conversation_key)
-                
+
         except Exception as e:
             logger.error(f"Error monitoring generation: {e}")
             await self._handle_generation_failure(conversation_key, str(e))
@@ -0,0 +1,189 @@
+"""
+Token-budgeted prompt context assembly for chat turns.
+
+Packs a conversation's intent, rolling summary, recent messages, code
+references and generation lineage into a fixed token budget, most relevant
+first, instead of sending raw history with every LLM call.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.chat.conversation_context_manager import ConversationContext
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token), as used for chunking."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - 3, 0)] + "..."
+
+
+@dataclass
+class AssembledContext:
+    """Prompt context packed into a token budget."""
+
+    text: str
+    token_estimate: int
+    full_token_estimate: int
+    token_budget: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    dropped_items: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(self.full_token_estimate - self.token_estimate, 0)
+
+
+class ContextPromptAssembler:
+    """
+    Packs conversation context into a token budget.
+
+    Sections are filled in priority order: intent, recent messages (newest
+    first), rolling summary of older messages, code references and generation
+    lineage (newest first). Each section may use at most its share of the
+    budget plus whatever earlier sections left unused.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        recent_messages_share: float = 0.4,
+        summary_share: float = 0.25,
+        code_references_share: float = 0.2,
+        max_snippet_tokens: int = 120,
+        max_lineage_prompt_tokens: int = 60,
+    ):
+        self.token_budget = token_budget
+        self.recent_messages_share = recent_messages_share
+        self.summary_share = summary_share
+        self.code_references_share = code_references_share
+        self.max_snippet_tokens = max_snippet_tokens
+        self.max_lineage_prompt_tokens = max_lineage_prompt_tokens
+
+    def assemble(
+        self,
+        context: Optional["ConversationContext"],
+        recent_messages: List[Dict[str, Any]],
+        token_budget: Optional[int] = None,
+    ) -> AssembledContext:
+        """
+        Assemble prompt context for one turn.
+
+        Args:
+            context: Conversation context (may be None for a new thread)
+            recent_messages: Recent messages, oldest first, as dicts with
+                ``role`` and ``content``
+            token_budget: Override for the assembler's default budget
+
+        Returns:
+            AssembledContext with the packed text and token accounting
+        """
+        budget = token_budget or self.token_budget
+        remaining = budget
+        sections: List[str] = []
+        section_tokens: Dict[str, int] = {}
+        dropped: Dict[str, int] = {}
+
+        intent = context.intent if context else None
+        summary = context.summary if context else None
+        code_references = context.code_references if context else []
+        lineage = context.generation_lineage if context else []
+
+        # Cost of sending everything verbatim, for savings accounting
+        full_tokens = (
+            estimate_tokens(intent)
+            + estimate_tokens(summary)
+            + sum(estimate_tokens(m.get("content")) for m in recent_messages)
+            + sum(estimate_tokens(r.get("code_snippet")) + estimate_tokens(r.get("file_path")) for r in code_references)
+            + sum(estimate_tokens(e.get("prompt")) + estimate_tokens(e.get("response")) for e in lineage)
+        )
+
+        def add_section(name: str, lines: List[str]) -> None:
+            nonlocal remaining
+            if not lines:
+                return
+            text = f"{name}:\n" + "\n".join(lines)
+            tokens = estimate_tokens(text)
+            sections.append(text)
+            section_tokens[name] = tokens
+            remaining -= tokens
+
+        # Intent
+        if intent:
+            add_section("Intent", [_truncate_to_tokens(intent, 50)])
+
+        # Recent messages, newest first until the section allowance is used
+        allowance = min(remaining, int(budget * self.recent_messages_share))
+        kept: List[str] = []
+        for message in reversed(recent_messages):
+            line = f"{message.get('role', 'user')}: {message.get('content', '')}"
+            tokens = estimate_tokens(line)
+            if tokens > allowance:
+                if not kept:
+                    # Always keep at least the latest message, truncated
+                    line = _truncate_to_tokens(line, allowance)
+                    kept.append(line)
+                    allowance -= estimate_tokens(line)
+                break
+            kept.append(line)
+            allowance -= tokens
+        dropped["recent_messages"] = len(recent_messages) - len(kept)
+        add_section("Recent messages", list(reversed(kept)))
+
+        # Rolling summary of older messages
+        if summary:
+            allowance = min(remaining, int(budget * self.summary_share) + max(allowance, 0))
+            add_section("Earlier conversation", [_truncate_to_tokens(summary, allowance)])
+
+        # Code references, newest first
+        allowance = min(remaining, int(budget * self.code_references_share))
+        kept = []
+        for reference in reversed(code_references):
+            location = reference.get("file_path", "")
+            if reference.get("line_number"):
+                location = f"{location}:{reference['line_number']}"
+            line = f"- {location} ({reference.get('reference_type', 'general')})"
+            if reference.get("code_snippet"):
+                line += "\n" + _truncate_to_tokens(reference["code_snippet"], self.max_snippet_tokens)
+            tokens = estimate_tokens(line)
+            if tokens > allowance:
+                break
+            kept.append(line)
+            allowance -= tokens
+        dropped["code_references"] = len(code_references) - len(kept)
+        add_section("Code references", kept)
+
+        # Generation lineage, newest first; responses are never inlined
+        allowance = remaining
+        kept = []
+        for entry in reversed(lineage):
+            line = (
+                f"- {entry.get('generation_id', '')} ({entry.get('model_used', '')}): "
+                f"{_truncate_to_tokens(entry.get('prompt') or '', self.max_lineage_prompt_tokens)}"
+            )
+            tokens = estimate_tokens(line)
+            if tokens > allowance:
+                break
+            kept.append(line)
+            allowance -= tokens
+        dropped["generation_lineage"] = len(lineage) - len(kept)
+        add_section("Previous generations", kept)
+
+        text = "\n\n".join(sections)
+        return AssembledContext(
+            text=text,
+            token_estimate=estimate_tokens(text),
+            full_token_estimate=full_tokens,
+            token_budget=budget,
+            section_tokens=section_tokens,
+            dropped_items=dropped,
+        )
@@ -7,19 +7,26 @@ with real-time updates and optional clarification questions.
 
 import asyncio
 import json
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from app.services.code_generation.realtime_orchestrator import RealtimeCodeGenerationOrchestrator
+from app.services.code_generation.events import GenerationEventType, generation_event_bus
 from app.services.websocket_manager import websocket_manager
 from app.services.code_generation.generation.prompt_engineer import GenerationScenario
 from app.services.code_generation.llm_providers.provider_factory import ProviderFactory
 from app.services.code_generation.config.settings import get_code_generation_settings
 from app.services.code_generation.llm_providers.base import LLMConfig, LLMRequest
+from app.services.code_generation.generation.pipeline import GenerationRequest
+from app.services.code_generation.rag.retriever import RAGRetriever, RetrievalResult
+from app.services.code_generation.rag.knowledge_base import KnowledgeBase
+from app.db.session import async_session_factory
 from app.models.chat import ProjectChat, ConversationThread, MessageType
 from logconfig.logger import get_logger
 
@@ -44,6 +51,37 @@ class TerraformChatResponse:
     clarification_questions: List[str] = field(default_factory=list)
     generation_job_id: Optional[str] = None
     message: str = ""
+    stage_timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class SpeculativeContext:
+    """Generation context prepared while the request is still being analysed."""
+    query: str
+    # Request the context was prepared for; decides whether generation may reuse it
+    request: Optional[GenerationRequest] = None
+    retrieval_result: Optional[RetrievalResult] = None
+    pattern_context: Optional[str] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+# Speculative context tasks for threads awaiting clarification, keyed by
+# (user ID, thread ID), so the context can be reused once the user answers.
+# A user's entries are dropped when their last WebSocket session disconnects.
+_pending_contexts: "OrderedDict[Tuple[str, str], asyncio.Task]" = OrderedDict()
+_MAX_PENDING_CONTEXTS = 500
+
+
+def _discard_pending_contexts(user_id: str) -> None:
+    """Cancel and drop the speculative contexts of a disconnected user."""
+    for key in [key for key in _pending_contexts if key[0] == user_id]:
+        task = _pending_contexts.pop(key)
+        if not task.done():
+            task.cancel()
+
+
+websocket_manager.user_disconnect_listeners.append(_discard_pending_contexts)
 
 
 class TerraformChatService:
@@ -100,12 +138,29 @@ class TerraformChatService:
                 }
             )
 
-            # Check if clarification is needed
+            # Check if clarification is needed. In speculative mode, context
+            # retrieval and pattern matching run alongside the analysis.
+            stage_timings: Dict[str, float] = {}
+            analysis_start = time.perf_counter()
+            prefetch_task = None
+            if self.settings.SPECULATIVE_PREGENERATION_ENABLED:
+                prefetch_task = asyncio.create_task(
+                    self._prefetch_generation_context(
+                        self._build_generation_request(request.message, request.cloud_provider)
+                    )
+                )
+
             clarification_needed, questions = await self._analyze_request_for_clarification(
                 request.message
             )
+            stage_timings["clarification_analysis"] = (time.perf_counter() - analysis_start) * 1000
 
             if clarification_needed:
+                if prefetch_task is not None:
+                    # Let retrieval finish in the background; the answer to the
+                    # clarification reuses it
+                    self._store_pending_context(request.user_id, thread.id, prefetch_task)
+
                 # Save clarification request message
                 clarification_content = f"I need some additional information: {', '.join(questions)}"
                 await self._save_message(
@@ -132,9 +187,16 @@ class TerraformChatService:
                     thread_id=thread.id,
                     status="clarification_needed",
                     clarification_questions=questions,
-                    message="Clarification needed before generating Terraform code."
+                    message="Clarification needed before generating Terraform code.",
+                    stage_timings_ms=stage_timings
                 )
 
+            speculative_context = None
+            if prefetch_task is not None:
+                speculative_context = await prefetch_task
+                stage_timings.update(speculative_context.timings_ms)
+            stage_timings["pre_generation"] = (time.perf_counter() - analysis_start) * 1000
+
             # No clarification needed, proceed with generation
             await websocket_manager.send_to_user(
                 str(request.user_id),
@@ -152,14 +214,18 @@ class TerraformChatService:
                 user_id=request.user_id,
                 project_id=request.project_id,
                 thread_id=thread.id,
-                cloud_provider=request.cloud_provider
+                cloud_provider=request.cloud_provider,
+                speculative_context=speculative_context
             )
 
+            logger.info(f"Pre-generation stages for thread {thread.id}: {stage_timings}")
+
             return TerraformChatResponse(
                 thread_id=thread.id,
                 status="generating",
                 generation_job_id=job_id,
-                message="Terraform generation started successfully."
+                message="Terraform generation started successfully.",
+                stage_timings_ms=stage_timings
             )
 
         except Exception as e:
@@ -236,20 +302,25 @@ class TerraformChatService:
                 }
             )
 
+            # Reuse context retrieved while the clarification was pending
+            speculative_context = await self._take_pending_context(user_id, thread_id)
+
             # Start generation with combined prompt
             job_id = await self._start_generation_with_progress_tracking(
                 query=combined_prompt,
                 user_id=user_id,
                 project_id=project_id,
                 thread_id=thread_id,
-                cloud_provider="AWS"  # Default, could be stored in thread
+                cloud_provider="AWS",  # Default, could be stored in thread
+                speculative_context=speculative_context
             )
 
             return TerraformChatResponse(
                 thread_id=thread_id,
                 status="generating",
                 generation_job_id=job_id,
-                message="Terraform generation started with clarifications."
+                message="Terraform generation started with clarifications.",
+                stage_timings_ms=speculative_context.timings_ms if speculative_context else {}
             )
 
         except Exception as e:
@@ -395,17 +466,38 @@ class TerraformChatService:
         logger.debug(f"Saved {message_type.value} message to thread {thread_id}")
 
     async def _start_generation_with_progress_tracking(
-        self, query: str, user_id: int, project_id: str, thread_id: str, cloud_provider: str
+        self,
+        query: str,
+        user_id: int,
+        project_id: str,
+        thread_id: str,
+        cloud_provider: str,
+        speculative_context: Optional[SpeculativeContext] = None
     ) -> str:
         """Start generation with comprehensive progress tracking."""
+        request = self._build_generation_request(query, cloud_provider)
+
+        prefetched = {}
+        if speculative_context is not None and self._context_matches(speculative_context, request):
+            prefetched["pattern_context"] = speculative_context.pattern_context
+            # Only a result with documents is handed over; otherwise the
+            # pipeline runs its own retrieval
+            retrieval_result = speculative_context.retrieval_result
+            if retrieval_result is not None and retrieval_result.documents:
+                prefetched["prefetched_context"] = retrieval_result
+
         # Start the generation
         job_id = await self.code_orchestrator.generate_code_async_with_realtime_monitoring(
-            query=query,
+            query=request.query,
             user_id=user_id,
             project_id=project_id,
-            scenario=GenerationScenario.NEW_RESOURCE,
+            scenario=request.scenario,
             enable_realtime=True,
-            cloud_provider=cloud_provider
+            cloud_provider=request.cloud_provider,
+            repository_name=request.repository_name,
+            max_context_documents=request.max_context_documents,
+            similarity_threshold=request.similarity_threshold,
+            **prefetched
         )
 
         # Start monitoring in background
@@ -413,64 +505,167 @@ class TerraformChatService:
 
         return job_id
 
-    async def _monitor_generation_progress(self, job_id: str, thread_id: str, user_id: int, project_id: str):
-        """Monitor generation progress and send updates."""
+    @staticmethod
+    def _build_generation_request(query: str, cloud_provider: str) -> GenerationRequest:
+        """
+        Build the generation request for a chat message.
+
+        Both speculative prefetching and the eventual generation start from
+        this request, so prefetched context is retrieved with the same
+        filters the generation pipeline would use.
+        """
+        return GenerationRequest(
+            query=query,
+            scenario=GenerationScenario.NEW_RESOURCE,
+            cloud_provider=cloud_provider,
+        )
+
+    @staticmethod
+    def _context_matches(context: SpeculativeContext, request: GenerationRequest) -> bool:
+        """
+        Check that a speculative context was prepared for a generation request.
+
+        The query is not compared: the answer to a clarification refines the
+        request that was prefetched for.
+        """
+        prepared = context.request
+        return prepared is not None and (
+            prepared.scenario == request.scenario
+            and prepared.cloud_provider == request.cloud_provider
+            and prepared.repository_name == request.repository_name
+            and prepared.max_context_documents == request.max_context_documents
+            and prepared.similarity_threshold == request.similarity_threshold
+        )
+
+    async def _prefetch_generation_context(self, request: GenerationRequest) -> SpeculativeContext:
+        """
+        Retrieve RAG context and match knowledge base patterns for a request.
+
+        Retrieval uses its own database session so it can run while this
+        service's session is in use, with the retrieval parameters of the
+        request generation will run. Failures are logged and leave the
+        corresponding part empty; generation then retrieves on its own.
+
+        Args:
+            request: Generation request built from the user's message
+
+        Returns:
+            SpeculativeContext with whatever could be prepared
+        """
+        query = request.query
+        context = SpeculativeContext(query=query, request=request)
+
+        async def retrieve():
+            start = time.perf_counter()
+            try:
+                async with async_session_factory() as session:
+                    retriever = RAGRetriever(session)
+                    context.retrieval_result = await retriever.retrieve_context(
+                        request.retrieval_context()
+                    )
+            except Exception as e:
+                logger.warning(f"Speculative context retrieval failed: {e}")
+            finally:
+                context.timings_ms["context_retrieval"] = (time.perf_counter() - start) * 1000
+
+        async def match_patterns():
+            start = time.perf_counter()
+            try:
+                kb_result = await KnowledgeBase(self.db).find_matching_patterns(query, max_results=3)
+                snippets = [
+                    f"# {match.pattern.resource_type or match.pattern.pattern_type}\n{match.pattern.code_snippet}"
+                    for match in kb_result.matched_patterns
+                    if match.pattern.code_snippet
+                ]
+                if snippets:
+                    context.pattern_context = "Known patterns:\n" + "\n\n".join(snippets)
+            except Exception as e:
+                logger.warning(f"Speculative pattern matching failed: {e}")
+            finally:
+                context.timings_ms["pattern_matching"] = (time.perf_counter() - start) * 1000
+
+        await asyncio.gather(retrieve(), match_patterns())
+        return context
+
+    def _store_pending_context(self, user_id: int, thread_id: str, task: asyncio.Task):
+        """Keep a speculative context task until the thread's clarification is answered."""
+        key = (str(user_id), thread_id)
+        previous = _pending_contexts.pop(key, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        _pending_contexts[key] = task
+        while len(_pending_contexts) > _MAX_PENDING_CONTEXTS:
+            _, oldest = _pending_contexts.popitem(last=False)
+            if not oldest.done():
+                oldest.cancel()
+
+    async def _take_pending_context(self, user_id: int, thread_id: str) -> Optional[SpeculativeContext]:
+        """Get the speculative context a user stored for a thread, if still fresh."""
+        task = _pending_contexts.pop((str(user_id), thread_id), None)
+        if task is None:
+            return None
+
         try:
-            # Poll for completion (simplified - in production use events)
-            max_wait_time = 300  # 5 minutes
-            poll_interval = 2    # 2 seconds
-            elapsed_time = 0
+            context = await task
+        except (asyncio.CancelledError, Exception) as e:
+            logger.warning(f"Speculative context for thread {thread_id} unavailable: {e}")
+            return None
 
-            while elapsed_time < max_wait_time:
-                try:
-                    # Check generation status
-                    status = await self.code_orchestrator.get_realtime_job_status(job_id)
-
-                    if status:
-                        if status.get("status") == "completed":
-                            # Send completion summary
-                            await self._send_generation_summary(thread_id, user_id, status, project_id)
-                            break
-                        elif status.get("status") == "failed":
-                            # Send failure notification
-                            await websocket_manager.send_to_user(str(user_id), {
-                                "type": "terraform_generation_failed",
-                                "thread_id": thread_id,
-                                "job_id": job_id,
-                                "error": status.get("error_message", "Generation failed"),
-                                "timestamp": datetime.utcnow().isoformat()
-                            })
-                            break
-                        else:
-                            # Send progress update
-                            progress_percentage = status.get("progress_percentage", 0)
-                            current_step = status.get("current_step", "Processing...")
-
-                            await websocket_manager.send_to_user(str(user_id), {
-                                "type": "terraform_generation_progress",
-                                "thread_id": thread_id,
-                                "job_id": job_id,
-                                "progress_percentage": progress_percentage,
-                                "current_step": current_step,
-                                "timestamp": datetime.utcnow().isoformat()
-                            })
-
-                    await asyncio.sleep(poll_interval)
-                    elapsed_time += poll_interval
-
-                except Exception as e:
-                    logger.error(f"Error checking generation status: {e}")
-                    await asyncio.sleep(poll_interval)
-                    elapsed_time += poll_interval
-
-            if elapsed_time >= max_wait_time:
-                await websocket_manager.send_to_user(str(user_id), {
-                    "type": "terraform_generation_timeout",
-                    "thread_id": thread_id,
-                    "job_id": job_id,
-                    "message": "Generation timed out. Please try again.",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
+        if time.monotonic() - context.created_at > self.settings.SPECULATIVE_CONTEXT_TTL_SECONDS:
+            return None
+
+        logger.debug(f"Reusing speculative context for thread {thread_id}")
+        return context
+
+    async def _monitor_generation_progress(self, job_id: str, thread_id: str, user_id: int, project_id: str):
+        """Relay generation events for a job to the user until it finishes."""
+        max_wait_time = 300  # 5 minutes
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_time
+
+        try:
+            async with generation_event_bus.subscribe(job_id) as subscription:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+
+                    event = await subscription.next_event(timeout=remaining)
+
+                    if event.event_type == GenerationEventType.COMPLETED:
+                        # Send completion summary
+                        await self._send_generation_summary(thread_id, user_id, event.data, project_id)
+                        break
+                    elif event.is_terminal:
+                        # Send failure notification
+                        await websocket_manager.send_to_user(str(user_id), {
+                            "type": "terraform_generation_failed",
+                            "thread_id": thread_id,
+                            "job_id": job_id,
+                            "error": event.data.get("error_message") or "Generation failed",
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+                        break
+                    else:
+                        # Send progress update
+                        await websocket_manager.send_to_user(str(user_id), {
+                            "type": "terraform_generation_progress",
+                            "thread_id": thread_id,
+                            "job_id": job_id,
+                            "progress_percentage": event.progress_percentage,
+                            "current_step": event.current_step or "Processing...",
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+
+        except asyncio.TimeoutError:
+            await websocket_manager.send_to_user(str(user_id), {
+                "type": "terraform_generation_timeout",
+                "thread_id": thread_id,
+                "job_id": job_id,
+                "message": "Generation timed out. Please try again.",
+                "timestamp": datetime.utcnow().isoformat()
+            })
 
         except Exception as e:
             logger.error(f"Error monitoring generation progress: {e}")
@@ -6,11 +6,12 @@ associated with projects, including saving messages and retrieving
 chat history with proper user access control.
 """
 
+import base64
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc, func
+from sqlalchemy import select, and_, desc, func, tuple_
 from sqlalchemy.orm import selectinload
 
 from app.models.chat import ProjectChat, MessageType
@@ -88,6 +89,41 @@ class ChatValidationError(ChatServiceError):
         self.field = field
 
 
+def encode_chat_cursor(message: ProjectChat) -> str:
+    """
+    Encode the keyset position of a chat message as an opaque cursor.
+
+    Args:
+        message: Last message of a page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_chat_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by ``encode_chat_cursor``.
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple of (timestamp, message_id)
+
+    Raises:
+        ChatValidationError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, message_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), message_id
+    except Exception:
+        raise ChatValidationError("Invalid pagination cursor", field="cursor")
+
+
 class ChatService:
     """
     Service for managing project chat functionality.
@@ -225,7 +261,7 @@ class ChatService:
             # Build query for chat messages
             query = select(ProjectChat).where(
                 ProjectChat.project_id == project_id
-            ).order_by(ProjectChat.timestamp.asc())  # Chronological order
+            ).order_by(ProjectChat.timestamp.asc(), ProjectChat.id.asc())  # Chronological order
             
             # Apply pagination
             if offset > 0:
@@ -253,6 +289,211 @@ class ChatService:
                 details={"project_id": project_id, "user_id": user_id}
             )
     
+    async def get_chat_history_page(
+        self,
+        project_id: str,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Tuple[List[ProjectChat], Optional[str], bool]:
+        """
+        Retrieve one page of chat history using keyset pagination.
+
+        Pages are ordered by (timestamp, id) and served from the
+        (project_id, timestamp, id) index, so deep pages cost the same as the
+        first one. One extra row is fetched to tell whether more messages
+        exist, so no second query is needed.
+
+        Args:
+            project_id: ID of the project to get chat history for
+            user_id: Supabase user ID requesting the chat history
+            limit: Maximum number of messages to return
+            cursor: Cursor returned with the previous page (None for the first page)
+            offset: Legacy offset, only used when no cursor is given
+
+        Returns:
+            Tuple of (messages, next_cursor, has_more)
+
+        Raises:
+            ChatValidationError: If parameters are invalid
+            ChatAccessDeniedError: If user lacks project access
+            ChatServiceError: If retrieval operation fails
+        """
+        try:
+            if limit <= 0:
+                raise ChatValidationError("Limit must be positive", field="limit")
+
+            if offset < 0:
+                raise ChatValidationError("Offset must be non-negative", field="offset")
+
+            after = decode_chat_cursor(cursor) if cursor else None
+
+            await self.ensure_history_access(project_id, user_id)
+
+            chat_messages = await self._fetch_history_batch(
+                project_id, limit + 1, after=after, offset=0 if after else offset
+            )
+
+            has_more = len(chat_messages) > limit
+            chat_messages = chat_messages[:limit]
+            next_cursor = (
+                encode_chat_cursor(chat_messages[-1]) if has_more and chat_messages else None
+            )
+
+            logger.info(f"Retrieved {len(chat_messages)} chat messages for project {project_id}")
+
+            return chat_messages, next_cursor, has_more
+
+        except (ChatValidationError, ChatAccessDeniedError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get chat history page for project {project_id}: {e}")
+            raise ChatServiceError(
+                f"Failed to retrieve chat history: {e}",
+                original_exception=e,
+                details={"project_id": project_id, "user_id": user_id}
+            )
+
+    async def get_recent_chat_history(
+        self,
+        project_id: str,
+        user_id: str,
+        limit: int
+    ) -> List[ProjectChat]:
+        """
+        Retrieve the most recent messages of a project in chronological order.
+
+        Reads the newest ``limit`` rows backwards along the
+        (project_id, timestamp, id) index instead of paging from the start.
+
+        Args:
+            project_id: ID of the project to get chat history for
+            user_id: Supabase user ID requesting the chat history
+            limit: Number of most recent messages to return
+
+        Returns:
+            List[ProjectChat]: Up to ``limit`` messages, oldest first
+
+        Raises:
+            ChatValidationError: If parameters are invalid
+            ChatAccessDeniedError: If user lacks project access
+            ChatServiceError: If retrieval operation fails
+        """
+        try:
+            if limit <= 0:
+                raise ChatValidationError("Limit must be positive", field="limit")
+
+            await self.ensure_history_access(project_id, user_id)
+
+            result = await self.db.execute(
+                select(ProjectChat)
+                .where(ProjectChat.project_id == project_id)
+                .order_by(ProjectChat.timestamp.desc(), ProjectChat.id.desc())
+                .limit(limit)
+            )
+            return list(reversed(result.scalars().all()))
+
+        except (ChatValidationError, ChatAccessDeniedError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get recent chat history for project {project_id}: {e}")
+            raise ChatServiceError(
+                f"Failed to retrieve chat history: {e}",
+                original_exception=e,
+                details={"project_id": project_id, "user_id": user_id}
+            )
+
+    async def ensure_history_access(self, project_id: str, user_id: str) -> None:
+        """
+        Validate parameters and project access for reading chat history.
+
+        Args:
+            project_id: ID of the project
+            user_id: Supabase user ID requesting the history
+
+        Raises:
+            ChatValidationError: If parameters are invalid
+            ChatAccessDeniedError: If user lacks project access
+            ResourceNotFoundError: If the project doesn't exist
+        """
+        if not project_id or not project_id.strip():
+            raise ChatValidationError("Project ID is required", field="project_id")
+
+        if not user_id or not user_id.strip():
+            raise ChatValidationError("User ID is required", field="user_id")
+
+        await self._validate_project_access(project_id, user_id)
+
+    async def iter_chat_history(
+        self,
+        project_id: str,
+        user_id: str,
+        batch_size: int = 500,
+        session: Optional[AsyncSession] = None,
+        check_access: bool = True
+    ) -> AsyncIterator[ProjectChat]:
+        """
+        Stream a project's full chat history in chronological order.
+
+        Messages are read in keyset-paginated batches, so memory use stays
+        bounded regardless of history length.
+
+        Args:
+            project_id: ID of the project to export
+            user_id: Supabase user ID requesting the export
+            batch_size: Number of messages read per query
+            session: Session to read with (e.g. one that outlives the request);
+                defaults to the service's session
+            check_access: Whether to validate access first; pass False if
+                ``ensure_history_access`` was already called
+
+        Yields:
+            ProjectChat messages, oldest first
+
+        Raises:
+            ChatValidationError: If parameters are invalid
+            ChatAccessDeniedError: If user lacks project access
+        """
+        if check_access:
+            await self.ensure_history_access(project_id, user_id)
+
+        after = None
+        while True:
+            batch = await self._fetch_history_batch(
+                project_id, batch_size, after=after, session=session
+            )
+            for message in batch:
+                yield message
+
+            if len(batch) < batch_size:
+                break
+            after = (batch[-1].timestamp, batch[-1].id)
+
+    async def _fetch_history_batch(
+        self,
+        project_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        offset: int = 0,
+        session: Optional[AsyncSession] = None
+    ) -> List[ProjectChat]:
+        """Fetch up to ``limit`` messages positioned after a (timestamp, id) key."""
+        query = select(ProjectChat).where(ProjectChat.project_id == project_id)
+
+        if after is not None:
+            query = query.where(
+                tuple_(ProjectChat.timestamp, ProjectChat.id) > tuple_(*after)
+            )
+
+        query = query.order_by(ProjectChat.timestamp.asc(), ProjectChat.id.asc())
+
+        if offset > 0:
+            query = query.offset(offset)
+
+        result = await (session or self.db).execute(query.limit(limit))
+        return list(result.scalars().all())
+
     async def initialize_project_chat(self, project_id: str) -> None:
         """
         Initialize empty chat for a new project.
@@ -0,0 +1,447 @@
+"""
+Compiled single-pass best practice rules for Terraform code.
+
+All line rules (naming, hardcoded secrets, ``count`` usage, long lines,
+complex expressions) are evaluated in one walk over the code, and the same
+walk builds a block model of the top-level blocks (``resource``, ``module``,
+``variable``, ...) for block rules such as missing descriptions. Patterns are
+compiled once at import and cheap substring prefilters skip the regexes on
+lines that cannot match.
+
+Results are cached per (content hash, strict_mode), so code that is
+analyzed by ``TerraformBestPracticesEnforcer`` and checked again by
+``TerraformValidator`` is only scanned once.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.code_generation.config.settings import get_code_generation_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+
+class PracticeCategory(Enum):
+    """Categories of best practices."""
+    NAMING = "naming"
+    ORGANIZATION = "organization"
+    SECURITY = "security"
+    PERFORMANCE = "performance"
+    MAINTAINABILITY = "maintainability"
+
+
+class PracticeSeverity(Enum):
+    """Severity levels for practice violations."""
+    ERROR = "error"
+    WARNING = "warning"
+    INFO = "info"
+
+
+@dataclass
+class PracticeViolation:
+    """Represents a best practice violation."""
+    category: PracticeCategory
+    severity: PracticeSeverity
+    rule: str
+    message: str
+    suggestion: str
+    line_number: Optional[int] = None
+    context: Optional[str] = None
+
+
+@dataclass
+class TerraformBlock:
+    """A top-level HCL block."""
+    kind: str
+    labels: Tuple[str, ...]
+    start_line: int  # 1-based, header line
+    end_line: int = 0  # 1-based, closing brace line
+    keys: Set[str] = field(default_factory=set)  # attribute and nested block names
+
+
+# Naming declarations; one alternation instead of a search per keyword
+_DECLARATION = re.compile(
+    r'(resource)\s+"([^"]+)"\s+"([^"]+)"'
+    r'|(module)\s+"([^"]+)"'
+    r'|(variable)\s+"([^"]+)"'
+    r'|(output)\s+"([^"]+)"'
+)
+_SECRET_PREFILTER = re.compile(r'(?:password|secret|key|token)\s*=\s*["\'][^"\']+["\']', re.IGNORECASE)
+_SECRET_PATTERNS = [
+    (re.compile(r'password\s*=\s*["\'][^"\']+["\']', re.IGNORECASE), "Hardcoded password detected"),
+    (re.compile(r'secret\s*=\s*["\'][^"\']+["\']', re.IGNORECASE), "Hardcoded secret detected"),
+    (re.compile(r'key\s*=\s*["\'][^"\']+["\']', re.IGNORECASE), "Hardcoded key detected"),
+    (re.compile(r'token\s*=\s*["\'][^"\']+["\']', re.IGNORECASE), "Hardcoded token detected"),
+]
+_NESTED_INTERPOLATION = re.compile(r'\$\{.*\$\{.*\$\{.*')
+_LENGTH_EXPRESSION = re.compile(r'length\s*\([^)]+\)')
+
+_BLOCK_HEADER = re.compile(
+    r'^\s*([A-Za-z_][\w-]*)((?:\s+(?:"[^"]*"|[A-Za-z_][\w-]*))*)\s*\{'
+)
+_LABEL = re.compile(r'"([^"]*)"|([A-Za-z_][\w-]*)')
+_BLOCK_KEY = re.compile(r'^\s*([A-Za-z_][\w-]*)\s*(?:=|\{|")')
+_STRING_OR_COMMENT = re.compile(r'"(?:[^"\\]|\\.)*"?|#.*|//.*')
+_HEREDOC = re.compile(r'<<-?\s*"?([A-Za-z_]\w*)"?\s*$')
+
+MAX_LINE_LENGTH = 120
+MAX_RESOURCE_NAME_LENGTH = 64
+
+
+class CompiledRuleSet:
+    """Evaluates every best practice rule in a single pass over the code."""
+
+    def evaluate(self, code: str, strict_mode: bool) -> Tuple[List[PracticeViolation], List[TerraformBlock]]:
+        """
+        Run all rules over ``code``.
+
+        Violations are returned grouped by category in a fixed order
+        (naming, organization, security, performance, maintainability).
+
+        Args:
+            code: Terraform code to analyze
+            strict_mode: Enable strict validation rules
+
+        Returns:
+            Tuple of (violations, top-level blocks)
+        """
+        naming: List[PracticeViolation] = []
+        organization: List[PracticeViolation] = []
+        security: List[PracticeViolation] = []
+        performance: List[PracticeViolation] = []
+        long_lines: List[PracticeViolation] = []
+        complex_expressions: List[PracticeViolation] = []
+
+        blocks: List[TerraformBlock] = []
+        block: Optional[TerraformBlock] = None
+        depth = 0
+        heredoc: Optional[str] = None
+        provider_count = 0
+        count_lines: List[Tuple[int, str]] = []
+        uses_for_each = False
+        has_public_flag = False
+        has_true = False
+
+        for i, line in enumerate(code.split('\n'), 1):
+            # Line rules apply to every line, including heredoc bodies
+            if '"' in line:
+                if 'provider "' in line:
+                    provider_count += line.count('provider "')
+                for match in _DECLARATION.finditer(line):
+                    self._check_declaration(match, i, strict_mode, naming)
+
+            if '=' in line:
+                if _SECRET_PREFILTER.search(line):
+                    for pattern, message in _SECRET_PATTERNS:
+                        if pattern.search(line):
+                            security.append(PracticeViolation(
+                                category=PracticeCategory.SECURITY,
+                                severity=PracticeSeverity.ERROR,
+                                rule="hardcoded_secret",
+                                message=message,
+                                suggestion="Use variables or secret management for sensitive values",
+                                line_number=i,
+                                context=line.strip()
+                            ))
+                if 'count =' in line:
+                    count_lines.append((i, line.strip()))
+                if 'for_each =' in line:
+                    uses_for_each = True
+
+            if not has_public_flag and 'publicly_accessible' in line:
+                has_public_flag = True
+            if not has_true and 'true' in line:
+                has_true = True
+
+            if len(line) > MAX_LINE_LENGTH:
+                long_lines.append(PracticeViolation(
+                    category=PracticeCategory.MAINTAINABILITY,
+                    severity=PracticeSeverity.INFO,
+                    rule="long_line",
+                    message=f"Line {i} is {len(line)} characters long",
+                    suggestion="Break long lines for better readability and maintainability",
+                    line_number=i
+                ))
+            if '${' in line and _NESTED_INTERPOLATION.search(line):
+                complex_expressions.append(self._complex_expression("Highly nested interpolation", i, line))
+            if 'length' in line and _LENGTH_EXPRESSION.search(line):
+                complex_expressions.append(self._complex_expression("Complex length expression", i, line))
+
+            # Block model
+            if heredoc is not None:
+                if line.strip() == heredoc:
+                    heredoc = None
+                continue
+
+            if depth == 0 and block is None:
+                header = _BLOCK_HEADER.match(line)
+                if header:
+                    labels = tuple(quoted or bare for quoted, bare in _LABEL.findall(header.group(2)))
+                    block = TerraformBlock(kind=header.group(1), labels=labels, start_line=i)
+                    # A single-line block carries its argument after the brace;
+                    # the depth count below closes it on this line
+                    key = _BLOCK_KEY.match(line[header.end():])
+                    if key:
+                        block.keys.add(key.group(1))
+            elif block is not None:
+                key = _BLOCK_KEY.match(line)
+                if key:
+                    block.keys.add(key.group(1))
+
+            if '{' in line or '}' in line:
+                stripped = line
+                if '"' in line or '#' in line or '/' in line:
+                    stripped = _STRING_OR_COMMENT.sub('', line)
+                depth = max(depth + stripped.count('{') - stripped.count('}'), 0)
+            if '<<' in line:
+                opened = _HEREDOC.search(line)
+                if opened:
+                    heredoc = opened.group(1)
+
+            if depth == 0 and block is not None:
+                block.end_line = i
+                blocks.append(block)
+                self._check_block(block, organization)
+                block = None
+
+        if provider_count > 1:
+            organization.insert(0, PracticeViolation(
+                category=PracticeCategory.ORGANIZATION,
+                severity=PracticeSeverity.WARNING,
+                rule="multiple_providers",
+                message=f"Multiple providers ({provider_count}) defined in one file",
+                suggestion="Consider separating providers into different files or using workspaces"
+            ))
+
+        if has_public_flag and has_true:
+            security.append(PracticeViolation(
+                category=PracticeCategory.SECURITY,
+                severity=PracticeSeverity.WARNING,
+                rule="public_access",
+                message="Resource configured with public access",
+                suggestion="Review if public access is necessary and implement proper security controls"
+            ))
+
+        if count_lines and not uses_for_each:
+            for i, context in count_lines:
+                performance.append(PracticeViolation(
+                    category=PracticeCategory.PERFORMANCE,
+                    severity=PracticeSeverity.INFO,
+                    rule="count_without_foreach",
+                    message="Using count without for_each may impact performance",
+                    suggestion="Consider using for_each instead of count for better performance",
+                    line_number=i,
+                    context=context
+                ))
+
+        violations = naming + organization + security + performance + long_lines + complex_expressions
+        return violations, blocks
+
+    def _check_declaration(
+        self,
+        match: re.Match,
+        line_num: int,
+        strict_mode: bool,
+        violations: List[PracticeViolation]
+    ) -> None:
+        """Apply naming rules to a resource, module, variable or output declaration."""
+        if match.group(1):
+            self._check_resource_name(match.group(2), match.group(3), line_num, strict_mode, violations)
+        elif match.group(4):
+            module_name = match.group(5)
+            if '_' in module_name:
+                violations.append(PracticeViolation(
+                    category=PracticeCategory.NAMING,
+                    severity=PracticeSeverity.ERROR if strict_mode else PracticeSeverity.WARNING,
+                    rule="module_name_underscores",
+                    message=f"Module name '{module_name}' contains underscores",
+                    suggestion="Use hyphens instead of underscores in module names",
+                    line_number=line_num,
+                    context=f"module \"{module_name}\""
+                ))
+        elif match.group(6):
+            var_name = match.group(7)
+            if '-' in var_name:
+                violations.append(PracticeViolation(
+                    category=PracticeCategory.NAMING,
+                    severity=PracticeSeverity.INFO,
+                    rule="variable_name_hyphens",
+                    message=f"Variable name '{var_name}' contains hyphens",
+                    suggestion="Use underscores in variable names for consistency",
+                    line_number=line_num,
+                    context=f"variable \"{var_name}\""
+                ))
+        else:
+            output_name = match.group(9)
+            if '-' in output_name:
+                violations.append(PracticeViolation(
+                    category=PracticeCategory.NAMING,
+                    severity=PracticeSeverity.INFO,
+                    rule="output_name_hyphens",
+                    message=f"Output name '{output_name}' contains hyphens",
+                    suggestion="Use underscores in output names for consistency",
+                    line_number=line_num,
+                    context=f"output \"{output_name}\""
+                ))
+
+    def _check_resource_name(
+        self,
+        resource_type: str,
+        resource_name: str,
+        line_num: int,
+        strict_mode: bool,
+        violations: List[PracticeViolation]
+    ) -> None:
+        """Validate resource naming conventions."""
+        # Check for underscores (prefer hyphens)
+        if '_' in resource_name:
+            violations.append(PracticeViolation(
+                category=PracticeCategory.NAMING,
+                severity=PracticeSeverity.ERROR if strict_mode else PracticeSeverity.WARNING,
+                rule="resource_name_underscores",
+                message=f"Resource name '{resource_name}' contains underscores",
+                suggestion="Use hyphens instead of underscores in resource names for consistency",
+                line_number=line_num,
+                context=f"resource \"{resource_type}\" \"{resource_name}\""
+            ))
+
+        if len(resource_name) > MAX_RESOURCE_NAME_LENGTH:
+            violations.append(PracticeViolation(
+                category=PracticeCategory.NAMING,
+                severity=PracticeSeverity.WARNING,
+                rule="resource_name_length",
+                message=f"Resource name '{resource_name}' is too long ({len(resource_name)} characters)",
+                suggestion="Keep resource names under 64 characters for readability",
+                line_number=line_num
+            ))
+
+        if any(c.isupper() for c in resource_name):
+            violations.append(PracticeViolation(
+                category=PracticeCategory.NAMING,
+                severity=PracticeSeverity.INFO,
+                rule="resource_name_case",
+                message=f"Resource name '{resource_name}' contains uppercase characters",
+                suggestion="Use lowercase with hyphens for resource names",
+                line_number=line_num
+            ))
+
+    def _check_block(self, block: TerraformBlock, violations: List[PracticeViolation]) -> None:
+        """Apply block rules to a completed top-level block."""
+        if block.kind == "resource" and not any('description' in key for key in block.keys):
+            violations.append(PracticeViolation(
+                category=PracticeCategory.ORGANIZATION,
+                severity=PracticeSeverity.INFO,
+                rule="missing_description",
+                message="Resource block missing description",
+                suggestion="Add a description field to document the resource purpose",
+                line_number=block.start_line
+            ))
+
+    def _complex_expression(self, message: str, line_num: int, line: str) -> PracticeViolation:
+        return PracticeViolation(
+            category=PracticeCategory.MAINTAINABILITY,
+            severity=PracticeSeverity.WARNING,
+            rule="complex_expression",
+            message=message,
+            suggestion="Consider simplifying complex expressions using locals or variables",
+            line_number=line_num,
+            context=line.strip()
+        )
+
+
+class PracticeResultCache:
+    """
+    LRU cache of rule results keyed by (content hash, strict_mode).
+
+    Cached violation lists are shared between callers; each call returns a
+    new list over the same (read-only) violation objects.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.rule_set = CompiledRuleSet()
+        self._entries: "OrderedDict[Tuple[str, bool], Tuple[Tuple[PracticeViolation, ...], Tuple[TerraformBlock, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "lines_analyzed": 0,
+            "analysis_seconds": 0.0,
+        }
+
+    def evaluate(self, code: str, strict_mode: bool = False) -> Tuple[List[PracticeViolation], List[TerraformBlock]]:
+        """
+        Get violations and blocks for ``code``, running the rules on a miss.
+
+        Args:
+            code: Terraform code to analyze
+            strict_mode: Enable strict validation rules
+
+        Returns:
+            Tuple of (violations, top-level blocks)
+        """
+        key = (hashlib.sha256(code.encode("utf-8")).hexdigest(), strict_mode)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return list(cached[0]), list(cached[1])
+
+        started = time.perf_counter()
+        violations, blocks = self.rule_set.evaluate(code, strict_mode)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["lines_analyzed"] += code.count('\n') + 1
+            self._stats["analysis_seconds"] += elapsed
+            self._entries[key] = (tuple(violations), tuple(blocks))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+        return violations, blocks
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache and rule evaluation statistics."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            seconds = self._stats["analysis_seconds"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "avg_analysis_ms": seconds * 1000 / self._stats["misses"] if self._stats["misses"] else 0.0,
+                "lines_per_second": self._stats["lines_analyzed"] / seconds if seconds else 0.0,
+            }
+
+
+_result_cache: Optional[PracticeResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_practice_result_cache() -> PracticeResultCache:
+    """Get the process-wide best practice result cache."""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            settings = get_code_generation_settings()
+            _result_cache = PracticeResultCache(max_entries=settings.BEST_PRACTICES_CACHE_SIZE)
+        return _result_cache
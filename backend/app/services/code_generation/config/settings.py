@@ -21,6 +21,64 @@ class CodeGenerationSettings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     ENABLE_RATE_LIMITING: bool = True
 
+    # Chat Flow Settings
+    # Run clarification analysis, context retrieval and pattern matching
+    # concurrently instead of one after another
+    SPECULATIVE_PREGENERATION_ENABLED: bool = True
+    SPECULATIVE_CONTEXT_TTL_SECONDS: int = 900
+
+    # Diff Engine Settings
+    # Diffs of inputs with at least this many lines run in a process pool
+    DIFF_OFFLOAD_MIN_LINES: int = 2000
+    DIFF_PROCESS_POOL_WORKERS: int = 2
+    # Stretches needing more edits are shown as one replacement, not line-diffed
+    DIFF_MYERS_MAX_EDIT_DISTANCE: int = 500
+
+    # Diff Storage Settings
+    DIFF_STORAGE_COMPRESSION_LEVEL: int = 6
+    # Longest delta chain before a full copy is stored again
+    DIFF_STORAGE_MAX_CHAIN_DEPTH: int = 16
+    # Store a delta only if it compresses to at most this fraction of a full copy
+    DIFF_STORAGE_DELTA_MAX_RATIO: float = 0.5
+    DIFF_STORAGE_DICTIONARY_SIZE: int = 112640
+
+    # Debug Session Persistence Settings
+    DEBUG_SESSION_QUEUE_SIZE: int = 256
+    DEBUG_SESSION_SEGMENT_MAX_BYTES: int = 16 * 1024 * 1024
+    DEBUG_SESSION_MAX_SEGMENTS: int = 20
+    DEBUG_SESSION_MAX_FIELD_CHARS: int = 8000
+    DEBUG_SESSION_MAX_LIST_ITEMS: int = 50
+
+    # RAG Re-ranking Settings
+    RAG_RERANK_ENABLED: bool = True
+    # Candidates fetched from the vector store per requested result
+    RAG_RERANK_CANDIDATE_MULTIPLIER: int = 4
+    # MMR trade-off: 1.0 ranks by relevance only, 0.0 by diversity only
+    RAG_MMR_LAMBDA: float = 0.7
+    # Neighbouring chunks of a file at least this similar are collapsed
+    RAG_CHUNK_OVERLAP_THRESHOLD: float = 0.92
+    # Weight of the lexical score in hybrid fusion (0 disables it)
+    RAG_LEXICAL_WEIGHT: float = 0.0
+
+    # RAG Retrieval Cache Settings
+    RAG_RETRIEVAL_CACHE_ENABLED: bool = True
+    RAG_RETRIEVAL_CACHE_SIZE: int = 256
+    RAG_RETRIEVAL_CACHE_TTL_SECONDS: int = 600
+    RAG_QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    # Share index versions across workers so re-indexing invalidates every cache
+    RAG_INDEX_VERSION_REDIS_URL: Optional[str] = None
+
+    # Component Registry Settings
+    # Generation jobs run at once in this process, across all orchestrators
+    GENERATION_MAX_CONCURRENT_JOBS: int = 5
+    # Finished jobs kept for status lookups; the oldest are dropped first
+    GENERATION_COMPLETED_JOBS_LIMIT: int = 1000
+    KNOWLEDGE_BASE_PATTERN_CACHE_SIZE: int = 512
+
+    # Best Practices Settings
+    # Rule results cached per (content hash, strict_mode)
+    BEST_PRACTICES_CACHE_SIZE: int = 512
+
     # Security Settings
     API_KEY_MIN_LENGTH: int = 20
     VALIDATE_API_KEY_ON_STARTUP: bool = True
@@ -0,0 +1,128 @@
+"""
+Compression and delta encoding for stored Terraform diffs.
+
+Diff content is stored as a compressed payload instead of plain text:
+
+- ``zstd`` payloads may be compressed with a dictionary trained on earlier
+  diffs, which pays off for the many small, structurally similar diffs the
+  generator produces;
+- when ``zstandard`` is not installed, ``zlib`` is used instead so storage
+  keeps working;
+- a diff may be stored as a line-level delta against an earlier diff of the
+  same job and file, which is reconstructed by applying the delta chain.
+"""
+
+import json
+import zlib
+from typing import List, Optional, Sequence, Union
+
+from app.services.code_generation.diff.engine import diff_opcodes
+from logconfig.logger import get_logger
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+logger = get_logger()
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+# Delta operations are either [start, end] (copy base lines) or a list of
+# literal lines; the payload is the JSON encoding of the operation list.
+DeltaOp = Union[List[int], List[str]]
+
+
+def preferred_codec() -> str:
+    """Codec used for new payloads."""
+    return CODEC_ZSTD if zstd is not None else CODEC_ZLIB
+
+
+def compress(
+    data: bytes,
+    codec: str,
+    level: int = 6,
+    dictionary: Optional[bytes] = None
+) -> bytes:
+    """
+    Compress a payload.
+
+    Args:
+        data: Raw bytes
+        codec: ``zstd`` or ``zlib``
+        level: Compression level
+        dictionary: Trained zstd dictionary, if any
+
+    Returns:
+        Compressed bytes
+    """
+    if codec == CODEC_ZSTD:
+        zstd_dict = zstd.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstd.ZstdCompressor(level=level, dict_data=zstd_dict).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, level)
+    raise ValueError(f"Unknown diff content codec: {codec}")
+
+
+def decompress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    """Decompress a payload written by ``compress``."""
+    if codec == CODEC_ZSTD:
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed diffs")
+        zstd_dict = zstd.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstd.ZstdDecompressor(dict_data=zstd_dict).decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown diff content codec: {codec}")
+
+
+def train_dictionary(samples: Sequence[str], dict_size: int) -> Optional[bytes]:
+    """
+    Train a zstd dictionary on sample diff contents.
+
+    Returns:
+        Dictionary bytes, or None when zstd is unavailable or training fails
+        (e.g. too few samples)
+    """
+    if zstd is None:
+        logger.warning("zstandard not installed, skipping diff dictionary training")
+        return None
+    try:
+        trained = zstd.train_dictionary(dict_size, [s.encode("utf-8") for s in samples if s])
+        return trained.as_bytes()
+    except Exception as e:
+        logger.warning(f"Diff dictionary training failed: {e}")
+        return None
+
+
+def make_delta(base: str, content: str) -> bytes:
+    """
+    Encode ``content`` as line-level copy/insert operations against ``base``.
+
+    Lines keep their terminators so reconstruction is byte-exact.
+    """
+    base_lines = base.splitlines(keepends=True)
+    lines = content.splitlines(keepends=True)
+    opcodes, _ = diff_opcodes(base_lines, lines)
+
+    ops: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(lines[j1:j2])
+    return json.dumps(ops, separators=(",", ":")).encode("utf-8")
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Reconstruct content from ``base`` and a delta from ``make_delta``."""
+    base_lines = base.splitlines(keepends=True)
+    parts: List[str] = []
+    for op in json.loads(delta):
+        if op and isinstance(op[0], int):
+            parts.extend(base_lines[op[0]:op[1]])
+        else:
+            parts.extend(op)
+    return "".join(parts)
+
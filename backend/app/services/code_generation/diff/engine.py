@@ -0,0 +1,540 @@
+"""
+Block-aligned diff engine for Terraform code.
+
+Instead of running a general-purpose sequence matcher over whole files,
+the engine:
+
+1. splits both sides into top-level HCL blocks (``resource "aws_s3_bucket"
+   "logs" { ... }``) and addresses them (``resource.aws_s3_bucket.logs``);
+2. aligns blocks by address, so unchanged blocks are matched by a single
+   equality check no matter how far they moved within the file;
+3. line-diffs only changed blocks and the unaligned stretches between them
+   with patience diff, falling back to Myers' O(ND) algorithm where no
+   unique anchor lines exist. Myers gives up beyond
+   ``DIFF_MYERS_MAX_EDIT_DISTANCE`` edits and the stretch is reported as a
+   single replacement.
+
+Output is rendered in the same unified format as ``difflib.unified_diff``,
+but it is not the same diff: patience and Myers can pick a different (equally
+valid) alignment than difflib's matcher, so hunk boundaries and the order of
+removed and added lines sometimes differ for the same inputs.
+
+Inputs of ``DIFF_OFFLOAD_MIN_LINES`` lines or more are diffed in a process
+pool so that large modules never stall the event loop.
+"""
+
+import asyncio
+import multiprocessing
+import re
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.services.code_generation.config.settings import get_code_generation_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+Opcode = Tuple[str, int, int, int, int]
+Segment = Tuple[str, int, int]  # (address, start line, end line)
+
+_BLOCK_HEADER = re.compile(
+    r'^\s*([A-Za-z_][\w-]*)((?:\s+(?:"[^"]*"|[A-Za-z_][\w-]*))*)\s*\{'
+)
+_LABEL = re.compile(r'"([^"]*)"|([A-Za-z_][\w-]*)')
+_STRING_OR_COMMENT = re.compile(r'"(?:[^"\\]|\\.)*"?|#.*|//.*')
+_HEREDOC = re.compile(r'<<-?\s*"?([A-Za-z_]\w*)"?\s*$')
+
+# Edit distance beyond which Myers gives up on a stretch of lines
+DEFAULT_MYERS_MAX_EDIT_DISTANCE = 500
+
+
+# ----------------------------------------------------------------------
+# Block splitting
+# ----------------------------------------------------------------------
+
+def _scan_line(line: str, depth: int) -> Tuple[int, Optional[str]]:
+    """
+    Update brace depth for one line, ignoring strings and comments.
+
+    Returns:
+        New depth and the heredoc terminator opened on this line, if any
+    """
+    code = line
+    if '"' in line or '#' in line or '/' in line:
+        code = _STRING_OR_COMMENT.sub('', line)
+    depth += code.count('{') - code.count('}')
+
+    heredoc = _HEREDOC.search(line) if '<<' in line else None
+    return depth, heredoc.group(1) if heredoc else None
+
+
+def _block_address(header: re.Match) -> str:
+    labels = [
+        quoted if quoted is not None else bare
+        for quoted, bare in _LABEL.findall(header.group(2))
+    ]
+    return ".".join([header.group(1), *labels])
+
+
+def split_blocks(lines: Sequence[str]) -> List[Segment]:
+    """
+    Split HCL lines into contiguous segments, one per top-level block.
+
+    Comments and blank lines before a block belong to that block; anything
+    after the last block forms a trailing segment. Repeated addresses (e.g.
+    several ``locals`` blocks) are numbered by occurrence. If braces do not
+    balance, the whole input is returned as a single segment.
+
+    Args:
+        lines: Source lines
+
+    Returns:
+        List of (address, start, end) segments covering every line
+    """
+    segments: List[Segment] = []
+    seen: Dict[str, int] = {}
+    depth = 0
+    heredoc: Optional[str] = None
+    segment_start = 0
+    address: Optional[str] = None
+
+    for index, line in enumerate(lines):
+        if heredoc is not None:
+            if line.strip() == heredoc:
+                heredoc = None
+            continue
+
+        if depth == 0 and address is None:
+            header = _BLOCK_HEADER.match(line)
+            if header:
+                address = _block_address(header)
+                count = seen.get(address, 0)
+                seen[address] = count + 1
+                if count:
+                    address = f"{address}#{count + 1}"
+
+        depth, heredoc = _scan_line(line, depth)
+        if depth < 0:
+            return [("", 0, len(lines))]
+
+        if depth == 0 and address is not None:
+            segments.append((address, segment_start, index + 1))
+            segment_start = index + 1
+            address = None
+
+    if depth != 0 or heredoc is not None:
+        return [("", 0, len(lines))]
+    if segment_start < len(lines):
+        segments.append(("", segment_start, len(lines)))
+    return segments
+
+
+# ----------------------------------------------------------------------
+# Line matching
+# ----------------------------------------------------------------------
+
+def _myers_matches(
+    a: Sequence[str], b: Sequence[str],
+    alo: int, ahi: int, blo: int, bhi: int,
+    matches: List[Tuple[int, int]],
+    max_edit_distance: int
+) -> bool:
+    """
+    Append matched line pairs of a shortest edit script (Myers, O(ND)).
+
+    The search keeps a trace of O(D²) entries, so it is abandoned once the
+    edit distance exceeds ``max_edit_distance``; nothing is appended and the
+    caller reports the stretch as one replacement.
+
+    Returns:
+        False if the search was abandoned
+    """
+    n = ahi - alo
+    m = bhi - blo
+    if n == 0 or m == 0:
+        return True
+
+    v = {1: 0}
+    trace = []
+    done = False
+    for d in range(n + m + 1):
+        if d > max_edit_distance:
+            return False
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                done = True
+                break
+        if done:
+            break
+
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    return True
+
+
+def _longest_increasing(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Longest subsequence of ``pairs`` (sorted by first item) whose second
+    items also increase, by patience sorting in O(k log k).
+    """
+    if not pairs:
+        return []
+
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous: List[int] = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        position = bisect_left(tails, j)
+        if position == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[position] = j
+            tail_index[position] = index
+        previous[index] = tail_index[position - 1] if position else -1
+
+    result = []
+    index = tail_index[-1]
+    while index != -1:
+        result.append(pairs[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+def _unique_anchors(
+    a: Sequence[str], b: Sequence[str],
+    alo: int, ahi: int, blo: int, bhi: int
+) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines that occur exactly once on each side."""
+    # line -> [occurrences in a, occurrences in b, index in a, index in b]
+    counts: Dict[str, List[int]] = {}
+    for i in range(alo, ahi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, 0, i, -1]
+        else:
+            entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+
+    return _longest_increasing(sorted(
+        (entry[2], entry[3]) for entry in counts.values()
+        if entry[0] == 1 and entry[1] == 1
+    ))
+
+
+def _patience_matches(
+    a: Sequence[str], b: Sequence[str],
+    alo: int, ahi: int, blo: int, bhi: int,
+    matches: List[Tuple[int, int]],
+    max_edit_distance: int
+) -> int:
+    """
+    Append matched line pairs using patience diff with a Myers fallback.
+
+    Returns:
+        Number of stretches where Myers gave up
+    """
+    # Common prefix and suffix
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        matches.append((ahi, bhi))
+    if alo == ahi or blo == bhi:
+        return 0
+
+    anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+    if not anchors:
+        return 0 if _myers_matches(a, b, alo, ahi, blo, bhi, matches, max_edit_distance) else 1
+
+    cutoffs = 0
+    i, j = alo, blo
+    for anchor_i, anchor_j in anchors:
+        cutoffs += _patience_matches(a, b, i, anchor_i, j, anchor_j, matches, max_edit_distance)
+        matches.append((anchor_i, anchor_j))
+        i, j = anchor_i + 1, anchor_j + 1
+    return cutoffs + _patience_matches(a, b, i, ahi, j, bhi, matches, max_edit_distance)
+
+
+# ----------------------------------------------------------------------
+# Block alignment
+# ----------------------------------------------------------------------
+
+def _align_segments(
+    source: List[Segment], target: List[Segment]
+) -> List[Tuple[int, int]]:
+    """Longest in-order run of segments present on both sides by address."""
+    target_index = {address: index for index, (address, _, _) in enumerate(target) if address}
+    pairs = [
+        (index, target_index[address])
+        for index, (address, _, _) in enumerate(source)
+        if address and address in target_index
+    ]
+    return _longest_increasing(pairs)
+
+
+def _append_gap(opcodes: List[Opcode], i1: int, i2: int, j1: int, j2: int) -> None:
+    if i1 < i2 and j1 < j2:
+        opcodes.append(("replace", i1, i2, j1, j2))
+    elif i1 < i2:
+        opcodes.append(("delete", i1, i2, j1, j1))
+    elif j1 < j2:
+        opcodes.append(("insert", i1, i1, j1, j2))
+
+
+def diff_opcodes(
+    a: Sequence[str],
+    b: Sequence[str],
+    max_edit_distance: int = DEFAULT_MYERS_MAX_EDIT_DISTANCE
+) -> Tuple[List[Opcode], Dict[str, int]]:
+    """
+    Compute difflib-style opcodes between two Terraform sources.
+
+    Args:
+        a: Source lines
+        b: Target lines
+        max_edit_distance: Edit distance beyond which Myers gives up on a
+            stretch without unique anchor lines
+
+    Returns:
+        Tuple of (opcodes, stats) where stats counts blocks per side, how
+        many aligned blocks were identical or changed, and how many
+        stretches were coarsely replaced after Myers gave up
+    """
+    source_segments = split_blocks(a)
+    target_segments = split_blocks(b)
+    aligned = _align_segments(source_segments, target_segments)
+
+    matches: List[Tuple[int, int]] = []
+    identical = 0
+    cutoffs = 0
+    i, j = 0, 0
+    for source_index, target_index in aligned:
+        _, s_start, s_end = source_segments[source_index]
+        _, t_start, t_end = target_segments[target_index]
+
+        # Unaligned stretch before this block pair
+        cutoffs += _patience_matches(a, b, i, s_start, j, t_start, matches, max_edit_distance)
+
+        if s_end - s_start == t_end - t_start and a[s_start:s_end] == b[t_start:t_end]:
+            identical += 1
+            matches.extend(zip(range(s_start, s_end), range(t_start, t_end)))
+        else:
+            cutoffs += _patience_matches(
+                a, b, s_start, s_end, t_start, t_end, matches, max_edit_distance
+            )
+        i, j = s_end, t_end
+    cutoffs += _patience_matches(a, b, i, len(a), j, len(b), matches, max_edit_distance)
+
+    matches.sort()
+    opcodes: List[Opcode] = []
+    i = j = 0
+    index = 0
+    while index < len(matches):
+        mi, mj = matches[index]
+        _append_gap(opcodes, i, mi, j, mj)
+
+        # Extend the run of consecutive matches
+        run = index
+        while (
+            run + 1 < len(matches)
+            and matches[run + 1] == (matches[run][0] + 1, matches[run][1] + 1)
+        ):
+            run += 1
+        i, j = matches[run][0] + 1, matches[run][1] + 1
+        opcodes.append(("equal", mi, i, mj, j))
+        index = run + 1
+    _append_gap(opcodes, i, len(a), j, len(b))
+
+    stats = {
+        "source_blocks": len(source_segments),
+        "target_blocks": len(target_segments),
+        "aligned_blocks": len(aligned),
+        "identical_blocks": identical,
+        "changed_blocks": len(aligned) - identical,
+        "myers_cutoffs": cutoffs,
+    }
+    return opcodes, stats
+
+
+# ----------------------------------------------------------------------
+# Unified rendering
+# ----------------------------------------------------------------------
+
+def _grouped_opcodes(opcodes: List[Opcode], n: int) -> Iterator[List[Opcode]]:
+    """Group opcodes into hunks with ``n`` lines of context (as difflib)."""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > n + n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(
+    a: Sequence[str],
+    b: Sequence[str],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3,
+    max_edit_distance: int = DEFAULT_MYERS_MAX_EDIT_DISTANCE
+) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Render a unified diff of two Terraform sources.
+
+    Output lines carry no line terminators, matching
+    ``difflib.unified_diff(..., lineterm='')``.
+
+    Returns:
+        Tuple of (diff lines, block alignment stats)
+    """
+    opcodes, stats = diff_opcodes(a, b, max_edit_distance)
+    lines: List[str] = []
+    for group in _grouped_opcodes(opcodes, n):
+        if not lines:
+            lines.append(f"--- {fromfile}")
+            lines.append(f"+++ {tofile}")
+        first, last = group[0], group[-1]
+        lines.append(
+            f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend(" " + line for line in a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                lines.extend("-" + line for line in a[i1:i2])
+            if tag in ("replace", "insert"):
+                lines.extend("+" + line for line in b[j1:j2])
+    return lines, stats
+
+
+# ----------------------------------------------------------------------
+# Off-loop execution
+# ----------------------------------------------------------------------
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = get_code_generation_settings().DIFF_PROCESS_POOL_WORKERS
+        # Forking a process that runs an event loop, database pools and
+        # background threads copies their state (including held locks) into
+        # the workers; start them from a clean interpreter instead
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return _executor
+
+
+def shutdown_diff_executor() -> None:
+    """Shut down the diff process pool, if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_unified_diff(
+    a: List[str],
+    b: List[str],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3
+) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Compute ``unified_diff`` without blocking the event loop on large inputs.
+
+    Inputs below ``DIFF_OFFLOAD_MIN_LINES`` lines are diffed inline; larger
+    ones in the process pool, or a worker thread if the pool is unusable.
+
+    Returns:
+        Tuple of (diff lines, stats) where stats also record where the diff
+        ran and how long it took
+    """
+    settings = get_code_generation_settings()
+    offload_min_lines = settings.DIFF_OFFLOAD_MIN_LINES
+    max_edit_distance = settings.DIFF_MYERS_MAX_EDIT_DISTANCE
+    started = time.perf_counter()
+    ran_in = "inline"
+
+    if len(a) + len(b) < offload_min_lines:
+        lines, stats = unified_diff(a, b, fromfile, tofile, n, max_edit_distance)
+    else:
+        ran_in = "process"
+        loop = asyncio.get_running_loop()
+        try:
+            lines, stats = await loop.run_in_executor(
+                _get_executor(), unified_diff, a, b, fromfile, tofile, n, max_edit_distance
+            )
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            logger.warning(f"Diff process pool unavailable, using a thread: {e}")
+            shutdown_diff_executor()
+            ran_in = "thread"
+            lines, stats = await asyncio.to_thread(
+                unified_diff, a, b, fromfile, tofile, n, max_edit_distance
+            )
+
+    return lines, {
+        **stats,
+        "ran_in": ran_in,
+        "engine_ms": (time.perf_counter() - started) * 1000,
+    }
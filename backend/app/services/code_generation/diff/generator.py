@@ -7,13 +7,13 @@ formatting and context handling.
 """
 
 import asyncio
-import difflib
 import hashlib
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
 from enum import Enum
 
+from app.services.code_generation.diff.engine import run_unified_diff
 from logconfig.logger import get_logger
 
 logger = get_logger()
@@ -89,6 +89,12 @@ class TerraformDiffGenerator:
     def __init__(self):
         """Initialize the diff generator."""
         self.default_options = DiffOptions()
+        self._engine_stats = {
+            "diffs": 0,
+            "offloaded_diffs": 0,
+            "total_engine_ms": 0.0,
+            "max_inline_ms": 0.0,
+        }
         logger.info("TerraformDiffGenerator initialized")
 
     async def generate_file_diff(self, request: FileDiffRequest) -> DiffResult:
@@ -184,15 +190,15 @@ class TerraformDiffGenerator:
                     metadata={"diff_scope": DiffScope.STRING.value}
                 )
 
-            # Generate unified diff
-            diff_lines = list(difflib.unified_diff(
+            # Generate unified diff; large inputs are diffed off the event loop
+            diff_lines, engine_stats = await run_unified_diff(
                 source_lines,
                 target_lines,
                 fromfile=request.source_name,
                 tofile=request.target_name,
-                lineterm='',
                 n=request.options.context_lines
-            ))
+            )
+            self._record_engine_stats(engine_stats)
 
             # Apply Terraform-aware formatting if enabled
             if request.options.terraform_aware:
@@ -218,7 +224,8 @@ class TerraformDiffGenerator:
                 metadata={
                     "diff_scope": DiffScope.STRING.value,
                     "source_name": request.source_name,
-                    "target_name": request.target_name
+                    "target_name": request.target_name,
+                    "engine": engine_stats
                 }
             )
 
@@ -362,6 +369,17 @@ class TerraformDiffGenerator:
 
         return formatted_lines
 
+    def _record_engine_stats(self, engine_stats: Dict[str, Any]) -> None:
+        """Accumulate diff engine timings."""
+        self._engine_stats["diffs"] += 1
+        self._engine_stats["total_engine_ms"] += engine_stats["engine_ms"]
+        if engine_stats["ran_in"] == "inline":
+            self._engine_stats["max_inline_ms"] = max(
+                self._engine_stats["max_inline_ms"], engine_stats["engine_ms"]
+            )
+        else:
+            self._engine_stats["offloaded_diffs"] += 1
+
     def _analyze_diff_lines(self, diff_lines: List[str]) -> tuple[int, int, int]:
         """Analyze diff lines to count additions, deletions, and changes."""
         additions = 0
@@ -384,5 +402,6 @@ class TerraformDiffGenerator:
             "default_context_lines": self.default_options.context_lines,
             "terraform_aware": self.default_options.terraform_aware,
             "supported_modes": [mode.value for mode in DiffMode],
-            "supported_scopes": [scope.value for scope in DiffScope]
+            "supported_scopes": [scope.value for scope in DiffScope],
+            "engine": dict(self._engine_stats)
         }
\ No newline at end of file
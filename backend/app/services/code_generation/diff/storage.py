@@ -4,21 +4,63 @@ Diff Storage for Terraform Code Changes.
 This module provides persistent storage capabilities for generated diffs,
 including versioning, search functionality, and integration with generation
 job tracking using SQLAlchemy.
+
+Diff content is stored compressed (zstd with a trained dictionary when
+available). Successive diffs of the same job and target file are stored as
+line-level deltas against the previous one, up to a bounded chain depth.
+Path searches are served by trigram indexes and result pages are addressed
+by a (created_at, id) keyset cursor.
 """
 
+import asyncio
+import base64
 import json
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_, or_, func, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import text
 
+from app.services.code_generation.config.settings import get_code_generation_settings
+from app.services.code_generation.diff import codec
 from logconfig.logger import get_logger
 
 logger = get_logger()
 
+# Reconstructed contents of recently read or written diffs, keyed by ID and
+# updated_at so that a row rewritten by another worker is never served stale
+_CONTENT_CACHE_SIZE = 512
+_content_cache: "OrderedDict[Tuple[int, datetime], str]" = OrderedDict()
+
+# Compression dictionaries are immutable once stored, keyed by ID
+_dictionaries: Dict[int, bytes] = {}
+_active_dictionary_id: Optional[int] = None
+_active_dictionary_loaded = False
+
+# Recent search latencies for percentile reporting
+_search_latencies_ms = deque(maxlen=1000)
+
+_RECORD_COLUMNS = """
+    id, job_id, user_id, source_file, target_file,
+    source_hash, target_hash, diff_content, diff_format,
+    additions, deletions, changes, risk_score, impact_level,
+    status, metadata, tags, created_at, updated_at, version,
+    content_blob, content_codec, dictionary_id, base_diff_id, chain_depth,
+    content_size, stored_size
+"""
+
+_SUMMARY_COLUMNS = """
+    id, job_id, user_id, source_file, target_file,
+    source_hash, target_hash, NULL, diff_format,
+    additions, deletions, changes, risk_score, impact_level,
+    status, metadata, tags, created_at, updated_at, version,
+    NULL, NULL, NULL, base_diff_id, chain_depth,
+    content_size, stored_size
+"""
+
 
 class StorageStatus(Enum):
     """Status of stored diff."""
@@ -59,6 +101,10 @@ class DiffRecord:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     version: int = 1
+    base_diff_id: Optional[int] = None
+    chain_depth: int = 0
+    content_size: int = 0
+    stored_size: int = 0
 
 
 @dataclass
@@ -77,6 +123,10 @@ class SearchFilters:
     date_to: Optional[datetime] = None
     limit: int = 50
     offset: int = 0
+    # Keyset cursor from a previous SearchResult; takes precedence over offset
+    cursor: Optional[str] = None
+    include_content: bool = True
+    include_total: bool = True
 
 
 @dataclass
@@ -86,6 +136,58 @@ class SearchResult:
     total_count: int = 0
     has_more: bool = False
     search_time_ms: float = 0.0
+    next_cursor: Optional[str] = None
+
+
+def encode_diff_cursor(record: DiffRecord) -> str:
+    """
+    Encode the keyset position of a diff record as an opaque cursor.
+
+    Args:
+        record: Last record of a page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{record.created_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_diff_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by ``encode_diff_cursor``.
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple of (created_at, diff_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, diff_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(diff_id)
+    except Exception:
+        raise ValueError("Invalid diff search cursor")
+
+
+def _cache_content(diff_id: int, updated_at: datetime, content: str) -> None:
+    key = (diff_id, updated_at)
+    _content_cache[key] = content
+    _content_cache.move_to_end(key)
+    while len(_content_cache) > _CONTENT_CACHE_SIZE:
+        _content_cache.popitem(last=False)
+
+
+def _cached_content(diff_id: int, updated_at: datetime) -> Optional[str]:
+    key = (diff_id, updated_at)
+    content = _content_cache.get(key)
+    if content is not None:
+        _content_cache.move_to_end(key)
+    return content
 
 
 class TerraformDiffStorage:
@@ -105,6 +207,8 @@ class TerraformDiffStorage:
         """
         self.db = db_session
         self.table_name = "terraform_diffs"
+        self.dictionary_table_name = "terraform_diff_dictionaries"
+        self.settings = get_code_generation_settings()
         logger.info("TerraformDiffStorage initialized")
 
     async def store_diff(
@@ -146,7 +250,6 @@ class TerraformDiffStorage:
         Returns:
             Stored DiffRecord with generated ID
         """
-        import time
         start_time = time.time()
 
         try:
@@ -176,10 +279,13 @@ class TerraformDiffStorage:
             # Insert into database
             record_id = await self._insert_diff_record(record)
             record.id = record_id
+            _cache_content(record_id, record.updated_at, diff_content)
 
             processing_time = (time.time() - start_time) * 1000
             logger.info(
-                f"Stored diff record {record_id} with {changes} changes in {processing_time:.2f}ms"
+                f"Stored diff record {record_id} with {changes} changes in {processing_time:.2f}ms "
+                f"({record.content_size} -> {record.stored_size} bytes"
+                f"{f', delta of {record.base_diff_id}' if record.base_diff_id else ''})"
             )
 
             return record
@@ -200,19 +306,18 @@ class TerraformDiffStorage:
         """
         try:
             query = f"""
-                SELECT id, job_id, user_id, source_file, target_file,
-                       source_hash, target_hash, diff_content, diff_format,
-                       additions, deletions, changes, risk_score, impact_level,
-                       status, metadata, tags, created_at, updated_at, version
+                SELECT {_RECORD_COLUMNS}
                 FROM {self.table_name}
-                WHERE id = $1 AND status != $2
+                WHERE id = :diff_id AND status != :deleted
             """
 
-            result = await self.db.execute(text(query), (diff_id, StorageStatus.DELETED.value))
+            result = await self.db.execute(
+                text(query), {"diff_id": diff_id, "deleted": StorageStatus.DELETED.value}
+            )
             row = result.fetchone()
 
             if row:
-                return self._row_to_record(row)
+                return (await self._rows_to_records([row]))[0]
 
             return None
 
@@ -236,19 +341,29 @@ class TerraformDiffStorage:
             True if update successful
         """
         try:
+            updates = dict(updates)
+
+            # New content is stored as a full copy; deltas based on the old
+            # content are re-encoded first
+            if "diff_content" in updates:
+                content = updates.pop("diff_content")
+                await self._rebase_dependents(diff_id)
+                await self._load_active_dictionary()
+                updates.update(self._encode_full(content))
+                updates.update(base_diff_id=None, chain_depth=0, diff_content=None)
+
             # Add updated_at timestamp
             updates["updated_at"] = datetime.utcnow()
 
             # Build update query
-            set_clause = ", ".join(f"{k} = ${i+2}" for i, k in enumerate(updates.keys()))
+            set_clause = ", ".join(f"{k} = :{k}" for k in updates.keys())
             query = f"""
                 UPDATE {self.table_name}
                 SET {set_clause}
-                WHERE id = $1
+                WHERE id = :diff_id
             """
 
-            params = (diff_id,) + tuple(updates.values())
-            await self.db.execute(text(query), params)
+            await self.db.execute(text(query), {**updates, "diff_id": diff_id})
             await self.db.commit()
 
             logger.info(f"Updated diff record {diff_id}")
@@ -274,8 +389,10 @@ class TerraformDiffStorage:
             if soft_delete:
                 await self.update_diff(diff_id, {"status": StorageStatus.DELETED.value})
             else:
-                query = f"DELETE FROM {self.table_name} WHERE id = $1"
-                await self.db.execute(text(query), (diff_id,))
+                # Deltas against this diff must not lose their base
+                await self._rebase_dependents(diff_id)
+                query = f"DELETE FROM {self.table_name} WHERE id = :diff_id"
+                await self.db.execute(text(query), {"diff_id": diff_id})
                 await self.db.commit()
 
             logger.info(f"Deleted diff record {diff_id}")
@@ -294,6 +411,10 @@ class TerraformDiffStorage:
         """
         Search for diff records based on filters.
 
+        Path filters are substring matches served by trigram indexes. Pages
+        are ordered newest first; pass ``next_cursor`` back as
+        ``filters.cursor`` to fetch the next page without an OFFSET scan.
+
         Args:
             filters: Search filters
             scope: Search scope
@@ -301,103 +422,111 @@ class TerraformDiffStorage:
         Returns:
             SearchResult with matching records
         """
-        import time
         start_time = time.time()
 
         try:
             # Build query conditions
             conditions = []
-            params = []
+            params: Dict[str, Any] = {}
 
             if filters.job_id:
-                conditions.append("job_id = $" + str(len(params) + 1))
-                params.append(filters.job_id)
+                conditions.append("job_id = :job_id")
+                params["job_id"] = filters.job_id
 
             if filters.user_id:
-                conditions.append("user_id = $" + str(len(params) + 1))
-                params.append(filters.user_id)
+                conditions.append("user_id = :user_id")
+                params["user_id"] = filters.user_id
 
             if filters.source_file:
-                conditions.append("source_file LIKE $" + str(len(params) + 1))
-                params.append(f"%{filters.source_file}%")
+                conditions.append("source_file LIKE :source_file")
+                params["source_file"] = f"%{self._escape_like(filters.source_file)}%"
 
             if filters.target_file:
-                conditions.append("target_file LIKE $" + str(len(params) + 1))
-                params.append(f"%{filters.target_file}%")
+                conditions.append("target_file LIKE :target_file")
+                params["target_file"] = f"%{self._escape_like(filters.target_file)}%"
 
             if filters.min_changes is not None:
-                conditions.append("changes >= $" + str(len(params) + 1))
-                params.append(filters.min_changes)
+                conditions.append("changes >= :min_changes")
+                params["min_changes"] = filters.min_changes
 
             if filters.max_risk_score is not None:
-                conditions.append("risk_score <= $" + str(len(params) + 1))
-                params.append(filters.max_risk_score)
+                conditions.append("risk_score <= :max_risk_score")
+                params["max_risk_score"] = filters.max_risk_score
 
             if filters.impact_level:
-                conditions.append("impact_level = $" + str(len(params) + 1))
-                params.append(filters.impact_level)
+                conditions.append("impact_level = :impact_level")
+                params["impact_level"] = filters.impact_level
 
             if filters.status:
-                conditions.append("status = $" + str(len(params) + 1))
-                params.append(filters.status.value)
+                conditions.append("status = :status")
+                params["status"] = filters.status.value
 
             if filters.date_from:
-                conditions.append("created_at >= $" + str(len(params) + 1))
-                params.append(filters.date_from)
+                conditions.append("created_at >= :date_from")
+                params["date_from"] = filters.date_from
 
             if filters.date_to:
-                conditions.append("created_at <= $" + str(len(params) + 1))
-                params.append(filters.date_to)
+                conditions.append("created_at <= :date_to")
+                params["date_to"] = filters.date_to
 
             # Exclude deleted records by default
-            conditions.append("status != $" + str(len(params) + 1))
-            params.append(StorageStatus.DELETED.value)
+            conditions.append("status != :deleted")
+            params["deleted"] = StorageStatus.DELETED.value
 
             # Build WHERE clause
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-            # Build ORDER BY based on scope
-            order_by = "created_at DESC"
-            if scope == SearchScope.RECENT:
-                # Already descending by created_at
-                pass
-
-            # Build query
+            where_clause = " AND ".join(conditions)
+
+            # Keyset position of the previous page, if any
+            page_conditions = list(conditions)
+            page_params = dict(params)
+            offset_clause = ""
+            if filters.cursor:
+                after_created_at, after_id = decode_diff_cursor(filters.cursor)
+                page_conditions.append("(created_at, id) < (:after_created_at, :after_id)")
+                page_params.update(after_created_at=after_created_at, after_id=after_id)
+            elif filters.offset:
+                offset_clause = "OFFSET :offset"
+                page_params["offset"] = filters.offset
+
+            # Fetch one extra row to know whether another page follows
+            columns = _RECORD_COLUMNS if filters.include_content else _SUMMARY_COLUMNS
             query = f"""
-                SELECT id, job_id, user_id, source_file, target_file,
-                       source_hash, target_hash, diff_content, diff_format,
-                       additions, deletions, changes, risk_score, impact_level,
-                       status, metadata, tags, created_at, updated_at, version
+                SELECT {columns}
                 FROM {self.table_name}
-                WHERE {where_clause}
-                ORDER BY {order_by}
-                LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}
+                WHERE {" AND ".join(page_conditions)}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit {offset_clause}
             """
-
-            params.extend([filters.limit, filters.offset])
+            page_params["limit"] = filters.limit + 1
 
             # Execute query
-            result = await self.db.execute(text(query), tuple(params))
+            result = await self.db.execute(text(query), page_params)
             rows = result.fetchall()
+            has_more = len(rows) > filters.limit
+            rows = rows[:filters.limit]
 
             # Get total count
-            count_query = f"""
-                SELECT COUNT(*) FROM {self.table_name}
-                WHERE {where_clause}
-            """
-            count_result = await self.db.execute(text(count_query), tuple(params[:-2]))
-            total_count = count_result.scalar()
+            total_count = -1
+            if filters.include_total:
+                count_query = f"""
+                    SELECT COUNT(*) FROM {self.table_name}
+                    WHERE {where_clause}
+                """
+                count_result = await self.db.execute(text(count_query), params)
+                total_count = count_result.scalar()
 
             # Convert rows to records
-            records = [self._row_to_record(row) for row in rows]
+            records = await self._rows_to_records(rows)
 
             processing_time = (time.time() - start_time) * 1000
+            _search_latencies_ms.append(processing_time)
 
             return SearchResult(
                 records=records,
                 total_count=total_count,
-                has_more=(filters.offset + len(records)) < total_count,
-                search_time_ms=processing_time
+                has_more=has_more,
+                search_time_ms=processing_time,
+                next_cursor=encode_diff_cursor(records[-1]) if has_more and records else None
             )
 
         except Exception as e:
@@ -408,32 +537,59 @@ class TerraformDiffStorage:
     async def get_diff_history(
         self,
         job_id: str,
-        limit: int = 10
+        limit: int = 10,
+        target_file: Optional[str] = None
     ) -> List[DiffRecord]:
         """
         Get diff history for a specific job.
 
+        Records come back newest first with their content reconstructed from
+        the delta chain; deltas are applied oldest first so each base is
+        decoded once.
+
         Args:
             job_id: Generation job ID
             limit: Maximum number of records to return
+            target_file: Restrict the history to one target file
 
         Returns:
             List of diff records for the job
         """
-        filters = SearchFilters(
-            job_id=job_id,
-            limit=limit,
-            status=StorageStatus.ACTIVE
-        )
+        try:
+            conditions = ["job_id = :job_id", "status = :active"]
+            params: Dict[str, Any] = {
+                "job_id": job_id,
+                "active": StorageStatus.ACTIVE.value,
+                "limit": limit,
+            }
+            if target_file is not None:
+                conditions.append("target_file = :target_file")
+                params["target_file"] = target_file
+
+            query = f"""
+                SELECT {_RECORD_COLUMNS}
+                FROM {self.table_name}
+                WHERE {" AND ".join(conditions)}
+                ORDER BY id DESC
+                LIMIT :limit
+            """
+            result = await self.db.execute(text(query), params)
+            rows = sorted(result.fetchall(), key=lambda row: row[0])
 
-        result = await self.search_diffs(filters, SearchScope.BY_JOB)
-        return result.records
+            records = await self._rows_to_records(rows)
+            records.reverse()
+            return records
+
+        except Exception as e:
+            logger.error(f"Failed to get diff history for job {job_id}: {e}")
+            return []
 
     async def get_user_diffs(
         self,
         user_id: str,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> SearchResult:
         """
         Get diffs for a specific user.
@@ -441,7 +597,8 @@ class TerraformDiffStorage:
         Args:
             user_id: User ID
             limit: Maximum number of records
-            offset: Pagination offset
+            offset: Pagination offset, only used when no cursor is given
+            cursor: Cursor returned with the previous page
 
         Returns:
             SearchResult with user's diffs
@@ -450,6 +607,7 @@ class TerraformDiffStorage:
             user_id=user_id,
             limit=limit,
             offset=offset,
+            cursor=cursor,
             status=StorageStatus.ACTIVE
         )
 
@@ -470,16 +628,16 @@ class TerraformDiffStorage:
 
             query = f"""
                 UPDATE {self.table_name}
-                SET status = $1, updated_at = $2
-                WHERE created_at < $3 AND status = $4
+                SET status = :archived, updated_at = :updated_at
+                WHERE created_at < :cutoff AND status = :active
             """
 
-            result = await self.db.execute(text(query), (
-                StorageStatus.ARCHIVED.value,
-                datetime.utcnow(),
-                cutoff_date,
-                StorageStatus.ACTIVE.value
-            ))
+            result = await self.db.execute(text(query), {
+                "archived": StorageStatus.ARCHIVED.value,
+                "updated_at": datetime.utcnow(),
+                "cutoff": cutoff_date,
+                "active": StorageStatus.ACTIVE.value,
+            })
 
             archived_count = result.rowcount
             await self.db.commit()
@@ -492,6 +650,71 @@ class TerraformDiffStorage:
             await self.db.rollback()
             return 0
 
+    async def train_compression_dictionary(self, sample_limit: int = 2000) -> Optional[int]:
+        """
+        Train a zstd dictionary on recent diffs and use it for new records.
+
+        Existing records keep the dictionary they were written with.
+
+        Args:
+            sample_limit: Number of recent full-copy diffs to sample
+
+        Returns:
+            ID of the new dictionary, or None if none could be trained
+        """
+        global _active_dictionary_id, _active_dictionary_loaded
+
+        if codec.preferred_codec() != codec.CODEC_ZSTD:
+            logger.warning("zstandard not installed, diff dictionary training skipped")
+            return None
+
+        try:
+            query = f"""
+                SELECT {_RECORD_COLUMNS}
+                FROM {self.table_name}
+                WHERE base_diff_id IS NULL AND status != :deleted
+                ORDER BY id DESC
+                LIMIT :limit
+            """
+            result = await self.db.execute(
+                text(query), {"deleted": StorageStatus.DELETED.value, "limit": sample_limit}
+            )
+            samples = [record.diff_content for record in await self._rows_to_records(result.fetchall())]
+
+            dictionary = await asyncio.to_thread(
+                codec.train_dictionary, samples, self.settings.DIFF_STORAGE_DICTIONARY_SIZE
+            )
+            if dictionary is None:
+                return None
+
+            insert_query = f"""
+                INSERT INTO {self.dictionary_table_name} (dictionary, sample_count, created_at)
+                VALUES (:dictionary, :sample_count, :created_at)
+                RETURNING id
+            """
+            result = await self.db.execute(text(insert_query), {
+                "dictionary": dictionary,
+                "sample_count": len(samples),
+                "created_at": datetime.utcnow(),
+            })
+            dictionary_id = result.scalar()
+            await self.db.commit()
+
+            _dictionaries[dictionary_id] = dictionary
+            _active_dictionary_id = dictionary_id
+            _active_dictionary_loaded = True
+
+            logger.info(
+                f"Trained diff dictionary {dictionary_id} ({len(dictionary)} bytes) "
+                f"on {len(samples)} samples"
+            )
+            return dictionary_id
+
+        except Exception as e:
+            logger.error(f"Failed to train diff dictionary: {e}")
+            await self.db.rollback()
+            return None
+
     async def get_storage_stats(self) -> Dict[str, Any]:
         """
         Get storage statistics.
@@ -518,14 +741,29 @@ class TerraformDiffStorage:
                     AVG(risk_score) as avg_risk,
                     SUM(additions) as total_additions,
                     SUM(deletions) as total_deletions,
-                    MAX(created_at) as latest_diff
+                    MAX(created_at) as latest_diff,
+                    SUM(content_size) as content_bytes,
+                    SUM(stored_size) as stored_bytes,
+                    COUNT(base_diff_id) as delta_diffs,
+                    AVG(chain_depth) as avg_chain_depth
                 FROM {self.table_name}
-                WHERE status != $1
+                WHERE status != :deleted
             """
 
-            stats_result = await self.db.execute(text(stats_query), (StorageStatus.DELETED.value,))
+            stats_result = await self.db.execute(
+                text(stats_query), {"deleted": StorageStatus.DELETED.value}
+            )
             stats_row = stats_result.fetchone()
 
+            content_bytes = int(stats_row[6] or 0)
+            stored_bytes = int(stats_row[7] or 0)
+            latencies = sorted(_search_latencies_ms)
+
+            def percentile(fraction: float) -> float:
+                if not latencies:
+                    return 0.0
+                return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
             return {
                 "status": "operational",
                 "total_diffs": stats_row[0] if stats_row[0] else 0,
@@ -534,7 +772,16 @@ class TerraformDiffStorage:
                 "total_additions": stats_row[3] if stats_row[3] else 0,
                 "total_deletions": stats_row[4] if stats_row[4] else 0,
                 "latest_diff": stats_row[5].isoformat() if stats_row[5] else None,
-                "status_breakdown": status_counts
+                "status_breakdown": status_counts,
+                "content_bytes": content_bytes,
+                "stored_bytes": stored_bytes,
+                "storage_ratio": content_bytes / stored_bytes if stored_bytes else 0.0,
+                "delta_diffs": stats_row[8] or 0,
+                "avg_chain_depth": float(stats_row[9]) if stats_row[9] else 0.0,
+                "codec": codec.preferred_codec(),
+                "active_dictionary_id": _active_dictionary_id,
+                "search_p50_ms": percentile(0.5),
+                "search_p99_ms": percentile(0.99),
             }
 
         except Exception as e:
@@ -542,30 +789,268 @@ class TerraformDiffStorage:
             return {"status": "error", "error": str(e)}
 
     async def _insert_diff_record(self, record: DiffRecord) -> int:
-        """Insert a diff record and return the ID."""
+        """Insert a diff record, encoded as a delta or full copy, and return the ID."""
+        content_columns = await self._encode_content(record)
+
         query = f"""
             INSERT INTO {self.table_name}
             (job_id, user_id, source_file, target_file, source_hash, target_hash,
-             diff_content, diff_format, additions, deletions, changes, risk_score,
-             impact_level, status, metadata, tags, created_at, updated_at, version)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19)
+             diff_format, additions, deletions, changes, risk_score,
+             impact_level, status, metadata, tags, created_at, updated_at, version,
+             content_blob, content_codec, dictionary_id, base_diff_id, chain_depth,
+             content_size, stored_size)
+            VALUES (:job_id, :user_id, :source_file, :target_file, :source_hash, :target_hash,
+                    :diff_format, :additions, :deletions, :changes, :risk_score,
+                    :impact_level, :status, :metadata, :tags, :created_at, :updated_at, :version,
+                    :content_blob, :content_codec, :dictionary_id, :base_diff_id, :chain_depth,
+                    :content_size, :stored_size)
             RETURNING id
         """
 
-        params = (
-            record.job_id, record.user_id, record.source_file, record.target_file,
-            record.source_hash, record.target_hash, record.diff_content, record.diff_format,
-            record.additions, record.deletions, record.changes, record.risk_score,
-            record.impact_level, record.status.value, json.dumps(record.metadata),
-            record.tags, record.created_at, record.updated_at, record.version
-        )
+        params = {
+            "job_id": record.job_id,
+            "user_id": record.user_id,
+            "source_file": record.source_file,
+            "target_file": record.target_file,
+            "source_hash": record.source_hash,
+            "target_hash": record.target_hash,
+            "diff_format": record.diff_format,
+            "additions": record.additions,
+            "deletions": record.deletions,
+            "changes": record.changes,
+            "risk_score": record.risk_score,
+            "impact_level": record.impact_level,
+            "status": record.status.value,
+            "metadata": json.dumps(record.metadata),
+            "tags": record.tags,
+            "created_at": record.created_at,
+            "updated_at": record.updated_at,
+            "version": record.version,
+            **content_columns,
+        }
 
         result = await self.db.execute(text(query), params)
         record_id = result.scalar()
         await self.db.commit()
 
+        record.base_diff_id = content_columns["base_diff_id"]
+        record.chain_depth = content_columns["chain_depth"]
+        record.content_size = content_columns["content_size"]
+        record.stored_size = content_columns["stored_size"]
         return record_id
 
+    # ------------------------------------------------------------------
+    # Content encoding
+    # ------------------------------------------------------------------
+
+    def _encode_full(self, content: str) -> Dict[str, Any]:
+        """Columns for content stored as a full compressed copy."""
+        raw = content.encode("utf-8")
+        content_codec = codec.preferred_codec()
+        dictionary_id = _active_dictionary_id if content_codec == codec.CODEC_ZSTD else None
+        blob = codec.compress(
+            raw,
+            content_codec,
+            level=self.settings.DIFF_STORAGE_COMPRESSION_LEVEL,
+            dictionary=_dictionaries.get(dictionary_id) if dictionary_id else None,
+        )
+        return {
+            "content_blob": blob,
+            "content_codec": content_codec,
+            "dictionary_id": dictionary_id,
+            "content_size": len(raw),
+            "stored_size": len(blob),
+        }
+
+    async def _encode_content(self, record: DiffRecord) -> Dict[str, Any]:
+        """
+        Encode a new record's content, as a delta against the previous diff
+        of the same job and target file when that is markedly smaller.
+        """
+        await self._load_active_dictionary()
+        columns = {**self._encode_full(record.diff_content), "base_diff_id": None, "chain_depth": 0}
+
+        if not record.job_id or not record.target_file:
+            return columns
+
+        base_query = f"""
+            SELECT id, chain_depth
+            FROM {self.table_name}
+            WHERE job_id = :job_id AND target_file = :target_file AND status != :deleted
+            ORDER BY id DESC
+            LIMIT 1
+        """
+        result = await self.db.execute(text(base_query), {
+            "job_id": record.job_id,
+            "target_file": record.target_file,
+            "deleted": StorageStatus.DELETED.value,
+        })
+        base = result.fetchone()
+        if base is None or base[1] >= self.settings.DIFF_STORAGE_MAX_CHAIN_DEPTH:
+            return columns
+
+        base_content = await self._reconstruct(base[0])
+        if base_content is None:
+            return columns
+
+        delta = codec.make_delta(base_content, record.diff_content)
+        delta_blob = codec.compress(
+            delta, columns["content_codec"], level=self.settings.DIFF_STORAGE_COMPRESSION_LEVEL
+        )
+        if len(delta_blob) > columns["stored_size"] * self.settings.DIFF_STORAGE_DELTA_MAX_RATIO:
+            return columns
+
+        return {
+            **columns,
+            "content_blob": delta_blob,
+            "dictionary_id": None,
+            "base_diff_id": base[0],
+            "chain_depth": base[1] + 1,
+            "stored_size": len(delta_blob),
+        }
+
+    async def _load_active_dictionary(self) -> None:
+        """Load the newest compression dictionary once per process."""
+        global _active_dictionary_id, _active_dictionary_loaded
+
+        if _active_dictionary_loaded or codec.preferred_codec() != codec.CODEC_ZSTD:
+            return
+
+        query = f"""
+            SELECT id, dictionary FROM {self.dictionary_table_name}
+            ORDER BY id DESC
+            LIMIT 1
+        """
+        result = await self.db.execute(text(query))
+        row = result.fetchone()
+        if row is not None:
+            _dictionaries[row[0]] = bytes(row[1])
+            _active_dictionary_id = row[0]
+        _active_dictionary_loaded = True
+
+    async def _load_dictionaries(self, dictionary_ids: List[int]) -> None:
+        missing = [i for i in set(dictionary_ids) if i is not None and i not in _dictionaries]
+        if not missing:
+            return
+        query = f"""
+            SELECT id, dictionary FROM {self.dictionary_table_name}
+            WHERE id = ANY(:ids)
+        """
+        result = await self.db.execute(text(query), {"ids": missing})
+        for row in result.fetchall():
+            _dictionaries[row[0]] = bytes(row[1])
+
+    def _decode_payload(self, blob: bytes, content_codec: str, dictionary_id: Optional[int]) -> bytes:
+        return codec.decompress(
+            bytes(blob), content_codec, _dictionaries.get(dictionary_id) if dictionary_id else None
+        )
+
+    async def _reconstruct(self, diff_id: int) -> Optional[str]:
+        """
+        Reconstruct a diff's content by walking its delta chain.
+
+        The chain's IDs and ``updated_at`` stamps are read first; payloads are
+        only fetched for rows above the first one found in the content cache.
+        """
+        query = f"""
+            WITH RECURSIVE chain AS (
+                SELECT id, base_diff_id, updated_at
+                FROM {self.table_name}
+                WHERE id = :diff_id
+                UNION ALL
+                SELECT d.id, d.base_diff_id, d.updated_at
+                FROM {self.table_name} d
+                JOIN chain c ON d.id = c.base_diff_id
+            )
+            SELECT id, base_diff_id, updated_at
+            FROM chain
+        """
+        result = await self.db.execute(text(query), {"diff_id": diff_id})
+        links = {row[0]: (row[1], row[2]) for row in result.fetchall()}
+        if diff_id not in links:
+            return None
+
+        # Follow base links from diff_id until a cached row or a full copy
+        pending: List[Tuple[int, datetime]] = []
+        content: Optional[str] = None
+        row_id: Optional[int] = diff_id
+        while row_id is not None and row_id in links:
+            base_diff_id, updated_at = links[row_id]
+            content = _cached_content(row_id, updated_at)
+            if content is not None:
+                break
+            pending.append((row_id, updated_at))
+            row_id = base_diff_id
+        if not pending:
+            return content
+
+        payload_query = f"""
+            SELECT id, base_diff_id, diff_content, content_blob, content_codec, dictionary_id
+            FROM {self.table_name}
+            WHERE id = ANY(:ids)
+        """
+        result = await self.db.execute(
+            text(payload_query), {"ids": [row_id for row_id, _ in pending]}
+        )
+        payloads = {row[0]: row[1:] for row in result.fetchall()}
+        await self._load_dictionaries([payload[4] for payload in payloads.values()])
+
+        # Apply from the full copy (or cached row) back up to diff_id
+        for row_id, updated_at in reversed(pending):
+            base_diff_id, legacy_content, blob, content_codec, dictionary_id = payloads[row_id]
+            if blob is None:
+                content = legacy_content or ""
+            elif base_diff_id is None:
+                content = self._decode_payload(blob, content_codec, dictionary_id).decode("utf-8")
+            else:
+                delta = self._decode_payload(blob, content_codec, dictionary_id)
+                content = codec.apply_delta(content or "", delta)
+            _cache_content(row_id, updated_at, content)
+        return content
+
+    async def _rebase_dependents(self, diff_id: int) -> None:
+        """Rewrite deltas based on ``diff_id`` as full copies."""
+        query = f"SELECT id FROM {self.table_name} WHERE base_diff_id = :diff_id"
+        result = await self.db.execute(text(query), {"diff_id": diff_id})
+        dependent_ids = [row[0] for row in result.fetchall()]
+        if not dependent_ids:
+            return
+
+        await self._load_active_dictionary()
+        for dependent_id in dependent_ids:
+            content = await self._reconstruct(dependent_id)
+            columns = self._encode_full(content or "")
+            await self.db.execute(text(f"""
+                UPDATE {self.table_name}
+                SET content_blob = :content_blob, content_codec = :content_codec,
+                    dictionary_id = :dictionary_id, content_size = :content_size,
+                    stored_size = :stored_size, base_diff_id = NULL, chain_depth = 0
+                WHERE id = :dependent_id
+            """), {**columns, "dependent_id": dependent_id})
+
+        logger.info(f"Rebased {len(dependent_ids)} diff deltas off diff {diff_id}")
+
+    async def _rows_to_records(self, rows) -> List[DiffRecord]:
+        """Convert rows to records, decoding or reconstructing their content."""
+        await self._load_dictionaries([row[22] for row in rows])
+
+        records = []
+        for row in rows:
+            record = self._row_to_record(row)
+            blob = row[20]
+            if blob is not None:
+                if row[23] is None:
+                    record.diff_content = self._decode_payload(blob, row[21], row[22]).decode("utf-8")
+                    _cache_content(record.id, record.updated_at, record.diff_content)
+                else:
+                    record.diff_content = await self._reconstruct(record.id) or ""
+            records.append(record)
+        return records
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
     def _row_to_record(self, row) -> DiffRecord:
         """Convert database row to DiffRecord."""
         return DiffRecord(
@@ -576,7 +1061,7 @@ class TerraformDiffStorage:
             target_file=row[4],
             source_hash=row[5],
             target_hash=row[6],
-            diff_content=row[7],
+            diff_content=row[7] or "",
             diff_format=row[8],
             additions=row[9],
             deletions=row[10],
@@ -588,5 +1073,9 @@ class TerraformDiffStorage:
             tags=row[16] if row[16] else [],
             created_at=row[17],
             updated_at=row[18],
-            version=row[19]
-        )
\ No newline at end of file
+            version=row[19],
+            base_diff_id=row[23],
+            chain_depth=row[24] or 0,
+            content_size=row[25] or 0,
+            stored_size=row[26] or 0
+        )
@@ -0,0 +1,235 @@
+"""
+In-process event bus for code generation jobs.
+
+Orchestrators publish stage, progress, completion and failure events for each
+job; chat services subscribe to the jobs they started and react as events
+arrive instead of polling job status on a timer.
+
+Publishing never blocks. Each subscriber has a bounded queue; when a slow
+subscriber falls behind, queued progress events are dropped in favour of newer
+ones, but terminal events are always delivered. The latest event of every job
+is retained for a while so that a subscriber that attaches after a job already
+finished still sees its outcome.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+
+class GenerationEventType(str, Enum):
+    """Types of generation job events."""
+
+    STAGE = "stage"
+    PROGRESS = "progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+TERMINAL_EVENT_TYPES = {
+    GenerationEventType.COMPLETED,
+    GenerationEventType.FAILED,
+    GenerationEventType.CANCELLED,
+}
+
+
+@dataclass
+class GenerationEvent:
+    """A single event in the life of a generation job."""
+
+    job_id: str
+    event_type: GenerationEventType
+    status: str
+    progress_percentage: int = 0
+    current_step: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    published_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.event_type in TERMINAL_EVENT_TYPES
+
+
+class GenerationSubscription:
+    """
+    A subscriber's view of one job's events.
+
+    Use as an async context manager so the subscription is always removed:
+
+        async with generation_event_bus.subscribe(job_id) as subscription:
+            event = await subscription.next_event(timeout=30)
+    """
+
+    def __init__(self, bus: "GenerationEventBus", job_id: str, max_queue_size: int):
+        self.bus = bus
+        self.job_id = job_id
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.dropped = 0
+
+    def _deliver(self, event: GenerationEvent) -> None:
+        if self._queue.qsize() >= self.max_queue_size:
+            # Drop the oldest queued non-terminal event; the newest progress
+            # supersedes it anyway.
+            kept = []
+            dropped = False
+            while not self._queue.empty():
+                queued = self._queue.get_nowait()
+                if not dropped and not queued.is_terminal:
+                    dropped = True
+                    self.dropped += 1
+                    continue
+                kept.append(queued)
+            for queued in kept:
+                self._queue.put_nowait(queued)
+            if not dropped and not event.is_terminal:
+                self.dropped += 1
+                return
+        self._queue.put_nowait(event)
+
+    async def next_event(self, timeout: Optional[float] = None) -> GenerationEvent:
+        """
+        Wait for the next event.
+
+        Raises:
+            asyncio.TimeoutError: If no event arrives within ``timeout`` seconds
+        """
+        event = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        self.bus._record_delivery(event)
+        return event
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    async def __aenter__(self) -> "GenerationSubscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class GenerationEventBus:
+    """Fan-out of generation job events to in-process subscribers."""
+
+    def __init__(self, max_queue_size: int = 100, retained_jobs: int = 1000):
+        self.max_queue_size = max_queue_size
+        self.retained_jobs = retained_jobs
+        self._subscribers: Dict[str, List[GenerationSubscription]] = {}
+        self._latest: "OrderedDict[str, GenerationEvent]" = OrderedDict()
+        self._stats = {
+            "published": 0,
+            "delivered": 0,
+            "total_delivery_seconds": 0.0,
+            "max_delivery_seconds": 0.0,
+        }
+
+    def publish(
+        self,
+        job_id: str,
+        event_type: GenerationEventType,
+        status: str,
+        progress_percentage: int = 0,
+        current_step: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> GenerationEvent:
+        """
+        Publish an event for a job to every subscriber of that job.
+
+        Args:
+            job_id: Generation job ID
+            event_type: Kind of event
+            status: Job status at the time of the event
+            progress_percentage: Overall progress (0-100)
+            current_step: Human-readable description of the current step
+            data: Extra payload (for terminal events, the final job status)
+
+        Returns:
+            The published event
+        """
+        event = GenerationEvent(
+            job_id=job_id,
+            event_type=event_type,
+            status=status,
+            progress_percentage=progress_percentage,
+            current_step=current_step,
+            data=data or {},
+        )
+
+        self._latest[job_id] = event
+        self._latest.move_to_end(job_id)
+        while len(self._latest) > self.retained_jobs:
+            self._latest.popitem(last=False)
+
+        self._stats["published"] += 1
+        for subscription in self._subscribers.get(job_id, ()):
+            subscription._deliver(event)
+        return event
+
+    def subscribe(self, job_id: str) -> GenerationSubscription:
+        """
+        Subscribe to a job's events.
+
+        The job's latest retained event, if any, is delivered first so that
+        nothing is missed between starting a job and subscribing to it.
+        """
+        subscription = GenerationSubscription(self, job_id, self.max_queue_size)
+        self._subscribers.setdefault(job_id, []).append(subscription)
+
+        latest = self._latest.get(job_id)
+        if latest is not None:
+            subscription._deliver(latest)
+        return subscription
+
+    def _unsubscribe(self, subscription: GenerationSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.job_id)
+        if not subscribers:
+            return
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.job_id]
+
+    def _record_delivery(self, event: GenerationEvent) -> None:
+        latency = time.perf_counter() - event.published_at
+        self._stats["delivered"] += 1
+        self._stats["total_delivery_seconds"] += latency
+        if latency > self._stats["max_delivery_seconds"]:
+            self._stats["max_delivery_seconds"] = latency
+
+    def latest_event(self, job_id: str) -> Optional[GenerationEvent]:
+        """Get the most recent event published for a job."""
+        return self._latest.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus statistics, including publish-to-consume latency."""
+        delivered = self._stats["delivered"]
+        return {
+            "published": self._stats["published"],
+            "delivered": delivered,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "retained_jobs": len(self._latest),
+            "avg_delivery_ms": (
+                self._stats["total_delivery_seconds"] * 1000 / delivered
+                if delivered
+                else 0.0
+            ),
+            "max_delivery_ms": self._stats["max_delivery_seconds"] * 1000,
+        }
+
+
+generation_event_bus = GenerationEventBus()
+
+
+def get_generation_event_bus() -> GenerationEventBus:
+    """Get the process-wide generation event bus."""
+    return generation_event_bus
@@ -7,7 +7,7 @@ process, including error contexts, performance metrics, and generation metadata.
 
 import asyncio
 import time
-import json
+from collections import deque
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -17,6 +17,7 @@ import uuid
 from logconfig.logger import get_logger
 from .validator import ValidationIssue, ValidationResult
 from .error_corrector import CorrectionAttempt, CorrectionResult
+from .debug_writer import find_debug_sessions, get_debug_session_writer
 
 logger = get_logger()
 
@@ -95,21 +96,29 @@ class DebugCollector:
     and other debugging information to help troubleshoot and improve the generation process.
     """
 
-    def __init__(self, enable_persistence: bool = True, debug_dir: Optional[str] = None):
+    def __init__(
+        self,
+        enable_persistence: bool = True,
+        debug_dir: Optional[str] = None,
+        max_history: int = 100
+    ):
         """
         Initialize the debug collector.
 
         Args:
             enable_persistence: Whether to save debug sessions to disk
             debug_dir: Directory to save debug sessions (defaults to logs/debug_sessions)
+            max_history: Number of finished sessions kept in memory
         """
         self.enable_persistence = enable_persistence
         self.debug_dir = Path(debug_dir) if debug_dir else Path("logs/debug_sessions")
         self.current_session: Optional[DebugSession] = None
-        self.session_history: List[DebugSession] = []
+        self.session_history = deque(maxlen=max_history)
+        self.writer = get_debug_session_writer(self.debug_dir) if enable_persistence else None
 
-        if self.enable_persistence:
-            self.debug_dir.mkdir(parents=True, exist_ok=True)
+        # Time spent in end_session, to compare persistence on and off
+        self._end_session_count = 0
+        self._end_session_seconds = 0.0
 
         logger.info("DebugCollector initialized")
 
@@ -157,6 +166,7 @@ class DebugCollector:
             logger.warning("No active debug session to end")
             return
 
+        started = time.perf_counter()
         self.current_session.end_time = datetime.now()
         self.current_session.success = success
         self.current_session.final_code = final_code
@@ -171,6 +181,9 @@ class DebugCollector:
         if self.enable_persistence:
             await self._persist_session(self.current_session)
 
+        self._end_session_count += 1
+        self._end_session_seconds += time.perf_counter() - started
+
         logger.info(
             f"Ended debug session: {self.current_session.session_id} "
             f"(success: {success}, duration: {self.current_session.duration_ms:.2f}ms)"
@@ -400,97 +413,117 @@ class DebugCollector:
 
     async def _persist_session(self, session: DebugSession):
         """
-        Persist a debug session to disk.
+        Queue a debug session for background persistence.
+
+        The session dict is built, bounded and compressed on the writer
+        thread; this only enqueues it.
 
         Args:
             session: Session to persist
         """
-        try:
-            session_file = self.debug_dir / f"debug_session_{session.session_id}.json"
-
-            # Convert session to dictionary
-            session_dict = {
-                "session_id": session.session_id,
-                "start_time": session.start_time.isoformat(),
-                "end_time": session.end_time.isoformat() if session.end_time else None,
-                "duration_ms": session.duration_ms,
-                "success": session.success,
-                "generation_metadata": {
-                    "generation_id": session.generation_metadata.generation_id,
-                    "timestamp": session.generation_metadata.timestamp.isoformat(),
-                    "user_query": session.generation_metadata.user_query,
-                    "scenario": session.generation_metadata.scenario,
-                    "provider_type": session.generation_metadata.provider_type,
-                    "model_used": session.generation_metadata.model_used,
-                    "temperature": session.generation_metadata.temperature,
-                    "max_tokens": session.generation_metadata.max_tokens,
-                    "prompts_used": session.generation_metadata.prompts_used,
-                    "context_documents": session.generation_metadata.context_documents,
-                    "llm_responses": session.generation_metadata.llm_responses
-                },
-                "performance_metrics": {
-                    "total_generation_time_ms": session.performance_metrics.total_generation_time_ms,
-                    "context_retrieval_time_ms": session.performance_metrics.context_retrieval_time_ms,
-                    "prompt_engineering_time_ms": session.performance_metrics.prompt_engineering_time_ms,
-                    "llm_generation_time_ms": session.performance_metrics.llm_generation_time_ms,
-                    "validation_time_ms": session.performance_metrics.validation_time_ms,
-                    "correction_time_ms": session.performance_metrics.correction_time_ms,
-                    "tokens_used": session.performance_metrics.tokens_used,
-                    "input_tokens": session.performance_metrics.input_tokens,
-                    "output_tokens": session.performance_metrics.output_tokens,
-                    "rate_limit_hits": session.performance_metrics.rate_limit_hits,
-                    "retries_attempted": session.performance_metrics.retries_attempted
-                },
-                "validation_results": [
-                    {
-                        "is_valid": vr.is_valid,
-                        "issues": [
-                            {
-                                "error_type": issue.error_type.value,
-                                "severity": issue.severity.value,
-                                "message": issue.message,
-                                "line_number": issue.line_number,
-                                "rule_id": issue.rule_id
-                            }
-                            for issue in vr.issues
-                        ],
-                        "processing_time_ms": vr.processing_time_ms,
-                        "total_issues": vr.total_issues,
-                        "errors_count": vr.errors_count,
-                        "warnings_count": vr.warnings_count
-                    }
-                    for vr in session.validation_results
-                ],
-                "correction_results": [
-                    {
-                        "success": cr.success,
-                        "total_attempts": cr.total_attempts,
-                        "successful_corrections": cr.successful_corrections,
-                        "processing_time_ms": cr.processing_time_ms
-                    }
-                    for cr in session.correction_results
-                ],
-                "error_contexts": [
-                    {
-                        "line_number": ec.line_number,
-                        "error_message": ec.error_message,
-                        "surrounding_lines": ec.surrounding_lines,
-                        "stack_trace": ec.stack_trace
-                    }
-                    for ec in session.error_contexts
-                ],
-                "custom_logs": session.custom_logs,
-                "final_code_length": len(session.final_code) if session.final_code else 0
-            }
-
-            # Write to file
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_dict, f, indent=2, ensure_ascii=False)
-
-            logger.debug(f"Persisted debug session to {session_file}")
-
-        except Exception as e:
-            logger.error(f"Failed to persist debug session: {e}")
+        self.writer.submit(
+            session.generation_metadata.generation_id,
+            session.session_id,
+            lambda: self._session_to_dict(session)
+        )
+
+    @staticmethod
+    def _session_to_dict(session: DebugSession) -> Dict[str, Any]:
+        """Convert a finished session to a JSON-compatible dictionary."""
+        return {
+            "session_id": session.session_id,
+            "start_time": session.start_time.isoformat(),
+            "end_time": session.end_time.isoformat() if session.end_time else None,
+            "duration_ms": session.duration_ms,
+            "success": session.success,
+            "generation_metadata": {
+                "generation_id": session.generation_metadata.generation_id,
+                "timestamp": session.generation_metadata.timestamp.isoformat(),
+                "user_query": session.generation_metadata.user_query,
+                "scenario": session.generation_metadata.scenario,
+                "provider_type": session.generation_metadata.provider_type,
+                "model_used": session.generation_metadata.model_used,
+                "temperature": session.generation_metadata.temperature,
+                "max_tokens": session.generation_metadata.max_tokens,
+                "prompts_used": session.generation_metadata.prompts_used,
+                "context_documents": session.generation_metadata.context_documents,
+                "llm_responses": session.generation_metadata.llm_responses
+            },
+            "performance_metrics": {
+                "total_generation_time_ms": session.performance_metrics.total_generation_time_ms,
+                "context_retrieval_time_ms": session.performance_metrics.context_retrieval_time_ms,
+                "prompt_engineering_time_ms": session.performance_metrics.prompt_engineering_time_ms,
+                "llm_generation_time_ms": session.performance_metrics.llm_generation_time_ms,
+                "validation_time_ms": session.performance_metrics.validation_time_ms,
+                "correction_time_ms": session.performance_metrics.correction_time_ms,
+                "tokens_used": session.performance_metrics.tokens_used,
+                "input_tokens": session.performance_metrics.input_tokens,
+                "output_tokens": session.performance_metrics.output_tokens,
+                "rate_limit_hits": session.performance_metrics.rate_limit_hits,
+                "retries_attempted": session.performance_metrics.retries_attempted
+            },
+            "validation_results": [
+                {
+                    "is_valid": vr.is_valid,
+                    "issues": [
+                        {
+                            "error_type": issue.error_type.value,
+                            "severity": issue.severity.value,
+                            "message": issue.message,
+                            "line_number": issue.line_number,
+                            "rule_id": issue.rule_id
+                        }
+                        for issue in vr.issues
+                    ],
+                    "processing_time_ms": vr.processing_time_ms,
+                    "total_issues": vr.total_issues,
+                    "errors_count": vr.errors_count,
+                    "warnings_count": vr.warnings_count
+                }
+                for vr in session.validation_results
+            ],
+            "correction_results": [
+                {
+                    "success": cr.success,
+                    "total_attempts": cr.total_attempts,
+                    "successful_corrections": cr.successful_corrections,
+                    "processing_time_ms": cr.processing_time_ms
+                }
+                for cr in session.correction_results
+            ],
+            "error_contexts": [
+                {
+                    "line_number": ec.line_number,
+                    "error_message": ec.error_message,
+                    "surrounding_lines": ec.surrounding_lines,
+                    "stack_trace": ec.stack_trace
+                }
+                for ec in session.error_contexts
+            ],
+            "custom_logs": session.custom_logs,
+            "final_code_length": len(session.final_code) if session.final_code else 0
+        }
+
+    async def find_persisted_sessions(
+        self,
+        generation_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up persisted sessions by generation or session ID.
+
+        Args:
+            generation_id: Generation ID to match
+            session_id: Session ID to match
+            limit: Maximum sessions to return
+
+        Returns:
+            Persisted session dictionaries, newest first
+        """
+        return await asyncio.to_thread(
+            find_debug_sessions, self.debug_dir, generation_id, session_id, limit
+        )
 
     async def get_session_summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -543,5 +576,10 @@ class DebugCollector:
             "total_errors_recorded": total_errors,
             "persistence_enabled": self.enable_persistence,
             "debug_directory": str(self.debug_dir) if self.enable_persistence else None,
-            "current_session_active": self.current_session is not None
+            "current_session_active": self.current_session is not None,
+            "avg_end_session_ms": (
+                self._end_session_seconds * 1000 / self._end_session_count
+                if self._end_session_count else 0.0
+            ),
+            "writer": self.writer.get_stats() if self.writer else None
         }
\ No newline at end of file
@@ -0,0 +1,386 @@
+"""
+Background persistence for code generation debug sessions.
+
+Finished sessions are handed to a bounded queue and written by a single
+writer thread, so generation never waits on serialization or disk I/O. When
+the queue is full, sessions are dropped and counted rather than blocking.
+
+Sessions are appended to size-rotated segments
+``debug_sessions-<timestamp>-<pid>-<seq>.jsonl.gz`` (the process ID keeps
+workers sharing a directory from appending to the same segment); each
+session is its own gzip member (concatenated members are still one valid
+gzip stream), and a ``.idx`` sidecar per segment records each session's
+generation ID, byte offset and length. ``find_debug_sessions`` reads only the index files and the
+matching members instead of whole segments. Only the newest segments are
+kept.
+
+Oversized fields are truncated and long lists sampled before writing, so a
+single session with huge prompts or context documents cannot blow up a
+segment.
+"""
+
+import argparse
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.code_generation.config.settings import get_code_generation_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+SEGMENT_PREFIX = "debug_sessions-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx"
+
+# Maximum sessions written per batch (one open/flush of the segment)
+_BATCH_SIZE = 32
+
+
+def truncate_fields(value: Any, max_chars: int, max_items: int) -> Tuple[Any, int]:
+    """
+    Bound the size of a JSON-compatible value.
+
+    Strings longer than ``max_chars`` are cut with a marker; lists longer
+    than ``max_items`` keep their first and last items around a marker with
+    the number of items left out.
+
+    Returns:
+        Tuple of (bounded value, number of strings and lists shortened)
+    """
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value, 0
+        return value[:max_chars] + f"...[truncated {len(value) - max_chars} chars]", 1
+    if isinstance(value, dict):
+        bounded = {}
+        shortened = 0
+        for key, item in value.items():
+            bounded[key], count = truncate_fields(item, max_chars, max_items)
+            shortened += count
+        return bounded, shortened
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        shortened = 0
+        if len(items) > max_items:
+            head = max_items // 2
+            tail = max_items - head
+            items = (
+                items[:head]
+                + [f"...[{len(items) - max_items} items omitted]"]
+                + items[len(items) - tail:]
+            )
+            shortened = 1
+        bounded = []
+        for item in items:
+            item, count = truncate_fields(item, max_chars, max_items)
+            bounded.append(item)
+            shortened += count
+        return bounded, shortened
+    return value, 0
+
+
+class DebugSessionWriter:
+    """
+    Writer thread persisting debug sessions to rotated, compressed JSONL.
+
+    ``submit`` takes a callable producing the session dict so that even
+    building the dict happens on the writer thread.
+    """
+
+    def __init__(
+        self,
+        debug_dir: Path,
+        queue_size: int = 256,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        max_segments: int = 20,
+        max_field_chars: int = 8000,
+        max_list_items: int = 50,
+    ):
+        self.debug_dir = Path(debug_dir)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.max_field_chars = max_field_chars
+        self.max_list_items = max_list_items
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self._segment: Optional[Path] = None
+        self._segment_seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "truncated": 0,
+            "batches": 0,
+            "bytes_written": 0,
+            "segments_rotated": 0,
+            "segments_deleted": 0,
+            "serialize_seconds": 0.0,
+            "write_seconds": 0.0,
+        }
+
+    def submit(self, generation_id: str, session_id: str, build: Callable[[], Dict[str, Any]]) -> bool:
+        """
+        Queue a session for writing without blocking.
+
+        Returns:
+            False if the queue was full and the session was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((generation_id, session_id, build))
+        except queue.Full:
+            self._stats["dropped"] += 1
+            logger.warning(f"Debug session queue full, dropped session {session_id}")
+            return False
+        self._stats["submitted"] += 1
+        return True
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.debug_dir.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="debug-session-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write_batch(batch)
+                    return
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        members = []
+        started = time.perf_counter()
+        for generation_id, session_id, build in batch:
+            try:
+                raw = build()
+                bounded, shortened = truncate_fields(raw, self.max_field_chars, self.max_list_items)
+                line = json.dumps(bounded, ensure_ascii=False, default=str)
+                if shortened:
+                    self._stats["truncated"] += 1
+                members.append((generation_id, session_id, raw.get("start_time"), raw.get("success"),
+                                gzip.compress((line + "\n").encode("utf-8"), compresslevel=6)))
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Failed to serialize debug session {session_id}: {e}")
+        self._stats["serialize_seconds"] += time.perf_counter() - started
+
+        if not members:
+            return
+
+        started = time.perf_counter()
+        try:
+            segment = self._current_segment()
+            index_entries = []
+            with open(segment, "ab") as f:
+                offset = f.tell()
+                for generation_id, session_id, start_time, success, member in members:
+                    f.write(member)
+                    index_entries.append(json.dumps({
+                        "generation_id": generation_id,
+                        "session_id": session_id,
+                        "start_time": start_time,
+                        "success": success,
+                        "offset": offset,
+                        "length": len(member),
+                    }))
+                    offset += len(member)
+            with open(self._index_path(segment), "a", encoding="utf-8") as f:
+                f.write("\n".join(index_entries) + "\n")
+
+            self._stats["written"] += len(members)
+            self._stats["batches"] += 1
+            self._stats["bytes_written"] += sum(len(m[-1]) for m in members)
+        except Exception as e:
+            self._stats["failed"] += len(members)
+            logger.error(f"Failed to write debug session batch: {e}")
+        finally:
+            self._stats["write_seconds"] += time.perf_counter() - started
+
+    def _index_path(self, segment: Path) -> Path:
+        return segment.with_name(segment.name[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+
+    def _current_segment(self) -> Path:
+        """Return the segment to append to, rotating it when full."""
+        if self._segment is not None and self._segment.exists():
+            if self._segment.stat().st_size < self.segment_max_bytes:
+                return self._segment
+            self._stats["segments_rotated"] += 1
+
+        self._segment_seq += 1
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self._segment = (
+            self.debug_dir
+            / f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{self._segment_seq:04d}{SEGMENT_SUFFIX}"
+        )
+        self._prune_segments()
+        return self._segment
+
+    def _prune_segments(self) -> None:
+        """Delete the oldest segments beyond ``max_segments`` (counting the new one)."""
+        segments = sorted(
+            self.debug_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"),
+            key=lambda path: path.stat().st_mtime
+        )
+        for segment in segments[:max(len(segments) - self.max_segments + 1, 0)]:
+            try:
+                segment.unlink()
+                self._index_path(segment).unlink(missing_ok=True)
+                self._stats["segments_deleted"] += 1
+            except OSError as e:
+                logger.warning(f"Failed to delete debug segment {segment}: {e}")
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait for queued sessions to be written, then stop the thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Debug session queue still full at shutdown")
+            return
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        written = self._stats["written"]
+        return {
+            **self._stats,
+            "queued": self._queue.qsize(),
+            "avg_serialize_ms": self._stats["serialize_seconds"] * 1000 / written if written else 0.0,
+            "avg_write_ms_per_session": self._stats["write_seconds"] * 1000 / written if written else 0.0,
+            "current_segment": str(self._segment) if self._segment else None,
+        }
+
+
+_writers: Dict[Path, DebugSessionWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_debug_session_writer(debug_dir: Path) -> DebugSessionWriter:
+    """Get the process-wide writer for a debug directory."""
+    key = Path(debug_dir).resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            settings = get_code_generation_settings()
+            writer = DebugSessionWriter(
+                key,
+                queue_size=settings.DEBUG_SESSION_QUEUE_SIZE,
+                segment_max_bytes=settings.DEBUG_SESSION_SEGMENT_MAX_BYTES,
+                max_segments=settings.DEBUG_SESSION_MAX_SEGMENTS,
+                max_field_chars=settings.DEBUG_SESSION_MAX_FIELD_CHARS,
+                max_list_items=settings.DEBUG_SESSION_MAX_LIST_ITEMS,
+            )
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def _flush_writers() -> None:
+    for writer in list(_writers.values()):
+        writer.flush()
+
+
+def find_debug_sessions(
+    debug_dir: Path,
+    generation_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Look up persisted debug sessions, newest first.
+
+    Only segment index files are scanned; matching sessions are read by
+    seeking to their gzip member. Segments removed by retention while the
+    lookup runs are skipped.
+
+    Args:
+        debug_dir: Debug session directory
+        generation_id: Match this generation ID
+        session_id: Match this session ID
+        limit: Maximum sessions to return
+
+    Returns:
+        Decoded session dicts
+    """
+    debug_dir = Path(debug_dir)
+    indexes = []
+    for index_path in debug_dir.glob(f"{SEGMENT_PREFIX}*{INDEX_SUFFIX}"):
+        try:
+            indexes.append((index_path.stat().st_mtime, index_path))
+        except FileNotFoundError:
+            continue
+    indexes.sort(key=lambda item: item[0], reverse=True)
+
+    sessions: List[Dict[str, Any]] = []
+    for _, index_path in indexes:
+        matches = []
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if generation_id and generation_id not in line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partially written last line
+                    if generation_id and entry.get("generation_id") != generation_id:
+                        continue
+                    if session_id and entry.get("session_id") != session_id:
+                        continue
+                    matches.append(entry)
+        except FileNotFoundError:
+            continue
+
+        if not matches:
+            continue
+        segment = index_path.with_name(index_path.name[:-len(INDEX_SUFFIX)] + SEGMENT_SUFFIX)
+        try:
+            with open(segment, "rb") as f:
+                for entry in reversed(matches):
+                    f.seek(entry["offset"])
+                    sessions.append(json.loads(gzip.decompress(f.read(entry["length"]))))
+                    if len(sessions) >= limit:
+                        return sessions
+        except FileNotFoundError:
+            continue
+    return sessions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query persisted code generation debug sessions")
+    parser.add_argument("--dir", default="logs/debug_sessions", help="Debug session directory")
+    parser.add_argument("--generation-id", help="Generation ID to look up")
+    parser.add_argument("--session-id", help="Session ID to look up")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum sessions to print")
+    args = parser.parse_args()
+
+    for found in find_debug_sessions(Path(args.dir), args.generation_id, args.session_id, args.limit):
+        print(json.dumps(found, indent=2, ensure_ascii=False))
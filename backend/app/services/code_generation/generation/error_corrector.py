@@ -9,6 +9,7 @@ import asyncio
 import time
 import re
 import os
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
@@ -128,7 +129,8 @@ class TerraformErrorCorrector:
         """Initialize the error corrector."""
         self.validator = TerraformValidator()
         self.provider_factory = ProviderFactory()
-        self.correction_history = []
+        # Bounded, since one corrector is shared by every pipeline
+        self.correction_history = deque(maxlen=1000)
 
         # Pattern-based correction rules
         self.pattern_fixes = self._initialize_pattern_fixes()
@@ -17,13 +17,11 @@ from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.code_generation.rag.retriever import RAGRetriever, RetrievalContext, RetrievalResult
-from app.services.code_generation.generation.prompt_engineer import PromptEngineer, PromptContext, EngineeredPrompt, GenerationScenario
-from app.services.code_generation.llm_providers.provider_factory import ProviderFactory
+from app.services.code_generation.generation.prompt_engineer import PromptContext, EngineeredPrompt, GenerationScenario
 from app.services.code_generation.llm_providers.base import LLMRequest, LLMResponse
 from app.services.code_generation.config.settings import get_code_generation_settings
-from app.services.code_generation.config.rate_limiter import RateLimiter
-from app.services.code_generation.generation.validator import TerraformValidator, MultiFileValidationResult
-from app.services.code_generation.generation.error_corrector import TerraformErrorCorrector, MultiFileCorrectionResult
+from app.services.code_generation.generation.validator import MultiFileValidationResult
+from app.services.code_generation.generation.error_corrector import MultiFileCorrectionResult
 from logconfig.logger import get_logger
 
 logger = get_logger()
@@ -55,6 +53,20 @@ class GenerationRequest:
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
     cloud_provider: str = "AWS"  # Cloud provider for infrastructure generation
+    # Context retrieved ahead of time (e.g. speculatively while the chat flow
+    # analysed the request); reused instead of running retrieval again
+    prefetched_context: Optional[RetrievalResult] = None
+    # Summary of matching knowledge base patterns, added to the prompt context
+    pattern_context: Optional[str] = None
+
+    def retrieval_context(self) -> RetrievalContext:
+        """Build the RAG retrieval parameters for this request."""
+        return RetrievalContext(
+            query=self.query,
+            repository_name=self.repository_name,
+            max_results=self.max_context_documents,
+            similarity_threshold=self.similarity_threshold
+        )
 
 
 @dataclass
@@ -98,24 +110,24 @@ class AutonomousGenerationPipeline:
         Args:
             db_session: Database session for vector store operations
         """
+        from app.services.code_generation.registry import get_component_registry
+
+        registry = get_component_registry()
         self.db = db_session
 
-        # Initialize components
+        # Session-bound components
         self.rag_retriever = RAGRetriever(db_session)
-        self.prompt_engineer = PromptEngineer()
-        self.provider_factory = ProviderFactory()
-
-        # Initialize enhanced validation and correction components
-        self.validator = TerraformValidator()
-        self.error_corrector = TerraformErrorCorrector()
-
-        # Initialize rate limiter
-        self.rate_limiter = RateLimiter(
-            redis_url=settings.REDIS_URL,
-            requests=settings.RATE_LIMIT_REQUESTS,
-            window=settings.RATE_LIMIT_WINDOW,
-            key_prefix="code_generation"
-        )
+
+        # Shared, session-independent components
+        self.prompt_engineer = registry.prompt_engineer()
+        self.provider_factory = registry.provider_factory()
+
+        # Enhanced validation and correction components
+        self.validator = registry.validator()
+        self.error_corrector = registry.error_corrector()
+
+        # Rate limiter (one Redis client per process)
+        self.rate_limiter = registry.rate_limiter()
 
         # Real-time service for user interaction
         try:
@@ -154,7 +166,8 @@ class AutonomousGenerationPipeline:
             retrieval_result = await self._retrieve_context(request, metrics)
             result.stage_results["context_retrieval"] = {
                 "documents_found": len(retrieval_result.documents),
-                "processing_time_ms": retrieval_result.processing_time_ms
+                "processing_time_ms": retrieval_result.processing_time_ms,
+                "prefetched": request.prefetched_context is not None
             }
 
             # Stage 2: Prompt Engineering
@@ -254,14 +267,16 @@ class AutonomousGenerationPipeline:
         Returns:
             RetrievalResult with context documents
         """
-        retrieval_context = RetrievalContext(
-            query=request.query,
-            repository_name=request.repository_name,
-            max_results=request.max_context_documents,
-            similarity_threshold=request.similarity_threshold
-        )
+        if request.prefetched_context is not None:
+            retrieval_result = request.prefetched_context
+            metrics.context_retrieval_time = 0.0
+            metrics.documents_retrieved = len(retrieval_result.documents)
+            logger.debug(
+                f"Reusing prefetched context with {len(retrieval_result.documents)} documents"
+            )
+            return retrieval_result
 
-        retrieval_result = await self.rag_retriever.retrieve_context(retrieval_context)
+        retrieval_result = await self.rag_retriever.retrieve_context(request.retrieval_context())
 
         # Update metrics
         metrics.context_retrieval_time = retrieval_result.processing_time_ms
@@ -294,6 +309,7 @@ class AutonomousGenerationPipeline:
             scenario=request.scenario,
             existing_code=request.existing_code,
             target_file_path=request.target_file_path,
+            repository_context=request.pattern_context,
             cloud_provider=request.cloud_provider
         )
 
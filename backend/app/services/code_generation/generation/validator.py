@@ -17,6 +17,7 @@ from enum import Enum
 from logconfig.logger import get_logger
 from app.services.tree_sitter_service import TreeSitterService
 from app.services.code_generation.config.settings import get_code_generation_settings
+from app.services.code_generation.best_practices.rules import get_practice_result_cache
 
 logger = get_logger()
 settings = get_code_generation_settings()
@@ -189,11 +190,10 @@ class TerraformValidator:
                 processing_time_ms=processing_time
             )
 
-            logger.info(
-                f"Validation completed for {'file' if file_path else 'code block'}: "
-                f"{result.total_issues} issues ({result.errors_count} errors, "
-                f"{result.warnings_count} warnings, {result.info_count} info) "
-                f"in {processing_time:.2f}ms"
+            logger.debug(
+                "Validation completed for {}: {} issues ({} errors, {} warnings, {} info) in {:.2f}ms",
+                "file" if file_path else "code block", result.total_issues,
+                result.errors_count, result.warnings_count, result.info_count, processing_time
             )
 
             return result
@@ -500,21 +500,24 @@ class TerraformValidator:
         """Check Terraform naming conventions."""
         issues = []
 
-        # Check resource naming
-        import re
-        resource_pattern = r'resource\s+"([^"]+)"\s+"([^"]+)"'
-        for match in re.finditer(resource_pattern, code):
-            resource_type, resource_name = match.groups()
+        # Only resource underscores are flagged, and only in strict mode
+        if not strict_mode:
+            return issues
 
-            # Check for underscores in resource names (prefer hyphens)
-            if '_' in resource_name and strict_mode:
-                issues.append(ValidationIssue(
-                    error_type=ValidationErrorType.STYLE,
-                    severity=ValidationSeverity.WARNING,
-                    message=f"Resource name '{resource_name}' contains underscores, consider using hyphens",
-                    rule_id="resource_name_underscores",
-                    suggestion="Use hyphens instead of underscores in resource names"
-                ))
+        # Shares the best practices rule results cached for this content
+        violations, _ = get_practice_result_cache().evaluate(code, strict_mode)
+        for violation in violations:
+            if violation.rule != "resource_name_underscores":
+                continue
+            issues.append(ValidationIssue(
+                error_type=ValidationErrorType.STYLE,
+                severity=ValidationSeverity.WARNING,
+                message=f"{violation.message}, consider using hyphens",
+                line_number=violation.line_number,
+                context=violation.context,
+                rule_id="resource_name_underscores",
+                suggestion="Use hyphens instead of underscores in resource names"
+            ))
 
         return issues
 
@@ -792,5 +795,6 @@ class TerraformValidator:
             ],
             "tree_sitter_integration": True,
             "async_processing": True,
-            "multi_file_support": True
+            "multi_file_support": True,
+            "best_practices_cache": get_practice_result_cache().get_stats()
         }
\ No newline at end of file
@@ -15,9 +15,9 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.code_generation.rag.cache import bump_index_version
 from app.services.code_generation.rag.retriever import RAGRetriever, RetrievalContext
 from app.services.code_generation.generation.prompt_engineer import (
-    PromptEngineer,
     PromptContext,
     GenerationScenario,
 )
@@ -30,8 +30,11 @@ from app.services.code_generation.rag.knowledge_base import (
     KnowledgeBase,
     KnowledgeBaseResult,
 )
-from app.services.code_generation.llm_providers.provider_factory import ProviderFactory
 from app.services.code_generation.config.settings import get_code_generation_settings
+from app.services.code_generation.events import (
+    GenerationEventType,
+    generation_event_bus,
+)
 from app.db.session import async_session_factory
 
 # from app.services.code_generation.monitoring.service import CodeGenerationMonitoringService
@@ -83,11 +86,15 @@ class CodeGenerationOrchestrator:
         Args:
             db_session: Database session for all operations
         """
+        from app.services.code_generation.registry import get_component_registry
+
+        registry = get_component_registry()
         self.db = db_session
 
-        # Initialize components
+        # Initialize components. Session-independent components come from the
+        # process-wide registry; only session-bound wrappers are built here.
         self.rag_retriever = RAGRetriever(db_session)
-        self.prompt_engineer = PromptEngineer()
+        self.prompt_engineer = registry.prompt_engineer()
         self.generation_pipeline = AutonomousGenerationPipeline(db_session)
 
         # Initialize real-time pipeline for enhanced monitoring
@@ -103,12 +110,14 @@ class CodeGenerationOrchestrator:
             self.realtime_pipeline = None
 
         self.knowledge_base = KnowledgeBase(db_session)
-        self.provider_factory = ProviderFactory()
+        self.provider_factory = registry.provider_factory()
 
-        # Job management
-        self.active_jobs: Dict[str, GenerationJob] = {}
-        self.completed_jobs: Dict[str, GenerationJob] = {}
-        self.job_semaphore = asyncio.Semaphore(5)  # Max concurrent jobs
+        # Job management, shared so job status survives the request that
+        # started the job
+        job_store = registry.job_store()
+        self.active_jobs: Dict[str, GenerationJob] = job_store.active_jobs
+        self.completed_jobs: Dict[str, GenerationJob] = job_store.completed_jobs
+        self.job_semaphore = job_store.job_semaphore  # Process-wide job limit
 
         # Monitoring
         # self.monitoring_service = CodeGenerationMonitoringService()
@@ -456,6 +465,7 @@ class CodeGenerationOrchestrator:
                     # Update job status
                     job.status = "running"
                     job.started_at = datetime.now()
+                    self._publish_job_event(job, GenerationEventType.STAGE, "Generation started")
 
                     # Record job start
                     # if self.config.enable_monitoring:
@@ -547,6 +557,7 @@ class CodeGenerationOrchestrator:
                 # Move to completed jobs
                 self.completed_jobs[job.job_id] = job
                 self.active_jobs.pop(job.job_id, None)
+                await self._publish_job_finished(job)
 
     async def _execute_realtime_generation_job(self, job):
         """
@@ -562,6 +573,7 @@ class CodeGenerationOrchestrator:
                     # Update job status
                     job.status = "running"
                     job.started_at = datetime.now()
+                    self._publish_job_event(job, GenerationEventType.STAGE, "Generation started")
 
                     # Create a new real-time pipeline with the background session
                     from app.services.code_generation.generation.realtime_pipeline import (
@@ -653,6 +665,7 @@ class CodeGenerationOrchestrator:
                 # Move to completed jobs
                 self.completed_jobs[job.job_id] = job
                 self.active_jobs.pop(job.job_id, None)
+                await self._publish_job_finished(job)
 
     async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -701,6 +714,54 @@ class CodeGenerationOrchestrator:
 
         return None
 
+    def _publish_job_event(
+        self,
+        job: GenerationJob,
+        event_type: GenerationEventType,
+        current_step: Optional[str] = None,
+        progress_percentage: Optional[int] = None,
+    ):
+        """
+        Publish a non-terminal job event to the generation event bus.
+
+        Args:
+            job: The generation job
+            event_type: Stage or progress event
+            current_step: Description of the current step
+            progress_percentage: Overall progress; defaults to the job's own
+        """
+        generation_event_bus.publish(
+            job_id=job.job_id,
+            event_type=event_type,
+            status=job.status,
+            progress_percentage=(
+                progress_percentage
+                if progress_percentage is not None
+                else getattr(job, "progress_percentage", 0)
+            ),
+            current_step=current_step or getattr(job, "current_step", None),
+        )
+
+    async def _publish_job_finished(self, job: GenerationJob):
+        """
+        Publish a job's terminal event, carrying its final status as payload.
+
+        Args:
+            job: The finished generation job
+        """
+        event_type = {
+            "completed": GenerationEventType.COMPLETED,
+            "cancelled": GenerationEventType.CANCELLED,
+        }.get(job.status, GenerationEventType.FAILED)
+
+        generation_event_bus.publish(
+            job_id=job.job_id,
+            event_type=event_type,
+            status=job.status,
+            progress_percentage=100 if job.status == "completed" else getattr(job, "progress_percentage", 0),
+            data=await self.get_job_status(job.job_id) or {},
+        )
+
     async def cancel_job(self, job_id: str) -> bool:
         """
         Cancel a running generation job.
@@ -720,6 +781,7 @@ class CodeGenerationOrchestrator:
             # Move to completed jobs
             self.completed_jobs[job_id] = job
             self.active_jobs.pop(job_id, None)
+            await self._publish_job_finished(job)
 
             logger.info(f"Cancelled generation job: {job_id}")
             return True
@@ -1022,10 +1084,13 @@ class CodeGenerationOrchestrator:
         result = {"success": False, "error": None}
 
         try:
-            # Generate embedding for the file content
-            embedding = await self.rag_retriever._generate_query_embedding(content)
+            # Whole files are embedded verbatim and would only churn the
+            # query embedding cache
+            embedding = await self.rag_retriever._generate_query_embedding(
+                content, use_cache=False
+            )
 
-            if embedding:
+            if embedding is not None and len(embedding) > 0:
                 # Prepare data for vector store
                 vectors = [embedding]
                 content_chunks = [content]
@@ -1047,6 +1112,7 @@ class CodeGenerationOrchestrator:
                     file_metadata=file_metadata,
                     embedding_type="generated_code",
                 )
+                await bump_index_version(repository_name)
 
                 result["success"] = True
                 logger.debug(f"Indexed {filename} in vector store")
@@ -1232,6 +1298,7 @@ class CodeGenerationOrchestrator:
                     "knowledge_base": kb_stats,
                     "rag_retriever": "operational",
                     "prompt_engineer": "operational",
+                    "event_bus": generation_event_bus.get_stats(),
                 },
                 "job_stats": {
                     "active_jobs": active_job_count,
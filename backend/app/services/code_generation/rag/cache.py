@@ -0,0 +1,272 @@
+"""
+Caching for RAG context retrieval.
+
+Retries, clarification continuations and ``get_context_recommendations``
+followed by ``generate_code`` ask ``RAGRetriever.retrieve_context`` the same
+question several times. Two in-process caches avoid repeating the work:
+
+- query embeddings of the normalized query text, keyed by that text;
+  embeddings do not depend on the index, so they survive re-indexing;
+- retrieval results, keyed by normalized query plus every retrieval filter,
+  with LRU and TTL eviction.
+
+Each cached result records the index version of the repository it was
+retrieved from (or the global version for searches across repositories).
+``EmbeddingOrchestrator``, ``EmbeddingService`` and ``CodeGenerationOrchestrator``
+(when it indexes generated files) bump the version whenever
+embeddings of a repository change, which invalidates the entries on their
+next lookup. With ``RAG_INDEX_VERSION_REDIS_URL`` set, versions are kept in
+Redis so re-indexing in one worker invalidates results cached in all of
+them; Redis failures fall back to the local versions.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.services.code_generation.config.settings import get_code_generation_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+GLOBAL_INDEX = "*"
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold a query and collapse its whitespace."""
+    return " ".join(query.split()).casefold()
+
+
+class IndexVersions:
+    """Per-repository embedding index versions."""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+    def _bump_local(self, repository_name: str) -> None:
+        with self._lock:
+            for name in (repository_name, GLOBAL_INDEX):
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    async def bump(self, repository_name: str) -> None:
+        """
+        Mark a repository's embeddings as changed.
+
+        Also bumps the global version, which guards searches across all
+        repositories.
+        """
+        self._bump_local(repository_name)
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.incr(self._redis_key(repository_name))
+                pipe.incr(self._redis_key(GLOBAL_INDEX))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to bump shared index version for {repository_name}: {e}")
+
+    async def get(self, repository_name: Optional[str]) -> Tuple[int, int]:
+        """
+        Get the current version of a repository's index.
+
+        Args:
+            repository_name: Repository, or None for all repositories
+
+        Returns:
+            (local version, shared version); the shared version is 0 without Redis
+        """
+        name = repository_name or GLOBAL_INDEX
+        with self._lock:
+            local = self._versions.get(name, 0)
+        client = self._get_redis()
+        if client is None:
+            return local, 0
+        try:
+            shared = await client.get(self._redis_key(name))
+        except Exception as e:
+            logger.warning(f"Failed to read shared index version for {name}: {e}")
+            return local, 0
+        return local, int(shared or 0)
+
+    def _redis_key(self, name: str) -> str:
+        return f"rag:index_version:{name}"
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            self._redis = None
+
+
+class RetrievalCache:
+    """
+    LRU/TTL cache of retrieval results and query embeddings.
+
+    Values are stored as given; callers must not mutate cached results.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 600,
+        max_embeddings: int = 1024,
+        index_versions: Optional[IndexVersions] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_embeddings = max_embeddings
+        self.index_versions = index_versions or IndexVersions()
+
+        # key -> (stored at, index version, value)
+        self._results: "OrderedDict[Hashable, Tuple[float, Tuple[int, int], Any]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "invalidated": 0,
+            "evictions": 0,
+            "embedding_hits": 0,
+            "embedding_misses": 0,
+        }
+
+    def get(self, key: Hashable, version: Tuple[int, int]) -> Optional[Any]:
+        """
+        Look up a retrieval result.
+
+        Entries older than the TTL or retrieved from another index version
+        are dropped.
+
+        Args:
+            key: Result key (normalized query plus filters)
+            version: Current index version from ``IndexVersions.get``
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            stored_at, stored_version, value = entry
+            if now - stored_at > self.ttl_seconds:
+                del self._results[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            if stored_version != version:
+                del self._results[key]
+                self._stats["invalidated"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._results.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, version: Tuple[int, int], value: Any) -> None:
+        """
+        Store a retrieval result.
+
+        ``version`` must be read before retrieving, so a re-index that
+        finishes during retrieval invalidates the stored result.
+        """
+        with self._lock:
+            self._results[key] = (time.monotonic(), version, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_embedding(self, query: str) -> Optional[Any]:
+        """Look up the embedding of a normalized query."""
+        with self._lock:
+            embedding = self._embeddings.get(query)
+            if embedding is None:
+                self._stats["embedding_misses"] += 1
+                return None
+            self._embeddings.move_to_end(query)
+            self._stats["embedding_hits"] += 1
+            return embedding
+
+    def put_embedding(self, query: str, embedding: Any) -> None:
+        """Store the embedding of a normalized query."""
+        with self._lock:
+            self._embeddings[query] = embedding
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > self.max_embeddings:
+                self._embeddings.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        """Fraction of result lookups served from the cache."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return self._stats["hits"] / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Drop all cached results and embeddings."""
+        with self._lock:
+            self._results.clear()
+            self._embeddings.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            embedding_lookups = self._stats["embedding_hits"] + self._stats["embedding_misses"]
+            return {
+                **self._stats,
+                "entries": len(self._results),
+                "embeddings": len(self._embeddings),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "embedding_hit_rate": (
+                    self._stats["embedding_hits"] / embedding_lookups if embedding_lookups else 0.0
+                ),
+                "shared_index_versions": bool(self.index_versions.redis_url),
+            }
+
+
+_retrieval_cache: Optional[RetrievalCache] = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the process-wide retrieval cache."""
+    global _retrieval_cache
+    with _retrieval_cache_lock:
+        if _retrieval_cache is None:
+            settings = get_code_generation_settings()
+            _retrieval_cache = RetrievalCache(
+                max_entries=settings.RAG_RETRIEVAL_CACHE_SIZE,
+                ttl_seconds=settings.RAG_RETRIEVAL_CACHE_TTL_SECONDS,
+                max_embeddings=settings.RAG_QUERY_EMBEDDING_CACHE_SIZE,
+                index_versions=IndexVersions(settings.RAG_INDEX_VERSION_REDIS_URL),
+            )
+        return _retrieval_cache
+
+
+async def bump_index_version(repository_name: str) -> None:
+    """Invalidate cached retrievals for a repository whose embeddings changed."""
+    await get_retrieval_cache().index_versions.bump(repository_name)
@@ -14,7 +14,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.tree_sitter_service import TreeSitterService
 from app.vectorstores.postgres_store import PostgresVectorStore
 from app.services.code_generation.rag.retriever import RetrievedDocument
 from logconfig.logger import get_logger
@@ -70,16 +69,21 @@ class KnowledgeBase:
         Args:
             db_session: Database session for pattern storage
         """
+        from app.services.code_generation.registry import get_component_registry
+
+        registry = get_component_registry()
         self.db = db_session
-        self.tree_sitter_service = TreeSitterService()
+        self.tree_sitter_service = registry.tree_sitter_service()
         self.vector_store = PostgresVectorStore(db_session)
 
-        # Pattern storage
-        self.patterns: Dict[str, TerraformPattern] = {}
-        self.pattern_index: Dict[str, List[str]] = {}  # term -> pattern_ids
+        # Pattern storage, shared across instances so learned patterns
+        # outlive the request that extracted them
+        index = registry.knowledge_base_index()
+        self.patterns: Dict[str, TerraformPattern] = index.patterns
+        self.pattern_index: Dict[str, List[str]] = index.pattern_index  # term -> pattern_ids
 
         # Caching
-        self.pattern_cache: Dict[str, List[PatternMatch]] = {}
+        self.pattern_cache: Dict[str, List[PatternMatch]] = index.pattern_cache
         self.cache_ttl = 3600  # 1 hour
 
         # Configuration
@@ -0,0 +1,221 @@
+"""
+Vectorized re-ranking of vector search candidates.
+
+The vector store returns the nearest chunks by cosine similarity, which for
+overlapping windows from ``TerraformChunker`` means several near-identical
+chunks of the same file often fill the top-k. Candidates are re-ranked on a
+float32 matrix of their embeddings in three steps:
+
+1. optional hybrid fusion of the dense similarity with a lexical score
+   (query-term coverage), both min-max scaled;
+2. collapsing of overlapping chunks: neighbouring chunks of the same file
+   whose embeddings are nearly identical are reduced to the best one;
+3. maximal marginal relevance (MMR) selection, trading relevance against
+   similarity to the chunks already selected.
+
+Every step works on whole arrays; only the k MMR rounds iterate in Python.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.vectors import VectorLike, as_float32_matrix, as_float32_vector, normalize_rows
+
+# Underscores separate terms so "bucket" matches "aws_s3_bucket"
+_TERM = re.compile(r"[A-Za-z0-9]{2,}")
+
+
+@dataclass
+class RerankResult:
+    """Selected candidate indices and the candidates collapsed as overlaps."""
+    indices: List[int]
+    scores: List[float]
+    collapsed: List[int]
+
+
+def lexical_scores(query: str, texts: Sequence[str]) -> np.ndarray:
+    """
+    Score texts by how many distinct query terms they contain.
+
+    Terms are matched case-insensitively and weighted by inverse document
+    frequency over the candidate set, so terms every candidate shares count
+    for little.
+
+    Returns:
+        float32 array with one score in [0, 1] per text
+    """
+    terms = sorted({term.lower() for term in _TERM.findall(query)})
+    if not terms or not texts:
+        return np.zeros(len(texts), dtype=np.float32)
+
+    index = {term: i for i, term in enumerate(terms)}
+    pattern = re.compile(
+        r"(?<![A-Za-z0-9])(?:" + "|".join(map(re.escape, terms)) + r")(?![A-Za-z0-9])",
+        re.IGNORECASE
+    )
+    hits = np.zeros((len(texts), len(terms)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        columns = [index[term.lower()] for term in set(pattern.findall(text or ""))]
+        hits[row, columns] = 1.0
+
+    idf = np.log1p(len(texts) / (1.0 + hits.sum(axis=0)))
+    total = idf.sum()
+    if total <= 0:
+        return np.zeros(len(texts), dtype=np.float32)
+    return (hits @ idf / total).astype(np.float32)
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 1e-9:
+        return np.ones_like(values)
+    return (values - low) / (high - low)
+
+
+def collapse_overlaps(
+    similarity: np.ndarray,
+    relevance: np.ndarray,
+    file_ids: np.ndarray,
+    chunk_indices: np.ndarray,
+    threshold: float,
+    max_gap: int = 1
+) -> np.ndarray:
+    """
+    Find candidates that duplicate a more relevant chunk of the same file.
+
+    A candidate is dropped when a more relevant candidate from the same file
+    lies within ``max_gap`` chunks of it and their embeddings have cosine
+    similarity of at least ``threshold``.
+
+    Args:
+        similarity: (n, n) pairwise cosine similarity of the candidates
+        relevance: Relevance score per candidate
+        file_ids: Integer file identifier per candidate
+        chunk_indices: Chunk index within the file per candidate
+        threshold: Minimum similarity for two chunks to count as overlapping
+        max_gap: Maximum chunk index distance of overlapping chunks
+
+    Returns:
+        Boolean mask of candidates to keep
+    """
+    order = np.argsort(-relevance, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    duplicate = (
+        (file_ids[:, None] == file_ids[None, :])
+        & (np.abs(chunk_indices[:, None] - chunk_indices[None, :]) <= max_gap)
+        & (similarity >= threshold)
+        & (rank[None, :] < rank[:, None])  # column outranks row
+    )
+    return ~duplicate.any(axis=1)
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    similarity: np.ndarray,
+    k: int,
+    lambda_mult: float
+) -> List[int]:
+    """
+    Select ``k`` candidates by maximal marginal relevance.
+
+    Each round picks ``argmax(lambda * relevance - (1 - lambda) * max_sim)``
+    where ``max_sim`` is the highest similarity to any selected candidate,
+    updated with one vectorized ``maximum`` per round.
+
+    Args:
+        relevance: Relevance score per candidate
+        similarity: (n, n) pairwise cosine similarity of the candidates
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Selected candidate indices in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    selected: List[int] = []
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        if selected:
+            score = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim
+        else:
+            score = relevance.copy()
+        score[~available] = -np.inf
+        best = int(np.argmax(score))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, similarity[best], out=max_sim)
+    return selected
+
+
+def rerank(
+    query_vector: VectorLike,
+    candidate_vectors: Sequence[VectorLike],
+    file_keys: Sequence[str],
+    chunk_indices: Sequence[int],
+    k: int,
+    lambda_mult: float = 0.7,
+    overlap_threshold: float = 0.92,
+    lexical: Optional[np.ndarray] = None,
+    lexical_weight: float = 0.0
+) -> RerankResult:
+    """
+    Re-rank vector search candidates for diversity.
+
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Candidate embeddings, one per candidate
+        file_keys: File identity per candidate (e.g. repository and path)
+        chunk_indices: Chunk index per candidate
+        k: Number of candidates to return
+        lambda_mult: MMR relevance/diversity trade-off
+        overlap_threshold: Similarity above which neighbouring chunks of a
+            file are collapsed; values above 1 disable collapsing
+        lexical: Lexical score per candidate for hybrid fusion
+        lexical_weight: Weight of the lexical score in [0, 1]
+
+    Returns:
+        RerankResult with selected indices, best first
+    """
+    n = len(candidate_vectors)
+    if n == 0:
+        return RerankResult(indices=[], scores=[], collapsed=[])
+
+    vectors = normalize_rows(as_float32_matrix(candidate_vectors), inplace=False)
+    query = as_float32_vector(query_vector)
+    norm = float(np.linalg.norm(query))
+    if norm > 0:
+        query = query / norm
+
+    relevance = vectors @ query
+    if lexical is not None and lexical_weight > 0:
+        relevance = (1.0 - lexical_weight) * _min_max(relevance) + lexical_weight * _min_max(lexical)
+
+    similarity = vectors @ vectors.T
+
+    _, file_ids = np.unique(np.asarray(file_keys), return_inverse=True)
+    keep = collapse_overlaps(
+        similarity,
+        relevance,
+        file_ids,
+        np.asarray(chunk_indices, dtype=np.int64),
+        overlap_threshold
+    )
+    kept = np.flatnonzero(keep)
+
+    chosen = mmr_select(relevance[kept], similarity[np.ix_(kept, kept)], k, lambda_mult)
+    indices = [int(kept[i]) for i in chosen]
+    return RerankResult(
+        indices=indices,
+        scores=[float(relevance[i]) for i in indices],
+        collapsed=[int(i) for i in np.flatnonzero(~keep)]
+    )
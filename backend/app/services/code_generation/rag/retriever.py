@@ -6,14 +6,19 @@ to find relevant code patterns and documentation for autonomous code generation.
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+import time
+from typing import Hashable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, replace
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.embedding_orchestrator import EmbeddingOrchestrator
 from app.vectorstores.postgres_store import PostgresVectorStore
 from app.providers.embedding.enhanced_anthropic_provider import EnhancedAnthropicEmbeddingProvider
 from app.services.code_generation.config.settings import get_code_generation_settings
+from app.services.code_generation.rag.cache import get_retrieval_cache, normalize_query
+from app.services.code_generation.rag.reranker import lexical_scores, rerank
+from app.services.chat.prompt_assembler import estimate_tokens
+from app.utils.vectors import VectorLike
 from logconfig.logger import get_logger
 
 logger = get_logger()
@@ -30,6 +35,7 @@ class RetrievalContext:
     similarity_threshold: float = 0.7
     include_summaries: bool = True
     include_code_chunks: bool = True
+    lexical_weight: Optional[float] = None  # hybrid fusion weight; None uses settings
 
 
 @dataclass
@@ -53,6 +59,14 @@ class RetrievalResult:
     processing_time_ms: float = 0.0
     embedding_time_ms: float = 0.0
     search_time_ms: float = 0.0
+    rerank_time_ms: float = 0.0
+    candidates_considered: int = 0
+    duplicates_collapsed: int = 0
+    context_tokens: int = 0
+    # Tokens of overlapping chunks a plain similarity top-k would have included
+    context_tokens_saved: int = 0
+    cache_hit: bool = False
+    cache_hit_rate: float = 0.0  # process-wide retrieval cache hit rate
 
 
 class RAGRetriever:
@@ -63,18 +77,24 @@ class RAGRetriever:
     using query embeddings and similarity search with configurable parameters.
     """
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        embedding_provider: Optional[EnhancedAnthropicEmbeddingProvider] = None
+    ):
         """
         Initialize the RAG retriever.
 
         Args:
             db_session: Database session for vector store operations
+            embedding_provider: Embedding provider; defaults to the shared
+                instance from the component registry
         """
+        from app.services.code_generation.registry import get_component_registry
+
         self.db = db_session
         self.vector_store = PostgresVectorStore(db_session)
-        self.embedding_provider = EnhancedAnthropicEmbeddingProvider(
-            api_key=settings.LLM_API_KEY
-        )
+        self.embedding_provider = embedding_provider or get_component_registry().embedding_provider()
 
         # Configuration
         self.max_concurrent_searches = 5
@@ -92,18 +112,35 @@ class RAGRetriever:
         Returns:
             RetrievalResult with retrieved documents and metadata
         """
-        import time
         start_time = time.time()
 
         result = RetrievalResult(query=context.query)
+        cache = get_retrieval_cache() if settings.RAG_RETRIEVAL_CACHE_ENABLED else None
 
         try:
+            if cache is not None:
+                cache_key = self._cache_key(context)
+                index_version = await cache.index_versions.get(context.repository_name)
+                cached = cache.get(cache_key, index_version)
+                if cached is not None:
+                    return replace(
+                        cached,
+                        documents=list(cached.documents),
+                        processing_time_ms=(time.time() - start_time) * 1000,
+                        embedding_time_ms=0.0,
+                        search_time_ms=0.0,
+                        rerank_time_ms=0.0,
+                        cache_hit=True,
+                        cache_hit_rate=cache.hit_rate()
+                    )
+                result.cache_hit_rate = cache.hit_rate()
+
             # Generate embedding for the query
             embedding_start = time.time()
             query_embedding = await self._generate_query_embedding(context.query)
             result.embedding_time_ms = (time.time() - embedding_start) * 1000
 
-            if not query_embedding:
+            if query_embedding is None or len(query_embedding) == 0:
                 logger.warning("Failed to generate query embedding")
                 return result
 
@@ -115,40 +152,82 @@ class RAGRetriever:
             )
             result.search_time_ms = (time.time() - search_start) * 1000
 
+            if search_results is None:
+                result.processing_time_ms = (time.time() - start_time) * 1000
+                return result
+
             # Process and rank results
             result.documents = await self._process_search_results(
                 search_results=search_results,
-                context=context
+                context=context,
+                query_embedding=query_embedding,
+                result=result
             )
             result.total_found = len(result.documents)
 
             result.processing_time_ms = (time.time() - start_time) * 1000
 
             logger.info(
-                f"Retrieved {result.total_found} documents for query '{context.query[:50]}...' "
-                f"in {result.processing_time_ms:.2f}ms"
+                "Retrieved {} documents for query '{}...' in {:.2f}ms "
+                "({} candidates, {} overlapping chunks collapsed, {} context tokens saved)",
+                result.total_found, context.query[:50], result.processing_time_ms,
+                result.candidates_considered, result.duplicates_collapsed, result.context_tokens_saved
             )
 
+            if cache is not None:
+                cache.put(cache_key, index_version, replace(result, documents=list(result.documents)))
+
         except Exception as e:
             logger.error(f"Error during context retrieval: {e}")
             result.processing_time_ms = (time.time() - start_time) * 1000
 
         return result
 
-    async def _generate_query_embedding(self, query: str) -> Optional[List[float]]:
+    def _cache_key(self, context: RetrievalContext) -> Hashable:
+        """Key a retrieval by its normalized query and every filter."""
+        return (
+            normalize_query(context.query),
+            context.repository_name,
+            tuple(sorted(context.file_extensions)) if context.file_extensions else None,
+            context.max_results,
+            context.similarity_threshold,
+            context.include_summaries,
+            context.include_code_chunks,
+            context.lexical_weight,
+        )
+
+    async def _generate_query_embedding(
+        self, query: str, use_cache: bool = True
+    ) -> Optional[List[float]]:
         """
         Generate embedding vector for the query.
 
+        With the cache, the normalized query is embedded and cached,
+        independent of the index, so queries differing only in case or
+        whitespace share one embedding. Without it the text is embedded
+        verbatim, which suits file contents that are embedded once.
+
         Args:
             query: Query text to embed
+            use_cache: Embed the normalized text and use the embedding cache
 
         Returns:
             Embedding vector or None if generation fails
         """
+        cache = get_retrieval_cache() if use_cache and settings.RAG_RETRIEVAL_CACHE_ENABLED else None
+        text = query
+        if cache is not None:
+            text = normalize_query(query)
+            cached = cache.get_embedding(text)
+            if cached is not None:
+                return cached
+
         try:
             # Use the embedding provider to generate query embedding
-            embeddings = self.embedding_provider.embed_texts([query])
-            if embeddings and len(embeddings) > 0:
+            embeddings = await self.embedding_provider.aembed_texts([text])
+            if len(embeddings) > 0:
+                if cache is not None:
+                    cache.put_embedding(text, embeddings[0])
                 return embeddings[0]
             else:
                 logger.error("No embeddings generated for query")
@@ -162,7 +241,7 @@ class RAGRetriever:
         self,
         query_embedding: List[float],
         context: RetrievalContext
-    ) -> List[Tuple[Dict[str, Any], float]]:
+    ) -> Optional[List[Tuple[Dict[str, Any], float]]]:
         """
         Perform similarity search in the vector store.
 
@@ -171,44 +250,57 @@ class RAGRetriever:
             context: Retrieval context with search parameters
 
         Returns:
-            List of (metadata, similarity_score) tuples
+            List of (metadata, similarity_score) tuples, or None if the search failed
         """
         try:
-            # Use the vector store's search method
+            # Get more results than requested for filtering and re-ranking
+            multiplier = settings.RAG_RERANK_CANDIDATE_MULTIPLIER if settings.RAG_RERANK_ENABLED else 2
             results = await self.vector_store.search_similar_files(
                 query_vector=query_embedding,
-                top_k=context.max_results * 2,  # Get more results for filtering
+                top_k=context.max_results * multiplier,
                 threshold=context.similarity_threshold,
                 repository_name=context.repository_name,
-                file_extensions=context.file_extensions
+                file_extensions=context.file_extensions,
+                include_vectors=settings.RAG_RERANK_ENABLED
             )
 
-            logger.debug(f"Vector search returned {len(results)} results")
+            logger.debug("Vector search returned {} results", len(results))
             return results
 
         except Exception as e:
             logger.error(f"Similarity search failed: {e}")
-            return []
+            return None
 
     async def _process_search_results(
         self,
         search_results: List[Tuple[Dict[str, Any], float]],
-        context: RetrievalContext
+        context: RetrievalContext,
+        query_embedding: Optional[VectorLike] = None,
+        result: Optional[RetrievalResult] = None
     ) -> List[RetrievedDocument]:
         """
         Process and rank search results into RetrievedDocument objects.
 
+        When candidate embeddings are available, results are re-ranked for
+        diversity (see ``_rerank_documents``); otherwise they are ranked by
+        similarity.
+
         Args:
             search_results: Raw search results from vector store
             context: Retrieval context
+            query_embedding: Query embedding, needed for re-ranking
+            result: Retrieval result to record re-ranking statistics on
 
         Returns:
             List of processed RetrievedDocument objects
         """
         documents = []
+        vectors = []
 
         for metadata, similarity_score in search_results:
             try:
+                vector = metadata.pop("embedding_vector", None)
+
                 # Determine source type based on metadata
                 source_type = "summary" if metadata.get("summary_text") else "code"
 
@@ -230,11 +322,26 @@ class RAGRetriever:
                 )
 
                 documents.append(document)
+                vectors.append(vector)
 
             except Exception as e:
                 logger.warning(f"Failed to process search result: {e}")
                 continue
 
+        if result is not None:
+            result.candidates_considered = len(documents)
+
+        if (
+            settings.RAG_RERANK_ENABLED
+            and query_embedding is not None
+            and len(documents) > 1
+            and all(vector is not None for vector in vectors)
+        ):
+            try:
+                return self._rerank_documents(documents, vectors, query_embedding, context, result)
+            except Exception as e:
+                logger.warning(f"Re-ranking failed, falling back to similarity order: {e}")
+
         # Sort by similarity score (highest first)
         documents.sort(key=lambda x: x.similarity_score, reverse=True)
 
@@ -244,6 +351,68 @@ class RAGRetriever:
 
         return documents
 
+    def _rerank_documents(
+        self,
+        documents: List[RetrievedDocument],
+        vectors: List[VectorLike],
+        query_embedding: VectorLike,
+        context: RetrievalContext,
+        result: Optional[RetrievalResult]
+    ) -> List[RetrievedDocument]:
+        """
+        Select ``max_results`` documents by MMR after collapsing overlapping chunks.
+
+        Args:
+            documents: Candidate documents
+            vectors: Candidate embeddings, aligned with ``documents``
+            query_embedding: Query embedding
+            context: Retrieval context
+            result: Retrieval result to record statistics on
+
+        Returns:
+            Selected documents, best first
+        """
+        start = time.perf_counter()
+
+        lexical_weight = context.lexical_weight
+        if lexical_weight is None:
+            lexical_weight = settings.RAG_LEXICAL_WEIGHT
+        lexical = None
+        if lexical_weight > 0:
+            lexical = lexical_scores(context.query, [doc.content for doc in documents])
+
+        ranked = rerank(
+            query_vector=query_embedding,
+            candidate_vectors=vectors,
+            file_keys=[f"{doc.repository_name}:{doc.file_path}" for doc in documents],
+            chunk_indices=[doc.chunk_index for doc in documents],
+            k=context.max_results,
+            lambda_mult=settings.RAG_MMR_LAMBDA,
+            overlap_threshold=settings.RAG_CHUNK_OVERLAP_THRESHOLD,
+            lexical=lexical,
+            lexical_weight=lexical_weight
+        )
+
+        selected = []
+        for index, score in zip(ranked.indices, ranked.scores):
+            documents[index].metadata["rerank_score"] = score
+            selected.append(documents[index])
+
+        if result is not None:
+            # Compare with the plain similarity top-k the same query would have used
+            collapsed = set(ranked.collapsed)
+            baseline = sorted(
+                range(len(documents)), key=lambda i: documents[i].similarity_score, reverse=True
+            )[:context.max_results]
+            result.duplicates_collapsed = len(collapsed)
+            result.context_tokens = sum(estimate_tokens(doc.content) for doc in selected)
+            result.context_tokens_saved = sum(
+                estimate_tokens(documents[i].content) for i in baseline if i in collapsed
+            )
+            result.rerank_time_ms = (time.perf_counter() - start) * 1000
+
+        return selected
+
     def _extract_content(
         self,
         metadata: Dict[str, Any],
@@ -353,7 +522,15 @@ class RAGRetriever:
                 "vector_store_stats": stats,
                 "embedding_provider": "enhanced_anthropic",
                 "max_concurrent_searches": self.max_concurrent_searches,
-                "embedding_batch_size": self.embedding_batch_size
+                "embedding_batch_size": self.embedding_batch_size,
+                "retrieval_cache": get_retrieval_cache().get_stats(),
+                "rerank": {
+                    "enabled": settings.RAG_RERANK_ENABLED,
+                    "candidate_multiplier": settings.RAG_RERANK_CANDIDATE_MULTIPLIER,
+                    "mmr_lambda": settings.RAG_MMR_LAMBDA,
+                    "chunk_overlap_threshold": settings.RAG_CHUNK_OVERLAP_THRESHOLD,
+                    "lexical_weight": settings.RAG_LEXICAL_WEIGHT
+                }
             }
         except Exception as e:
             logger.error(f"Failed to get retrieval stats: {e}")
@@ -23,6 +23,7 @@ from app.services.code_generation.generation.pipeline import (
     GenerationRequest,
     GenerationResult,
 )
+from app.services.code_generation.events import GenerationEventType
 from app.services.realtime_service import realtime_service, GenerationStatus
 from app.models.project import CodeGeneration, GenerationStatus as ModelGenerationStatus
 from app.services.chat_service import ChatService
@@ -233,6 +234,8 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
             max_context_documents=kwargs.get("max_context_documents", 5),
             similarity_threshold=kwargs.get("similarity_threshold", 0.7),
             cloud_provider=kwargs.get("cloud_provider", "AWS"),
+            prefetched_context=kwargs.get("prefetched_context"),
+            pattern_context=kwargs.get("pattern_context"),
         )
 
         # Add user and project context for autonomous interaction
@@ -305,9 +308,8 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
                 "Retrieving context from knowledge base...",
             )
 
-            # Get RAG context if available
-            retrieval_context = None
-            if hasattr(self, "rag_retriever"):
+            # Get RAG context if it was not prefetched; the pipeline reuses it
+            if request.prefetched_context is None and hasattr(self, "rag_retriever"):
                 try:
                     from app.services.code_generation.rag.retriever import (
                         RetrievalContext,
@@ -317,8 +319,11 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
                         query=request.query,
                         repository_name=request.repository_name,
                         max_results=request.max_context_documents,
+                        similarity_threshold=request.similarity_threshold,
+                    )
+                    request.prefetched_context = (
+                        await self.rag_retriever.retrieve_context(retrieval_context)
                     )
-                    await self.rag_retriever.retrieve_context(retrieval_context)
                 except Exception as e:
                     logger.warning(f"Failed to retrieve RAG context: {e}")
 
@@ -429,6 +434,7 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
                         job.request.query, job.request.scenario
                     )
                 )
+                self._publish_job_event(job, GenerationEventType.STAGE, "Generation started")
 
                 # Emit generation started event
                 if job.enable_realtime:
@@ -533,6 +539,7 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
                 # Move to completed jobs
                 self.completed_jobs[job.job_id] = job
                 self.active_jobs.pop(job.job_id, None)
+                await self._publish_job_finished(job)
 
     async def _emit_progress_update(
         self,
@@ -554,15 +561,28 @@ class RealtimeCodeGenerationOrchestrator(CodeGenerationOrchestrator):
             step_index: Current step index
             current_step: Description of current step
         """
-        if not enable_realtime:
-            return
-
         # Calculate progress percentage based on step
         if step_index < len(self.progress_steps):
             progress_percentage = self.progress_steps[step_index][1]
         else:
             progress_percentage = 100
 
+        # Keep the job record current and notify in-process subscribers
+        job = self.active_jobs.get(generation_id)
+        if job is not None:
+            if isinstance(job, RealtimeGenerationJob):
+                job.progress_percentage = progress_percentage
+                job.current_step = current_step
+            self._publish_job_event(
+                job,
+                GenerationEventType.PROGRESS,
+                current_step=current_step,
+                progress_percentage=progress_percentage,
+            )
+
+        if not enable_realtime:
+            return
+
         # Calculate estimated completion
         estimated_completion = None
         if step_index < len(self.progress_steps) - 1:
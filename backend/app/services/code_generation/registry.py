@@ -0,0 +1,208 @@
+"""
+Application-lifetime registry of code generation components.
+
+Providers, the validator, the prompt engineer, the knowledge base index and
+the Terraform parser hold no per-request state but are expensive to build
+(templates, rule tables, parser grammars, HTTP and Redis clients). The
+registry builds each of them once and hands the same instance to every
+orchestrator and pipeline, which only keep the database session they were
+created with.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from app.services.code_generation.config.settings import get_code_generation_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+
+
+class BoundedDict(OrderedDict):
+    """Dict that drops its oldest entries once it holds more than ``max_entries``."""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+def _pattern_cache() -> BoundedDict:
+    return BoundedDict(get_code_generation_settings().KNOWLEDGE_BASE_PATTERN_CACHE_SIZE)
+
+
+def _completed_jobs() -> BoundedDict:
+    return BoundedDict(get_code_generation_settings().GENERATION_COMPLETED_JOBS_LIMIT)
+
+
+def _job_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(get_code_generation_settings().GENERATION_MAX_CONCURRENT_JOBS)
+
+
+@dataclass
+class KnowledgeBaseIndex:
+    """Learned patterns shared by every KnowledgeBase instance."""
+
+    patterns: Dict[str, Any] = field(default_factory=dict)
+    pattern_index: Dict[str, List[str]] = field(default_factory=dict)
+    pattern_cache: Dict[str, List[Any]] = field(default_factory=_pattern_cache)
+
+
+@dataclass
+class GenerationJobStore:
+    """
+    Generation jobs shared by every orchestrator instance.
+
+    ``job_semaphore`` limits concurrent generation jobs for the whole process
+    (``GENERATION_MAX_CONCURRENT_JOBS``), not per orchestrator. Completed jobs
+    are kept up to ``GENERATION_COMPLETED_JOBS_LIMIT``, oldest dropped first.
+    """
+
+    active_jobs: Dict[str, Any] = field(default_factory=dict)
+    completed_jobs: Dict[str, Any] = field(default_factory=_completed_jobs)
+    job_semaphore: asyncio.Semaphore = field(default_factory=_job_semaphore)
+
+
+class ComponentRegistry:
+    """
+    Lazily builds and caches session-independent components.
+
+    Components are created on first use (or by ``warm_up`` at startup) and
+    reused for the lifetime of the process.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.construction_ms: Dict[str, float] = {}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get a component by name, building it with ``factory`` if needed."""
+        component = self._components.get(name)
+        if component is not None:
+            return component
+
+        with self._lock:
+            component = self._components.get(name)
+            if component is None:
+                start = time.perf_counter()
+                component = factory()
+                self.construction_ms[name] = (time.perf_counter() - start) * 1000
+                self._components[name] = component
+        return component
+
+    def provider_factory(self):
+        from app.services.code_generation.llm_providers.provider_factory import ProviderFactory
+
+        return self.get("provider_factory", ProviderFactory)
+
+    def prompt_engineer(self):
+        from app.services.code_generation.generation.prompt_engineer import PromptEngineer
+
+        return self.get("prompt_engineer", PromptEngineer)
+
+    def validator(self):
+        from app.services.code_generation.generation.validator import TerraformValidator
+
+        return self.get("validator", TerraformValidator)
+
+    def error_corrector(self):
+        from app.services.code_generation.generation.error_corrector import TerraformErrorCorrector
+
+        return self.get("error_corrector", TerraformErrorCorrector)
+
+    def tree_sitter_service(self):
+        from app.services.tree_sitter_service import TreeSitterService
+
+        return self.get("tree_sitter_service", TreeSitterService)
+
+    def embedding_provider(self):
+        from app.providers.embedding.enhanced_anthropic_provider import (
+            EnhancedAnthropicEmbeddingProvider,
+        )
+        from app.services.code_generation.config.settings import get_code_generation_settings
+
+        settings = get_code_generation_settings()
+        return self.get(
+            "embedding_provider",
+            lambda: EnhancedAnthropicEmbeddingProvider(api_key=settings.LLM_API_KEY),
+        )
+
+    def rate_limiter(self):
+        from app.services.code_generation.config.rate_limiter import RateLimiter
+        from app.services.code_generation.config.settings import get_code_generation_settings
+
+        settings = get_code_generation_settings()
+        return self.get(
+            "rate_limiter",
+            lambda: RateLimiter(
+                redis_url=settings.REDIS_URL,
+                requests=settings.RATE_LIMIT_REQUESTS,
+                window=settings.RATE_LIMIT_WINDOW,
+                key_prefix="code_generation",
+            ),
+        )
+
+    def knowledge_base_index(self) -> KnowledgeBaseIndex:
+        return self.get("knowledge_base_index", KnowledgeBaseIndex)
+
+    def job_store(self) -> GenerationJobStore:
+        return self.get("job_store", GenerationJobStore)
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Build every component up front so the first request does not pay for it.
+
+        Returns:
+            Construction time per component in milliseconds
+        """
+        builders = [
+            self.provider_factory,
+            self.prompt_engineer,
+            self.validator,
+            self.error_corrector,
+            self.tree_sitter_service,
+            self.embedding_provider,
+            self.rate_limiter,
+            self.knowledge_base_index,
+        ]
+        for build in builders:
+            try:
+                build()
+            except Exception as e:
+                logger.warning(f"Failed to warm up {build.__name__}: {e}")
+
+        logger.info(
+            f"Code generation component registry warmed up: "
+            f"{sum(self.construction_ms.values()):.1f}ms total"
+        )
+        return dict(self.construction_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics."""
+        index = self._components.get("knowledge_base_index")
+        jobs = self._components.get("job_store")
+        return {
+            "components": sorted(self._components),
+            "construction_ms": dict(self.construction_ms),
+            "knowledge_base_patterns": len(index.patterns) if index else 0,
+            "active_jobs": len(jobs.active_jobs) if jobs else 0,
+            "completed_jobs": len(jobs.completed_jobs) if jobs else 0,
+        }
+
+
+component_registry = ComponentRegistry()
+
+
+def get_component_registry() -> ComponentRegistry:
+    """Get the process-wide component registry."""
+    return component_registry
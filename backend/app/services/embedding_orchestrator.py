@@ -10,15 +10,17 @@ from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.llm_summarization_service import LLMSummarizationService, CodeChunk, ChunkSummary
+from app.services.llm_summarization_service import CodeChunk, ChunkSummary, get_summarization_service
 from app.services.monitoring_service import EmbeddingMonitoringService
 from app.services.error_handling_service import ComprehensiveErrorHandlingService, create_default_error_handler
 from app.services.tree_sitter_service import TreeSitterService
-from app.providers.embedding.enhanced_anthropic_provider import EnhancedAnthropicEmbeddingProvider
+from app.providers.embedding.enhanced_anthropic_provider import get_enhanced_embedding_provider
 from app.utils.chunking import TerraformChunker
-from app.vectorstores.postgres_store import PostgresVectorStore
+from app.vectorstores.postgres_store import FileEmbeddingBatch, PostgresVectorStore
+from app.services.code_generation.rag.cache import bump_index_version
 from app.core.settings import get_settings
 from logconfig.logger import get_logger
 
@@ -31,6 +33,7 @@ class ProcessingStatus(Enum):
     PENDING = "pending"
     PROCESSING = "processing"
     COMPLETED = "completed"
+    PARTIAL = "partial"  # some files' embeddings could not be stored
     FAILED = "failed"
     CANCELLED = "cancelled"
 
@@ -48,6 +51,8 @@ class ProcessingResult:
     repository_name: Optional[str] = None
     start_time: Optional[float] = None
     end_time: Optional[float] = None
+    rows_ingested: int = 0
+    ingest_rows_per_second: float = 0.0
 
 
 @dataclass
@@ -61,6 +66,8 @@ class RepositoryEmbeddingRequest:
     max_files: int = 100
     reindex: bool = False
     recursive: bool = True
+    # Drop the ANN index during the load and rebuild it once at the end
+    defer_index_maintenance: bool = False
 
 
 class EmbeddingOrchestrator:
@@ -72,12 +79,8 @@ class EmbeddingOrchestrator:
         self.job_id = str(uuid.uuid4())
 
         # Initialize services
-        self.summarization_service = LLMSummarizationService(
-            api_key=settings.ANTHROPIC_API_KEY
-        )
-        self.embedding_provider = EnhancedAnthropicEmbeddingProvider(
-            api_key=settings.ANTHROPIC_API_KEY
-        )
+        self.summarization_service = get_summarization_service()
+        self.embedding_provider = get_enhanced_embedding_provider(settings.ANTHROPIC_API_KEY)
         self.chunker = TerraformChunker()
         self.vector_store = PostgresVectorStore(db_session)
         self.monitoring_service = EmbeddingMonitoringService()
@@ -89,6 +92,15 @@ class EmbeddingOrchestrator:
         self.max_concurrent_chunks = 20
         self.batch_size = 100
 
+        # Bulk ingestion: embeddings are buffered and written with COPY
+        self.bulk_ingest = settings.EMBEDDING_BULK_INGEST_ENABLED
+        self.bulk_flush_rows = settings.EMBEDDING_BULK_FLUSH_ROWS
+        self._pending_embeddings: List[FileEmbeddingBatch] = []
+        self._pending_rows = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_errors: List[Dict[str, Any]] = []
+        self._ingest_stats = {"rows": 0, "seconds": 0.0}
+
         # Rate limiting
         self.requests_per_minute = 50
         self.burst_limit = 10
@@ -122,6 +134,9 @@ class EmbeddingOrchestrator:
             start_time=start_time
         )
 
+        self._flush_errors = []
+        self._ingest_stats = {"rows": 0, "seconds": 0.0}
+
         try:
             logger.info(f"Starting repository processing: {request.repository_name}")
 
@@ -140,6 +155,10 @@ class EmbeddingOrchestrator:
             )
             logger.info(f"Discovered {len(files_to_process)} files to process")
 
+            defer_index = request.defer_index_maintenance and self.bulk_ingest
+            if defer_index:
+                await self.vector_store.drop_ann_index()
+
             # Process files with concurrency control and error handling
             semaphore = asyncio.Semaphore(self.max_concurrent_files)
 
@@ -156,7 +175,23 @@ class EmbeddingOrchestrator:
 
             # Process files concurrently
             tasks = [process_file_with_semaphore(file_path) for file_path in files_to_process]
-            file_results = await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                file_results = await asyncio.gather(*tasks, return_exceptions=True)
+                await self._flush_embeddings(
+                    request.repository_name, request.repository_url, request.repository_description
+                )
+            finally:
+                if defer_index:
+                    await self.vector_store.rebuild_ann_index()
+
+            result.errors.extend(self._flush_errors)
+            result.rows_ingested = self._ingest_stats["rows"]
+            if self._ingest_stats["seconds"]:
+                result.ingest_rows_per_second = self._ingest_stats["rows"] / self._ingest_stats["seconds"]
+
+            # Files whose buffered embeddings failed to flush were never
+            # stored and are not counted
+            unstored = {error["file_path"] for error in self._flush_errors}
 
             # Aggregate results
             for file_result in file_results:
@@ -171,6 +206,8 @@ class EmbeddingOrchestrator:
                         {"repository": request.repository_name}
                     )
                 elif isinstance(file_result, dict):
+                    if file_result.get("file_path") in unstored:
+                        continue
                     result.files_processed += file_result.get("files_processed", 0)
                     result.chunks_created += file_result.get("chunks_created", 0)
                     result.embeddings_generated += file_result.get("embeddings_generated", 0)
@@ -178,15 +215,25 @@ class EmbeddingOrchestrator:
                         result.errors.extend(file_result["errors"])
 
             # Update final status
-            result.status = ProcessingStatus.COMPLETED
+            if not unstored:
+                result.status = ProcessingStatus.COMPLETED
+            elif result.files_processed:
+                result.status = ProcessingStatus.PARTIAL
+            else:
+                result.status = ProcessingStatus.FAILED
             result.end_time = time.time()
             result.duration_ms = int((result.end_time - start_time) * 1000)
 
             # Record success
-            self.monitoring_service.record_processing_end(metric_id, success=True)
+            self.monitoring_service.record_processing_end(
+                metric_id,
+                success=not unstored,
+                error_message=f"{len(unstored)} files could not be stored" if unstored else None
+            )
 
-            logger.info(f"Completed repository processing: {result.files_processed} files, "
-                       f"{result.chunks_created} chunks, {result.embeddings_generated} embeddings")
+            logger.info(f"Completed repository processing ({result.status.value}): "
+                       f"{result.files_processed} files, {result.chunks_created} chunks, "
+                       f"{result.embeddings_generated} embeddings")
 
         except Exception as e:
             logger.error(f"Repository processing failed: {e}")
@@ -327,8 +374,10 @@ class EmbeddingOrchestrator:
             code_texts = [chunk.content for chunk in code_chunks]
             summary_texts = [summary.summary_text for summary in valid_summaries] if valid_summaries else []
 
-            code_embeddings = self.embedding_provider.embed_texts(code_texts)
-            summary_embeddings = self.embedding_provider.embed_texts(summary_texts) if summary_texts else []
+            code_embeddings, summary_embeddings = await asyncio.gather(
+                self.embedding_provider.aembed_texts_matrix(code_texts),
+                self.embedding_provider.aembed_texts_matrix(summary_texts)
+            )
 
             # Store embeddings with dual structure
             await self._store_dual_embeddings(
@@ -347,6 +396,7 @@ class EmbeddingOrchestrator:
                         f"{len(code_embeddings)} code embeddings, {len(summary_embeddings)} summary embeddings")
 
             return {
+                "file_path": file_path,
                 "files_processed": 1,
                 "chunks_created": len(code_chunks),
                 "embeddings_generated": len(code_embeddings) + len(summary_embeddings),
@@ -372,8 +422,8 @@ class EmbeddingOrchestrator:
         file_path: str,
         code_chunks: List[CodeChunk],
         summaries: List[ChunkSummary],
-        code_embeddings: List[List[float]],
-        summary_embeddings: List[List[float]],
+        code_embeddings: np.ndarray,
+        summary_embeddings: np.ndarray,
         file_metadata: Dict[str, Any],
         repository_url: Optional[str] = None,
         repository_description: Optional[str] = None
@@ -393,6 +443,22 @@ class EmbeddingOrchestrator:
                 "summarization_model": summary.processing_metadata.get("model", "claude-3-haiku")
             })
 
+        if self.bulk_ingest:
+            self._pending_embeddings.append(FileEmbeddingBatch(
+                file_path=file_path,
+                vectors=code_embeddings,
+                content_chunks=[chunk.content for chunk in code_chunks],
+                file_metadata=file_metadata,
+                embedding_type="code",
+                summary_texts=summary_texts,
+                summary_vectors=summary_embeddings,
+                summary_metadata=summary_metadata
+            ))
+            self._pending_rows += self._pending_embeddings[-1].row_count
+            if self._pending_rows >= self.bulk_flush_rows:
+                await self._flush_embeddings(repository_name, repository_url, repository_description)
+            return
+
         # Store both code and summary embeddings using the enhanced vector store
         await self.vector_store.upsert_file_embedding(
             repository_name=repository_name,
@@ -407,6 +473,48 @@ class EmbeddingOrchestrator:
             summary_vectors=summary_embeddings,
             summary_metadata=summary_metadata
         )
+        # Invalidate cached RAG retrievals for this repository
+        await bump_index_version(repository_name)
+
+    async def _flush_embeddings(
+        self,
+        repository_name: str,
+        repository_url: Optional[str] = None,
+        repository_description: Optional[str] = None
+    ) -> None:
+        """
+        Write buffered file embeddings in one bulk COPY.
+
+        Failures are recorded per file in ``_flush_errors`` rather than
+        raised, since the buffered files were processed by other tasks.
+        """
+        async with self._flush_lock:
+            batches = self._pending_embeddings
+            if not batches:
+                return
+            self._pending_embeddings = []
+            self._pending_rows = 0
+
+            try:
+                stats = await self.vector_store.bulk_upsert_file_embeddings(
+                    repository_name=repository_name,
+                    files=batches,
+                    repository_url=repository_url,
+                    repository_description=repository_description
+                )
+                self._ingest_stats["rows"] += stats["rows"]
+                self._ingest_stats["seconds"] += stats["seconds"]
+            except Exception as e:
+                logger.error(f"Bulk embedding flush failed for {len(batches)} files: {e}")
+                self._flush_errors.extend({
+                    "type": "storage_error",
+                    "message": str(e),
+                    "file_path": batch.file_path
+                } for batch in batches)
+                return
+
+        # Invalidate cached RAG retrievals for this repository
+        await bump_index_version(repository_name)
 
     def _calculate_file_metadata(self, file_path: str, content: str, parsed_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Calculate metadata for a file."""
@@ -7,10 +7,13 @@ import os
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from anthropic import Anthropic
 
+from app.utils.vectors import hash_bytes_vector, normalize_rows
 from app.vectorstores.postgres_store import PostgresVectorStore
+from app.services.code_generation.rag.cache import bump_index_version
 from app.core.config import get_settings
 from logconfig.logger import get_logger
 
@@ -74,6 +77,7 @@ class EmbeddingService:
                 repository_url=repository_url,
                 repository_description=repository_description,
             )
+            await bump_index_version(repository_name)
 
             logger.info(
                 f"Successfully embedded file {file_path} with {len(chunks)} chunks"
@@ -234,6 +238,7 @@ class EmbeddingService:
         """Delete all embeddings for a repository."""
         try:
             await self.vector_store.delete_repository_embeddings(repository_name)
+            await bump_index_version(repository_name)
             logger.info(f"Deleted embeddings for repository {repository_name}")
         except Exception as e:
             logger.error(f"Failed to delete repository {repository_name}: {e}")
@@ -312,7 +317,7 @@ class EmbeddingService:
 
         return chunks if chunks else [content]
 
-    async def _generate_embedding(self, text: str) -> List[float]:
+    async def _generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text using Anthropic."""
         try:
             # For now, we'll use a simple approach - in production, you might want to use
@@ -322,30 +327,12 @@ class EmbeddingService:
 
             # For demonstration, we'll create a simple hash-based embedding
             # In production, replace this with actual embedding generation
-            import numpy as np
-
-            # Create a deterministic "embedding" based on text hash
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            # Convert hex to numbers and normalize
-            embedding = []
-            for i in range(0, len(text_hash), 2):
-                hex_pair = text_hash[i : i + 2]
-                embedding.append(int(hex_pair, 16) / 255.0)
-
-            # Pad or truncate to desired dimension
-            target_dim = settings.EMBEDDING_DIMENSION
-            if len(embedding) < target_dim:
-                embedding.extend([0.0] * (target_dim - len(embedding)))
-            else:
-                embedding = embedding[:target_dim]
-
-            # Normalize the vector
-            embedding = np.array(embedding, dtype=np.float32)
-            norm = np.linalg.norm(embedding)
-            if norm > 0:
-                embedding = embedding / norm
-
-            return embedding.tolist()
+            # Create a deterministic "embedding" based on text hash, padded
+            # with zeros to the configured dimension and kept as float32
+            embedding = hash_bytes_vector(
+                hashlib.md5(text.encode()).digest(), settings.EMBEDDING_DIMENSION
+            )
+            return normalize_rows(embedding.reshape(1, -1))[0]
 
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
@@ -6,29 +6,45 @@ and webhook handling for installation events.
 """
 
 import asyncio
-import base64
 import hashlib
 import hmac
 import json
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-import jwt
 import httpx
 from logconfig.logger import get_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.github_http_cache import (
+    INSTALLATION_EXTENSION,
+    GitHubConditionalCacheTransport,
+    get_github_http_cache,
+)
 from app.core.settings import get_settings
 from app.models.user import User, GitHubConnection
 from app.schemas.github import GitHubRepository, GitHubInstallation, GitHubWebhookEvent
 from app.db.session import get_db
+from app.services.github_token_cache import InstallationToken, get_github_credential_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 logger = get_logger()
 settings = get_settings()
 
+# Changed files up to this size are sent inline in the create-tree request
+INLINE_BLOB_MAX_BYTES = 32 * 1024
+
+# Maximum concurrent blob uploads per push
+BLOB_UPLOAD_CONCURRENCY = 8
+
+
+def git_blob_sha(content: str) -> str:
+    """Compute the git blob SHA-1 GitHub assigns to UTF-8 file content."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
 
 class GitHubAppError(Exception):
     """Base exception for GitHub App operations."""
@@ -69,15 +85,19 @@ class GitHubAppService:
         # GitHub API base URL
         self.api_base_url = "https://api.github.com"
         
-        # HTTP client for API requests
+        # HTTP client for API requests; GET responses are revalidated with ETags
         self.http_client = httpx.AsyncClient(
             timeout=30.0,
+            transport=GitHubConditionalCacheTransport(),
             headers={
                 "Accept": "application/vnd.github.v3+json",
                 "User-Agent": "InfraJet-GitHub-App/1.0"
             }
         )
         
+        # Process-wide JWT, private key and installation token cache
+        self.credential_cache = get_github_credential_cache()
+        
         # Validate configuration on initialization
         self._validate_configuration()
 
@@ -152,6 +172,9 @@ class GitHubAppService:
             health_status["errors"].append(f"JWT generation failed: {e}")
             health_status["status"] = "unhealthy"
         
+        health_status["credential_cache"] = self.credential_cache.get_stats()
+        health_status["http_cache"] = get_github_http_cache().get_stats()
+        
         # Check GitHub API connectivity (if JWT generation works)
         if "jwt_generation" in health_status["checks"] and "✓" in health_status["checks"]["jwt_generation"]:
             try:
@@ -199,35 +222,13 @@ class GitHubAppService:
         if not self.app_id or not self.private_key:
             raise GitHubAppAuthError("GitHub App ID and private key are required")
         
+        # Check if it's a placeholder or invalid key
+        if self.private_key == "your-github-app-private-key-here":
+            raise GitHubAppAuthError("GitHub App private key not configured. Please set GITHUB_PRIVATE_KEY environment variable.")
+        
         try:
-            # JWT payload
-            now = int(time.time())
-            payload = {
-                "iat": now - 60,  # Issued at time (60 seconds ago to account for clock skew)
-                "exp": now + (10 * 60),  # Expires in 10 minutes
-                "iss": self.app_id  # Issuer (GitHub App ID)
-            }
-            
-            # Handle different private key formats
-            private_key = self.private_key
-            
-            # Check if it's a placeholder or invalid key
-            if private_key == "your-github-app-private-key-here" or not private_key:
-                raise GitHubAppAuthError("GitHub App private key not configured. Please set GITHUB_PRIVATE_KEY environment variable.")
-            
-            if private_key.startswith("-----BEGIN"):
-                # Already in PEM format
-                pass
-            else:
-                # Try to decode from base64
-                try:
-                    private_key = base64.b64decode(private_key).decode('utf-8')
-                except Exception as e:
-                    logger.warning(f"Failed to decode private key from base64, using as-is: {e}")
-                    # If decoding fails, use as-is and let JWT library handle it
-            
-            # Generate JWT token
-            token = jwt.encode(payload, private_key, algorithm="RS256")
+            # Reuses the cached JWT and parsed key until shortly before expiry
+            token = self.credential_cache.get_app_jwt(self.app_id, self.private_key)
             
             logger.debug("Generated GitHub App JWT token")
             return token
@@ -240,12 +241,26 @@ class GitHubAppService:
         """
         Get installation access token for repository operations.
         
+        Tokens are cached until shortly before they expire, and concurrent
+        requests for the same installation share a single refresh.
+        
         Args:
             installation_id: GitHub App installation ID
             
         Returns:
             Installation access token
             
+        Raises:
+            GitHubAppAuthError: If token retrieval fails
+        """
+        return await self.credential_cache.get_installation_token(
+            installation_id, lambda: self._mint_installation_access_token(installation_id)
+        )
+
+    async def _mint_installation_access_token(self, installation_id: int) -> InstallationToken:
+        """
+        Request a new installation access token from GitHub.
+        
         Raises:
             GitHubAppAuthError: If token retrieval fails
         """
@@ -270,7 +285,12 @@ class GitHubAppService:
                 expires_at = data.get("expires_at")
                 
                 logger.info(f"Retrieved installation access token for installation {installation_id}, expires at {expires_at}")
-                return token
+                if expires_at:
+                    expires_ts = datetime.fromisoformat(expires_at.replace("Z", "+00:00")).timestamp()
+                else:
+                    # GitHub installation tokens last one hour
+                    expires_ts = time.time() + 3600
+                return InstallationToken(token=token, expires_at=expires_ts)
             elif response.status_code == 404:
                 raise GitHubAppAuthError(f"Installation {installation_id} not found")
             elif response.status_code == 403:
@@ -450,7 +470,7 @@ class GitHubAppService:
             
             # Get current branch reference
             ref_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}/git/refs/heads/{branch}"
-            ref_response = await self.http_client.get(ref_url, headers=headers)
+            ref_response = await self._get_with_installation_token(installation_id, ref_url, headers)
             
             if ref_response.status_code != 200:
                 await self._handle_api_error(ref_response, "get branch reference")
@@ -458,41 +478,45 @@ class GitHubAppService:
             ref_data = ref_response.json()
             base_sha = ref_data["object"]["sha"]
             
-            # Get base tree
+            # Get the full base tree to diff against
             tree_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}/git/trees/{base_sha}"
-            tree_response = await self.http_client.get(tree_url, headers=headers)
+            tree_response = await self.http_client.get(tree_url, headers=headers, params={"recursive": "1"})
             
             if tree_response.status_code != 200:
                 await self._handle_api_error(tree_response, "get base tree")
             
-            # Create blobs for each file
-            tree_items = []
+            tree_data = tree_response.json()
+            base_tree_sha = tree_data.get("sha", base_sha)
+            existing = {
+                item["path"]: item
+                for item in tree_data.get("tree", [])
+                if item.get("type") == "blob"
+            }
+            if tree_data.get("truncated"):
+                logger.warning(
+                    f"Base tree of {repo_owner}/{repo_name} is truncated; files missing from it are uploaded"
+                )
+            
+            # Only files whose git blob SHA differs from the base tree change
+            changed = {}
             for file_path, content in files.items():
-                # Create blob
-                blob_data = {
-                    "content": content,
-                    "encoding": "utf-8"
-                }
-                
-                blob_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}/git/blobs"
-                blob_response = await self.http_client.post(blob_url, headers=headers, json=blob_data)
-                
-                if blob_response.status_code != 201:
-                    await self._handle_api_error(blob_response, f"create blob for {file_path}")
-                
-                blob_sha = blob_response.json()["sha"]
-                
-                # Add to tree
-                tree_items.append({
-                    "path": file_path,
-                    "mode": "100644",
-                    "type": "blob",
-                    "sha": blob_sha
-                })
+                current = existing.get(file_path)
+                if current is None or current.get("sha") != git_blob_sha(content):
+                    changed[file_path] = content
+            
+            if not changed:
+                logger.info(
+                    f"All {len(files)} files already up to date in {repo_owner}/{repo_name}, skipping commit"
+                )
+                return base_sha
+            
+            tree_items = await self._build_tree_items(
+                repo_owner, repo_name, changed, existing, headers
+            )
             
             # Create new tree
             new_tree_data = {
-                "base_tree": base_sha,
+                "base_tree": base_tree_sha,
                 "tree": tree_items
             }
             
@@ -529,7 +553,10 @@ class GitHubAppService:
             if update_ref_response.status_code != 200:
                 await self._handle_api_error(update_ref_response, "update branch reference")
             
-            logger.info(f"Pushed {len(files)} files to {repo_owner}/{repo_name}, commit: {commit_sha}")
+            logger.info(
+                f"Pushed {len(changed)} changed files ({len(files) - len(changed)} unchanged) "
+                f"to {repo_owner}/{repo_name}, commit: {commit_sha}"
+            )
             return commit_sha
             
         except GitHubAppAPIError:
@@ -538,6 +565,57 @@ class GitHubAppService:
             logger.error(f"Error pushing files to {repo_owner}/{repo_name}: {str(e)}")
             raise GitHubAppAPIError(f"Failed to push files: {str(e)}")
 
+    async def _build_tree_items(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        files: Dict[str, str],
+        existing: Dict[str, Dict[str, Any]],
+        headers: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Build create-tree entries for changed files.
+        
+        Small files are sent inline in the tree request; larger ones are
+        uploaded as blobs, at most BLOB_UPLOAD_CONCURRENCY at a time.
+        Existing files keep their mode (e.g. executable bits).
+        """
+        blob_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}/git/blobs"
+        semaphore = asyncio.Semaphore(BLOB_UPLOAD_CONCURRENCY)
+        
+        async def upload_blob(file_path: str, content: str) -> str:
+            async with semaphore:
+                blob_response = await self.http_client.post(
+                    blob_url, headers=headers, json={"content": content, "encoding": "utf-8"}
+                )
+            if blob_response.status_code != 201:
+                await self._handle_api_error(blob_response, f"create blob for {file_path}")
+            return blob_response.json()["sha"]
+        
+        large = [
+            path for path, content in files.items()
+            if len(content.encode("utf-8")) > INLINE_BLOB_MAX_BYTES
+        ]
+        uploaded = dict(zip(
+            large,
+            await asyncio.gather(*(upload_blob(path, files[path]) for path in large))
+        ))
+        
+        tree_items = []
+        for file_path, content in files.items():
+            item = {
+                "path": file_path,
+                "mode": existing.get(file_path, {}).get("mode", "100644"),
+                "type": "blob"
+            }
+            if file_path in uploaded:
+                item["sha"] = uploaded[file_path]
+            else:
+                item["content"] = content
+            tree_items.append(item)
+        
+        return tree_items
+
     async def sync_repository(
         self,
         installation_id: int,
@@ -565,31 +643,37 @@ class GitHubAppService:
             GitHubAppAPIError: If sync operation fails
         """
         try:
-            # Get installation access token
-            access_token = await self.get_installation_access_token(installation_id)
-            
-            # Check if repository exists
-            repo_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}"
-            headers = {
-                "Authorization": f"token {access_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
+            with self.credential_cache.track_usage() as token_usage:
+                # Get installation access token
+                access_token = await self.get_installation_access_token(installation_id)
+                
+                # Check if repository exists
+                repo_url = f"{self.api_base_url}/repos/{repo_owner}/{repo_name}"
+                headers = {
+                    "Authorization": f"token {access_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                }
+                
+                repo_response = await self._get_with_installation_token(installation_id, repo_url, headers)
+                
+                if repo_response.status_code == 404:
+                    raise GitHubAppAPIError(f"Repository {repo_owner}/{repo_name} not found")
+                elif repo_response.status_code != 200:
+                    await self._handle_api_error(repo_response, "check repository")
+                
+                # Push files
+                commit_sha = await self.push_files(
+                    installation_id=installation_id,
+                    repo_owner=repo_owner,
+                    repo_name=repo_name,
+                    files=files,
+                    commit_message=commit_message,
+                    branch=branch
+                )
             
-            repo_response = await self.http_client.get(repo_url, headers=headers)
-            
-            if repo_response.status_code == 404:
-                raise GitHubAppAPIError(f"Repository {repo_owner}/{repo_name} not found")
-            elif repo_response.status_code != 200:
-                await self._handle_api_error(repo_response, "check repository")
-            
-            # Push files
-            commit_sha = await self.push_files(
-                installation_id=installation_id,
-                repo_owner=repo_owner,
-                repo_name=repo_name,
-                files=files,
-                commit_message=commit_message,
-                branch=branch
+            logger.info(
+                f"Synced {repo_owner}/{repo_name}: "
+                f"{token_usage.served_from_cache} token requests served from cache"
             )
             
             return {
@@ -696,7 +780,7 @@ class GitHubAppService:
                 "Accept": "application/vnd.github.v3+json"
             }
             
-            response = await self.http_client.get(repo_url, headers=headers)
+            response = await self._get_with_installation_token(installation_id, repo_url, headers)
             
             if response.status_code == 200:
                 logger.info(f"User has access to repository {repo_owner}/{repo_name} through installation {installation_id}")
@@ -901,6 +985,48 @@ class GitHubAppService:
         
         return {"handled": True, "message": "Push event processed"}
 
+    async def _get_with_installation_token(
+        self,
+        installation_id: int,
+        url: str,
+        headers: Dict[str, str],
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        GET with an installation token, replacing the token once if GitHub
+        rejects it.
+        
+        A cached token can be revoked before it expires (e.g. when the
+        installation is suspended or its permissions change). On a 401 the
+        cached token is invalidated, a fresh one is minted and the request is
+        retried once. ``headers`` is updated in place so later requests of
+        the same operation use the new token.
+        
+        The installation ID is attached for the conditional-request cache,
+        which keys on it instead of the short-lived token.
+        """
+        kwargs.setdefault("extensions", {})[INSTALLATION_EXTENSION] = installation_id
+        response = await self.http_client.get(url, headers=headers, **kwargs)
+        if not self._is_bad_credentials(response):
+            return response
+        
+        logger.warning(f"GitHub rejected the cached token for installation {installation_id}, refreshing")
+        await self.credential_cache.invalidate(installation_id)
+        access_token = await self.get_installation_access_token(installation_id)
+        headers["Authorization"] = f"token {access_token}"
+        return await self.http_client.get(url, headers=headers, **kwargs)
+
+    @staticmethod
+    def _is_bad_credentials(response: httpx.Response) -> bool:
+        """Check whether GitHub rejected the request's token."""
+        if response.status_code == 401:
+            return True
+        try:
+            message = response.json().get("message", "") if response.content else ""
+        except (json.JSONDecodeError, AttributeError):
+            return False
+        return response.status_code == 403 and "bad credentials" in str(message).lower()
+
     async def _handle_api_error(self, response: httpx.Response, operation: str) -> None:
         """
         Handle GitHub API error responses.
@@ -0,0 +1,322 @@
+"""
+GitHub App credential cache.
+
+Minting an installation access token costs an RS256 signature for the App JWT
+and a POST to ``/app/installations/{id}/access_tokens``, yet the token stays
+valid for about an hour. This module keeps:
+
+- installation tokens keyed by installation ID until shortly before their
+  ``expires_at``, with concurrent refreshes of the same installation
+  collapsed into a single request;
+- the App JWT, reused until shortly before its 10-minute expiry;
+- the parsed private key, so the PEM is decoded and loaded once.
+
+An optional Redis tier shares installation tokens between workers so that
+each worker does not mint its own. Redis failures are logged and ignored;
+the in-process tier keeps working.
+"""
+
+import asyncio
+import base64
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+from app.core.settings import get_settings
+from logconfig.logger import get_logger
+
+logger = get_logger()
+settings = get_settings()
+
+# GitHub rejects App JWTs valid for more than 10 minutes
+APP_JWT_LIFETIME_SECONDS = 10 * 60
+
+
+@dataclass
+class InstallationToken:
+    """An installation access token and its expiry (epoch seconds)."""
+
+    token: str
+    expires_at: float
+
+
+@dataclass
+class TokenUsage:
+    """Installation token lookups made within one ``track_usage`` block."""
+
+    requested: int = 0
+    served_from_cache: int = 0
+
+
+_token_usage: ContextVar[Optional[TokenUsage]] = ContextVar("github_token_usage", default=None)
+
+
+class GitHubCredentialCache:
+    """
+    Process-wide cache of GitHub App JWTs and installation access tokens.
+
+    Installation tokens are refreshed ``refresh_margin_seconds`` before they
+    expire so callers never receive a token that lapses mid-operation.
+    """
+
+    def __init__(
+        self,
+        refresh_margin_seconds: int = 300,
+        jwt_refresh_margin_seconds: int = 60,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "github:installation_token",
+    ):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.jwt_refresh_margin_seconds = jwt_refresh_margin_seconds
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+
+        self._tokens: Dict[int, InstallationToken] = {}
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._jwt: Optional[Tuple[str, str, float]] = None  # (app_id, token, exp)
+        self._private_keys: Dict[str, Any] = {}
+        self._redis = None
+
+        self._stats = {
+            "hits": 0,
+            "redis_hits": 0,
+            "coalesced": 0,
+            "mints": 0,
+            "jwt_hits": 0,
+            "jwt_signs": 0,
+            "invalidations": 0,
+            "mint_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # App JWT
+    # ------------------------------------------------------------------
+
+    def load_private_key(self, raw_key: str) -> Any:
+        """
+        Parse a PEM or base64-encoded PEM private key once.
+
+        Returns:
+            Loaded private key object usable by ``jwt.encode``
+        """
+        key = self._private_keys.get(raw_key)
+        if key is not None:
+            return key
+
+        pem = raw_key
+        if not pem.startswith("-----BEGIN"):
+            try:
+                pem = base64.b64decode(pem).decode('utf-8')
+            except Exception as e:
+                logger.warning(f"Failed to decode private key from base64, using as-is: {e}")
+
+        key = load_pem_private_key(pem.encode('utf-8'), password=None)
+        self._private_keys[raw_key] = key
+        return key
+
+    def get_app_jwt(self, app_id: str, raw_private_key: str) -> str:
+        """
+        Get an App JWT, signing a new one only when the cached one is close
+        to expiry.
+        """
+        now = int(time.time())
+        if self._jwt is not None:
+            cached_app_id, token, exp = self._jwt
+            if cached_app_id == app_id and exp - self.jwt_refresh_margin_seconds > now:
+                self._stats["jwt_hits"] += 1
+                return token
+
+        payload = {
+            "iat": now - 60,  # Issued at time (60 seconds ago to account for clock skew)
+            "exp": now + APP_JWT_LIFETIME_SECONDS,
+            "iss": app_id,  # Issuer (GitHub App ID)
+        }
+        token = jwt.encode(payload, self.load_private_key(raw_private_key), algorithm="RS256")
+        self._jwt = (app_id, token, payload["exp"])
+        self._stats["jwt_signs"] += 1
+        return token
+
+    # ------------------------------------------------------------------
+    # Installation tokens
+    # ------------------------------------------------------------------
+
+    async def get_installation_token(
+        self,
+        installation_id: int,
+        mint: Callable[[], Awaitable[InstallationToken]],
+    ) -> str:
+        """
+        Get an installation access token, minting one with ``mint`` if no
+        usable token is cached locally or in Redis.
+
+        Concurrent callers asking for the same installation share one mint;
+        failures are never cached and propagate to every waiter. Inside
+        ``track_usage`` the lookup is also counted for the caller.
+        """
+        usage = _token_usage.get()
+        cached = self._get_local(installation_id)
+        if cached is not None:
+            self._stats["hits"] += 1
+            if usage is not None:
+                usage.served_from_cache += 1
+            return cached.token
+
+        inflight = self._inflight.get(installation_id)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            if usage is not None:
+                usage.served_from_cache += 1
+        else:
+            inflight = asyncio.ensure_future(self._fetch(installation_id, mint))
+            self._inflight[installation_id] = inflight
+            if usage is not None:
+                usage.requested += 1
+
+        # Shielded so that a cancelled caller does not cancel the fetch the
+        # other waiters share
+        return (await asyncio.shield(inflight)).token
+
+    async def _fetch(
+        self,
+        installation_id: int,
+        mint: Callable[[], Awaitable[InstallationToken]],
+    ) -> InstallationToken:
+        try:
+            token = await self._get_shared(installation_id)
+            if token is not None:
+                self._stats["redis_hits"] += 1
+            else:
+                started = time.perf_counter()
+                try:
+                    token = await mint()
+                finally:
+                    self._stats["mint_seconds"] += time.perf_counter() - started
+                self._stats["mints"] += 1
+                await self._put_shared(installation_id, token)
+
+            self._tokens[installation_id] = token
+            return token
+        finally:
+            self._inflight.pop(installation_id, None)
+
+    def _usable(self, token: InstallationToken) -> bool:
+        return token.expires_at - self.refresh_margin_seconds > time.time()
+
+    def _get_local(self, installation_id: int) -> Optional[InstallationToken]:
+        token = self._tokens.get(installation_id)
+        if token is None:
+            return None
+        if not self._usable(token):
+            del self._tokens[installation_id]
+            return None
+        return token
+
+    async def invalidate(self, installation_id: int) -> None:
+        """Drop an installation's token, e.g. after GitHub rejected it."""
+        self._tokens.pop(installation_id, None)
+        self._stats["invalidations"] += 1
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.delete(f"{self.key_prefix}:{installation_id}")
+        except Exception as e:
+            logger.warning(f"Failed to invalidate shared GitHub token: {e}")
+
+    # ------------------------------------------------------------------
+    # Shared (Redis) tier
+    # ------------------------------------------------------------------
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    async def _get_shared(self, installation_id: int) -> Optional[InstallationToken]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            value = await client.get(f"{self.key_prefix}:{installation_id}")
+        except Exception as e:
+            logger.warning(f"Shared GitHub token cache unavailable: {e}")
+            return None
+        if not value:
+            return None
+
+        data = json.loads(value)
+        token = InstallationToken(token=data["token"], expires_at=float(data["expires_at"]))
+        return token if self._usable(token) else None
+
+    async def _put_shared(self, installation_id: int, token: InstallationToken) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        ttl = int(token.expires_at - self.refresh_margin_seconds - time.time())
+        if ttl <= 0:
+            return
+        try:
+            await client.set(
+                f"{self.key_prefix}:{installation_id}",
+                json.dumps({"token": token.token, "expires_at": token.expires_at}),
+                ex=ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to share GitHub token: {e}")
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            self._redis = None
+
+    @contextmanager
+    def track_usage(self) -> Iterator[TokenUsage]:
+        """
+        Count the installation token lookups of one operation, e.g. a sync.
+
+        Unlike the process-wide statistics, the counts are unaffected by
+        lookups that other requests make concurrently.
+        """
+        usage = TokenUsage()
+        reset = _token_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _token_usage.reset(reset)
+
+    def api_calls_saved(self) -> int:
+        """Installation token requests avoided so far."""
+        return self._stats["hits"] + self._stats["redis_hits"] + self._stats["coalesced"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        mints = self._stats["mints"]
+        return {
+            **self._stats,
+            "cached_installations": len(self._tokens),
+            "api_calls_saved": self.api_calls_saved(),
+            "avg_mint_ms": self._stats["mint_seconds"] * 1000 / mints if mints else 0.0,
+            "shared_tier": bool(self.redis_url),
+        }
+
+
+credential_cache = GitHubCredentialCache(
+    refresh_margin_seconds=settings.GITHUB_TOKEN_REFRESH_MARGIN_SECONDS,
+    redis_url=settings.GITHUB_TOKEN_CACHE_REDIS_URL,
+)
+
+
+def get_github_credential_cache() -> GitHubCredentialCache:
+    """Get the process-wide GitHub credential cache."""
+    return credential_cache
@@ -1,15 +1,28 @@
 """
 LLM Summarization Service for generating semantic summaries of code chunks.
+
+Batch summarization packs several small chunks into one prompt, runs packs
+concurrently under the provider rate limiter, summarizes identical content
+once, and keeps completed summaries so that a failed batch can be resumed
+without repeating finished work.
 """
 
+import asyncio
+import hashlib
 import json
+import re
+import time
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from logconfig.logger import get_logger
 
 logger = get_logger()
 
+# Chunks estimated below this many tokens are packed with others
+SMALL_CHUNK_TOKENS = 400
+
 
 @dataclass
 class CodeChunk:
@@ -34,20 +47,56 @@ class ChunkSummary:
 class LLMSummarizationService:
     """Service for generating semantic summaries of code chunks using LLM."""
 
-    def __init__(self, api_key: str, model: str = "claude-3-haiku-20240307"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-3-haiku-20240307",
+        rate_limiter=None,
+        max_concurrency: int = 4,
+        max_chunks_per_pack: int = 8,
+        pack_token_limit: int = 2000,
+        cache_size: int = 5000
+    ):
         """
         Initialize the LLM summarization service.
 
         Args:
             api_key: Anthropic API key
             model: Claude model to use for summarization
+            rate_limiter: Optional RateLimiter every LLM call must pass
+            max_concurrency: Maximum concurrent LLM calls in a batch
+            max_chunks_per_pack: Maximum chunks summarized by one LLM call
+            pack_token_limit: Maximum estimated input tokens of one packed prompt
+            cache_size: Number of summaries kept by content hash
         """
         self.api_key = api_key
         self.model = model
-        self.client = Anthropic(api_key=api_key) if api_key else None
+        self.client = AsyncAnthropic(api_key=api_key) if api_key else None
         self.max_tokens = 1000
         self.temperature = 0.3
 
+        self.rate_limiter = rate_limiter
+        self.rate_limit_key = f"summarization:{model}"
+        self.max_concurrency = max_concurrency
+        self.max_chunks_per_pack = max_chunks_per_pack
+        self.pack_token_limit = pack_token_limit
+        self.cache_size = cache_size
+
+        # Completed summaries by content hash; fallbacks are never cached so
+        # that re-running a failed batch retries exactly those chunks
+        self._summary_cache: "OrderedDict[str, ChunkSummary]" = OrderedDict()
+        self._stats = {
+            "chunks_requested": 0,
+            "cache_hits": 0,
+            "duplicates": 0,
+            "llm_calls": 0,
+            "packed_calls": 0,
+            "fallbacks": 0,
+            "rate_limited_waits": 0,
+            "total_batch_seconds": 0.0,
+            "chunks_summarized": 0,
+        }
+
     async def summarize_chunk(self, chunk: CodeChunk) -> ChunkSummary:
         """
         Generate a semantic summary of a code chunk.
@@ -65,45 +114,56 @@ class LLMSummarizationService:
             # Generate summary using Claude
             summary_text = await self._generate_summary_with_claude(chunk)
 
-            # Classify summary type
-            summary_type = self._classify_summary_type(summary_text, chunk)
+            return self._build_summary(chunk, summary_text, "claude_analysis")
 
-            # Calculate confidence score
-            confidence_score = self._calculate_confidence_score(chunk, summary_text)
+        except Exception as e:
+            logger.error(f"Failed to summarize chunk: {e}")
+            return self._create_fallback_summary(chunk)
 
-            # Create processing metadata
-            processing_metadata = {
+    def _build_summary(self, chunk: CodeChunk, summary_text: str, method: str) -> ChunkSummary:
+        """Wrap LLM output for a chunk into a ChunkSummary."""
+        return ChunkSummary(
+            original_chunk=chunk,
+            summary_text=summary_text,
+            summary_type=self._classify_summary_type(summary_text, chunk),
+            confidence_score=self._calculate_confidence_score(chunk, summary_text),
+            processing_metadata={
                 "model": self.model,
                 "input_tokens": len(chunk.content.split()),
                 "output_tokens": len(summary_text.split()),
-                "processing_method": "claude_analysis"
+                "processing_method": method
             }
-
-            return ChunkSummary(
-                original_chunk=chunk,
-                summary_text=summary_text,
-                summary_type=summary_type,
-                confidence_score=confidence_score,
-                processing_metadata=processing_metadata
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to summarize chunk: {e}")
-            return self._create_fallback_summary(chunk)
+        )
 
     async def _generate_summary_with_claude(self, chunk: CodeChunk) -> str:
         """Generate summary using Claude."""
         prompt = self._build_summarization_prompt(chunk)
+        return await self._call_claude(prompt)
+
+    async def _call_claude(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """Send a single prompt to Claude once the rate limiter allows it."""
+        await self._wait_for_rate_limit()
+        self._stats["llm_calls"] += 1
 
-        response = self.client.messages.create(
+        response = await self.client.messages.create(
             model=self.model,
-            max_tokens=self.max_tokens,
+            max_tokens=max_tokens or self.max_tokens,
             temperature=self.temperature,
             messages=[{"role": "user", "content": prompt}]
         )
 
         return response.content[0].text.strip()
 
+    async def _wait_for_rate_limit(self) -> None:
+        """Block until the provider rate limiter admits another request."""
+        if self.rate_limiter is None:
+            return
+
+        interval = self.rate_limiter.window / max(self.rate_limiter.requests, 1)
+        while not await self.rate_limiter.is_allowed(self.rate_limit_key):
+            self._stats["rate_limited_waits"] += 1
+            await asyncio.sleep(interval)
+
     def _build_summarization_prompt(self, chunk: CodeChunk) -> str:
         """Build the summarization prompt for Claude."""
         language = chunk.language or "code"
@@ -212,10 +272,237 @@ Be specific and technical, but avoid unnecessary details."""
         """Check if the service is available."""
         return self.client is not None and self.api_key is not None
 
+    @staticmethod
+    def content_hash(chunk: CodeChunk) -> str:
+        """Hash identifying chunks whose summaries are interchangeable."""
+        return hashlib.sha256(f"{chunk.language}\0{chunk.content}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _estimate_tokens(chunk: CodeChunk) -> int:
+        return max(1, min(len(chunk.content), 3000) // 4)
+
     async def batch_summarize(self, chunks: List[CodeChunk]) -> List[ChunkSummary]:
-        """Summarize multiple chunks in batch."""
+        """
+        Summarize multiple chunks in batch.
+
+        Chunks with identical content are summarized once, summaries cached
+        from earlier batches are reused, small chunks are packed several to a
+        prompt, and prompts run concurrently (bounded by ``max_concurrency``
+        and the rate limiter). Chunks that could not be summarized get a
+        fallback summary and are retried when the batch is submitted again.
+
+        Args:
+            chunks: Chunks to summarize
+
+        Returns:
+            Summaries in the same order as ``chunks``
+        """
+        if not chunks:
+            return []
+
+        started = time.perf_counter()
+        self._stats["chunks_requested"] += len(chunks)
+
+        hashes = [self.content_hash(chunk) for chunk in chunks]
+        results: Dict[str, ChunkSummary] = {}
+        pending: Dict[str, CodeChunk] = {}
+
+        for chunk, digest in zip(chunks, hashes):
+            if digest in results or digest in pending:
+                self._stats["duplicates"] += 1
+                continue
+            cached = self._summary_cache.get(digest)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                self._summary_cache.move_to_end(digest)
+                results[digest] = cached
+                continue
+            pending[digest] = chunk
+
+        if pending and self.is_available():
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run_pack(pack: List[tuple]) -> None:
+                async with semaphore:
+                    results.update(await self._summarize_pack(pack))
+
+            await asyncio.gather(
+                *(run_pack(pack) for pack in self._pack_chunks(list(pending.items())))
+            )
+
         summaries = []
-        for chunk in chunks:
-            summary = await self.summarize_chunk(chunk)
+        for chunk, digest in zip(chunks, hashes):
+            summary = results.get(digest)
+            if summary is None:
+                self._stats["fallbacks"] += 1
+                summary = self._create_fallback_summary(chunk)
+            elif summary.original_chunk is not chunk:
+                summary = ChunkSummary(
+                    original_chunk=chunk,
+                    summary_text=summary.summary_text,
+                    summary_type=summary.summary_type,
+                    confidence_score=summary.confidence_score,
+                    processing_metadata=summary.processing_metadata
+                )
             summaries.append(summary)
-        return summaries
\ No newline at end of file
+
+        elapsed = time.perf_counter() - started
+        self._stats["total_batch_seconds"] += elapsed
+        self._stats["chunks_summarized"] += len(chunks)
+        logger.info(
+            f"Summarized {len(chunks)} chunks ({len(pending)} via LLM) in {elapsed:.2f}s"
+        )
+        return summaries
+
+    def _pack_chunks(self, items: List[tuple]) -> List[List[tuple]]:
+        """Group (hash, chunk) pairs into packs; large chunks go alone."""
+        packs: List[List[tuple]] = []
+        current: List[tuple] = []
+        current_tokens = 0
+
+        for digest, chunk in items:
+            tokens = self._estimate_tokens(chunk)
+            if tokens >= SMALL_CHUNK_TOKENS:
+                packs.append([(digest, chunk)])
+                continue
+
+            if current and (
+                len(current) >= self.max_chunks_per_pack
+                or current_tokens + tokens > self.pack_token_limit
+            ):
+                packs.append(current)
+                current, current_tokens = [], 0
+
+            current.append((digest, chunk))
+            current_tokens += tokens
+
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _summarize_pack(self, pack: List[tuple]) -> Dict[str, ChunkSummary]:
+        """
+        Summarize one pack, falling back to per-chunk calls for anything the
+        packed response did not cover.
+
+        Returns:
+            Summaries by content hash; chunks that failed are absent
+        """
+        summaries: Dict[str, ChunkSummary] = {}
+        remaining = pack
+
+        if len(pack) > 1:
+            try:
+                self._stats["packed_calls"] += 1
+                response = await self._call_claude(
+                    self._build_packed_prompt([chunk for _, chunk in pack]),
+                    max_tokens=min(self.max_tokens * len(pack), 4000)
+                )
+                texts = self._parse_packed_response(response, len(pack))
+                remaining = []
+                for index, (digest, chunk) in enumerate(pack):
+                    text = texts.get(index)
+                    if text:
+                        summaries[digest] = self._remember(
+                            digest, self._build_summary(chunk, text, "claude_batch_analysis")
+                        )
+                    else:
+                        remaining.append((digest, chunk))
+            except Exception as e:
+                logger.warning(f"Packed summarization of {len(pack)} chunks failed, retrying individually: {e}")
+
+        for digest, chunk in remaining:
+            try:
+                text = await self._generate_summary_with_claude(chunk)
+                summaries[digest] = self._remember(
+                    digest, self._build_summary(chunk, text, "claude_analysis")
+                )
+            except Exception as e:
+                logger.error(f"Failed to summarize chunk {chunk.file_path}#{chunk.chunk_index}: {e}")
+
+        return summaries
+
+    def _remember(self, digest: str, summary: ChunkSummary) -> ChunkSummary:
+        self._summary_cache[digest] = summary
+        self._summary_cache.move_to_end(digest)
+        while len(self._summary_cache) > self.cache_size:
+            self._summary_cache.popitem(last=False)
+        return summary
+
+    def _build_packed_prompt(self, chunks: List[CodeChunk]) -> str:
+        """Build one prompt asking for a summary of each of several chunks."""
+        sections = []
+        for index, chunk in enumerate(chunks):
+            language = chunk.language or "code"
+            sections.append(
+                f"### Chunk {index}\n```{language}\n{chunk.content[:3000]}\n```"
+            )
+
+        return f"""Analyze each of the following code chunks and provide a concise semantic summary of each.
+
+For every chunk, focus on what it does, its key components, important patterns or
+configurations, security implications (if any) and dependencies.
+Each summary should be 2-3 specific, technical sentences.
+
+{chr(10).join(sections)}
+
+Respond with JSON only, in exactly this shape, with one entry per chunk:
+{{"summaries": [{{"id": 0, "summary": "..."}}]}}"""
+
+    @staticmethod
+    def _parse_packed_response(response: str, expected: int) -> Dict[int, str]:
+        """Parse the per-chunk summaries of a packed response by chunk id."""
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if not match:
+            return {}
+
+        data = json.loads(match.group(0))
+        texts = {}
+        for entry in data.get("summaries", []):
+            try:
+                index = int(entry.get("id"))
+            except (TypeError, ValueError):
+                continue
+            text = (entry.get("summary") or "").strip()
+            if 0 <= index < expected and text:
+                texts[index] = text
+        return texts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch summarization statistics, including throughput."""
+        seconds = self._stats["total_batch_seconds"]
+        return {
+            **self._stats,
+            "cached_summaries": len(self._summary_cache),
+            "chunks_per_second": (
+                self._stats["chunks_summarized"] / seconds if seconds else 0.0
+            ),
+        }
+
+
+_summarization_service: Optional[LLMSummarizationService] = None
+
+
+def get_summarization_service() -> LLMSummarizationService:
+    """
+    Get the process-wide summarization service.
+
+    Sharing one instance lets every embedding job reuse summaries already
+    produced, so a re-run after a partial failure only summarizes what is
+    missing. LLM calls pass through the code generation rate limiter.
+    """
+    global _summarization_service
+    if _summarization_service is None:
+        from app.core.settings import get_settings
+        from app.services.code_generation.registry import get_component_registry
+
+        settings = get_settings()
+        _summarization_service = LLMSummarizationService(
+            api_key=settings.ANTHROPIC_API_KEY,
+            rate_limiter=get_component_registry().rate_limiter(),
+            max_concurrency=settings.SUMMARIZATION_MAX_CONCURRENCY,
+            max_chunks_per_pack=settings.SUMMARIZATION_MAX_CHUNKS_PER_PACK,
+            pack_token_limit=settings.SUMMARIZATION_PACK_TOKEN_LIMIT,
+            cache_size=settings.SUMMARIZATION_CACHE_SIZE
+        )
+    return _summarization_service
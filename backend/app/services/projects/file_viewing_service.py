@@ -17,8 +17,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 import yaml
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.project import Project, ProjectFile, CodeGeneration, GeneratedFile
 from app.services.azure.file_operations import FileOperationsService
@@ -98,7 +98,7 @@ class FileSearchResult:
 class FileViewingService:
     """Service for enhanced file viewing with syntax highlighting."""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession):
         """Initialize the file viewing service."""
         self.db = db_session
         self.azure_service = FileOperationsService()
@@ -135,14 +135,15 @@ class FileViewingService:
         """
         # Get all project files with generation info
         query = (
-            self.db.query(ProjectFile, CodeGeneration, GeneratedFile)
+            select(ProjectFile, CodeGeneration, GeneratedFile)
             .outerjoin(GeneratedFile, ProjectFile.id == GeneratedFile.project_file_id)
             .outerjoin(CodeGeneration, GeneratedFile.generation_id == CodeGeneration.id)
-            .filter(ProjectFile.project_id == project_id)
+            .where(ProjectFile.project_id == project_id)
             .order_by(ProjectFile.file_path)
         )
 
-        files_data = query.all()
+        result = await self.db.execute(query)
+        files_data = result.all()
 
         if group_by_generation:
             return self._build_generation_grouped_tree(files_data, include_metadata)
@@ -290,16 +291,15 @@ class FileViewingService:
             SyntaxHighlightedContent with highlighted content
         """
         # Get file record
-        file_record = (
-            self.db.query(ProjectFile)
-            .filter(
+        result = await self.db.execute(
+            select(ProjectFile).where(
                 and_(
                     ProjectFile.project_id == project_id,
                     ProjectFile.file_path == file_path,
                 )
             )
-            .first()
         )
+        file_record = result.scalars().first()
 
         if not file_record:
             raise FileNotFoundError(
@@ -471,14 +471,12 @@ class FileViewingService:
             List of FileSearchResult objects
         """
         # Build file query
-        file_query = self.db.query(ProjectFile).filter(
-            ProjectFile.project_id == project_id
-        )
+        file_query = select(ProjectFile).where(ProjectFile.project_id == project_id)
 
         if file_types:
-            file_query = file_query.filter(ProjectFile.file_type.in_(file_types))
+            file_query = file_query.where(ProjectFile.file_type.in_(file_types))
 
-        files = file_query.all()
+        files = (await self.db.execute(file_query)).scalars().all()
         results = []
 
         for file_record in files:
@@ -496,15 +494,15 @@ class FileViewingService:
 
                 if filename_score > 0 or content_matches:
                     # Get generation info if available
-                    generation_query = (
-                        self.db.query(CodeGeneration)
+                    generation_result = await self.db.execute(
+                        select(CodeGeneration)
                         .join(
                             GeneratedFile,
                             CodeGeneration.id == GeneratedFile.generation_id,
                         )
-                        .filter(GeneratedFile.project_file_id == file_record.id)
-                        .first()
+                        .where(GeneratedFile.project_file_id == file_record.id)
                     )
+                    generation_query = generation_result.scalars().first()
 
                     generation_id = generation_query.id if generation_query else None
 
@@ -13,7 +13,7 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Set, Tuple, Any
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, and_, or_
@@ -22,6 +22,7 @@ from app.models.project import Project, ProjectFile, ProjectStatus
 from app.services.azure.file_operations import FileOperationsService, get_file_operations_service
 from app.services.azure.folder_manager import ProjectFolderManager, get_folder_manager
 from app.services.projects.reconciliation import ReconciliationService
+from app.services.sync.metadata_sync import SyncResolutionStrategy, get_metadata_sync_manager
 
 
 class SyncDirection(Enum):
@@ -479,63 +480,57 @@ class SyncService:
         conflict_resolution: SyncConflictResolution,
         force: bool
     ) -> SyncResult:
-        """Synchronize from Azure File Share to database."""
+        """
+        Synchronize from Azure File Share to database.
+        
+        Delegates to the metadata sync manager, which compares files by the
+        hashes stored in Azure metadata and by ETag before downloading any
+        content.
+        """
         result = SyncResult(
             success=True,
             project_id=project.id,
             direction=SyncDirection.AZURE_TO_DATABASE
         )
 
-        try:
-            # Get Azure files
-            azure_files = await self.folder_manager.list_project_files(project.id)
-            result.files_processed = len(azure_files)
-
-            # Get existing database files
-            db_files = await self._get_database_files(project.id)
-            db_file_map = {f.file_path: f for f in db_files}
+        strategy = {
+            SyncConflictResolution.AZURE_WINS: SyncResolutionStrategy.AZURE_WINS,
+            SyncConflictResolution.DATABASE_WINS: SyncResolutionStrategy.DATABASE_WINS,
+            SyncConflictResolution.MANUAL: SyncResolutionStrategy.MANUAL,
+        }.get(conflict_resolution)
 
-            for azure_file in azure_files:
-                try:
-                    if azure_file.file_path in db_file_map:
-                        # File exists in database, check for conflicts
-                        db_file = db_file_map[azure_file.file_path]
-                        
-                        if self._has_metadata_conflict(db_file, azure_file):
-                            # Handle conflict
-                            conflict = SyncConflict(
-                                file_path=azure_file.file_path,
-                                project_id=project.id,
-                                conflict_type="metadata_mismatch",
-                                database_metadata=self._extract_file_metadata(db_file),
-                                azure_metadata=self._extract_azure_metadata(azure_file)
-                            )
-                            
-                            if conflict_resolution == SyncConflictResolution.AZURE_WINS or force:
-                                # Update database with Azure metadata
-                                await self._update_database_file_from_azure(db_file, azure_file)
-                                result.files_synced += 1
-                            else:
-                                result.conflicts.append(conflict)
-                                result.conflicts_detected += 1
-                        else:
-                            # No conflict, skip if not forced
-                            if force:
-                                await self._update_database_file_from_azure(db_file, azure_file)
-                                result.files_synced += 1
-                            else:
-                                result.files_skipped += 1
-                    else:
-                        # File doesn't exist in database, create it
-                        await self._create_database_file_from_azure(project.id, azure_file)
-                        result.files_synced += 1
+        try:
+            metadata_sync = await get_metadata_sync_manager()
+            metadata_result = await metadata_sync.sync_project_metadata(
+                project.id,
+                self.db,
+                force_full_sync=force,
+                resolution_strategy=strategy
+            )
 
-                except Exception as e:
-                    error_msg = f"Failed to sync file {azure_file.file_path}: {str(e)}"
-                    result.errors.append(error_msg)
-                    self.logger.error(error_msg)
+            resolved = [c for c in metadata_result.conflicts if c.resolved]
+            unresolved = [c for c in metadata_result.conflicts if not c.resolved]
 
-            result.success = len(result.errors) == 0
+            result.files_synced = (
+                metadata_result.files_added
+                + metadata_result.files_updated
+                + metadata_result.files_deleted
+                + len(resolved)
+            )
+            result.files_processed = result.files_synced + len(unresolved)
+            result.conflicts_detected = len(unresolved)
+            for conflict in unresolved:
+                result.conflicts.append(SyncConflict(
+                    file_path=conflict.file_path,
+                    project_id=project.id,
+                    conflict_type=conflict.conflict_type.value,
+                    database_metadata=conflict.db_metadata,
+                    azure_metadata=(
+                        asdict(conflict.azure_metadata) if conflict.azure_metadata else None
+                    )
+                ))
+            result.errors.extend(metadata_result.errors)
+            result.success = metadata_result.success
 
         except Exception as e:
             result.success = False
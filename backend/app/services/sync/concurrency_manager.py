@@ -7,9 +7,12 @@ implementing various locking strategies and optimistic concurrency control.
 
 import asyncio
 import logging
+import os
+import socket
 import time
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set, Any, Callable, Awaitable
+from typing import Dict, List, Optional, Set, Any, Callable, Awaitable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
@@ -22,10 +25,35 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.models.project import Project, ProjectFile
 from app.exceptions.azure_exceptions import ConcurrencyError, LockTimeoutError
+from app.services.sync.lock_backends import LockBackend, get_lock_backend
 
 
 logger = logging.getLogger(__name__)
 
+# Identifies this process among the workers sharing a lock backend
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Lock holder token per asyncio task; entries go away with their tasks
+_task_holders: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def _holder_token() -> str:
+    """
+    Identify the code path acquiring a lock: this worker plus the current task.
+
+    Re-entrancy is granted per holder, so a task can nest acquisitions of a
+    resource it holds, while other tasks and workers acting for the same
+    user still conflict.
+    """
+    task = asyncio.current_task()
+    if task is None:
+        return f"{_WORKER_ID}:{uuid4()}"
+    token = _task_holders.get(task)
+    if token is None:
+        token = f"{_WORKER_ID}:{uuid4()}"
+        _task_holders[task] = token
+    return token
+
 
 class LockType(Enum):
     """Types of locks that can be acquired."""
@@ -52,6 +80,8 @@ class LockInfo:
     acquired_at: datetime
     expires_at: Optional[datetime] = None
     metadata: Optional[Dict[str, Any]] = None
+    fencing_token: Optional[int] = None
+    lease_seconds: Optional[float] = None
 
 
 @dataclass
@@ -65,16 +95,35 @@ class OptimisticLockInfo:
 
 class DistributedLock:
     """
-    Distributed lock implementation using database-backed coordination.
+    Distributed lock implementation backed by a pluggable lock backend.
     
-    Provides distributed locking across multiple application instances
-    using the database as the coordination mechanism.
+    With the Redis backend, locks are shared by every application instance:
+    exclusive and write locks exclude everything else, read locks are shared,
+    and each grant carries a fencing token that downstream writes can use to
+    reject stale holders. Locks taken by the same asyncio task never conflict,
+    so a task can re-acquire a resource it already holds; ``owner_id`` (the
+    user) is recorded for reporting only and grants no re-entrancy. Waiters
+    are woken by release notifications rather than polling, and held leases
+    can be renewed in the background.
     """
     
-    def __init__(self, db_session: AsyncSession, timeout: float = 30.0):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        timeout: float = 30.0,
+        backend: Optional[LockBackend] = None,
+        lease_seconds: Optional[float] = None
+    ):
         self.db_session = db_session
         self.timeout = timeout
+        self.backend = backend or get_lock_backend()
+        self.lease_seconds = lease_seconds
         self._locks: Dict[str, LockInfo] = {}
+        self._renewal_tasks: Dict[str, asyncio.Task] = {}
+    
+    @staticmethod
+    def _resource_key(resource_id: str, lock_scope: LockScope) -> str:
+        return f"{lock_scope.value}:{resource_id}"
     
     async def acquire_lock(
         self,
@@ -83,7 +132,9 @@ class DistributedLock:
         lock_scope: LockScope,
         owner_id: str,
         timeout: Optional[float] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        lease_seconds: Optional[float] = None,
+        auto_renew: bool = False
     ) -> LockInfo:
         """
         Acquire a distributed lock for a resource.
@@ -92,62 +143,112 @@ class DistributedLock:
             resource_id: Unique identifier for the resource
             lock_type: Type of lock to acquire
             lock_scope: Scope of the lock
-            owner_id: Identifier of the lock owner
-            timeout: Lock timeout in seconds
+            owner_id: User or service the lock is taken for (reporting only)
+            timeout: Maximum time to wait for the lock in seconds
             metadata: Additional metadata for the lock
+            lease_seconds: Lease duration; defaults to the wait timeout
+            auto_renew: Renew the lease in the background until released
             
         Returns:
-            LockInfo object with lock details
+            LockInfo object with lock details and fencing token
             
         Raises:
             LockTimeoutError: If lock cannot be acquired within timeout
-            ConcurrencyError: If there are conflicting locks
+            ConcurrencyError: If the lock backend fails
         """
         lock_timeout = timeout or self.timeout
+        lease = lease_seconds or self.lease_seconds or lock_timeout
         lock_id = str(uuid4())
-        start_time = time.time()
+        resource_key = self._resource_key(resource_id, lock_scope)
+        start_time = time.perf_counter()
         
         logger.debug(
             f"Attempting to acquire {lock_type.value} lock for {lock_scope.value} "
             f"{resource_id} by {owner_id}"
         )
         
-        while time.time() - start_time < lock_timeout:
-            try:
-                # Check for conflicting locks
-                conflicting_locks = await self._get_conflicting_locks(
-                    resource_id, lock_type, lock_scope, owner_id
-                )
-                
-                if not conflicting_locks:
-                    # No conflicts, acquire the lock
-                    lock_info = LockInfo(
-                        lock_id=lock_id,
-                        resource_id=resource_id,
-                        lock_type=lock_type,
-                        lock_scope=lock_scope,
-                        owner_id=owner_id,
-                        acquired_at=datetime.utcnow(),
-                        expires_at=datetime.utcnow() + timedelta(seconds=lock_timeout),
-                        metadata=metadata or {}
-                    )
-                    
-                    await self._store_lock(lock_info)
-                    self._locks[lock_id] = lock_info
-                    
-                    logger.debug(f"Acquired lock {lock_id} for {resource_id}")
-                    return lock_info
-                
-                # Wait before retrying
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"Error acquiring lock for {resource_id}: {str(e)}")
-                raise ConcurrencyError(f"Failed to acquire lock: {str(e)}")
+        try:
+            fencing_token = await self.backend.acquire(
+                resource_key,
+                lock_id,
+                exclusive=lock_type != LockType.READ,
+                lease_ms=int(lease * 1000),
+                timeout=lock_timeout,
+                owner_id=_holder_token()
+            )
+        except Exception as e:
+            logger.error(f"Error acquiring lock for {resource_id}: {str(e)}")
+            raise ConcurrencyError(f"Failed to acquire lock: {str(e)}", resource_id=resource_id)
         
-        raise LockTimeoutError(
-            f"Timeout acquiring {lock_type.value} lock for {resource_id}"
+        if fencing_token is None:
+            raise LockTimeoutError(
+                f"Timeout acquiring {lock_type.value} lock for {resource_id}",
+                timeout_seconds=lock_timeout,
+                lock_type=lock_type.value
+            )
+        
+        now = datetime.utcnow()
+        lock_info = LockInfo(
+            lock_id=lock_id,
+            resource_id=resource_id,
+            lock_type=lock_type,
+            lock_scope=lock_scope,
+            owner_id=owner_id,
+            acquired_at=now,
+            expires_at=now + timedelta(seconds=lease),
+            metadata=metadata or {},
+            fencing_token=fencing_token,
+            lease_seconds=lease
         )
+        self._locks[lock_id] = lock_info
+        
+        if auto_renew:
+            self._renewal_tasks[lock_id] = asyncio.create_task(
+                self._renew_until_released(lock_info)
+            )
+        
+        logger.debug(
+            f"Acquired lock {lock_id} for {resource_id} (fence={fencing_token}) "
+            f"in {(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return lock_info
+    
+    async def renew_lock(self, lock_info: LockInfo, lease_seconds: Optional[float] = None) -> bool:
+        """
+        Extend the lease of a held lock.
+        
+        Args:
+            lock_info: Lock to renew
+            lease_seconds: New lease duration; defaults to the original lease
+            
+        Returns:
+            True if the lease was extended, False if it had already been lost
+        """
+        lease = lease_seconds or lock_info.lease_seconds or self.timeout
+        renewed = await self.backend.renew(
+            self._resource_key(lock_info.resource_id, lock_info.lock_scope),
+            lock_info.lock_id,
+            int(lease * 1000)
+        )
+        if renewed:
+            lock_info.expires_at = datetime.utcnow() + timedelta(seconds=lease)
+        return renewed
+    
+    async def _renew_until_released(self, lock_info: LockInfo):
+        """Renew a lease at a third of its duration until it is released or lost."""
+        interval = max((lock_info.lease_seconds or self.timeout) / 3, 0.1)
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if not await self.renew_lock(lock_info):
+                    logger.warning(
+                        f"Lost lease for lock {lock_info.lock_id} on {lock_info.resource_id}"
+                    )
+                    return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error renewing lock {lock_info.lock_id}: {str(e)}")
     
     async def release_lock(self, lock_info: LockInfo) -> bool:
         """
@@ -159,8 +260,15 @@ class DistributedLock:
         Returns:
             True if lock was successfully released
         """
+        renewal_task = self._renewal_tasks.pop(lock_info.lock_id, None)
+        if renewal_task:
+            renewal_task.cancel()
+        
         try:
-            await self._remove_lock(lock_info.lock_id)
+            await self.backend.release(
+                self._resource_key(lock_info.resource_id, lock_info.lock_scope),
+                lock_info.lock_id
+            )
             
             if lock_info.lock_id in self._locks:
                 del self._locks[lock_info.lock_id]
@@ -171,55 +279,6 @@ class DistributedLock:
         except Exception as e:
             logger.error(f"Error releasing lock {lock_info.lock_id}: {str(e)}")
             return False
-    
-    async def _get_conflicting_locks(
-        self,
-        resource_id: str,
-        lock_type: LockType,
-        lock_scope: LockScope,
-        owner_id: str
-    ) -> List[LockInfo]:
-        """Get locks that would conflict with the requested lock."""
-        # For simplicity, we'll use in-memory tracking
-        # In production, this would query a locks table in the database
-        conflicting = []
-        
-        for lock_info in self._locks.values():
-            if (lock_info.resource_id == resource_id and 
-                lock_info.owner_id != owner_id and
-                self._locks_conflict(lock_info.lock_type, lock_type)):
-                
-                # Check if lock has expired
-                if (lock_info.expires_at and 
-                    datetime.utcnow() > lock_info.expires_at):
-                    # Lock expired, remove it
-                    await self._remove_lock(lock_info.lock_id)
-                    continue
-                
-                conflicting.append(lock_info)
-        
-        return conflicting
-    
-    def _locks_conflict(self, existing_type: LockType, requested_type: LockType) -> bool:
-        """Check if two lock types conflict."""
-        if existing_type == LockType.EXCLUSIVE or requested_type == LockType.EXCLUSIVE:
-            return True
-        
-        if existing_type == LockType.WRITE or requested_type == LockType.WRITE:
-            return True
-        
-        # Multiple read locks are allowed
-        return False
-    
-    async def _store_lock(self, lock_info: LockInfo):
-        """Store lock information (placeholder for database storage)."""
-        # In production, this would insert into a locks table
-        pass
-    
-    async def _remove_lock(self, lock_id: str):
-        """Remove lock information (placeholder for database removal)."""
-        # In production, this would delete from locks table
-        pass
 
 
 class OptimisticLockManager:
@@ -382,7 +441,8 @@ class ConcurrencyManager:
                 lock_type=LockType.EXCLUSIVE,
                 lock_scope=LockScope.PROJECT,
                 owner_id=str(user_id),
-                timeout=timeout
+                timeout=timeout,
+                auto_renew=True
             )
             
             logger.info(f"Acquired exclusive access to project {project_id} for user {user_id}")
@@ -415,7 +475,8 @@ class ConcurrencyManager:
                 lock_type=LockType.READ,
                 lock_scope=LockScope.PROJECT,
                 owner_id=str(user_id),
-                timeout=timeout
+                timeout=timeout,
+                auto_renew=True
             )
             
             logger.debug(f"Acquired shared access to project {project_id} for user {user_id}")
@@ -453,7 +514,8 @@ class ConcurrencyManager:
                 lock_scope=LockScope.FILE,
                 owner_id=str(user_id),
                 timeout=timeout,
-                metadata={"project_id": project_id, "file_path": file_path}
+                metadata={"project_id": project_id, "file_path": file_path},
+                auto_renew=True
             )
             
             logger.debug(f"Acquired write access to file {file_path} in project {project_id}")
@@ -0,0 +1,451 @@
+"""
+Lock storage backends for the distributed lock in concurrency_manager.
+
+Two backends are provided:
+
+- ``InMemoryLockBackend`` coordinates tasks inside a single process. It is the
+  default and is what local development and single-worker deployments use.
+- ``RedisLockBackend`` coordinates every worker that shares a Redis instance.
+  Holders live in a sorted set scored by lease expiry, every grant returns a
+  monotonically increasing fencing token, and waiters are woken by pub/sub
+  release notifications instead of polling.
+
+Both backends implement shared (read) / exclusive (write) semantics: any
+number of readers, or exactly one writer. Grants are re-entrant per holder:
+grants with the same ``owner_id`` never block each other, so a holder can lock
+a resource again (or upgrade a read to a write) without deadlocking on itself.
+Callers must therefore pass a token unique to the holding task, not a user id.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a waiter sleeps without re-checking, in case a
+# holder dies without releasing and its lease has to run out.
+DEFAULT_MAX_WAIT_SLICE = 5.0
+
+
+class LockBackend:
+    """Interface for lock storage backends."""
+
+    async def acquire(
+        self,
+        resource_key: str,
+        lock_id: str,
+        exclusive: bool,
+        lease_ms: int,
+        timeout: float,
+        owner_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Acquire a shared or exclusive lease on a resource.
+
+        Args:
+            resource_key: Fully qualified resource key (scope and resource id)
+            lock_id: Unique identifier of this lock grant
+            exclusive: True for an exclusive (write) lease, False for shared
+            lease_ms: Lease duration in milliseconds
+            timeout: Maximum time to wait for the lease, in seconds
+            owner_id: Holder token of the grant (one per task); leases with the same token do
+                not conflict. None makes the grant conflict with every holder.
+
+        Returns:
+            Fencing token for the grant, or None if the timeout elapsed
+        """
+        raise NotImplementedError
+
+    async def release(self, resource_key: str, lock_id: str) -> bool:
+        """Release a lease. Returns True if the lease was still held."""
+        raise NotImplementedError
+
+    async def renew(self, resource_key: str, lock_id: str, lease_ms: int) -> bool:
+        """Extend a lease. Returns False if the lease was already lost."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+@dataclass
+class _Holder:
+    """A single grant on a resource in the in-memory backend."""
+
+    owner_id: Optional[str]
+    exclusive: bool
+    expires: float
+
+
+@dataclass
+class _ResourceState:
+    """Holders and waiters of a single resource in the in-memory backend."""
+
+    holders: Dict[str, _Holder] = field(default_factory=dict)
+    waiters: int = 0
+    released: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class InMemoryLockBackend(LockBackend):
+    """
+    Process-local backend with event-based wake-ups.
+
+    A resource's state is dropped once it has no holders and no waiters, so
+    the backend only tracks resources that are currently in use. Fencing
+    tokens come from one backend-wide counter, which keeps them increasing
+    per resource across those resets.
+    """
+
+    def __init__(self, max_wait_slice: float = DEFAULT_MAX_WAIT_SLICE):
+        self.max_wait_slice = max_wait_slice
+        self._resources: Dict[str, _ResourceState] = {}
+        self._fence = 0
+
+    def _state(self, resource_key: str) -> _ResourceState:
+        state = self._resources.get(resource_key)
+        if state is None:
+            state = _ResourceState()
+            self._resources[resource_key] = state
+        return state
+
+    def _discard_if_idle(self, resource_key: str, state: _ResourceState) -> None:
+        if not state.holders and not state.waiters and self._resources.get(resource_key) is state:
+            del self._resources[resource_key]
+
+    @staticmethod
+    def _expire(state: _ResourceState, now: float) -> None:
+        for lock_id, holder in list(state.holders.items()):
+            if holder.expires <= now:
+                del state.holders[lock_id]
+
+    @staticmethod
+    def _blockers(state: _ResourceState, exclusive: bool, owner_id: Optional[str]):
+        return [
+            holder for holder in state.holders.values()
+            if (exclusive or holder.exclusive)
+            and (owner_id is None or holder.owner_id != owner_id)
+        ]
+
+    async def acquire(
+        self,
+        resource_key: str,
+        lock_id: str,
+        exclusive: bool,
+        lease_ms: int,
+        timeout: float,
+        owner_id: Optional[str] = None,
+    ) -> Optional[int]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        state = self._state(resource_key)
+        state.waiters += 1
+
+        try:
+            while True:
+                now = loop.time()
+                self._expire(state, now)
+
+                blockers = self._blockers(state, exclusive, owner_id)
+                if not blockers:
+                    state.holders[lock_id] = _Holder(
+                        owner_id=owner_id,
+                        exclusive=exclusive,
+                        expires=now + lease_ms / 1000,
+                    )
+                    self._fence += 1
+                    return self._fence
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+
+                next_expiry = max(min(holder.expires for holder in blockers) - now, 0.0)
+                wait = min(remaining, self.max_wait_slice, next_expiry or remaining)
+                try:
+                    await asyncio.wait_for(state.released.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            state.waiters -= 1
+            self._discard_if_idle(resource_key, state)
+
+    async def release(self, resource_key: str, lock_id: str) -> bool:
+        state = self._resources.get(resource_key)
+        if state is None or state.holders.pop(lock_id, None) is None:
+            return False
+
+        # Wake current waiters, then arm a fresh event for the next round
+        state.released.set()
+        state.released = asyncio.Event()
+        self._discard_if_idle(resource_key, state)
+        return True
+
+    async def renew(self, resource_key: str, lock_id: str, lease_ms: int) -> bool:
+        state = self._resources.get(resource_key)
+        holder = state.holders.get(lock_id) if state is not None else None
+        if holder is None:
+            return False
+
+        now = asyncio.get_running_loop().time()
+        if holder.expires <= now:
+            return False
+        holder.expires = now + lease_ms / 1000
+        return True
+
+
+# KEYS: leases (zset lock_id -> expiry ms), holders (hash lock_id -> "mode:owner"), fence
+# ARGV: mode ("w"/"r"), lock_id, owner_id ("" for none), lease_ms
+# Returns the fencing token (> 0) on success, or -wait_ms on conflict.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local lease = tonumber(ARGV[4])
+
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)
+if #expired > 0 then
+    redis.call('ZREM', KEYS[1], unpack(expired))
+    redis.call('HDEL', KEYS[2], unpack(expired))
+end
+
+local wait = nil
+local leases = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+for i = 1, #leases, 2 do
+    local info = redis.call('HGET', KEYS[2], leases[i]) or 'w:'
+    local mode = string.sub(info, 1, 1)
+    local owner = string.sub(info, 3)
+    if (ARGV[1] == 'w' or mode == 'w') and (ARGV[3] == '' or owner ~= ARGV[3]) then
+        local remaining = math.max(tonumber(leases[i + 1]) - now, 1)
+        if wait == nil or remaining < wait then
+            wait = remaining
+        end
+    end
+end
+if wait ~= nil then
+    return -wait
+end
+
+redis.call('ZADD', KEYS[1], now + lease, ARGV[2])
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[1] .. ':' .. ARGV[3])
+for _, key in ipairs({KEYS[1], KEYS[2]}) do
+    if redis.call('PTTL', key) < lease then
+        redis.call('PEXPIRE', key, lease)
+    end
+end
+return redis.call('INCR', KEYS[3])
+"""
+
+# KEYS: leases, holders, channel  ARGV: lock_id
+_RELEASE_SCRIPT = """
+local released = redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if released > 0 then
+    redis.call('PUBLISH', KEYS[3], ARGV[1])
+end
+return released
+"""
+
+# KEYS: leases, holders  ARGV: lock_id, lease_ms
+_RENEW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local lease = tonumber(ARGV[2])
+local expires = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not expires or tonumber(expires) <= now then
+    return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', now + lease, ARGV[1])
+for _, key in ipairs({KEYS[1], KEYS[2]}) do
+    if redis.call('PTTL', key) < lease then
+        redis.call('PEXPIRE', key, lease)
+    end
+end
+return 1
+"""
+
+
+class RedisLockBackend(LockBackend):
+    """
+    Redis-backed lock shared by every worker using the same Redis.
+
+    All state transitions run as Lua scripts so that conflict checks and
+    grants are atomic. Keys share a hash tag so the backend also works on
+    Redis Cluster.
+
+    Release notifications arrive on one pattern subscription per backend,
+    read by a single listener task that wakes the waiters of the released
+    resource, so waiting does not cost a pub/sub connection per acquire.
+    """
+
+    def __init__(
+        self,
+        client,
+        key_prefix: str = "lock",
+        max_wait_slice: float = DEFAULT_MAX_WAIT_SLICE,
+    ):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.max_wait_slice = max_wait_slice
+        self._acquire_script = client.register_script(_ACQUIRE_SCRIPT)
+        self._release_script = client.register_script(_RELEASE_SCRIPT)
+        self._renew_script = client.register_script(_RENEW_SCRIPT)
+
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._listener_lock = asyncio.Lock()
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+
+    def _keys(self, resource_key: str) -> Dict[str, str]:
+        base = f"{self.key_prefix}:{{{resource_key}}}"
+        return {
+            "leases": f"{base}:leases",
+            "holders": f"{base}:holders",
+            "fence": f"{base}:fence",
+            "channel": f"{base}:released",
+        }
+
+    async def _ensure_listener(self) -> None:
+        if self._listener is not None and not self._listener.done():
+            return
+        async with self._listener_lock:
+            if self._listener is not None and not self._listener.done():
+                return
+            pubsub = self.client.pubsub()
+            await pubsub.psubscribe(f"{self.key_prefix}:*:released")
+            self._pubsub = pubsub
+            self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "pmessage":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                for event in self._waiters.get(channel, ()):
+                    event.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Lock release listener stopped: {str(e)}")
+        finally:
+            # Let every waiter re-check; the next acquire restarts the listener
+            for events in self._waiters.values():
+                for event in events:
+                    event.set()
+
+    async def acquire(
+        self,
+        resource_key: str,
+        lock_id: str,
+        exclusive: bool,
+        lease_ms: int,
+        timeout: float,
+        owner_id: Optional[str] = None,
+    ) -> Optional[int]:
+        keys = self._keys(resource_key)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        # Register before the first attempt so a release between the failed
+        # attempt and the wait cannot be missed.
+        await self._ensure_listener()
+        released = asyncio.Event()
+        self._waiters.setdefault(keys["channel"], set()).add(released)
+        try:
+            while True:
+                released.clear()
+                result = int(
+                    await self._acquire_script(
+                        keys=[keys["leases"], keys["holders"], keys["fence"]],
+                        args=["w" if exclusive else "r", lock_id, owner_id or "", lease_ms],
+                    )
+                )
+                if result > 0:
+                    return result
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+
+                # Sleep until a release is published or the blocking lease
+                # could have expired, whichever comes first.
+                wait = min(remaining, self.max_wait_slice, max(-result, 1) / 1000)
+                try:
+                    await asyncio.wait_for(released.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            waiters = self._waiters.get(keys["channel"])
+            if waiters is not None:
+                waiters.discard(released)
+                if not waiters:
+                    del self._waiters[keys["channel"]]
+
+    async def release(self, resource_key: str, lock_id: str) -> bool:
+        keys = self._keys(resource_key)
+        released = await self._release_script(
+            keys=[keys["leases"], keys["holders"], keys["channel"]],
+            args=[lock_id],
+        )
+        return int(released) > 0
+
+    async def renew(self, resource_key: str, lock_id: str, lease_ms: int) -> bool:
+        keys = self._keys(resource_key)
+        renewed = await self._renew_script(
+            keys=[keys["leases"], keys["holders"]],
+            args=[lock_id, lease_ms],
+        )
+        return int(renewed) > 0
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            close = getattr(self._pubsub, "aclose", None) or self._pubsub.reset
+            await close()
+            self._pubsub = None
+
+
+_default_backend: Optional[LockBackend] = None
+
+
+def get_lock_backend() -> LockBackend:
+    """
+    Get the process-wide lock backend selected by ``LOCK_BACKEND``.
+
+    Falls back to the in-memory backend if Redis is not configured.
+    """
+    global _default_backend
+    if _default_backend is not None:
+        return _default_backend
+
+    from app.core.settings import get_settings
+
+    settings = get_settings()
+    if settings.LOCK_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        if settings.LOCK_REDIS_URL:
+            client = redis.from_url(settings.LOCK_REDIS_URL, decode_responses=True)
+        else:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=True,
+            )
+        _default_backend = RedisLockBackend(client)
+        logger.info("Using Redis lock backend for distributed locks")
+    else:
+        _default_backend = InMemoryLockBackend()
+        logger.info("Using in-memory lock backend for distributed locks")
+
+    return _default_backend
@@ -8,8 +8,9 @@ operations, handling conflicts, and ensuring data consistency through atomic tra
 import asyncio
 import hashlib
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple, Any
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
@@ -21,7 +22,7 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.db.session import get_db
 from app.models.project import Project, ProjectFile
-from app.services.azure.file_operations import FileOperationsService
+from app.services.azure.file_operations import FileOperationsService, get_file_operations_service
 from app.exceptions.azure_exceptions import AzureFileShareError
 
 
@@ -77,6 +78,9 @@ class SyncResult:
     files_deleted: int = 0
     conflicts: List[SyncConflict] = None
     errors: List[str] = None
+    bytes_downloaded: int = 0
+    files_hashed: int = 0
+    hashes_reused: int = 0
 
     def __post_init__(self):
         if self.conflicts is None:
@@ -155,11 +159,18 @@ class MetadataSyncManager:
     def __init__(
         self,
         azure_service: FileOperationsService,
-        conflict_resolver: Optional[ConflictResolver] = None
+        conflict_resolver: Optional[ConflictResolver] = None,
+        max_concurrent_hashes: int = 8,
+        max_etag_hashes: int = 50000
     ):
         self.azure_service = azure_service
         self.conflict_resolver = conflict_resolver or ConflictResolver()
+        self.max_concurrent_hashes = max_concurrent_hashes
+        self.max_etag_hashes = max_etag_hashes
         self._sync_locks: Dict[str, asyncio.Lock] = {}
+        # (project_id, file_path) -> (etag, content_hash) seen in earlier syncs,
+        # least recently used first
+        self._etag_hashes: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
     
     async def _get_project_lock(self, project_id: str) -> asyncio.Lock:
         """Get or create a lock for a specific project."""
@@ -171,7 +182,8 @@ class MetadataSyncManager:
         self,
         project_id: str,
         db_session: AsyncSession,
-        force_full_sync: bool = False
+        force_full_sync: bool = False,
+        resolution_strategy: Optional[SyncResolutionStrategy] = None
     ) -> SyncResult:
         """
         Synchronize metadata for a specific project between Azure and database.
@@ -180,6 +192,8 @@ class MetadataSyncManager:
             project_id: The project to synchronize
             db_session: Database session for operations
             force_full_sync: If True, perform full reconciliation regardless of timestamps
+            resolution_strategy: Strategy for every conflict of this sync,
+                overriding the resolver's rules
             
         Returns:
             SyncResult with details of the synchronization operation
@@ -190,14 +204,21 @@ class MetadataSyncManager:
             logger.info(f"Starting metadata sync for project {project_id}")
             
             try:
-                # Get current state from both sources
-                azure_files = await self._get_azure_file_metadata(project_id)
+                # Get current state from both sources. Database metadata is
+                # loaded first so unchanged Azure files can reuse its hashes.
+                hash_stats = {'bytes_downloaded': 0, 'files_hashed': 0, 'hashes_reused': 0}
                 db_files = await self._get_database_file_metadata(project_id, db_session)
+                azure_files = await self._get_azure_file_metadata(
+                    project_id, db_files, hash_stats
+                )
                 
                 # Detect conflicts and changes
                 conflicts, changes = await self._analyze_sync_differences(
                     azure_files, db_files, force_full_sync
                 )
+                if resolution_strategy is not None:
+                    for conflict in conflicts:
+                        conflict.resolution_strategy = resolution_strategy
                 
                 # Apply changes atomically
                 transaction_manager = AtomicTransactionManager(db_session)
@@ -207,10 +228,16 @@ class MetadataSyncManager:
                         project_id, changes, conflicts, db_session
                     )
                 
+                result.bytes_downloaded = hash_stats['bytes_downloaded']
+                result.files_hashed = hash_stats['files_hashed']
+                result.hashes_reused = hash_stats['hashes_reused']
+                
                 logger.info(
                     f"Completed metadata sync for project {project_id}: "
                     f"{result.files_added} added, {result.files_updated} updated, "
-                    f"{result.files_deleted} deleted, {len(result.conflicts)} conflicts"
+                    f"{result.files_deleted} deleted, {len(result.conflicts)} conflicts, "
+                    f"{result.bytes_downloaded} bytes downloaded for {result.files_hashed} hashes "
+                    f"({result.hashes_reused} reused)"
                 )
                 
                 return result
@@ -222,36 +249,70 @@ class MetadataSyncManager:
                     errors=[f"Sync failed: {str(e)}"]
                 )
     
-    async def _get_azure_file_metadata(self, project_id: str) -> Dict[str, FileMetadata]:
-        """Get file metadata from Azure File Share."""
+    async def _get_azure_file_metadata(
+        self,
+        project_id: str,
+        db_files: Optional[Dict[str, Dict[str, Any]]] = None,
+        hash_stats: Optional[Dict[str, int]] = None
+    ) -> Dict[str, FileMetadata]:
+        """
+        Get file metadata from Azure File Share.
+        
+        Content hashes are resolved without downloading whenever possible: the
+        SHA-256 stored in Azure metadata at upload time, then a hash cached for
+        an unchanged ETag, then the database hash when size matches and the
+        file was not modified after the database record. Only the remaining
+        files are downloaded, streamed through an incremental hasher with
+        bounded concurrency.
+        """
+        db_files = db_files or {}
+        if hash_stats is None:
+            hash_stats = {'bytes_downloaded': 0, 'files_hashed': 0, 'hashes_reused': 0}
+        
         try:
-            azure_files = await self.azure_service.list_project_files(project_id)
+            azure_files = await self.azure_service.list_project_files(
+                project_id, folder_path=self._project_folder(db_files)
+            )
             metadata_dict = {}
+            to_hash: List[FileMetadata] = []
+            etags: Dict[str, Optional[str]] = {}
             
             for file_info in azure_files:
-                # Calculate content hash if not provided
+                file_path = file_info['file_path']
+                etag = file_info.get('etag')
+                etags[file_path] = etag
+                
                 content_hash = file_info.get('content_hash')
                 if not content_hash:
-                    try:
-                        content = await self.azure_service.download_file(
-                            project_id, file_info['file_path']
-                        )
-                        content_hash = hashlib.sha256(content.encode()).hexdigest()
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not calculate hash for {file_info['file_path']}: {str(e)}"
-                        )
-                        content_hash = "unknown"
+                    content_hash = self._reuse_known_hash(
+                        project_id, file_info, db_files.get(file_path)
+                    )
+                    if content_hash:
+                        hash_stats['hashes_reused'] += 1
                 
                 metadata = FileMetadata(
-                    file_path=file_info['file_path'],
+                    file_path=file_path,
                     azure_path=file_info['azure_path'],
                     size_bytes=file_info['size_bytes'],
-                    content_hash=content_hash,
+                    content_hash=content_hash or "",
                     last_modified=file_info['last_modified'],
-                    file_type=file_info.get('file_type', self._get_file_type(file_info['file_path']))
+                    file_type=file_info.get('file_type', self._get_file_type(file_path))
                 )
-                metadata_dict[file_info['file_path']] = metadata
+                metadata_dict[file_path] = metadata
+                if not content_hash:
+                    to_hash.append(metadata)
+            
+            if to_hash:
+                semaphore = asyncio.Semaphore(self.max_concurrent_hashes)
+                await asyncio.gather(*[
+                    self._hash_azure_file(project_id, metadata, semaphore, hash_stats)
+                    for metadata in to_hash
+                ])
+            
+            for file_path, metadata in metadata_dict.items():
+                etag = etags.get(file_path)
+                if etag and metadata.content_hash != "unknown":
+                    self._remember_hash(project_id, file_path, etag, metadata.content_hash)
             
             return metadata_dict
             
@@ -259,6 +320,94 @@ class MetadataSyncManager:
             logger.error(f"Failed to get Azure file metadata for project {project_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def _project_folder(db_files: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        """
+        Derive the Azure folder of a project from its database records.
+        
+        Projects created by different code paths live under different
+        prefixes, so the folder is taken from a stored ``azure_path`` minus
+        its relative ``file_path``. Returns None when no record allows it.
+        """
+        for db_meta in db_files.values():
+            azure_path = db_meta.get('azure_path') or ''
+            file_path = db_meta.get('file_path') or ''
+            if file_path and azure_path.endswith('/' + file_path):
+                return azure_path[:-len(file_path) - 1]
+        return None
+    
+    def _remember_hash(self, project_id: str, file_path: str, etag: str, content_hash: str):
+        """Record the hash of an Azure file version, evicting the least recently used."""
+        key = (project_id, file_path)
+        self._etag_hashes[key] = (etag, content_hash)
+        self._etag_hashes.move_to_end(key)
+        while len(self._etag_hashes) > self.max_etag_hashes:
+            self._etag_hashes.popitem(last=False)
+    
+    def _reuse_known_hash(
+        self,
+        project_id: str,
+        file_info: Dict[str, Any],
+        db_meta: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Return a known hash for an Azure file that has not changed, if any."""
+        etag = file_info.get('etag')
+        key = (project_id, file_info['file_path'])
+        cached = self._etag_hashes.get(key)
+        if etag and cached and cached[0] == etag:
+            self._etag_hashes.move_to_end(key)
+            return cached[1]
+        
+        if not db_meta or not db_meta.get('content_hash'):
+            return None
+        if db_meta.get('size_bytes') != file_info.get('size_bytes'):
+            return None
+        
+        last_modified = file_info.get('last_modified')
+        recorded_at = db_meta.get('updated_at') or db_meta.get('created_at')
+        if last_modified is None or recorded_at is None:
+            return None
+        
+        try:
+            # Compare naive UTC timestamps; Azure returns aware datetimes
+            if last_modified.tzinfo is not None:
+                last_modified = last_modified.replace(tzinfo=None) - (
+                    last_modified.utcoffset() or timedelta(0)
+                )
+            if recorded_at.tzinfo is not None:
+                recorded_at = recorded_at.replace(tzinfo=None) - (
+                    recorded_at.utcoffset() or timedelta(0)
+                )
+            if last_modified <= recorded_at:
+                return db_meta['content_hash']
+        except (AttributeError, TypeError):
+            return None
+        
+        return None
+    
+    async def _hash_azure_file(
+        self,
+        project_id: str,
+        metadata: FileMetadata,
+        semaphore: asyncio.Semaphore,
+        hash_stats: Dict[str, int]
+    ):
+        """Compute the SHA-256 of an Azure file by streaming its content."""
+        async with semaphore:
+            try:
+                hasher = hashlib.sha256()
+                async for chunk in self.azure_service.iter_file_chunks(metadata.azure_path):
+                    hasher.update(chunk)
+                    hash_stats['bytes_downloaded'] += len(chunk)
+                
+                metadata.content_hash = hasher.hexdigest()
+                hash_stats['files_hashed'] += 1
+            except Exception as e:
+                logger.warning(
+                    f"Could not calculate hash for {metadata.file_path}: {str(e)}"
+                )
+                metadata.content_hash = "unknown"
+    
     async def _get_database_file_metadata(
         self, project_id: str, db_session: AsyncSession
     ) -> Dict[str, Dict[str, Any]]:
@@ -509,4 +658,23 @@ class MetadataSyncManager:
             
         finally:
             # Restore original strategy
-            self.conflict_resolver.default_strategy = original_strategy
\ No newline at end of file
+            self.conflict_resolver.default_strategy = original_strategy
+
+
+# Global metadata sync manager; shared so the ETag hash cache outlives a sync
+_metadata_sync_manager: Optional[MetadataSyncManager] = None
+
+
+async def get_metadata_sync_manager() -> MetadataSyncManager:
+    """
+    Get the global metadata sync manager instance.
+    
+    Returns:
+        MetadataSyncManager: Global metadata sync manager.
+    """
+    global _metadata_sync_manager
+    
+    if _metadata_sync_manager is None:
+        _metadata_sync_manager = MetadataSyncManager(await get_file_operations_service())
+    
+    return _metadata_sync_manager
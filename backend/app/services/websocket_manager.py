@@ -9,7 +9,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Set, Optional, List, Any
+from typing import Callable, Dict, Set, Optional, List, Any
 from uuid import uuid4
 
 import socketio
@@ -151,6 +151,9 @@ class SocketIOManager:
         # Pending clarification requests: generation_id -> clarification_data
         self.pending_clarifications: Dict[str, Dict[str, Any]] = {}
 
+        # Called with the user ID when a user's last session disconnects
+        self.user_disconnect_listeners: List[Callable[[str], None]] = []
+
         # Heartbeat interval (seconds)
         self.heartbeat_interval = 30
 
@@ -281,35 +284,32 @@ class SocketIOManager:
 
     async def authenticate_socketio(self, sid: str, token: str) -> Optional[str]:
         """
-        Authenticate Socket.IO connection using Supabase JWT token.
+        Authenticate Socket.IO connection using a Firebase ID token.
+
+        Verification goes through the process-wide verified-token cache, so
+        reconnects with the same token skip signature verification and cold
+        verifications run off the event loop.
 
         Args:
             sid: Socket.IO session ID
-            token: Supabase JWT access token
+            token: Firebase ID token
 
         Returns:
-            Supabase user ID if authentication successful, None otherwise
+            Firebase user ID if authentication successful, None otherwise
         """
         try:
             # Import here to avoid circular imports
-            from app.dependencies.auth import SupabaseJWTValidator
+            from app.core.firebase_token_cache import verify_firebase_id_token
 
-            validator = SupabaseJWTValidator()
+            decoded_token = await verify_firebase_id_token(token)
+            user_id = decoded_token.get("uid")
 
-            # Validate token and extract user information
-            supabase_user = validator.extract_user_info(token)
+            if user_id:
+                logger.debug(f"Socket.IO authentication successful for user: {user_id}")
+                return user_id
 
-            # Additional validation: check if user exists in Supabase
-            user_exists = await validator.validate_user_exists(supabase_user.id)
-
-            if user_exists:
-                logger.debug(f"Socket.IO authentication successful for Supabase user: {supabase_user.id}")
-                return supabase_user.id
-            else:
-                logger.warning(
-                    f"Socket.IO authentication failed: User not found in Supabase (user_id: {supabase_user.id})"
-                )
-                return None
+            logger.warning(f"Socket.IO authentication failed: token for {sid} has no uid")
+            return None
 
         except Exception as e:
             logger.error(f"Socket.IO authentication error: {str(e)}")
@@ -409,6 +409,13 @@ class SocketIOManager:
             k: v for k, v in self.conversation_subscriptions.items() if v
         }
 
+        if user_id not in self.user_sessions:
+            for listener in list(self.user_disconnect_listeners):
+                try:
+                    listener(user_id)
+                except Exception as e:
+                    logger.warning(f"User disconnect listener failed for {user_id}: {str(e)}")
+
         logger.info(f"Socket.IO disconnected: user_id={user_id}, session_id={session_id}, sid={sid}")
 
     async def send_to_session(self, session_id: str, message: Dict[str, Any]) -> bool:
@@ -53,7 +53,7 @@ class TerraformChunker:
             # Post-process chunks
             chunks = self._post_process_chunks(chunks)
             
-            logger.info(f"Created {len(chunks)} chunks for {file_path}")
+            logger.debug("Created {} chunks for {}", len(chunks), file_path)
             return chunks
             
         except Exception as e:
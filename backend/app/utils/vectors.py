@@ -0,0 +1,102 @@
+"""
+Float32 embedding vector utilities.
+
+Embeddings are kept as contiguous ``float32`` NumPy arrays from the provider
+to the vector store: a 1536-dimension vector takes 6KB as float32 instead of
+roughly 50KB as a list of Python floats, normalization runs over whole
+batches at once, and arrays already in the right layout are handed to FAISS
+without copying.
+"""
+from typing import Sequence, Union
+
+import numpy as np
+
+VectorLike = Union[Sequence[float], np.ndarray]
+
+
+def as_float32_vector(vector: VectorLike) -> np.ndarray:
+    """Return ``vector`` as a 1-D float32 array, copying only if needed."""
+    return np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)
+
+
+def as_float32_matrix(vectors: Union[Sequence[VectorLike], np.ndarray]) -> np.ndarray:
+    """
+    Return ``vectors`` as a C-contiguous (n, dim) float32 matrix.
+
+    A float32 C-contiguous 2-D array is returned as is (no copy); lists of
+    vectors are stacked into a new matrix.
+    """
+    if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+    if len(vectors) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.stack([np.asarray(v, dtype=np.float32) for v in vectors]))
+
+
+def normalize_rows(matrix: np.ndarray, inplace: bool = True) -> np.ndarray:
+    """
+    L2-normalize every row of a float32 matrix; zero rows are left as is.
+
+    Args:
+        matrix: (n, dim) float32 matrix
+        inplace: Normalize ``matrix`` itself instead of a copy
+
+    Returns:
+        The normalized matrix
+    """
+    if not inplace:
+        matrix = matrix.copy()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def rows_are_normalized(matrix: np.ndarray, tolerance: float = 1e-3) -> bool:
+    """Check whether every non-zero row of ``matrix`` already has unit length."""
+    if matrix.size == 0:
+        return True
+    norms = np.linalg.norm(matrix, axis=1)
+    return bool(np.all((np.abs(norms - 1.0) <= tolerance) | (norms == 0)))
+
+
+def hash_bytes_vector(digest: bytes, dimension: int, centered: bool = False) -> np.ndarray:
+    """
+    Spread hash digest bytes into a zero-padded float32 vector.
+
+    Args:
+        digest: Raw digest bytes
+        dimension: Target vector dimension
+        centered: Map bytes to [-1, 1] instead of [0, 1]
+    """
+    values = np.frombuffer(digest, dtype=np.uint8)[:dimension].astype(np.float32)
+    if centered:
+        values = (values - 127.5) / 127.5
+    else:
+        values /= 255.0
+
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector
+
+
+def extend_by_averaging(seed: np.ndarray, dimension: int) -> np.ndarray:
+    """
+    Pad ``seed`` to ``dimension`` where each new element is the mean of the
+    previous two, in closed form instead of one Python append per element.
+
+    x[n] = (x[n-1] + x[n-2]) / 2 has the solution A + B * (-1/2)^n for the
+    two seed values x[0] and x[1].
+    """
+    seed = np.asarray(seed, dtype=np.float32)[:dimension]
+    if len(seed) >= dimension:
+        return np.ascontiguousarray(seed)
+    if len(seed) < 2:
+        return np.concatenate([seed, np.full(dimension - len(seed), 0.5, dtype=np.float32)])
+
+    x0, x1 = float(seed[-2]), float(seed[-1])
+    a = (x0 + 2 * x1) / 3
+    b = 2 * (x0 - x1) / 3
+    steps = np.arange(2, dimension - len(seed) + 2, dtype=np.float64)
+    tail = (a + b * np.power(-0.5, steps)).astype(np.float32)
+    return np.concatenate([seed, tail])
+
@@ -1,11 +1,42 @@
 """
 FAISS-based vector store implementation.
+
+Vectors are added under stable integer IDs so they can be removed and
+replaced by ID without rebuilding the index: flat and HNSW indexes are
+wrapped in an ``IndexIDMap2``, while IVF indexes store the IDs in their
+inverted lists natively (wrapping them breaks the mapping after a removal). Metadata and string IDs are kept in a SQLite
+sidecar next to the index, together with a write-ahead log of index changes:
+every write commits its metadata and log entries in one SQLite transaction,
+the in-memory index is updated immediately, and the index file is only
+rewritten at periodic checkpoints (written to a temporary file and atomically
+renamed into place). On startup the log is replayed on top of the last
+checkpoint.
+
+Index types:
+- ``flat``: exact inner-product search (default)
+- ``ivf``: inverted-file index for large corpora; trained on the first batch
+  written, so bulk-load a representative batch first
+- ``hnsw``: graph index for large corpora; HNSW cannot remove vectors, so
+  removed vectors are tombstoned and dropped when the index is compacted at
+  a checkpoint
+
+Serving workers use ``ReadOnlyFaissStore``, which memory-maps the latest
+checkpoint instead of loading it. Metadata rows replaced or deleted since a
+checkpoint move to a ``retired`` table, where the view still finds them for
+the vectors that checkpoint contains; they are purged once a later
+checkpoint has been in place for ``retired_grace_seconds`` (HNSW tombstones,
+which stay in the index until compaction, at the next checkpoint).
 """
-import os
 import json
+import math
+import os
 import pickle
+import resource
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
 import numpy as np
 
 try:
@@ -14,294 +45,879 @@ try:
 except ImportError:
     FAISS_AVAILABLE = False
 
+from app.utils.vectors import VectorLike, as_float32_matrix, as_float32_vector, rows_are_normalized
 from app.vectorstores.base import VectorStore
 from logconfig.logger import get_logger
 
 logger = get_logger()
 
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+_SIDECAR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    faiss_id INTEGER PRIMARY KEY,
+    vec_id TEXT NOT NULL UNIQUE,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    faiss_id INTEGER NOT NULL,
+    vector BLOB
+);
+CREATE TABLE IF NOT EXISTS retired (
+    faiss_id INTEGER PRIMARY KEY,
+    metadata TEXT NOT NULL,
+    checkpointed_at REAL
+);
+CREATE TABLE IF NOT EXISTS store_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _batched(items: List[Any], size: int = _SQL_BATCH) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class FaissStore(VectorStore):
     """FAISS-based vector store for efficient similarity search."""
-    
-    def __init__(self, index_path: str, dimension: int):
+
+    def __init__(
+        self,
+        index_path: str,
+        dimension: int,
+        index_type: str = "flat",
+        checkpoint_every: int = 1000,
+        checkpoint_interval_seconds: float = 60.0,
+        ivf_nlist: int = 1024,
+        ivf_nprobe: int = 16,
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+        compaction_ratio: float = 0.2,
+        retired_grace_seconds: float = 60.0,
+    ):
         """
         Initialize FAISS vector store.
-        
+
         Args:
             index_path: Directory path to store FAISS index files
             dimension: Dimension of embedding vectors
+            index_type: One of "flat", "ivf" or "hnsw" (fixed once the store
+                has data)
+            checkpoint_every: Write the index file after this many changes
+            checkpoint_interval_seconds: Write the index file on the first
+                change after this much time has passed since the last one
+            ivf_nlist: Maximum number of IVF lists (capped by training size)
+            ivf_nprobe: IVF lists probed per search
+            hnsw_m: HNSW graph degree
+            hnsw_ef_search: HNSW search breadth
+            compaction_ratio: Rebuild an HNSW index at checkpoint once this
+                fraction of its vectors are tombstoned
+            retired_grace_seconds: Keep metadata of replaced or deleted
+                vectors this long after the checkpoint that dropped them, so
+                read-only views still mapping the previous checkpoint can
+                resolve their hits
         """
         if not FAISS_AVAILABLE:
             raise ImportError("FAISS is not available. Install with: pip install faiss-cpu")
-        
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+
         self.index_path = Path(index_path)
         self.dimension = dimension
-        
+        self.index_type = index_type
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.compaction_ratio = compaction_ratio
+        self.retired_grace_seconds = retired_grace_seconds
+
         # Create directory if it doesn't exist
         self.index_path.mkdir(parents=True, exist_ok=True)
-        
+
         # File paths
         self.faiss_index_file = self.index_path / "index.faiss"
-        self.metadata_file = self.index_path / "metadata.pkl"
-        self.id_mapping_file = self.index_path / "id_mapping.json"
-        
+        self.sidecar_file = self.index_path / "metadata.sqlite"
+        self.legacy_metadata_file = self.index_path / "metadata.pkl"
+        self.legacy_id_mapping_file = self.index_path / "id_mapping.json"
+
+        self._lock = threading.RLock()
+        self._tombstones: set = set()
+        self._ops_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._stats = {
+            "upserted": 0,
+            "upsert_seconds": 0.0,
+            "searches": 0,
+            "search_seconds": 0.0,
+            "checkpoints": 0,
+            "last_checkpoint_ms": 0.0,
+            "compactions": 0,
+        }
+
         # Initialize or load index
+        self._db = self._open_sidecar()
+        self._load_store_info()
         self.index = self._load_or_create_index()
-        self.metadata = self._load_metadata()
-        self.id_to_idx = self._load_id_mapping()
-        self.next_idx = len(self.metadata)
-    
-    def _load_or_create_index(self) -> 'faiss.Index':
-        """Load existing FAISS index or create a new one."""
+        self._replay_wal()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _open_sidecar(self) -> sqlite3.Connection:
+        """Open (or create) the SQLite metadata sidecar."""
+        fresh = not self.sidecar_file.exists()
+        db = sqlite3.connect(str(self.sidecar_file), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(_SIDECAR_SCHEMA)
+        db.commit()
+
+        if fresh and self.faiss_index_file.exists() and self.legacy_metadata_file.exists():
+            self._migrate_legacy_files(db)
+        return db
+
+    def _load_store_info(self) -> None:
+        info = dict(self._db.execute("SELECT key, value FROM store_info").fetchall())
+        if "index_type" in info and info["index_type"] != self.index_type:
+            logger.warning(
+                f"FAISS store at {self.index_path} was built as {info['index_type']!r}; "
+                f"ignoring requested index type {self.index_type!r}"
+            )
+            self.index_type = info["index_type"]
+        if "dimension" in info and int(info["dimension"]) != self.dimension:
+            raise ValueError(
+                f"FAISS store at {self.index_path} has dimension {info['dimension']}, "
+                f"not {self.dimension}"
+            )
+
+        max_id = self._db.execute(
+            "SELECT MAX(faiss_id) FROM (SELECT faiss_id FROM vectors UNION ALL SELECT faiss_id FROM retired)"
+        ).fetchone()[0]
+        self.next_id = max(int(info.get("next_id", 0)), -1 if max_id is None else max_id + 1)
+
+        self._db.executemany(
+            "INSERT OR IGNORE INTO store_info (key, value) VALUES (?, ?)",
+            [("index_type", self.index_type), ("dimension", str(self.dimension))],
+        )
+        self._db.commit()
+
+    def _load_or_create_index(self) -> Optional['faiss.Index']:
+        """Load the last checkpoint, or create an empty index (None for untrained IVF)."""
         if self.faiss_index_file.exists():
             try:
                 logger.info(f"Loading existing FAISS index from {self.faiss_index_file}")
-                return faiss.read_index(str(self.faiss_index_file))
+                index = faiss.read_index(str(self.faiss_index_file))
+                self._configure_search(index)
+                return index
             except Exception as e:
-                logger.warning(f"Failed to load existing index: {e}. Creating new index.")
-        
-        logger.info(f"Creating new FAISS index with dimension {self.dimension}")
-        # Use IndexFlatIP for cosine similarity (after L2 normalization)
-        index = faiss.IndexFlatIP(self.dimension)
+                logger.warning(f"Failed to load existing index: {e}. Starting from an empty index.")
+
+        logger.info(f"Creating new {self.index_type} FAISS index with dimension {self.dimension}")
+        return None if self.index_type == "ivf" else self._create_index()
+
+    def _create_index(self, training_vectors: Optional[np.ndarray] = None) -> 'faiss.Index':
+        """Create an empty index of the configured type that accepts IDs."""
+        # Inner product on L2-normalized vectors is cosine similarity
+        if self.index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        elif self.index_type == "ivf":
+            count = len(training_vectors)
+            nlist = max(1, min(self.ivf_nlist, int(4 * math.sqrt(count)), count))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            base = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            base.train(training_vectors)
+            logger.info(f"Trained IVF index with {nlist} lists on {count} vectors")
+            # IVF handles add_with_ids/remove_ids itself
+            self._configure_search(base)
+            return base
+        else:
+            base = faiss.IndexFlatIP(self.dimension)
+
+        index = faiss.IndexIDMap2(base)
+        self._configure_search(index)
         return index
-    
-    def _load_metadata(self) -> List[Dict[str, Any]]:
-        """Load metadata from disk."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load metadata: {e}")
-        return []
-    
-    def _load_id_mapping(self) -> Dict[str, int]:
-        """Load ID to index mapping from disk."""
-        if self.id_mapping_file.exists():
-            try:
-                with open(self.id_mapping_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load ID mapping: {e}")
-        return {}
-    
-    def _save_index(self) -> None:
-        """Save FAISS index to disk."""
-        try:
-            faiss.write_index(self.index, str(self.faiss_index_file))
-        except Exception as e:
-            logger.error(f"Failed to save FAISS index: {e}")
-            raise
-    
-    def _save_metadata(self) -> None:
-        """Save metadata to disk."""
-        try:
-            with open(self.metadata_file, 'wb') as f:
-                pickle.dump(self.metadata, f)
-        except Exception as e:
-            logger.error(f"Failed to save metadata: {e}")
-            raise
-    
-    def _save_id_mapping(self) -> None:
-        """Save ID mapping to disk."""
+
+    def _configure_search(self, index: 'faiss.Index') -> None:
+        base = faiss.downcast_index(index.index) if hasattr(index, "index") else index
+        if isinstance(base, faiss.IndexIVF):
+            base.nprobe = self.ivf_nprobe
+        elif isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = self.hnsw_ef_search
+
+    def _indexed_ids(self) -> np.ndarray:
+        if self.index is None or self.index.ntotal == 0:
+            return np.empty(0, dtype=np.int64)
+        if isinstance(self.index, faiss.IndexIVF):
+            invlists = self.index.invlists
+            return np.concatenate([
+                faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+                for list_no in range(self.index.nlist)
+                if invlists.list_size(list_no)
+            ]).astype(np.int64)
+        return faiss.vector_to_array(self.index.id_map)
+
+    def _replay_wal(self) -> None:
+        """Apply index changes logged since the last checkpoint."""
+        rows = self._db.execute("SELECT op, faiss_id, vector FROM wal ORDER BY seq").fetchall()
+        present = set(self._indexed_ids().tolist())
+
+        if rows:
+            # Group consecutive adds so they are applied as one batch; entries
+            # the checkpoint already contains are skipped.
+            add_ids: List[int] = []
+            add_vectors: List[np.ndarray] = []
+
+            def flush_adds() -> None:
+                if add_ids:
+                    self._index_add(np.array(add_ids, dtype=np.int64), np.stack(add_vectors))
+                    add_ids.clear()
+                    add_vectors.clear()
+
+            for op, faiss_id, blob in rows:
+                if op == "add":
+                    if faiss_id not in present:
+                        add_ids.append(faiss_id)
+                        add_vectors.append(np.frombuffer(blob, dtype=np.float32))
+                        present.add(faiss_id)
+                else:
+                    flush_adds()
+                    if faiss_id in present:
+                        self._index_remove(np.array([faiss_id], dtype=np.int64))
+                        present.discard(faiss_id)
+            flush_adds()
+
+            self._ops_since_checkpoint = len(rows)
+            logger.info(f"Replayed {len(rows)} write-ahead log entries into FAISS index")
+
+        # Never reuse an ID still present in the index (e.g. a tombstone)
+        indexed_ids = self._indexed_ids()
+        if len(indexed_ids):
+            self.next_id = max(self.next_id, int(indexed_ids.max()) + 1)
+
+        if self.index_type == "hnsw" and len(indexed_ids):
+            live = {row[0] for row in self._db.execute("SELECT faiss_id FROM vectors")}
+            self._tombstones = set(indexed_ids.tolist()) - live
+
+    def _migrate_legacy_files(self, db: sqlite3.Connection) -> None:
+        """Import a store written by the pickle/JSON based format."""
         try:
-            with open(self.id_mapping_file, 'w') as f:
-                json.dump(self.id_to_idx, f)
+            legacy_index = faiss.read_index(str(self.faiss_index_file))
+            with open(self.legacy_metadata_file, 'rb') as f:
+                metadata = pickle.load(f)
+            id_mapping: Dict[str, int] = {}
+            if self.legacy_id_mapping_file.exists():
+                with open(self.legacy_id_mapping_file, 'r') as f:
+                    id_mapping = json.load(f)
         except Exception as e:
-            logger.error(f"Failed to save ID mapping: {e}")
-            raise
-    
-    def upsert(self, vectors: List[List[float]], metadatas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> None:
+            logger.warning(f"Failed to read legacy FAISS store, starting empty: {e}")
+            return
+
+        total = legacy_index.ntotal
+        idx_to_id = {idx: vec_id for vec_id, idx in id_mapping.items()}
+        db.executemany(
+            "INSERT INTO vectors (faiss_id, vec_id, metadata) VALUES (?, ?, ?)",
+            [
+                (
+                    idx,
+                    idx_to_id.get(idx, f"vec_{idx}"),
+                    json.dumps(metadata[idx] if idx < len(metadata) else {}, default=str),
+                )
+                for idx in range(total)
+            ],
+        )
+
+        if total:
+            vectors = legacy_index.reconstruct_n(0, total)
+            db.executemany(
+                "INSERT INTO wal (op, faiss_id, vector) VALUES ('add', ?, ?)",
+                [(idx, vectors[idx].tobytes()) for idx in range(total)],
+            )
+        db.commit()
+
+        # The old index has no ID map; rebuild it from the log
+        self.faiss_index_file.rename(self.faiss_index_file.with_suffix(".faiss.legacy"))
+        logger.info(f"Migrated {total} vectors from legacy FAISS store at {self.index_path}")
+
+    # ------------------------------------------------------------------
+    # Index operations
+    # ------------------------------------------------------------------
+
+    def _index_add(self, faiss_ids: np.ndarray, vectors: np.ndarray) -> None:
+        if self.index is None:
+            self.index = self._create_index(training_vectors=vectors)
+        self.index.add_with_ids(vectors, faiss_ids)
+
+    def _index_remove(self, faiss_ids: np.ndarray) -> None:
+        if self.index is None or len(faiss_ids) == 0:
+            return
+        if self.index_type == "hnsw":
+            self._tombstones.update(faiss_ids.tolist())
+        else:
+            self.index.remove_ids(faiss_ids)
+
+    def _lookup_faiss_ids(self, ids: List[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        for batch in _batched(ids):
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._db.execute(
+                f"SELECT vec_id, faiss_id FROM vectors WHERE vec_id IN ({placeholders})", batch
+            ).fetchall())
+        return found
+
+    def _retire(self, faiss_ids: List[int]) -> None:
+        """Keep metadata of superseded vectors for views of the last checkpoint."""
+        for batch in _batched(faiss_ids):
+            placeholders = ",".join("?" * len(batch))
+            self._db.execute(
+                f"INSERT OR REPLACE INTO retired (faiss_id, metadata) "
+                f"SELECT faiss_id, metadata FROM vectors WHERE faiss_id IN ({placeholders})",
+                batch,
+            )
+
+    def _lookup_metadata(self, faiss_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        found: Dict[int, Dict[str, Any]] = {}
+        for batch in _batched(faiss_ids):
+            placeholders = ",".join("?" * len(batch))
+            for faiss_id, metadata in self._db.execute(
+                f"SELECT faiss_id, metadata FROM vectors WHERE faiss_id IN ({placeholders})", batch
+            ):
+                found[faiss_id] = json.loads(metadata)
+        return found
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _maybe_checkpoint(self) -> None:
+        if self._ops_since_checkpoint >= self.checkpoint_every or (
+            self._ops_since_checkpoint
+            and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval_seconds
+        ):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Write the index file and truncate the write-ahead log.
+
+        The index is written to a temporary file, synced and atomically
+        renamed over the previous checkpoint, so a crash at any point leaves
+        either the old or the new checkpoint plus a log that replays cleanly.
+        """
+        with self._lock:
+            if self.index is None:
+                return
+            start = time.perf_counter()
+
+            max_seq = self._db.execute("SELECT MAX(seq) FROM wal").fetchone()[0]
+            if self._tombstones and len(self._tombstones) >= self.compaction_ratio * self.index.ntotal:
+                self._compact()
+
+            tmp_file = self.faiss_index_file.with_suffix(".faiss.tmp")
+            faiss.write_index(self.index, str(tmp_file))
+            with open(tmp_file, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.faiss_index_file)
+
+            if max_seq is not None:
+                self._db.execute("DELETE FROM wal WHERE seq <= ?", (max_seq,))
+            # Rows retired before an earlier checkpoint are no longer served
+            # once that checkpoint is older than the grace period; rows
+            # retired since are dropped from this checkpoint and start theirs
+            now = time.time()
+            self._db.execute(
+                "DELETE FROM retired WHERE checkpointed_at IS NOT NULL AND checkpointed_at < ?",
+                (now - self.retired_grace_seconds,),
+            )
+            self._db.execute(
+                "UPDATE retired SET checkpointed_at = ? WHERE checkpointed_at IS NULL", (now,)
+            )
+            # HNSW tombstones are still in the checkpoint just written, so
+            # their metadata must go now or views would keep serving them
+            for batch in _batched(list(self._tombstones)):
+                placeholders = ",".join("?" * len(batch))
+                self._db.execute(f"DELETE FROM retired WHERE faiss_id IN ({placeholders})", batch)
+            self._db.execute(
+                "INSERT OR REPLACE INTO store_info (key, value) VALUES ('next_id', ?)",
+                (str(self.next_id),),
+            )
+            self._db.commit()
+
+            self._ops_since_checkpoint = 0
+            self._last_checkpoint = time.monotonic()
+            self._stats["checkpoints"] += 1
+            self._stats["last_checkpoint_ms"] = (time.perf_counter() - start) * 1000
+
+    def _compact(self) -> None:
+        """Rebuild an HNSW index without its tombstoned vectors."""
+        live_ids = np.array(
+            [faiss_id for faiss_id in self._indexed_ids().tolist() if faiss_id not in self._tombstones],
+            dtype=np.int64,
+        )
+        vectors = (
+            np.stack([self.index.reconstruct(int(faiss_id)) for faiss_id in live_ids])
+            if len(live_ids)
+            else np.empty((0, self.dimension), dtype=np.float32)
+        )
+
+        self.index = self._create_index()
+        if len(live_ids):
+            self.index.add_with_ids(vectors, live_ids)
+
+        logger.info(f"Compacted HNSW index: dropped {len(self._tombstones)} tombstoned vectors")
+        self._tombstones = set()
+        self._stats["compactions"] += 1
+
+    def close(self) -> None:
+        """Checkpoint pending changes and close the metadata sidecar."""
+        with self._lock:
+            if self._ops_since_checkpoint:
+                self.checkpoint()
+            self._db.close()
+
+    # ------------------------------------------------------------------
+    # VectorStore interface
+    # ------------------------------------------------------------------
+
+    def upsert(self, vectors: Union[List[VectorLike], np.ndarray], metadatas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> None:
         """
         Insert or update vectors with metadata.
-        
+
+        Vectors whose ID already exists are removed from the index and
+        re-added; nothing else in the index is touched. A C-contiguous
+        float32 matrix of unit-length rows (as produced by
+        ``EmbeddingProvider.embed_texts_matrix``) is handed to FAISS without
+        copying; anything else is converted and normalized once.
+
         Args:
-            vectors: List of embedding vectors
+            vectors: Embedding vectors, as a list or an (n, dim) matrix
             metadatas: List of metadata dictionaries
             ids: Optional list of unique IDs for the vectors
         """
-        if not vectors:
+        if len(vectors) == 0:
             return
-        
+
         if len(vectors) != len(metadatas):
             raise ValueError("Number of vectors must match number of metadata entries")
-        
+
         if ids and len(ids) != len(vectors):
             raise ValueError("Number of IDs must match number of vectors")
-        
-        # Convert to numpy array and normalize for cosine similarity
-        vectors_array = np.array(vectors, dtype=np.float32)
-        faiss.normalize_L2(vectors_array)
-        
-        # Generate IDs if not provided
-        if not ids:
-            ids = [f"vec_{self.next_idx + i}" for i in range(len(vectors))]
-        
-        # Handle updates (remove existing vectors with same IDs)
-        existing_indices = []
-        for vec_id in ids:
-            if vec_id in self.id_to_idx:
-                existing_indices.append(self.id_to_idx[vec_id])
-        
-        if existing_indices:
-            # For simplicity, we'll rebuild the index without the existing vectors
-            # In production, consider using IndexIDMap for more efficient updates
-            self._remove_vectors_by_indices(existing_indices)
-        
-        # Add new vectors
-        start_idx = self.index.ntotal
-        self.index.add(vectors_array)
-        
-        # Update metadata and ID mapping
-        for i, (vec_id, metadata) in enumerate(zip(ids, metadatas)):
-            idx = start_idx + i
-            
-            # Ensure metadata list is large enough
-            while len(self.metadata) <= idx:
-                self.metadata.append({})
-            
-            self.metadata[idx] = metadata
-            self.id_to_idx[vec_id] = idx
-        
-        self.next_idx = self.index.ntotal
-        
-        # Save to disk
-        self._save_index()
-        self._save_metadata()
-        self._save_id_mapping()
-        
-        logger.info(f"Upserted {len(vectors)} vectors. Total vectors: {self.index.ntotal}")
-    
-    def _remove_vectors_by_indices(self, indices: List[int]) -> None:
-        """Remove vectors by their indices (requires rebuilding index)."""
-        if not indices:
-            return
-        
-        # Get all vectors and metadata except the ones to remove
-        all_vectors = []
-        new_metadata = []
-        new_id_mapping = {}
-        
-        indices_set = set(indices)
-        new_idx = 0
-        
-        for old_idx in range(self.index.ntotal):
-            if old_idx not in indices_set:
-                # Get vector from index
-                vector = self.index.reconstruct(old_idx)
-                all_vectors.append(vector)
-                
-                # Copy metadata
-                if old_idx < len(self.metadata):
-                    new_metadata.append(self.metadata[old_idx])
-                else:
-                    new_metadata.append({})
-                
-                # Update ID mapping
-                for vec_id, mapped_idx in self.id_to_idx.items():
-                    if mapped_idx == old_idx:
-                        new_id_mapping[vec_id] = new_idx
-                        break
-                
-                new_idx += 1
-        
-        # Rebuild index
-        self.index = faiss.IndexFlatIP(self.dimension)
-        if all_vectors:
-            vectors_array = np.array(all_vectors, dtype=np.float32)
-            self.index.add(vectors_array)
-        
-        self.metadata = new_metadata
-        self.id_to_idx = new_id_mapping
-        self.next_idx = len(new_metadata)
-    
-    def search(self, query_vector: List[float], top_k: int = 5, threshold: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+
+        if ids and len(set(ids)) != len(ids):
+            raise ValueError("IDs must be unique within an upsert")
+
+        start = time.perf_counter()
+
+        # Convert to a float32 matrix and normalize for cosine similarity,
+        # without touching (or copying) input that is already normalized
+        vectors_array = as_float32_matrix(vectors)
+        if not rows_are_normalized(vectors_array):
+            if vectors_array is vectors:
+                vectors_array = vectors_array.copy()
+            faiss.normalize_L2(vectors_array)
+
+        with self._lock:
+            # Generate IDs if not provided
+            if not ids:
+                ids = [f"vec_{self.next_id + i}" for i in range(len(vectors))]
+
+            replaced = self._lookup_faiss_ids(ids)
+            new_faiss_ids = np.arange(self.next_id, self.next_id + len(ids), dtype=np.int64)
+            self.next_id += len(ids)
+
+            # Metadata and log entries commit together
+            with self._db:
+                self._retire(list(replaced.values()))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO vectors (faiss_id, vec_id, metadata) VALUES (?, ?, ?)",
+                    [
+                        (int(faiss_id), vec_id, json.dumps(metadata, default=str))
+                        for faiss_id, vec_id, metadata in zip(new_faiss_ids, ids, metadatas)
+                    ],
+                )
+                self._db.executemany(
+                    "INSERT INTO wal (op, faiss_id, vector) VALUES ('remove', ?, NULL)",
+                    [(faiss_id,) for faiss_id in replaced.values()],
+                )
+                self._db.executemany(
+                    "INSERT INTO wal (op, faiss_id, vector) VALUES ('add', ?, ?)",
+                    [
+                        (int(faiss_id), vectors_array[row].tobytes())
+                        for row, faiss_id in enumerate(new_faiss_ids)
+                    ],
+                )
+
+            self._index_remove(np.array(list(replaced.values()), dtype=np.int64))
+            self._index_add(new_faiss_ids, vectors_array)
+
+            self._ops_since_checkpoint += len(ids) + len(replaced)
+            self._maybe_checkpoint()
+
+        self._stats["upserted"] += len(ids)
+        self._stats["upsert_seconds"] += time.perf_counter() - start
+        logger.info(f"Upserted {len(ids)} vectors ({len(replaced)} replaced). Total vectors: {self.index.ntotal - len(self._tombstones)}")
+
+    def search(self, query_vector: VectorLike, top_k: int = 5, threshold: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
         """
         Search for similar vectors.
-        
+
         Args:
             query_vector: Query embedding vector
             top_k: Number of top results to return
             threshold: Minimum similarity threshold
-            
+
         Returns:
             List of (metadata, similarity_score) tuples
         """
-        if self.index.ntotal == 0:
-            return []
-        
+        start = time.perf_counter()
+
         # Normalize query vector for cosine similarity
-        query_array = np.array([query_vector], dtype=np.float32)
+        query_array = as_float32_vector(query_vector).reshape(1, -1).copy()
         faiss.normalize_L2(query_array)
-        
-        # Search
-        similarities, indices = self.index.search(query_array, min(top_k, self.index.ntotal))
-        
-        results = []
-        for similarity, idx in zip(similarities[0], indices[0]):
-            if idx == -1:  # FAISS returns -1 for invalid indices
-                continue
-            
-            if similarity < threshold:
-                continue
-            
-            # Get metadata
-            metadata = self.metadata[idx] if idx < len(self.metadata) else {}
-            results.append((metadata, float(similarity)))
-        
+
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return []
+
+            # Over-fetch to make up for tombstoned vectors
+            k = min(top_k + len(self._tombstones), self.index.ntotal)
+            similarities, faiss_ids = self.index.search(query_array, k)
+
+            hits = [
+                (int(faiss_id), float(similarity))
+                for similarity, faiss_id in zip(similarities[0], faiss_ids[0])
+                # FAISS returns -1 for missing results
+                if faiss_id != -1 and faiss_id not in self._tombstones and similarity >= threshold
+            ][:top_k]
+            metadata = self._lookup_metadata([faiss_id for faiss_id, _ in hits])
+
+        results = [
+            (metadata[faiss_id], similarity)
+            for faiss_id, similarity in hits
+            if faiss_id in metadata
+        ]
+
+        self._stats["searches"] += 1
+        self._stats["search_seconds"] += time.perf_counter() - start
         return results
-    
+
     def delete(self, ids: List[str]) -> None:
         """
         Delete vectors by IDs.
-        
+
         Args:
             ids: List of vector IDs to delete
         """
-        indices_to_remove = []
-        for vec_id in ids:
-            if vec_id in self.id_to_idx:
-                indices_to_remove.append(self.id_to_idx[vec_id])
-        
-        if indices_to_remove:
-            self._remove_vectors_by_indices(indices_to_remove)
-            self._save_index()
-            self._save_metadata()
-            self._save_id_mapping()
-            
-            logger.info(f"Deleted {len(indices_to_remove)} vectors")
-    
+        with self._lock:
+            found = self._lookup_faiss_ids(list(ids))
+            if not found:
+                return
+
+            with self._db:
+                self._retire(list(found.values()))
+                for batch in _batched(list(found)):
+                    placeholders = ",".join("?" * len(batch))
+                    self._db.execute(f"DELETE FROM vectors WHERE vec_id IN ({placeholders})", batch)
+                self._db.executemany(
+                    "INSERT INTO wal (op, faiss_id, vector) VALUES ('remove', ?, NULL)",
+                    [(faiss_id,) for faiss_id in found.values()],
+                )
+
+            self._index_remove(np.array(list(found.values()), dtype=np.int64))
+            self._ops_since_checkpoint += len(found)
+            self._maybe_checkpoint()
+
+        logger.info(f"Deleted {len(found)} vectors")
+
     def clear(self) -> None:
         """Clear all vectors from the store."""
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.metadata = []
-        self.id_to_idx = {}
-        self.next_idx = 0
-        
-        # Remove files
-        for file_path in [self.faiss_index_file, self.metadata_file, self.id_mapping_file]:
-            if file_path.exists():
-                file_path.unlink()
-        
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM vectors")
+                self._db.execute("DELETE FROM wal")
+                self._db.execute("DELETE FROM retired")
+                self._db.execute("DELETE FROM store_info WHERE key = 'next_id'")
+
+            self.index = None if self.index_type == "ivf" else self._create_index()
+            self.next_id = 0
+            self._tombstones = set()
+            self._ops_since_checkpoint = 0
+
+            # Remove files
+            for file_path in [self.faiss_index_file, self.legacy_metadata_file, self.legacy_id_mapping_file]:
+                if file_path.exists():
+                    file_path.unlink()
+
         logger.info("Cleared all vectors from store")
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         index_size = 0
         if self.faiss_index_file.exists():
             index_size = self.faiss_index_file.stat().st_size
-        
+
+        with self._lock:
+            live_vectors = self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            pending_wal = self._db.execute("SELECT COUNT(*) FROM wal").fetchone()[0]
+            indexed = self.index.ntotal if self.index is not None else 0
+
+        upserted = self._stats["upserted"]
+        searches = self._stats["searches"]
         return {
-            "total_vectors": self.index.ntotal,
+            "total_vectors": live_vectors,
+            "indexed_vectors": indexed,
+            "tombstoned_vectors": len(self._tombstones),
             "dimension": self.dimension,
+            "index_type": self.index_type,
             "index_size_bytes": index_size,
             "index_size_mb": round(index_size / (1024 * 1024), 2),
-            "metadata_entries": len(self.metadata),
-            "id_mappings": len(self.id_to_idx)
+            "pending_wal_entries": pending_wal,
+            "checkpoints": self._stats["checkpoints"],
+            "last_checkpoint_ms": self._stats["last_checkpoint_ms"],
+            "compactions": self._stats["compactions"],
+            "upserts_per_second": (
+                upserted / self._stats["upsert_seconds"] if self._stats["upsert_seconds"] else 0.0
+            ),
+            "avg_search_ms": (
+                self._stats["search_seconds"] * 1000 / searches if searches else 0.0
+            ),
         }
-    
+
     def exists(self) -> bool:
         """Check if the vector store exists and is initialized."""
-        return (self.faiss_index_file.exists() and 
-                self.metadata_file.exists() and 
-                self.index.ntotal > 0)
\ No newline at end of file
+        with self._lock:
+            has_vectors = self._db.execute("SELECT 1 FROM vectors LIMIT 1").fetchone() is not None
+        return self.sidecar_file.exists() and has_vectors
+
+
+class ReadOnlyFaissStore(VectorStore):
+    """
+    Read-only, memory-mapped view of a FaissStore directory for serving.
+
+    Construction does no I/O. The index is opened on first search with
+    ``IO_FLAG_MMAP``, so its pages come from the OS page cache and are shared
+    by every worker process serving the same files instead of each worker
+    holding a private copy. Metadata is read from the SQLite sidecar by
+    primary key, only for the hits being returned.
+
+    The view serves the last checkpoint written by the (single) writer, so
+    vectors written since then show up after the next checkpoint. Hits on
+    vectors replaced or deleted since that checkpoint are resolved from the
+    writer's ``retired`` rows, so an updated vector keeps returning its
+    checkpointed version instead of disappearing. The view notices a newer
+    checkpoint by the index file's inode and mtime, checked at most every
+    ``reload_interval_seconds`` (keep this below the writer's
+    ``retired_grace_seconds``), and re-maps it.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        dimension: Optional[int] = None,
+        ivf_nprobe: int = 16,
+        hnsw_ef_search: int = 64,
+        reload_interval_seconds: float = 5.0,
+    ):
+        """
+        Initialize a read-only FAISS view.
+
+        Args:
+            index_path: Directory written by a FaissStore
+            dimension: Expected vector dimension (checked when the index opens)
+            ivf_nprobe: IVF lists probed per search
+            hnsw_ef_search: HNSW search breadth
+            reload_interval_seconds: How often to check for a newer checkpoint
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS is not available. Install with: pip install faiss-cpu")
+
+        self.index_path = Path(index_path)
+        self.dimension = dimension
+        self.ivf_nprobe = ivf_nprobe
+        self.hnsw_ef_search = hnsw_ef_search
+        self.reload_interval_seconds = reload_interval_seconds
+
+        self.faiss_index_file = self.index_path / "index.faiss"
+        self.sidecar_file = self.index_path / "metadata.sqlite"
+
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_signature: Optional[Tuple[int, int]] = None
+        self._last_reload_check = 0.0
+        self._db: Optional[sqlite3.Connection] = None
+        self._has_retired = False
+        self._stats = {
+            "opens": 0,
+            "last_open_ms": 0.0,
+            "searches": 0,
+            "search_seconds": 0.0,
+        }
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.faiss_index_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _ensure_open(self) -> bool:
+        """Open or re-map the index if needed; returns False if there is none."""
+        now = time.monotonic()
+        if self._index is not None and now - self._last_reload_check < self.reload_interval_seconds:
+            return True
+        self._last_reload_check = now
+
+        signature = self._signature()
+        if signature is None:
+            return self._index is not None
+        if signature == self._index_signature:
+            return True
+
+        start = time.perf_counter()
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        if self._stored_index_type() != "ivf":
+            # Flat (non-IVF) codes are only memory-mapped with this flag
+            # (faiss >= 1.9); IVF lists are mapped without it and fail with it
+            flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        index = faiss.read_index(str(self.faiss_index_file), flags)
+        if self.dimension is not None and index.d != self.dimension:
+            raise ValueError(f"FAISS index has dimension {index.d}, not {self.dimension}")
+
+        base = faiss.downcast_index(index.index) if hasattr(index, "index") else index
+        if isinstance(base, faiss.IndexIVF):
+            base.nprobe = self.ivf_nprobe
+        elif isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = self.hnsw_ef_search
+
+        self._index = index
+        self._index_signature = signature
+        self._stats["opens"] += 1
+        self._stats["last_open_ms"] = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Memory-mapped FAISS index {self.faiss_index_file} "
+            f"({index.ntotal} vectors) in {self._stats['last_open_ms']:.1f}ms"
+        )
+        return True
+
+    def _stored_index_type(self) -> Optional[str]:
+        row = self._sidecar().execute(
+            "SELECT value FROM store_info WHERE key = 'index_type'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _sidecar(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                f"file:{self.sidecar_file}?mode=ro", uri=True, check_same_thread=False
+            )
+            # Sidecars written before retired rows were kept lack the table
+            self._has_retired = self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'retired'"
+            ).fetchone() is not None
+        return self._db
+
+    def search(self, query_vector: VectorLike, top_k: int = 5, threshold: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Search for similar vectors.
+
+        Args:
+            query_vector: Query embedding vector
+            top_k: Number of top results to return
+            threshold: Minimum similarity threshold
+
+        Returns:
+            List of (metadata, similarity_score) tuples
+        """
+        start = time.perf_counter()
+
+        query_array = as_float32_vector(query_vector).reshape(1, -1).copy()
+        faiss.normalize_L2(query_array)
+
+        with self._lock:
+            if not self._ensure_open() or self._index.ntotal == 0:
+                return []
+            index = self._index
+            db = self._sidecar()
+
+            # Vectors deleted since they were indexed (HNSW tombstones) have
+            # no sidecar row; over-fetch by their number so top_k still fills
+            live = db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            k = min(top_k + max(index.ntotal - live, 0), index.ntotal)
+
+            similarities, faiss_ids = index.search(query_array, k)
+            hits = [
+                (int(faiss_id), float(similarity))
+                for similarity, faiss_id in zip(similarities[0], faiss_ids[0])
+                if faiss_id != -1 and similarity >= threshold
+            ]
+
+            metadata: Dict[int, Dict[str, Any]] = {}
+            wanted = [faiss_id for faiss_id, _ in hits]
+            tables = ("vectors", "retired") if self._has_retired else ("vectors",)
+            for table in tables:
+                for batch in _batched(wanted):
+                    placeholders = ",".join("?" * len(batch))
+                    for faiss_id, value in db.execute(
+                        f"SELECT faiss_id, metadata FROM {table} WHERE faiss_id IN ({placeholders})", batch
+                    ):
+                        metadata[faiss_id] = json.loads(value)
+                wanted = [faiss_id for faiss_id in wanted if faiss_id not in metadata]
+                if not wanted:
+                    break
+
+        results = [
+            (metadata[faiss_id], similarity)
+            for faiss_id, similarity in hits
+            if faiss_id in metadata
+        ][:top_k]
+
+        self._stats["searches"] += 1
+        self._stats["search_seconds"] += time.perf_counter() - start
+        return results
+
+    def upsert(self, vectors: Union[List[VectorLike], np.ndarray], metadatas: List[Dict[str, Any]], ids: Optional[List[str]] = None) -> None:
+        raise NotImplementedError("ReadOnlyFaissStore is read-only; write through FaissStore")
+
+    def delete(self, ids: List[str]) -> None:
+        raise NotImplementedError("ReadOnlyFaissStore is read-only; write through FaissStore")
+
+    def clear(self) -> None:
+        raise NotImplementedError("ReadOnlyFaissStore is read-only; write through FaissStore")
+
+    def close(self) -> None:
+        """Unmap the index and close the sidecar connection."""
+        with self._lock:
+            self._index = None
+            self._index_signature = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the view, including open time and process RSS."""
+        searches = self._stats["searches"]
+        return {
+            "mapped": self._index is not None,
+            "total_vectors": self._index.ntotal if self._index is not None else 0,
+            "opens": self._stats["opens"],
+            "last_open_ms": self._stats["last_open_ms"],
+            "avg_search_ms": (
+                self._stats["search_seconds"] * 1000 / searches if searches else 0.0
+            ),
+            # Linux reports ru_maxrss in kilobytes
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+    def exists(self) -> bool:
+        """Check if a checkpointed index is available to serve."""
+        return self.faiss_index_file.exists() and self.sidecar_file.exists()
@@ -2,18 +2,60 @@
 PostgreSQL-based vector store implementation using pgvector extension.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, text, and_, or_
 from sqlalchemy.orm import selectinload
 
+from app.utils.vectors import VectorLike, as_float32_vector
 from app.vectorstores.base import VectorStore
 from app.models.embedding import Repository, FileEmbedding
 from logconfig.logger import get_logger
 
 logger = get_logger()
 
+ANN_INDEX_NAME = "idx_file_embeddings_vector_cosine"
+
+# Columns written by bulk ingestion, in COPY order
+_BULK_COLUMNS = (
+    "file_path", "file_name", "file_extension", "file_size", "file_hash",
+    "repository_id", "content_chunk", "chunk_index", "total_chunks",
+    "embedding_vector", "embedding_model", "embedding_dimension", "embedding_type",
+    "summary_text", "summary_embedding_vector", "summary_confidence", "summary_type",
+    "processing_metadata", "summarization_model", "chunk_strategy",
+    "language", "tokens_count", "created_at", "updated_at",
+)
+
+
+@dataclass
+class FileEmbeddingBatch:
+    """Embeddings of one file for ``bulk_upsert_file_embeddings``."""
+    file_path: str
+    vectors: Sequence[VectorLike]
+    content_chunks: List[str]
+    file_metadata: Dict[str, Any]
+    embedding_type: str = "code"
+    summary_texts: Optional[List[str]] = None
+    summary_vectors: Optional[Sequence[VectorLike]] = None
+    summary_metadata: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def row_count(self) -> int:
+        summary_count = len(self.summary_vectors) if self.has_summaries else 0
+        return len(self.vectors) + summary_count
+
+    @property
+    def has_summaries(self) -> bool:
+        return bool(
+            self.summary_texts and self.summary_vectors is not None
+            and len(self.summary_vectors) and self.summary_metadata
+        )
+
 
 class PostgresVectorStore(VectorStore):
     """PostgreSQL-based vector store for embedding storage and retrieval."""
@@ -35,14 +77,14 @@ class PostgresVectorStore(VectorStore):
         self,
         repository_name: str,
         file_path: str,
-        vectors: List[List[float]],
+        vectors: Sequence[VectorLike],
         content_chunks: List[str],
         file_metadata: Dict[str, Any],
         repository_url: Optional[str] = None,
         repository_description: Optional[str] = None,
         embedding_type: str = "code",
         summary_texts: Optional[List[str]] = None,
-        summary_vectors: Optional[List[List[float]]] = None,
+        summary_vectors: Optional[Sequence[VectorLike]] = None,
         summary_metadata: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """
@@ -51,13 +93,14 @@ class PostgresVectorStore(VectorStore):
         Args:
             repository_name: Name of the repository
             file_path: Path to the file within the repository
-            vectors: List of embedding vectors (one per chunk)
+            vectors: Embedding vectors (one per chunk), as lists or float32
+                arrays; float32 rows are bound without converting to lists
             content_chunks: List of content chunks corresponding to vectors
             file_metadata: Metadata about the file (size, hash, extension, etc.)
             repository_url: Optional repository URL
             repository_description: Optional repository description
         """
-        if not vectors or not content_chunks:
+        if len(vectors) == 0 or not content_chunks:
             return
 
         if len(vectors) != len(content_chunks):
@@ -101,7 +144,7 @@ class PostgresVectorStore(VectorStore):
                 self.db.add(embedding)
 
             # Store summary embeddings if provided
-            if summary_texts and summary_vectors and summary_metadata:
+            if summary_texts and summary_vectors is not None and len(summary_vectors) and summary_metadata:
                 for chunk_index, (summary_vector, summary_text, summary_meta) in enumerate(
                     zip(summary_vectors, summary_texts, summary_metadata)
                 ):
@@ -133,13 +176,12 @@ class PostgresVectorStore(VectorStore):
 
             await self.db.commit()
 
-            total_embeddings = len(vectors)
-            if summary_vectors:
-                total_embeddings += len(summary_vectors)
+            summary_count = len(summary_vectors) if summary_vectors is not None else 0
+            total_embeddings = len(vectors) + summary_count
 
             logger.info(
                 f"Upserted {total_embeddings} embeddings ({len(vectors)} code, "
-                f"{len(summary_vectors) if summary_vectors else 0} summary) "
+                f"{summary_count} summary) "
                 f"for file {file_path} in repository {repository_name}"
             )
 
@@ -148,6 +190,213 @@ class PostgresVectorStore(VectorStore):
             logger.error(f"Failed to upsert embeddings for {file_path}: {e}")
             raise
 
+    @staticmethod
+    async def _reset_vector_codecs(driver) -> None:
+        """Drop the codecs ``register_vector`` installed on an asyncpg connection."""
+        for type_name in ("vector", "halfvec", "sparsevec"):
+            try:
+                await driver.reset_type_codec(type_name, schema="public")
+            except ValueError:
+                # halfvec and sparsevec only exist with pgvector >= 0.7
+                pass
+
+    async def bulk_upsert_file_embeddings(
+        self,
+        repository_name: str,
+        files: Sequence[FileEmbeddingBatch],
+        repository_url: Optional[str] = None,
+        repository_description: Optional[str] = None,
+        defer_index: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Replace the embeddings of many files with one binary COPY.
+
+        Rows are streamed through asyncpg's binary ``COPY`` (the vector
+        columns use pgvector's binary codec) into a temporary staging table,
+        then a single statement deletes the files' existing rows and inserts
+        the staged ones. This avoids per-row ORM objects and round trips
+        during repository-scale indexing. The result is the same as calling
+        ``upsert_file_embedding`` for each file.
+
+        Args:
+            repository_name: Name of the repository
+            files: Embeddings per file
+            repository_url: Optional repository URL
+            repository_description: Optional repository description
+            defer_index: Drop the ANN index before loading and rebuild it
+                once afterwards. Worth it only when the load is large
+                relative to the table; searches fall back to sequential
+                scans until the rebuild is done. For loads spanning several
+                calls, use ``drop_ann_index``/``rebuild_ann_index`` instead.
+
+        Returns:
+            Load statistics: rows, files, seconds, rows_per_second
+        """
+        from pgvector.asyncpg import register_vector
+
+        files = [batch for batch in files if len(batch.vectors) and batch.content_chunks]
+        for batch in files:
+            if len(batch.vectors) != len(batch.content_chunks):
+                raise ValueError(
+                    f"Number of vectors must match number of content chunks for {batch.file_path}"
+                )
+        if not files:
+            return {"rows": 0, "files": 0, "seconds": 0.0, "rows_per_second": 0.0}
+
+        start = time.perf_counter()
+        try:
+            repository = await self._get_or_create_repository(
+                repository_name, repository_url, repository_description
+            )
+
+            if defer_index:
+                await self.drop_ann_index(commit=False)
+
+            connection = await (await self.db.connection()).get_raw_connection()
+            driver = connection.driver_connection
+
+            column_list = ", ".join(_BULK_COLUMNS)
+            await driver.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS file_embeddings_staging ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM file_embeddings WITH NO DATA"
+            )
+            await driver.execute("TRUNCATE file_embeddings_staging")
+            # The binary vector codecs only serve the COPY: left on the pooled
+            # connection they break the text binds of SQLAlchemy's VECTOR type.
+            # The savepoint keeps the transaction usable for the reset (a type
+            # lookup) when the COPY fails.
+            await register_vector(driver)
+            try:
+                async with driver.transaction():
+                    await driver.copy_records_to_table(
+                        "file_embeddings_staging",
+                        records=self._bulk_records(repository.id, files),
+                        columns=list(_BULK_COLUMNS),
+                    )
+            finally:
+                await self._reset_vector_codecs(driver)
+
+            # The DELETE and INSERT see the same snapshot, so the INSERT's
+            # rows are never deleted
+            await driver.execute(
+                f"""
+                WITH replaced AS (
+                    DELETE FROM file_embeddings f
+                    USING (SELECT DISTINCT repository_id, file_path FROM file_embeddings_staging) s
+                    WHERE f.repository_id = s.repository_id AND f.file_path = s.file_path
+                )
+                INSERT INTO file_embeddings ({column_list})
+                SELECT {column_list} FROM file_embeddings_staging
+                """
+            )
+
+            rows = sum(batch.row_count for batch in files)
+            if defer_index:
+                await self.rebuild_ann_index(commit=False)
+
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Bulk upsert of {len(files)} files failed for repository {repository_name}: {e}")
+            raise
+
+        seconds = time.perf_counter() - start
+        stats = {
+            "rows": rows,
+            "files": len(files),
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0,
+            "index_deferred": defer_index,
+        }
+        logger.info(
+            f"Bulk upserted {rows} embeddings for {len(files)} files in repository "
+            f"{repository_name} in {seconds:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+        )
+        return stats
+
+    def _bulk_records(
+        self, repository_id: int, files: Sequence[FileEmbeddingBatch]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Yield COPY records in ``_BULK_COLUMNS`` order, mirroring ``upsert_file_embedding``."""
+        now = datetime.utcnow()
+        for batch in files:
+            meta = batch.file_metadata
+            file_name = batch.file_path.split("/")[-1]
+            file_extension = file_name.split(".")[-1] if "." in file_name else None
+            chunk_strategy = meta.get("chunk_strategy", "line_based")
+
+            for chunk_index, (vector, content_chunk) in enumerate(
+                zip(batch.vectors, batch.content_chunks)
+            ):
+                vector = as_float32_vector(vector)
+                yield (
+                    batch.file_path, file_name, file_extension, meta.get("size"), meta.get("hash"),
+                    repository_id, content_chunk, chunk_index, len(batch.content_chunks),
+                    vector, self.embedding_model, len(vector), batch.embedding_type,
+                    None, None, None, None,
+                    None, None, chunk_strategy,
+                    meta.get("language"), meta.get("tokens_count"), now, now,
+                )
+
+            if not batch.has_summaries:
+                continue
+            for chunk_index, (summary_vector, summary_text, summary_meta) in enumerate(
+                zip(batch.summary_vectors, batch.summary_texts, batch.summary_metadata)
+            ):
+                summary_vector = as_float32_vector(summary_vector)
+                processing_metadata = summary_meta.get("processing_metadata")
+                yield (
+                    batch.file_path, file_name, file_extension, meta.get("size"), meta.get("hash"),
+                    repository_id, summary_meta.get("original_content", ""), chunk_index,
+                    len(batch.summary_texts),
+                    summary_vector, self.embedding_model, len(summary_vector), "summary",
+                    summary_text, summary_vector, summary_meta.get("confidence_score"),
+                    summary_meta.get("summary_type"),
+                    json.dumps(processing_metadata) if processing_metadata is not None else None,
+                    summary_meta.get("summarization_model"), chunk_strategy,
+                    meta.get("language"), summary_meta.get("tokens_count"), now, now,
+                )
+
+    async def drop_ann_index(self, commit: bool = True) -> None:
+        """
+        Drop the ANN (ivfflat) index ahead of a large load.
+
+        Pair with ``rebuild_ann_index``; until then, similarity searches run
+        as sequential scans.
+        """
+        await self.db.execute(text(f"DROP INDEX IF EXISTS {ANN_INDEX_NAME}"))
+        if commit:
+            await self.db.commit()
+        logger.info(f"Dropped ANN index {ANN_INDEX_NAME} for bulk load")
+
+    async def rebuild_ann_index(self, commit: bool = True) -> None:
+        """
+        Recreate the ANN (ivfflat) index after a bulk load.
+
+        The number of lists follows pgvector's guidance for the table size:
+        rows / 1000 up to a million rows, sqrt(rows) beyond, and at least 100.
+
+        Args:
+            commit: Commit after building
+        """
+        row_count = (await self.db.execute(select(func.count(FileEmbedding.id)))).scalar() or 0
+        lists = row_count // 1000 if row_count <= 1_000_000 else int(row_count ** 0.5)
+        lists = max(lists, 100)
+
+        start = time.perf_counter()
+        await self.db.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {ANN_INDEX_NAME} ON file_embeddings "
+                f"USING ivfflat (embedding_vector vector_cosine_ops) WITH (lists = {lists})"
+            )
+        )
+        if commit:
+            await self.db.commit()
+        logger.info(
+            f"Rebuilt ANN index {ANN_INDEX_NAME} with {lists} lists over {row_count} rows "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
     async def _get_or_create_repository(
         self, name: str, url: Optional[str] = None, description: Optional[str] = None
     ) -> Repository:
@@ -182,11 +431,12 @@ class PostgresVectorStore(VectorStore):
 
     async def search_similar_files(
         self,
-        query_vector: List[float],
+        query_vector: VectorLike,
         top_k: int = 5,
         threshold: float = 0.0,
         repository_name: Optional[str] = None,
         file_extensions: Optional[List[str]] = None,
+        include_vectors: bool = False,
     ) -> List[Tuple[Dict[str, Any], float]]:
         """
         Search for similar file chunks using pgvector cosine similarity.
@@ -197,6 +447,8 @@ class PostgresVectorStore(VectorStore):
             threshold: Minimum similarity threshold (0.0 to 1.0, where 1.0 is most similar)
             repository_name: Optional filter by repository name
             file_extensions: Optional filter by file extensions
+            include_vectors: Add each chunk's embedding to its metadata as
+                ``embedding_vector`` (for re-ranking)
 
         Returns:
             List of (metadata, similarity_score) tuples
@@ -273,6 +525,8 @@ class PostgresVectorStore(VectorStore):
                         else None
                     ),
                 }
+                if include_vectors:
+                    metadata["embedding_vector"] = embedding.embedding_vector
                 similarities.append((metadata, similarity))
 
             return similarities
@@ -1,6 +1,11 @@
 from loguru import logger
 import sys
 import os
+import atexit
+import json
+import queue
+import threading
+import time
 from pathlib import Path
 import contextvars
 import asyncio
@@ -14,6 +19,15 @@ ENV = os.getenv("APP_ENV", "development")
 APP_NAME = "Infrajet"
 LOG_LEVEL = "DEBUG" if ENV == "development" else "INFO"
 
+# "standard" keeps the full set of development sinks; "production" uses a
+# console sink without diagnostics plus a single batched JSON sink.
+LOG_MODE = os.getenv("LOG_MODE", "production" if ENV in ("production", "prod") else "standard")
+
+# Sampling of high-frequency INFO/DEBUG messages in production mode: each call
+# site may emit LOG_SAMPLE_BURST records per LOG_SAMPLE_WINDOW seconds.
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "20"))
+LOG_SAMPLE_WINDOW = float(os.getenv("LOG_SAMPLE_WINDOW", "10"))
+
 LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -54,71 +68,268 @@ FILE_FORMAT = (
     "{name}:{function}:{line} | env={extra[env]} | app={extra[app_name]} | {message}"
 )
 
+# ----------------------------------------------------
+# Sampling & Batched JSON Sink
+# ----------------------------------------------------
+class SamplingFilter:
+    """
+    Rate-limit INFO and lower records per call site.
+
+    Warnings and errors always pass. Suppressed records are counted and the
+    count is attached to the next record that passes for that call site.
+    """
+    def __init__(self, burst: int = LOG_SAMPLE_BURST, window: float = LOG_SAMPLE_WINDOW):
+        self.burst = burst
+        self.window = window
+        self._sites = {}
+        self.suppressed = 0
+
+    def __call__(self, record):
+        if record["level"].no >= 30:  # WARNING and above
+            return True
+
+        key = (record["name"], record["function"], record["line"])
+        now = time.monotonic()
+        window_start, count, dropped = self._sites.get(key, (now, 0, 0))
+        if now - window_start >= self.window:
+            window_start, count = now, 0
+
+        if count < self.burst:
+            self._sites[key] = (window_start, count + 1, 0)
+            if dropped:
+                # Copy so the count does not leak into the caller's bound
+                # context or into other sinks handling the same record
+                record["extra"] = {**record["extra"], "sampled_out": dropped}
+            return True
+
+        self._sites[key] = (window_start, count, dropped + 1)
+        self.suppressed += 1
+        return False
+
+
+_STOP = object()
+
+
+class BatchedJsonSink:
+    """
+    Loguru sink that writes compact JSON lines from a background thread.
+
+    Records are reduced to plain dicts on the calling thread and put on a
+    bounded queue. A writer thread flushes them in batches of ``batch_size``
+    or every ``flush_interval`` seconds, rotating the file at ``max_bytes``.
+    When the queue is full, records are dropped and counted instead of
+    blocking the request path. Records still queued at interpreter exit are
+    written by ``close``, which is registered with ``atexit``.
+    """
+    def __init__(
+        self,
+        path: Path,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-json-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, message):
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "name": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": record["message"],
+            "extra": record["extra"],
+        }
+        if record["exception"] is not None:
+            entry["exception"] = str(record["exception"].value)
+        if self._closed:
+            self._write([entry])
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            lines = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+            if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.dropped += len(batch)
+            sys.stderr.write(f"Failed to write structured log batch: {e}\n")
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until queued records have been written (best effort)."""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout: float = 5.0):
+        """Write every queued record and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def metrics(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+
+_sampling_filters = {}
+_batched_sinks = {}
+
 # ----------------------------------------------------
 # Handlers
 # ----------------------------------------------------
 logger.remove()
 
-# Console logging
-logger.add(
-    sys.stdout,
-    colorize=True,
-    format=CONSOLE_FORMAT,
-    level=LOG_LEVEL,
-    backtrace=True,
-    diagnose=True,
-    enqueue=True
-)
-
-# Application log
-logger.add(
-    LOG_DIR / "app.log",
-    format=FILE_FORMAT,
-    level="INFO",
-    rotation="10 MB",
-    retention="30 days",
-    compression="zip",
-    enqueue=True
-)
+if LOG_MODE == "production":
+    # Console logging without variable inspection on tracebacks
+    logger.add(
+        sys.stdout,
+        colorize=False,
+        format=FILE_FORMAT,
+        level=LOG_LEVEL,
+        filter=_sampling_filters.setdefault("console", SamplingFilter()),
+        backtrace=False,
+        diagnose=False,
+        enqueue=True
+    )
 
-# Error log
-logger.add(
-    LOG_DIR / "error.log",
-    format=FILE_FORMAT,
-    level="ERROR",
-    rotation="5 MB",
-    retention="60 days",
-    compression="zip",
-    enqueue=True
-)
+    # Single batched JSON sink for everything at LOG_LEVEL and above
+    _batched_sinks["structured"] = BatchedJsonSink(LOG_DIR / "structured.json")
+    logger.add(
+        _batched_sinks["structured"],
+        level=LOG_LEVEL,
+        filter=_sampling_filters.setdefault("structured", SamplingFilter()),
+        backtrace=False,
+        diagnose=False,
+    )
+else:
+    # Console logging
+    logger.add(
+        sys.stdout,
+        colorize=True,
+        format=CONSOLE_FORMAT,
+        level=LOG_LEVEL,
+        backtrace=True,
+        diagnose=True,
+        enqueue=True
+    )
 
-# Debug log (only in development)
-if ENV == "development":
+    # Application log
     logger.add(
-        LOG_DIR / "debug.log",
+        LOG_DIR / "app.log",
         format=FILE_FORMAT,
-        level="DEBUG",
-        rotation="5 MB",
-        retention="7 days",
+        level="INFO",
+        rotation="10 MB",
+        retention="30 days",
+        compression="zip",
         enqueue=True
     )
 
-# Structured JSON logs
-try:
+    # Error log
     logger.add(
-        LOG_DIR / "structured.json",
-        serialize=True,  # ✅ Let Loguru handle JSON serialization
-        level="DEBUG",
-        rotation="10 MB",  # Increased rotation size to reduce frequency
-        retention="15 days",
-        compression="gz",
-        enqueue=True,
-        delay=True  # Delay file opening until first log message
+        LOG_DIR / "error.log",
+        format=FILE_FORMAT,
+        level="ERROR",
+        rotation="5 MB",
+        retention="60 days",
+        compression="zip",
+        enqueue=True
     )
-except Exception as e:
-    # Fallback: log to console only if file logging fails
-    logger.warning(f"Failed to setup structured JSON logging: {e}. Using console only.")
-    pass
+
+    # Debug log (only in development)
+    if ENV == "development":
+        logger.add(
+            LOG_DIR / "debug.log",
+            format=FILE_FORMAT,
+            level="DEBUG",
+            rotation="5 MB",
+            retention="7 days",
+            enqueue=True
+        )
+
+    # Structured JSON logs
+    try:
+        logger.add(
+            LOG_DIR / "structured.json",
+            serialize=True,  # ✅ Let Loguru handle JSON serialization
+            level="DEBUG",
+            rotation="10 MB",  # Increased rotation size to reduce frequency
+            retention="15 days",
+            compression="gz",
+            enqueue=True,
+            delay=True  # Delay file opening until first log message
+        )
+    except Exception as e:
+        # Fallback: log to console only if file logging fails
+        logger.warning(f"Failed to setup structured JSON logging: {e}. Using console only.")
+        pass
 
 # ----------------------------------------------------
 # Exception Handling
@@ -145,3 +356,11 @@ def get_logger():
 
 def get_context_filter():
     return context_filter
+
+def get_sink_metrics():
+    """Queue depth and throughput of the batched sinks, plus sampling counts."""
+    return {
+        "mode": LOG_MODE,
+        "sampled_out": {name: f.suppressed for name, f in _sampling_filters.items()},
+        "sinks": {name: sink.metrics() for name, sink in _batched_sinks.items()},
+    }
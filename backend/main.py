@@ -4,7 +4,14 @@ import socketio
 from logconfig.logger import get_logger, get_context_filter
 from app.api.v1.api import create_app
 from app.core.config import get_settings
+from app.core.firebase_token_cache import check_signing_certificate_endpoint
+from app.core.github_http_cache import github_http_cache
 from app.db.session import engine, create_tables
+from app.services.code_generation.diff.engine import shutdown_diff_executor
+from app.services.code_generation.rag.cache import get_retrieval_cache
+from app.services.code_generation.registry import get_component_registry
+from app.services.chat.conversation_context_manager import context_store
+from app.services.github_token_cache import credential_cache
 from app.services.job_queue import job_queue_service
 from app.services.websocket_manager import websocket_manager
 
@@ -30,10 +37,17 @@ async def startup_event():
     await create_tables()
     logger.info("Application startup: Database tables created successfully")
 
+    # Build shared code generation components once for the process
+    get_component_registry().warm_up()
+    logger.info("Application startup: Code generation components initialized")
+
     # Start job queue service
     await job_queue_service.start()
     logger.info("Application startup: Job queue service started")
 
+    # Surface an unreachable Firebase signing certificate endpoint at startup
+    await check_signing_certificate_endpoint()
+
     # Start WebSocket manager background tasks
     await websocket_manager.start_background_tasks()
     logger.info("Application startup: WebSocket manager background tasks started")
@@ -61,6 +75,11 @@ async def startup_event():
 async def shutdown_event():
     # Stop background services
     await job_queue_service.stop()
+    await context_store.close()
+    await credential_cache.close()
+    await github_http_cache.close()
+    await get_retrieval_cache().index_versions.close()
+    shutdown_diff_executor()
     await websocket_manager.stop_background_tasks()
     logger.info("Application shutdown: Background services stopped")
 